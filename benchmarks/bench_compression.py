@@ -0,0 +1,51 @@
+"""
+Measures the size and latency tradeoff of compressing cached authz_info.
+
+For IndexedAuthorizationInfo objects of increasing size, serializes with the
+default msgpack SerializationManager, with and without a PayloadCompressor,
+and reports the encoded size and the mean serialize/deserialize latency.
+"""
+import timeit
+
+from yosai.core import (
+    PayloadCompressor,
+    SerializationManager,
+)
+from yosai.core.serialize.benchmark import make_authz_info
+
+
+def measure(manager, obj, number):
+    message = manager.serialize(obj)
+    ser = timeit.timeit(lambda: manager.serialize(obj), number=number) / number
+    deser = timeit.timeit(lambda: manager.deserialize(message),
+                          number=number) / number
+    return len(message), ser, deser
+
+
+def main():
+    managers = [('none', SerializationManager())]
+    for codec, level in [('zlib', 1), ('zlib', 6), ('zlib', 9),
+                         ('bz2', 9), ('lzma', 0)]:
+        compressor = PayloadCompressor(threshold=1024, codec=codec, level=level)
+        managers.append(('{0}-{1}'.format(codec, level),
+                         SerializationManager(compressor=compressor)))
+
+    header = '{0:>6} {1:>9} {2:>10} {3:>8} {4:>12} {5:>12}'
+    print(header.format('perms', 'codec', 'bytes', 'ratio',
+                        'ser (ms)', 'deser (ms)'))
+
+    for permission_count in (10, 100, 1000, 5000):
+        authz_info = make_authz_info(permission_count, role_count=20)
+        number = max(1, 2000 // permission_count)
+        baseline = None
+        for name, manager in managers:
+            size, ser, deser = measure(manager, authz_info, number)
+            baseline = baseline or size
+            print(header.format(permission_count, name, size,
+                                '{0:.2f}'.format(size / baseline),
+                                '{0:.3f}'.format(ser * 1000),
+                                '{0:.3f}'.format(deser * 1000)))
+
+
+if __name__ == '__main__':
+    main()
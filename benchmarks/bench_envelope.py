@@ -0,0 +1,74 @@
+"""
+Measures the cost of the SerializationManager envelope.
+
+"legacy" reproduces the envelope of earlier releases:  pkg_resources is
+queried and a timestamp formatted for every call, the envelope is copied for
+each element of a list and every dict carries its class name.  "compact" is
+SerializationManager.serialize, whose envelope is a cached version tag and a
+small type code.  Both encode with msgpack and use the same codecs.
+"""
+import copy
+import datetime
+import timeit
+
+import msgpack
+import pkg_resources
+
+from yosai.core import (
+    SerializationManager,
+    SimpleRole,
+)
+from yosai.core.serialize.benchmark import make_session
+
+
+def legacy_serialize(manager, obj):
+    try:
+        dist_version = pkg_resources.get_distribution('yosai').version
+    except pkg_resources.DistributionNotFound:
+        dist_version = 'N/A'
+
+    newdict = {}
+    now = datetime.datetime.utcnow().isoformat()
+    newdict.update({'serialized_dist_version': dist_version,
+                    'serialized_record_dt': now})
+    if isinstance(obj, list):
+        newobj = []
+        for element in obj:
+            mydict = copy.copy(newdict)
+            mydict['serialized_cls'] = element.__class__.__name__
+            mydict.update(manager.to_dict(element))
+            newobj.append(mydict)
+    else:
+        newdict.update(manager.to_dict(obj))
+        newdict['serialized_cls'] = obj.__class__.__name__
+        newobj = newdict
+    # the legacy format encoded datetimes and timedeltas as strings:
+    return msgpack.packb(newobj, default=str)
+
+
+def main():
+    manager = SerializationManager()
+    objects = [('SimpleRole', SimpleRole('admin')),
+               ('SimpleSession', make_session()),
+               ('100 x SimpleRole', [SimpleRole('role' + str(x))
+                                     for x in range(100)])]
+    number = 2000
+
+    header = '{0:>18} {1:>12} {2:>13} {3:>13} {4:>14}'
+    print(header.format('object', 'legacy (us)', 'compact (us)',
+                        'legacy bytes', 'compact bytes'))
+
+    for name, obj in objects:
+        legacy = timeit.timeit(lambda: legacy_serialize(manager, obj),
+                               number=number) / number
+        compact = timeit.timeit(lambda: manager.serialize(obj),
+                                number=number) / number
+        print(header.format(name,
+                            '{0:.1f}'.format(legacy * 1e6),
+                            '{0:.1f}'.format(compact * 1e6),
+                            len(legacy_serialize(manager, obj)),
+                            len(manager.serialize(obj))))
+
+
+if __name__ == '__main__':
+    main()
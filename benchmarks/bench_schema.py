@@ -0,0 +1,62 @@
+"""
+Measures the per-object cost of converting Serializables to and from dicts.
+
+"rebuilt" calls serialization_schema() and instantiates its schema for every
+call, as Serializable did before schemas were memoized.  "memoized" uses
+Serializable.serialize/deserialize, which re-use the schema class and a
+per-thread schema instance.  "codec" uses the hand-written codec that the
+SerializationManager picks for the object's class.
+"""
+import timeit
+
+from yosai.core import (
+    DefaultPermission,
+    SerializationManager,
+    SimpleIdentifierCollection,
+    SimpleRole,
+)
+from yosai.core.serialize.benchmark import make_authz_info, make_session
+
+
+def rebuilt(obj):
+    cls = obj.__class__
+    data = cls.serialization_schema()().dump(obj).data
+    return cls.serialization_schema()().load(data=data).data
+
+
+def memoized(obj):
+    return obj.__class__.deserialize(obj.serialize())
+
+
+def codec(obj):
+    encode, decode = SerializationManager.codecs[obj.__class__]
+    return decode(encode(obj))
+
+
+def main():
+    objects = [
+        ('SimpleRole', SimpleRole('admin')),
+        ('DefaultPermission', DefaultPermission(
+            wildcard_string='leatherduffelbag:transport:theringer')),
+        ('SimpleIdentifierCollection', SimpleIdentifierCollection(
+            source_name='AccountStoreRealm', identifier='thedude')),
+        ('SimpleSession', make_session()),
+        ('IndexedAuthorizationInfo (10)', make_authz_info(10, role_count=2)),
+    ]
+    number = 2000
+
+    header = '{0:>30} {1:>14} {2:>14} {3:>11}'
+    print(header.format('object', 'rebuilt (us)', 'memoized (us)', 'codec (us)'))
+
+    for name, obj in objects:
+        before = timeit.timeit(lambda: rebuilt(obj), number=number) / number
+        after = timeit.timeit(lambda: memoized(obj), number=number) / number
+        fast = timeit.timeit(lambda: codec(obj), number=number) / number
+        print(header.format(name,
+                            '{0:.1f}'.format(before * 1e6),
+                            '{0:.1f}'.format(after * 1e6),
+                            '{0:.1f}'.format(fast * 1e6)))
+
+
+if __name__ == '__main__':
+    main()
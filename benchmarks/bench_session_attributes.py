@@ -0,0 +1,63 @@
+"""
+Measures the cost of reading and validating a cached session that holds many
+attributes, as DefaultNativeSessionHandler.do_get_session does.
+
+"eager" decodes the session's attributes along with it, as SimpleSession did
+before attributes were decoded lazily.  "lazy" validates the session without
+using its attributes.  "lazy + get" then reads one attribute, decoding them
+all.
+"""
+import timeit
+
+from yosai.core import (
+    SerializationManager,
+    SimpleSession,
+)
+from yosai.core.serialize.benchmark import (
+    make_attributes_schema,
+    make_session,
+)
+
+
+def make_payload(serialization_manager, count):
+    return serialization_manager.serialize(make_session(count))
+
+
+def eager(serialization_manager, payload):
+    session = serialization_manager.deserialize(payload)
+    session.attributes
+    session.validate()
+
+
+def lazy(serialization_manager, payload):
+    session = serialization_manager.deserialize(payload)
+    session.validate()
+
+
+def lazy_get(serialization_manager, payload):
+    session = serialization_manager.deserialize(payload)
+    session.validate()
+    session.get_attribute('attribute0')
+
+
+def main():
+    sm = SerializationManager()
+    number = 2000
+
+    header = '{0:>11} {1:>11} {2:>10} {3:>16}'
+    print(header.format('attributes', 'eager (us)', 'lazy (us)',
+                        'lazy + get (us)'))
+
+    for count in (0, 10, 50):
+        SimpleSession.set_attributes_schema(make_attributes_schema(count))
+        payload = make_payload(sm, count)
+
+        timings = [timeit.timeit(lambda: read(sm, payload),
+                                 number=number) / number
+                   for read in (eager, lazy, lazy_get)]
+        print(header.format(count, *('{0:.1f}'.format(timing * 1e6)
+                                     for timing in timings)))
+
+
+if __name__ == '__main__':
+    main()
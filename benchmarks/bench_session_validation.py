@@ -0,0 +1,76 @@
+"""
+Compares SimpleSession with CompactSession, which keeps its fields in slots
+and its timestamps as epoch seconds:
+
+    - the time to validate a session, 1,000,000 times by default
+    - the peak memory allocated (per tracemalloc) while validating
+    - the memory held by each of 10,000 live sessions
+
+    python benchmarks/bench_session_validation.py
+    python benchmarks/bench_session_validation.py --number 100000
+"""
+import argparse
+import timeit
+import tracemalloc
+
+from yosai.core import (
+    CompactSession,
+    SimpleSession,
+)
+from yosai.core.serialize.benchmark import make_session
+
+POPULATION_SIZE = 10000
+
+
+def validation_peak(session, number):
+    """
+    :returns: the peak memory, in bytes, allocated while validating
+    """
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        for _ in range(number):
+            session.validate()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+
+def bytes_per_session(session_cls):
+    """
+    :returns: the mean memory, in bytes, held by each live session
+    """
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        sessions = [make_session(session_cls=session_cls)
+                    for _ in range(POPULATION_SIZE)]
+        held = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del sessions
+    return held / POPULATION_SIZE
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--number', type=int, default=1000000,
+                        help='the number of validations to time')
+    args = parser.parse_args(argv)
+
+    header = '{0:>15} {1:>13} {2:>14} {3:>13} {4:>14}'
+    print(header.format('session', 'total (s)', 'per call (ns)',
+                        'peak (bytes)', 'bytes/session'))
+
+    for session_cls in (SimpleSession, CompactSession):
+        session = make_session(session_cls=session_cls)
+        elapsed = timeit.timeit(session.validate, number=args.number)
+        print(header.format(session_cls.__name__,
+                            '{0:.2f}'.format(elapsed),
+                            '{0:.0f}'.format(elapsed / args.number * 1e9),
+                            validation_peak(session, 10000),
+                            '{0:.0f}'.format(bytes_per_session(session_cls))))
+
+
+if __name__ == '__main__':
+    main()
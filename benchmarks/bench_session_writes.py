@@ -0,0 +1,126 @@
+"""
+Simulates an hour of traffic against cached sessions and counts the session
+writes that DefaultNativeSessionHandler makes, for several values of
+SimpleSession.touch_write_threshold.
+
+Every request reads (and auto-touches) a session;  a fraction of requests
+also change an attribute.  Before dirty tracking, every call of on_change
+wrote its session:  that is the "before" column.
+
+Time is simulated, so the benchmark runs in seconds.
+"""
+import datetime
+import heapq
+import logging
+import random
+import types
+from unittest import mock
+
+import pytz
+from marshmallow import Schema, fields
+
+from yosai.core import (
+    DefaultNativeSessionHandler,
+    DefaultSessionKey,
+    MemoryCacheHandler,
+    SessionEventHandler,
+    SimpleSession,
+)
+from yosai.core.session import session as session_module
+
+SESSIONS = 500
+DURATION = datetime.timedelta(hours=1)
+MEAN_INTERVAL = 60  # seconds between a session's requests, on average
+IDLE_TIMEOUT = datetime.timedelta(minutes=30)
+ABSOLUTE_TIMEOUT = datetime.timedelta(hours=2)
+
+
+class SimulatedClock:
+
+    def __init__(self):
+        self.current = datetime.datetime(2016, 1, 1, tzinfo=pytz.utc)
+
+    def now(self, tz=None):
+        return self.current
+
+
+class AttributesSchema(Schema):
+    cart = fields.Str()
+
+
+def simulate(threshold, write_fraction, seed=1):
+    """
+    :param write_fraction: the fraction of requests that change an attribute
+    :returns: a tuple of (requests, changes, writes), where changes counts
+              the calls of on_change, each of which wrote its session
+              before dirty tracking
+    """
+    rand = random.Random(seed)
+    clock = SimulatedClock()
+    fake_datetime = types.SimpleNamespace(
+        datetime=types.SimpleNamespace(now=clock.now),
+        timedelta=datetime.timedelta)
+
+    with mock.patch.object(session_module, 'datetime', fake_datetime), \
+            mock.patch.object(SimpleSession, 'touch_write_threshold',
+                              threshold):
+        handler = DefaultNativeSessionHandler(SessionEventHandler(),
+                                              auto_touch=True)
+        handler.cache_handler = MemoryCacheHandler(absolute_ttl=10**6)
+        store = handler.session_store
+
+        keys = []
+        for _ in range(SESSIONS):
+            session = SimpleSession()
+            session.idle_timeout = IDLE_TIMEOUT
+            session.absolute_timeout = ABSOLUTE_TIMEOUT
+            keys.append(DefaultSessionKey(handler.create_session(session)))
+
+        # each session's requests arrive at exponentially distributed intervals
+        arrivals = [(rand.expovariate(1.0 / MEAN_INTERVAL), index)
+                    for index in range(len(keys))]
+        heapq.heapify(arrivals)
+        end = DURATION.total_seconds()
+        origin = clock.current
+
+        requests = 0
+        with mock.patch.object(store, 'update', wraps=store.update) as update,\
+                mock.patch.object(handler, 'on_change',
+                                  wraps=handler.on_change) as on_change:
+            while arrivals[0][0] <= end:
+                at, index = heapq.heappop(arrivals)
+                clock.current = origin + datetime.timedelta(seconds=at)
+
+                session = handler.do_get_session(keys[index])
+                if rand.random() < write_fraction:
+                    session.set_attribute('cart', str(rand.random()))
+                    handler.on_change(session)
+                requests += 1
+
+                following = at + rand.expovariate(1.0 / MEAN_INTERVAL)
+                heapq.heappush(arrivals, (following, index))
+            writes = update.call_count
+            changes = on_change.call_count
+
+    return requests, changes, writes
+
+
+def main():
+    # sessions without identifiers aren't indexed by identifier, noisily:
+    logging.disable(logging.WARNING)
+    SimpleSession.set_attributes_schema(AttributesSchema)
+
+    header = '{0:>10} {1:>15} {2:>9} {3:>8} {4:>8} {5:>10}'
+    print(header.format('threshold', 'changing reqs', 'requests', 'before',
+                        'writes', 'reduction'))
+    for write_fraction in (0.0, 0.1):
+        for threshold in (0.0, 0.01, 0.05, 0.1, 0.25):
+            requests, changes, writes = simulate(threshold, write_fraction)
+            print(header.format(threshold,
+                                '{0:.0%}'.format(write_fraction),
+                                requests, changes, writes,
+                                '{0:.1%}'.format(1 - writes / changes)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+Measures serialization throughput, size and memory over realistic
+populations of the objects that Yosai caches:
+
+    - sessions with N attributes
+    - authz_info with M permissions and R roles
+    - identifier collections across K realms
+
+For each population and format, reports serialize and de-serialize
+operations per second, bytes per object and the peak memory allocated (per
+tracemalloc) while serializing and de-serializing one object.  A SimpleSession
+defers decoding its attributes until they're used, so de-serializing is
+measured both without ("lazy") and with ("full") decoding them.
+
+    python benchmarks/suite.py
+    python benchmarks/suite.py --json results.json
+    python benchmarks/suite.py --compare results.json
+
+--json writes the results, with their environment, as machine-readable json
+so that they can be tracked over time.  --compare reports the change in
+operations per second against earlier results.
+"""
+import argparse
+import datetime
+import json
+import platform
+import random
+import sys
+import timeit
+import tracemalloc
+
+from yosai.core import (
+    SerializationManager,
+    SimpleSession,
+)
+from yosai.core.serialize.benchmark import (
+    deserialize_fully,
+    make_attributes_schema,
+    make_authz_info,
+    make_identifiers,
+    make_session,
+)
+from yosai.core.serialize.serialize import dist_version
+
+POPULATION_SIZE = 20
+MAX_ATTRIBUTES = 50
+
+
+def populations():
+    """
+    :returns: a list of (object name, parameters, objects) tuples, each
+              population of objects generated from a fixed seed
+    """
+    rand = random.Random(1)
+    result = []
+    for n in (0, 10, MAX_ATTRIBUTES):
+        result.append(('SimpleSession', {'attributes': n},
+                       [make_session(n, rand) for _ in range(POPULATION_SIZE)]))
+    for m, r in ((10, 2), (100, 10), (1000, 50)):
+        result.append(('IndexedAuthorizationInfo',
+                       {'permissions': m, 'roles': r},
+                       [make_authz_info(m, r, rand)
+                        for _ in range(POPULATION_SIZE)]))
+    for k in (1, 3, 10):
+        result.append(('SimpleIdentifierCollection', {'realms': k},
+                       [make_identifiers(k, rand)
+                        for _ in range(POPULATION_SIZE)]))
+    return result
+
+
+def ops_per_second(func, objects):
+    """
+    :returns: the number of calls of func, over objects in turn, per second
+    """
+    def run():
+        for obj in objects:
+            func(obj)
+
+    number, elapsed = timeit.Timer(run).autorange()
+    return number * len(objects) / elapsed
+
+
+def peak_allocation(func, objects):
+    """
+    :returns: the mean of the peak memory, in bytes, allocated by each call
+    """
+    # reset_peak is new in python 3.9;  clearing traces also resets the peak
+    reset_peak = getattr(tracemalloc, 'reset_peak', tracemalloc.clear_traces)
+
+    total = 0
+    tracemalloc.start()
+    try:
+        for obj in objects:
+            reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            func(obj)
+            total += tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return total / len(objects)
+
+
+def measure(manager, objects):
+    messages = [manager.serialize(obj) for obj in objects]
+
+    def deserialize_full(message):
+        return deserialize_fully(manager, message)
+
+    return {
+        'serialize_ops_per_sec': ops_per_second(manager.serialize, objects),
+        'deserialize_ops_per_sec': ops_per_second(manager.deserialize,
+                                                  messages),
+        'full_deserialize_ops_per_sec': ops_per_second(deserialize_full,
+                                                       messages),
+        'bytes_per_object': sum(map(len, messages)) / len(messages),
+        'serialize_peak_alloc_bytes': peak_allocation(manager.serialize,
+                                                      objects),
+        'deserialize_peak_alloc_bytes': peak_allocation(manager.deserialize,
+                                                        messages),
+        'full_deserialize_peak_alloc_bytes': peak_allocation(deserialize_full,
+                                                             messages),
+    }
+
+
+def run(formats):
+    SimpleSession.set_attributes_schema(make_attributes_schema(MAX_ATTRIBUTES))
+    results = []
+    for name, parameters, objects in populations():
+        for format in formats:
+            result = {'object': name, 'parameters': parameters,
+                      'format': format}
+            result.update(measure(SerializationManager(format=format), objects))
+            results.append(result)
+    return results
+
+
+def result_key(result):
+    return (result['object'], json.dumps(result['parameters'], sort_keys=True),
+            result['format'])
+
+
+def print_table(results, baseline=None):
+    baseline = {result_key(each): each for each in (baseline or [])}
+
+    header = ('{0:>27} {1:>28} {2:>8} {3:>12} {4:>12} {5:>12} {6:>9} '
+              '{7:>11} {8:>11} {9:>11}')
+    print(header.format('object', 'parameters', 'format', 'ser ops/s',
+                        'lazy ops/s', 'full ops/s', 'bytes', 'ser alloc',
+                        'lazy alloc', 'full alloc'))
+
+    rates = ('serialize_ops_per_sec', 'deserialize_ops_per_sec',
+             'full_deserialize_ops_per_sec')
+    for result in results:
+        before = baseline.get(result_key(result))
+        columns = []
+        for rate in rates:
+            column = '{0:.0f}'.format(result[rate])
+            # results from before full de-serialization was measured lack it:
+            if before and rate in before:
+                column += ' ({0:+.0%})'.format(result[rate] / before[rate] - 1)
+            columns.append(column)
+
+        parameters = ', '.join('{0}={1}'.format(key, value) for key, value
+                               in sorted(result['parameters'].items()))
+        columns.append('{0:.0f}'.format(result['bytes_per_object']))
+        columns.extend('{0:.0f}'.format(result[alloc]) for alloc in (
+            'serialize_peak_alloc_bytes', 'deserialize_peak_alloc_bytes',
+            'full_deserialize_peak_alloc_bytes'))
+        print(header.format(result['object'], parameters, result['format'],
+                            *columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--format', action='append', dest='formats',
+                        help='a format to measure (default: msgpack and json)')
+    parser.add_argument('--json', dest='output',
+                        help="write the results as json to this file, "
+                             "or '-' for stdout")
+    parser.add_argument('--compare',
+                        help='a json results file to compare against')
+    args = parser.parse_args(argv)
+
+    results = run(args.formats or ['msgpack', 'json'])
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)['results']
+
+    if args.output:
+        document = {
+            'created': datetime.datetime.utcnow().isoformat() + 'Z',
+            'yosai_version': dist_version(),
+            'python_version': platform.python_version(),
+            'platform': platform.platform(),
+            'population_size': POPULATION_SIZE,
+            'results': results,
+        }
+        if args.output == '-':
+            json.dump(document, sys.stdout, indent=2)
+            return 0
+        with open(args.output, 'w') as stream:
+            json.dump(document, stream, indent=2)
+
+    print_table(results, baseline)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
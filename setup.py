@@ -69,5 +69,8 @@ setup(
     ],
     install_requires=install_requires,
     zip_safe=False,
+    entry_points={
+        'console_scripts': ['yosai-cache-bulk = yosai.core.cache.bulk:main'],
+    },
     cmdclass={'clean': CleanCommand}
 )
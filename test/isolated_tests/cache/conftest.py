@@ -0,0 +1,58 @@
+import sys
+
+import pytest
+
+from yosai.core import (
+    EarlyRefreshCacheHandler,
+    InstrumentedCacheHandler,
+    MemoryCacheHandler,
+    ShardedCacheHandler,
+)
+
+from .doubles import (
+    DictCacheHandler,
+    WarmableRealm,
+)
+
+
+# the asyncio counterparts require python 3.5 (async def)
+collect_ignore = ['test_cache_aio.py'] if sys.version_info < (3, 5) else []
+
+
+@pytest.fixture(scope='function')
+def dict_cache_handler():
+    return DictCacheHandler()
+
+
+@pytest.fixture(scope='function')
+def instrumented_cache_handler(dict_cache_handler):
+    return InstrumentedCacheHandler(dict_cache_handler)
+
+
+@pytest.fixture(scope='function')
+def early_refresh_cache_handler(dict_cache_handler):
+    erch = EarlyRefreshCacheHandler(dict_cache_handler,
+                                    ttl={'credentials': 60})
+    erch.clock = lambda: 1000.0
+    erch.random = lambda: 0.5
+    return erch
+
+
+@pytest.fixture(scope='function')
+def warmable_realm():
+    return WarmableRealm(accounts=('thedude', 'walter'))
+
+
+@pytest.fixture(scope='function')
+def memory_cache_handler():
+    mch = MemoryCacheHandler(ttl={'credentials': 10})
+    mch.now = 1000.0
+    mch.clock = lambda: mch.now
+    return mch
+
+
+@pytest.fixture(scope='function')
+def sharded_cache_handler():
+    # in-process stand-ins for several cache backends:
+    return ShardedCacheHandler({name: MemoryCacheHandler()
+                                for name in ('shard0', 'shard1', 'shard2')})
@@ -0,0 +1,48 @@
+from yosai.core import (
+    cache_abcs,
+)
+
+
+class DictCacheHandler(cache_abcs.CacheHandler):
+    """
+    A dict-backed CacheHandler that stores values as-is (no serialization)
+    """
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, domain, identifier):
+        return self.store.get((domain, identifier))
+
+    def get_or_create(self, domain, identifier, creator_func, creator):
+        value = self.store.get((domain, identifier))
+        if value is None:
+            value = creator_func(creator)
+            self.store[(domain, identifier)] = value
+        return value
+
+    def set(self, domain, identifier, value):
+        self.store[(domain, identifier)] = value
+
+    def delete(self, domain, identifier):
+        self.store.pop((domain, identifier), None)
+
+    def keys(self, pattern):
+        return list(self.store)
+
+
+class WarmableRealm:
+    """
+    A realm double that records the identifiers it is asked to warm
+    """
+
+    def __init__(self, accounts, cache_handler='cache_handler'):
+        self.accounts = accounts
+        self.cache_handler = cache_handler
+        self.warmed = []
+
+    def warm_cache(self, identifier):
+        if identifier == 'broken':
+            raise ValueError('account store is down')
+        self.warmed.append(identifier)
+        return identifier in self.accounts
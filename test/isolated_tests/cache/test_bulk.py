@@ -0,0 +1,204 @@
+import io
+import pytest
+
+from yosai.core import (
+    MemoryCacheHandler,
+    SerializationException,
+    SimpleRole,
+    SimpleSession,
+)
+
+from yosai.core.cache import bulk
+
+# -----------------------------------------------------------------------------
+# Bulk Export/Import Tests
+# -----------------------------------------------------------------------------
+
+
+@pytest.fixture(scope='function')
+def populated_cache_handler(memory_cache_handler):
+    mch = memory_cache_handler
+    for x in range(3):
+        session = SimpleSession(host='127.0.0.1')
+        session.session_id = 'session:' + str(x)  # ids may contain colons
+        mch.set(domain='session', identifier=session.session_id, value=session)
+    mch.set(domain='authz_info', identifier='thedude', value=SimpleRole('x'))
+    mch.set(domain='credentials', identifier='thedude', value=SimpleRole('y'))
+    return mch
+
+
+def test_export_import_round_trip(populated_cache_handler):
+    """
+    unit tested:  export_cache, import_cache
+
+    test case:
+    the exported domains are imported into another cache handler, payloads
+    unchanged
+    """
+    source = populated_cache_handler
+    stream = io.BytesIO()
+    exported = bulk.export_cache(source, stream)
+
+    target = MemoryCacheHandler()
+    stream.seek(0)
+    imported = bulk.import_cache(target, stream)
+
+    assert (exported == imported == 4 and
+            sorted(target.keys('*')) ==
+            sorted(source.keys('yosai:*:session') +
+                   source.keys('yosai:*:authz_info')) and
+            target.get_raw('session', 'session:1') ==
+            source.get_raw('session', 'session:1'))
+
+
+def test_export_import_hash_entries(populated_cache_handler):
+    """
+    unit tested:  export_cache, import_cache
+
+    test case:
+    hash entries, such as those of a HashCachingSessionStore and of the
+    identifier_sessions index, are exported and imported with the others
+    """
+    source = populated_cache_handler
+    source.hset(domain='session', identifier='hashed',
+                mapping={'header': b'h', 'attribute:cart': b'eggs'})
+    source.hset(domain='identifier_sessions', identifier='thedude',
+                mapping={'session:1': b'1'})
+    stream = io.BytesIO()
+    exported = bulk.export_cache(source, stream)
+
+    target = MemoryCacheHandler()
+    stream.seek(0)
+    imported = bulk.import_cache(target, stream)
+
+    assert (exported == imported == 6 and
+            target.hgetall('session', 'hashed') ==
+            {'header': b'h', 'attribute:cart': b'eggs'} and
+            target.hgetall('identifier_sessions', 'thedude') ==
+            {'session:1': b'1'} and
+            target.get_raw('session', 'session:1') ==
+            source.get_raw('session', 'session:1'))
+
+
+def test_read_records_legacy_header():
+    """
+    unit tested:  read_records
+
+    test case:
+    an export of version 1, which predates hash entries, remains readable
+    """
+    stream = io.BytesIO()
+    bulk.write_records(stream, [('session', 'a', b'payload')])
+    legacy = io.BytesIO(bulk.legacy_headers[0] +
+                        stream.getvalue()[len(bulk.header):])
+    assert list(bulk.read_records(legacy)) == [('session', 'a', b'payload')]
+
+
+def test_import_selected_domains(populated_cache_handler):
+    """
+    unit tested:  import_cache
+
+    test case:
+    only the selected domains are imported
+    """
+    stream = io.BytesIO()
+    bulk.export_cache(populated_cache_handler, stream)
+    stream.seek(0)
+
+    target = MemoryCacheHandler()
+    assert (bulk.import_cache(target, stream, domains=['authz_info']) == 1 and
+            target.keys('*') == ['yosai:thedude:authz_info'])
+
+
+def test_generate_records_skips_expired(populated_cache_handler):
+    """
+    unit tested:  generate_records
+
+    test case:
+    entries that expire before they are read are skipped
+    """
+    mch = populated_cache_handler
+    keys = mch.keys('yosai:*:session')
+    mch.keys = lambda pattern: keys
+    mch.delete('session', 'session:0')
+
+    records = list(bulk.generate_records(mch, domains=['session']))
+    assert sorted(identifier for _, identifier, _ in records) == [
+        'session:1', 'session:2']
+
+
+def test_generate_records_decodes_byte_keys(populated_cache_handler):
+    """
+    unit tested:  generate_records
+
+    test case:
+    keys returned as bytes, as by redis, are parsed as well
+    """
+    mch = populated_cache_handler
+    keys = mch.keys('yosai:*:authz_info')
+    mch.keys = lambda pattern: [key.encode('utf-8') for key in keys]
+
+    records = list(bulk.generate_records(mch, domains=['authz_info']))
+    assert [identifier for _, identifier, _ in records] == ['thedude']
+
+
+def test_write_records_is_streamed():
+    """
+    unit tested:  write_records
+
+    test case:
+    records are consumed from a generator, one at a time, and are read back in
+    order
+    """
+    records = (('session', str(x), bytes([x % 256]) * x) for x in range(1000))
+    stream = io.BytesIO()
+
+    assert bulk.write_records(stream, records) == 1000
+    stream.seek(0)
+    read = list(bulk.read_records(stream))
+    assert read[999] == ('session', '999', bytes([999 % 256]) * 999)
+
+
+def test_read_records_bad_header():
+    """
+    unit tested:  read_records
+
+    test case:
+    a stream that isn't an export raises an exception
+    """
+    with pytest.raises(SerializationException):
+        list(bulk.read_records(io.BytesIO(b'not an export')))
+
+
+def test_read_records_truncated():
+    """
+    unit tested:  read_records
+
+    test case:
+    a stream that ends in the middle of a record raises an exception
+    """
+    stream = io.BytesIO()
+    bulk.write_records(stream, [('session', 'a', b'payload')])
+    truncated = io.BytesIO(stream.getvalue()[:-3])
+
+    with pytest.raises(SerializationException):
+        list(bulk.read_records(truncated))
+
+
+def test_main_export_import(populated_cache_handler, tmpdir, monkeypatch):
+    """
+    unit tested:  main
+
+    test case:
+    the command line exports a cache to a file and imports it into another
+    """
+    target = MemoryCacheHandler()
+    handlers = iter([populated_cache_handler, target])
+    monkeypatch.setattr(bulk, 'create_cache_handler',
+                        lambda path: next(handlers))
+    path = str(tmpdir.join('backup.ysb'))
+
+    assert bulk.main(['export', path, '--cache-handler', 'x:y',
+                      '--domain', 'session']) == 0
+    assert bulk.main(['import', path, '--cache-handler', 'x:y']) == 0
+    assert len(target.keys('yosai:*:session')) == 3
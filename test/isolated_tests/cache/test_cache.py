@@ -0,0 +1,996 @@
+import collections
+import threading
+import time
+
+import pytest
+from unittest import mock
+
+from yosai.core import (
+    CacheException,
+    CacheStatistics,
+    CacheWarmer,
+    ConsistentHashRing,
+    EarlyRefreshCacheHandler,
+    EarlyRefreshStamp,
+    InstrumentedCacheHandler,
+    InvalidArgumentException,
+    MemoryCacheHandler,
+    SerializationManager,
+    ShardedCacheHandler,
+    SimpleRole,
+)
+
+from .doubles import (
+    WarmableRealm,
+)
+
+# -----------------------------------------------------------------------------
+# CacheStatistics Tests
+# -----------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize('elapsed, bucket',
+                         [(0.0000005, 0), (0.000001, 1), (0.000003, 2),
+                          (0.0005, 9), (1000.0, 23)])
+def test_cs_record_buckets(elapsed, bucket):
+    """
+    unit tested:  record
+
+    test case:
+    latency is histogrammed into power-of-two microsecond buckets, with the
+    last bucket absorbing the slowest operations
+    """
+    cs = CacheStatistics()
+    cs.get_latency.record(elapsed)
+    assert (cs.get_latency.buckets[bucket] == 1 and
+            cs.get_latency.count == 1 and
+            cs.get_latency.total == elapsed)
+
+
+def test_cs_hit_ratio():
+    """
+    unit tested:  hit_ratio
+
+    test case:
+    None without lookups, otherwise hits over lookups
+    """
+    cs = CacheStatistics()
+    assert cs.hit_ratio is None
+    cs.hits = 3
+    cs.misses = 1
+    assert cs.hit_ratio == 0.75
+
+
+def test_cs_snapshot_is_a_copy():
+    """
+    unit tested:  snapshot
+
+    test case:
+    a snapshot is detached from the live counters
+    """
+    cs = CacheStatistics()
+    cs.set_latency.record(0.000002)
+    snapshot = cs.snapshot()
+    cs.set_latency.record(0.000002)
+    assert (snapshot['latency']['set']['count'] == 1 and
+            snapshot['latency']['set']['buckets'][2] == 1 and
+            cs.set_latency.count == 2)
+
+# -----------------------------------------------------------------------------
+# InstrumentedCacheHandler Tests
+# -----------------------------------------------------------------------------
+
+
+def test_ich_get_counts_hits_and_misses(instrumented_cache_handler):
+    """
+    unit tested:  get
+
+    test case:
+    a None result is a miss, anything else is a hit
+    """
+    ich = instrumented_cache_handler
+    ich.get(domain='session', identifier='sessionid123')
+    ich.set(domain='session', identifier='sessionid123', value='session')
+    assert ich.get(domain='session', identifier='sessionid123') == 'session'
+
+    stats = ich.snapshot()['session']
+    assert (stats['hits'] == 1 and stats['misses'] == 1 and
+            stats['sets'] == 1 and stats['latency']['get']['count'] == 2)
+
+
+def test_ich_get_or_create_counts_loads(instrumented_cache_handler):
+    """
+    unit tested:  get_or_create
+
+    test case:
+    the first call loads through the creator_func (a miss), the second is
+    served from cache (a hit)
+    """
+    ich = instrumented_cache_handler
+
+    def creator_func(creator):
+        return 'creds_of_' + creator
+
+    for _ in range(2):
+        result = ich.get_or_create(domain='credentials',
+                                   identifier='thedude',
+                                   creator_func=creator_func,
+                                   creator='thedude')
+
+    stats = ich.snapshot()['credentials']
+    assert (result == 'creds_of_thedude' and stats['loads'] == 1 and
+            stats['misses'] == 1 and stats['hits'] == 1)
+
+
+def test_ich_delete_counts_evictions(instrumented_cache_handler):
+    """
+    unit tested:  delete
+
+    test case:
+    deleting an entry is recorded as an eviction in its domain
+    """
+    ich = instrumented_cache_handler
+    ich.set(domain='authz_info', identifier='thedude', value='authz')
+    ich.delete(domain='authz_info', identifier='thedude')
+    assert (ich.snapshot()['authz_info']['evictions'] == 1 and
+            ich.cache_handler.store == {})
+
+
+def test_ich_records_latency_when_handler_raises(instrumented_cache_handler,
+                                                 monkeypatch):
+    """
+    unit tested:  get
+
+    test case:
+    latency is recorded even when the wrapped handler raises
+    """
+    ich = instrumented_cache_handler
+
+    def raiser(domain, identifier):
+        raise ValueError
+
+    monkeypatch.setattr(ich.cache_handler, 'get', raiser)
+    with pytest.raises(ValueError):
+        ich.get(domain='session', identifier='sessionid123')
+    assert ich.snapshot()['session']['latency']['get']['count'] == 1
+
+
+def test_ich_disabled_records_nothing(instrumented_cache_handler):
+    """
+    unit tested:  enabled
+
+    test case:
+    a disabled handler passes operations through without recording them
+    """
+    ich = instrumented_cache_handler
+    ich.enabled = False
+    ich.set(domain='session', identifier='sessionid123', value='session')
+    assert (ich.get(domain='session', identifier='sessionid123') == 'session'
+            and ich.snapshot() == {})
+
+
+def test_ich_passes_through_attributes(instrumented_cache_handler):
+    """
+    unit tested:  __getattr__
+
+    test case:
+    attributes that aren't instrumented are obtained from the wrapped handler
+    """
+    ich = instrumented_cache_handler
+    assert ich.keys('*') == []
+
+
+def test_ich_reset(instrumented_cache_handler):
+    """
+    unit tested:  reset
+
+    test case:
+    resetting clears all recorded statistics
+    """
+    ich = instrumented_cache_handler
+    ich.get(domain='session', identifier='sessionid123')
+    ich.reset()
+    assert ich.snapshot() == {}
+
+# -----------------------------------------------------------------------------
+# EarlyRefreshCacheHandler Tests
+# -----------------------------------------------------------------------------
+
+
+def test_erch_get_or_create_stamps_entry(early_refresh_cache_handler):
+    """
+    unit tested:  get_or_create
+
+    test case:
+    a computed entry is cached as is, and its expiry, from the domain's ttl,
+    and compute time are cached apart from it
+    """
+    erch = early_refresh_cache_handler
+    result = erch.get_or_create(domain='credentials', identifier='thedude',
+                                creator_func=lambda creator: 'creds',
+                                creator=None)
+    store = erch.cache_handler.store
+    stamp = store[('credentials:early_refresh', 'thedude')]
+    assert (result == 'creds' and
+            store[('credentials', 'thedude')] == 'creds' and
+            stamp.expiry == 1060.0 and stamp.delta >= 0 and
+            erch.get('credentials', 'thedude') == 'creds')
+
+
+def test_erch_get_or_create_without_ttl(early_refresh_cache_handler):
+    """
+    unit tested:  get_or_create
+
+    test case:
+    an entry of a domain whose ttl isn't known is cached without a stamp
+    """
+    erch = early_refresh_cache_handler
+    erch.get_or_create(domain='authz_info', identifier='thedude',
+                       creator_func=lambda creator: 'info', creator=None)
+    assert erch.cache_handler.store == {('authz_info', 'thedude'): 'info'}
+
+
+@pytest.mark.parametrize('value', [['one', 'two'], [], 'one'])
+def test_erch_keeps_stored_format(early_refresh_cache_handler, value):
+    """
+    unit tested:  get_or_create
+
+    test case:
+    a computed value, whether a list or not, is stored just as the wrapped
+    handler stores it, and refreshing it early doesn't change that
+    """
+    erch = early_refresh_cache_handler
+    erch.get_or_create(domain='credentials', identifier='thedude',
+                       creator_func=lambda creator: value, creator=None)
+    erch.clock = lambda: 1060.0  # the entry's expiry
+    erch.get_or_create(domain='credentials', identifier='thedude',
+                       creator_func=lambda creator: value, creator=None)
+    assert (erch.cache_handler.store[('credentials', 'thedude')] == value and
+            erch.snapshot() == {'credentials': 1})
+
+
+def test_erch_get_or_create_far_from_expiry(early_refresh_cache_handler):
+    """
+    unit tested:  get_or_create
+
+    test case:
+    an entry far from its expiry is served from cache
+    """
+    erch = early_refresh_cache_handler
+    erch.cache_handler.set('credentials', 'thedude', 'cached')
+    erch.cache_handler.set('credentials:early_refresh', 'thedude',
+                           EarlyRefreshStamp(1060.0, 1.0))
+
+    result = erch.get_or_create(domain='credentials', identifier='thedude',
+                                creator_func=lambda creator: 'fresh',
+                                creator=None)
+    assert result == 'cached' and erch.snapshot() == {}
+
+
+def test_erch_get_or_create_near_expiry(early_refresh_cache_handler):
+    """
+    unit tested:  get_or_create
+
+    test case:
+    an entry near its expiry, relative to its compute time, is refreshed
+    early and the refreshed value is cached, stamped anew
+    """
+    erch = early_refresh_cache_handler
+    erch.cache_handler.set('credentials', 'thedude', 'cached')
+    erch.cache_handler.set('credentials:early_refresh', 'thedude',
+                           EarlyRefreshStamp(1001.0, 2.0))
+
+    result = erch.get_or_create(domain='credentials', identifier='thedude',
+                                creator_func=lambda creator: 'fresh',
+                                creator=None)
+    stamp = erch.cache_handler.get('credentials:early_refresh', 'thedude')
+    assert (result == 'fresh' and
+            erch.cache_handler.get('credentials', 'thedude') == 'fresh' and
+            stamp.expiry == 1060.0 and
+            erch.snapshot() == {'credentials': 1})
+
+
+def test_erch_unstamped_entry_not_refreshed(early_refresh_cache_handler):
+    """
+    unit tested:  get_or_create
+
+    test case:
+    an entry that was set, rather than computed, is served from cache
+    """
+    erch = early_refresh_cache_handler
+    erch.set('credentials', 'thedude', 'cached')
+
+    result = erch.get_or_create(domain='credentials', identifier='thedude',
+                                creator_func=lambda creator: 'fresh',
+                                creator=None)
+    assert result == 'cached' and erch.snapshot() == {}
+
+
+def test_erch_beta_zero_disables(early_refresh_cache_handler):
+    """
+    unit tested:  get_or_create
+
+    test case:
+    a beta of 0 disables early refreshes
+    """
+    erch = early_refresh_cache_handler
+    erch.beta = 0
+    erch.cache_handler.set('credentials', 'thedude', 'cached')
+    erch.cache_handler.set('credentials:early_refresh', 'thedude',
+                           EarlyRefreshStamp(1001.0, 2.0))
+
+    result = erch.get_or_create(domain='credentials', identifier='thedude',
+                                creator_func=lambda creator: 'fresh',
+                                creator=None)
+    assert result == 'cached'
+
+
+@pytest.mark.parametrize('beta, expected', [(0.5, False), (1.0, True)])
+def test_erch_should_refresh_scales_with_beta(
+        early_refresh_cache_handler, beta, expected):
+    """
+    unit tested:  should_refresh
+
+    test case:
+    a larger beta refreshes earlier
+    """
+    erch = early_refresh_cache_handler
+    erch.beta = beta
+    # -log(0.5) * 2.0 is ~1.39 seconds:
+    assert erch.should_refresh(1001.0, 2.0) is expected
+
+
+def test_erch_shared_by_processes():
+    """
+    unit tested:  get_or_create
+
+    test case:
+    an entry computed through one process's handler is refreshed early
+    through another's, which shares only the (serializing) cache
+    """
+    cache_handler = MemoryCacheHandler()
+    computed, refreshed = [EarlyRefreshCacheHandler(cache_handler,
+                                                    ttl={'authz_info': 60})
+                           for _ in range(2)]
+    computed.clock = lambda: 1000.0
+    refreshed.clock = lambda: 1059.99
+    refreshed.random = lambda: 0.5
+
+    def creator_func(name):
+        time.sleep(0.05)  # so that delta * -log(0.5) exceeds 0.01 seconds
+        return [SimpleRole(name)]
+
+    computed.get_or_create(domain='authz_info', identifier='thedude',
+                           creator_func=creator_func, creator='bowler')
+    result = refreshed.get_or_create(domain='authz_info',
+                                     identifier='thedude',
+                                     creator_func=creator_func,
+                                     creator='nihilist')
+
+    assert (result == [SimpleRole('nihilist')] and
+            refreshed.snapshot() == {'authz_info': 1} and
+            computed.get('authz_info', 'thedude') == [SimpleRole('nihilist')] and
+            cache_handler.get('authz_info', 'thedude') ==
+            [SimpleRole('nihilist')])
+
+# -----------------------------------------------------------------------------
+# CacheWarmer Tests
+# -----------------------------------------------------------------------------
+
+
+def test_cw_skips_realms_without_cache(warmable_realm):
+    """
+    unit tested:  __init__
+
+    test case:
+    realms without a cache_handler aren't warmed
+    """
+    uncached = WarmableRealm(accounts=(), cache_handler=None)
+    cw = CacheWarmer([warmable_realm, uncached])
+    assert cw.realms == (warmable_realm,)
+
+
+def test_cw_warm(warmable_realm):
+    """
+    unit tested:  warm
+
+    test case:
+    every unique identifier is warmed and the outcome of each is reported
+    """
+    cw = CacheWarmer([warmable_realm], max_workers=2)
+    report = cw.warm(['thedude', 'walter', 'donny', 'broken', 'thedude'])
+
+    assert (sorted(warmable_realm.warmed) == ['donny', 'thedude', 'walter'] and
+            report.total == 4 and report.completed == 4 and
+            report.warmed == 2 and report.missing == ['donny'] and
+            list(report.failed) == ['broken'] and report.elapsed > 0)
+
+
+def test_cw_warm_reports_progress(warmable_realm):
+    """
+    unit tested:  warm
+
+    test case:
+    progress is reported every progress_interval identifiers and on completion
+    """
+    progress = []
+    cw = CacheWarmer([warmable_realm], progress=lambda *args:
+                     progress.append(args), progress_interval=2)
+    cw.warm(['thedude', 'walter', 'donny'])
+    assert progress == [(2, 3), (3, 3)]
+
+
+def test_cw_warm_from_file(warmable_realm, tmpdir):
+    """
+    unit tested:  resolve_identifiers
+
+    test case:
+    identifiers are read from a recent-activity file, one per line
+    """
+    activity = tmpdir.join('activity.txt')
+    activity.write('# recently active\nthedude\n\nwalter\n')
+
+    cw = CacheWarmer([warmable_realm])
+    report = cw.warm(str(activity))
+    assert report.warmed == 2
+
+
+def test_cw_warm_from_callable(warmable_realm):
+    """
+    unit tested:  resolve_identifiers
+
+    test case:
+    identifiers are obtained from a callable, such as a query
+    """
+    cw = CacheWarmer([warmable_realm])
+    report = cw.warm(lambda: iter(['thedude']))
+    assert report.warmed == 1 and report.total == 1
+
+
+# -----------------------------------------------------------------------------
+# MemoryCacheHandler Tests
+# -----------------------------------------------------------------------------
+
+
+def test_mch_set_get(memory_cache_handler):
+    """
+    unit tested:  set, get
+
+    test case:
+    a cached Serializable is stored serialized and de-serializes to an equal
+    object
+    """
+    mch = memory_cache_handler
+    mch.set(domain='role', identifier='admin', value=SimpleRole('admin'))
+    assert (isinstance(mch.store['yosai:admin:role'][1], bytes) and
+            mch.get(domain='role', identifier='admin') == SimpleRole('admin'))
+
+
+def test_mch_entries_expire(memory_cache_handler):
+    """
+    unit tested:  get
+
+    test case:
+    an entry expires once its domain's ttl has elapsed
+    """
+    mch = memory_cache_handler
+    mch.set(domain='credentials', identifier='thedude', value=SimpleRole('a'))
+    mch.now += 9
+    assert mch.get(domain='credentials', identifier='thedude') is not None
+    mch.now += 1
+    assert (mch.get(domain='credentials', identifier='thedude') is None and
+            mch.store == {})
+
+
+def test_mch_raw_round_trip(memory_cache_handler):
+    """
+    unit tested:  get_raw, set_raw
+
+    test case:
+    raw payloads are moved in and out of cache without (de)serialization
+    """
+    mch = memory_cache_handler
+    payload = mch.serialization_manager.serialize(SimpleRole('admin'))
+
+    with mock.patch.object(SerializationManager, 'serialize') as ser:
+        with mock.patch.object(SerializationManager, 'deserialize') as deser:
+            mch.set_raw(domain='role', identifier='admin', payload=payload)
+            result = mch.get_raw(domain='role', identifier='admin')
+            assert not ser.called and not deser.called
+
+    assert (result == payload and
+            mch.get(domain='role', identifier='admin') == SimpleRole('admin'))
+
+
+def test_mch_get_or_create(memory_cache_handler):
+    """
+    unit tested:  get_or_create
+
+    test case:
+    creator_func is called only upon a miss
+    """
+    mch = memory_cache_handler
+    creator_func = mock.Mock(return_value=SimpleRole('admin'))
+    for _ in range(2):
+        result = mch.get_or_create(domain='role', identifier='admin',
+                                   creator_func=creator_func, creator=None)
+    assert result == SimpleRole('admin') and creator_func.call_count == 1
+
+
+def test_mch_get_or_create_contention(memory_cache_handler):
+    """
+    unit tested:  get_or_create
+
+    test case:
+    concurrent callers of one key never call creator_func at the same time,
+    even as callers keep arriving while others wait, and no lock is kept once
+    they are done
+    """
+    mch = memory_cache_handler
+    running = []
+    overlaps = []
+    guard = threading.Lock()
+
+    def creator_func(creator):
+        with guard:
+            running.append(creator)
+            overlaps.append(len(running))
+        time.sleep(0.005)
+        with guard:
+            running.remove(creator)
+        return SimpleRole('admin')
+
+    def caller(number):
+        time.sleep(number * 0.001)  # callers keep arriving
+        mch.get_or_create(domain='role', identifier='admin',
+                          creator_func=creator_func, creator=number)
+
+    # nothing is cached, so that every caller calls creator_func:
+    with mock.patch.object(mch, 'set'):
+        threads = [threading.Thread(target=caller, args=(number,))
+                   for number in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert (len(overlaps) == 20 and max(overlaps) == 1 and
+            mch._creation_locks == {})
+
+
+def test_mch_delete_keys(memory_cache_handler):
+    """
+    unit tested:  delete, keys
+
+    test case:
+    keys lists the entries matching a pattern; deleted entries are gone
+    """
+    mch = memory_cache_handler
+    mch.set(domain='role', identifier='admin', value=SimpleRole('admin'))
+    mch.set(domain='role', identifier='user', value=SimpleRole('user'))
+    mch.delete(domain='role', identifier='user')
+    assert mch.keys('yosai:*:role') == ['yosai:admin:role']
+
+
+def test_cache_handler_default_raw_methods(dict_cache_handler):
+    """
+    unit tested:  CacheHandler.get_raw, CacheHandler.set_raw
+
+    test case:
+    cache handlers that don't override the raw methods fall back to
+    (de)serializing with their serialization_manager
+    """
+    dch = dict_cache_handler
+    dch.serialization_manager = SerializationManager()
+    payload = dch.serialization_manager.serialize(SimpleRole('admin'))
+
+    dch.set_raw(domain='role', identifier='admin', payload=payload)
+    assert (dch.get(domain='role', identifier='admin') == SimpleRole('admin')
+            and dch.get_raw(domain='role', identifier='admin') is not None and
+            dch.get_raw(domain='role', identifier='user') is None)
+
+
+def test_ich_instruments_raw_methods(memory_cache_handler):
+    """
+    unit tested:  InstrumentedCacheHandler.get_raw, set_raw
+
+    test case:
+    raw operations pass through the wrapper and are recorded as gets and sets
+    """
+    ich = InstrumentedCacheHandler(memory_cache_handler)
+    ich.set_raw(domain='role', identifier='admin', payload=b'payload')
+    result = ich.get_raw(domain='role', identifier='admin')
+    stats = ich.snapshot()['role']
+    assert result == b'payload' and stats['sets'] == 1 and stats['hits'] == 1
+
+
+def test_mch_hash_fields(memory_cache_handler):
+    """
+    unit tested:  hset, hget, hgetall, hdel
+
+    test case:
+    the fields of a hash entry are set, read and removed individually
+    """
+    mch = memory_cache_handler
+    mch.hset(domain='session', identifier='abc',
+             mapping={'one': b'1', 'two': b'2'})
+    mch.hset(domain='session', identifier='abc', mapping={'two': b'22'})
+    mch.hdel(domain='session', identifier='abc', fields=['one', 'three'])
+
+    assert (mch.hget(domain='session', identifier='abc', field='two') == b'22'
+            and mch.hget(domain='session', identifier='abc',
+                         field='one') is None and
+            mch.hgetall(domain='session', identifier='abc') == {'two': b'22'})
+
+
+def test_mch_hash_entries_expire(memory_cache_handler):
+    """
+    unit tested:  hset, hget, hgetall
+
+    test case:
+    a hash entry expires once its domain's ttl has elapsed since it was last
+    set
+    """
+    mch = memory_cache_handler
+    mch.hset(domain='credentials', identifier='thedude', mapping={'a': b'1'})
+    mch.now += 9
+    mch.hset(domain='credentials', identifier='thedude', mapping={'b': b'2'})
+    mch.now += 9
+    assert mch.hget(domain='credentials', identifier='thedude', field='a')
+    mch.now += 1
+    assert (mch.hgetall(domain='credentials', identifier='thedude') == {} and
+            mch.hashes == {})
+
+
+def test_mch_hash_delete_keys(memory_cache_handler):
+    """
+    unit tested:  delete, keys
+
+    test case:
+    hash entries are listed by keys and removed by delete, as are other
+    entries, yet aren't readable as raw payloads
+    """
+    mch = memory_cache_handler
+    mch.hset(domain='session', identifier='abc', mapping={'a': b'1'})
+    mch.hset(domain='session', identifier='def', mapping={'a': b'1'})
+    mch.delete(domain='session', identifier='def')
+    assert (mch.keys('yosai:*:session') == ['yosai:abc:session'] and
+            mch.get_raw(domain='session', identifier='abc') is None)
+
+
+def test_mch_hdel_last_field_removes_entry(memory_cache_handler):
+    """
+    unit tested:  hdel
+
+    test case:
+    removing the last field of a hash entry removes the entry
+    """
+    mch = memory_cache_handler
+    mch.hset(domain='session', identifier='abc', mapping={'a': b'1'})
+    mch.hdel(domain='session', identifier='abc', fields=['a'])
+    assert mch.keys('*') == []
+
+
+@pytest.mark.parametrize('operation, kwargs',
+                         [('hget', {'field': 'a'}),
+                          ('hgetall', {}),
+                          ('hset', {'mapping': {'a': b'1'}}),
+                          ('hdel', {'fields': ['a']})])
+def test_cache_handler_default_hash_methods(dict_cache_handler, operation,
+                                            kwargs):
+    """
+    unit tested:  CacheHandler.hget, hgetall, hset, hdel
+
+    test case:
+    cache handlers that don't support hash entries raise
+    """
+    with pytest.raises(CacheException):
+        getattr(dict_cache_handler, operation)(domain='session',
+                                               identifier='abc', **kwargs)
+
+
+def test_ich_instruments_hash_methods(memory_cache_handler):
+    """
+    unit tested:  InstrumentedCacheHandler.hget, hgetall, hset, hdel
+
+    test case:
+    hash operations pass through the wrapper and are recorded as gets and sets
+    """
+    ich = InstrumentedCacheHandler(memory_cache_handler)
+    ich.hset(domain='session', identifier='abc', mapping={'a': b'1'})
+    ich.hget(domain='session', identifier='abc', field='a')
+    ich.hget(domain='session', identifier='abc', field='b')
+    ich.hdel(domain='session', identifier='abc', fields=['a'])
+    result = ich.hgetall(domain='session', identifier='abc')
+    stats = ich.snapshot()['session']
+    assert (result == {} and stats['sets'] == 1 and stats['hits'] == 1 and
+            stats['misses'] == 2 and stats['evictions'] == 0)
+
+
+# -----------------------------------------------------------------------------
+# ConsistentHashRing Tests
+# -----------------------------------------------------------------------------
+
+
+def test_chr_spreads_keys_evenly():
+    """
+    unit tested:  get_node
+
+    test case:
+    with virtual nodes, each node receives close to an equal share of keys
+    """
+    ring = ConsistentHashRing(nodes=['a', 'b', 'c', 'd'])
+    counts = collections.Counter(ring.get_node('session{0}'.format(i))
+                                 for i in range(10000))
+    assert (set(counts) == {'a', 'b', 'c', 'd'} and
+            all(1800 < count < 3200 for count in counts.values()))
+
+
+def test_chr_adding_node_moves_minimal_share():
+    """
+    unit tested:  add_node
+
+    test case:
+    adding a fourth node moves about a quarter of the keys, all of them to
+    the new node
+    """
+    keys = ['session{0}'.format(i) for i in range(10000)]
+    ring = ConsistentHashRing(nodes=['a', 'b', 'c'])
+    before = {key: ring.get_node(key) for key in keys}
+    ring.add_node('d')
+    moved = [key for key in keys if ring.get_node(key) != before[key]]
+    assert (0.18 < len(moved) / len(keys) < 0.32 and
+            all(ring.get_node(key) == 'd' for key in moved))
+
+
+def test_chr_removing_node_moves_only_its_keys():
+    """
+    unit tested:  remove_node
+
+    test case:
+    removing a node moves only the keys that it held
+    """
+    keys = ['session{0}'.format(i) for i in range(2000)]
+    ring = ConsistentHashRing(nodes=['a', 'b', 'c'])
+    before = {key: ring.get_node(key) for key in keys}
+    ring.remove_node('b')
+    assert all(ring.get_node(key) == before[key] for key in keys
+               if before[key] != 'b')
+
+
+def test_chr_is_stable_across_instances():
+    """
+    unit tested:  get_node
+
+    test case:
+    placement depends only on the nodes, not on the order they were added in
+    nor on the process
+    """
+    ring1 = ConsistentHashRing(nodes=['a', 'b', 'c'])
+    ring2 = ConsistentHashRing(nodes=['c', 'a', 'b'])
+    assert (all(ring1.get_node(i) == ring2.get_node(i) for i in range(1000))
+            and ConsistentHashRing.hash('thedude') == 15912753882564552970)
+
+
+def test_chr_weighted_node():
+    """
+    unit tested:  add_node
+
+    test case:
+    a node of weight 2 receives about twice the keys of a node of weight 1
+    """
+    ring = ConsistentHashRing()
+    ring.add_node('a')
+    ring.add_node('b', weight=2)
+    counts = collections.Counter(ring.get_node(i) for i in range(9000))
+    assert 1.5 < counts['b'] / counts['a'] < 3.5
+
+
+def test_chr_invalid_use():
+    """
+    unit tested:  add_node, get_node
+
+    test case:
+    a node can't be added twice, and an empty ring can't place keys
+    """
+    ring = ConsistentHashRing(nodes=['a'])
+    with pytest.raises(InvalidArgumentException):
+        ring.add_node('a')
+    ring.remove_node('a')
+    with pytest.raises(InvalidArgumentException):
+        ring.get_node('thedude')
+
+
+# -----------------------------------------------------------------------------
+# ShardedCacheHandler Tests
+# -----------------------------------------------------------------------------
+
+
+def test_sch_routes_by_identifier(sharded_cache_handler):
+    """
+    unit tested:  set, get, set_raw, hset
+
+    test case:
+    every domain of an identifier is kept by the same shard, and entries are
+    spread across all of the shards
+    """
+    sch = sharded_cache_handler
+    for i in range(300):
+        identifier = 'user{0}'.format(i)
+        sch.set(domain='role', identifier=identifier, value=SimpleRole('r'))
+        sch.set_raw(domain='session', identifier=identifier, payload=b'x')
+        sch.hset(domain='hash', identifier=identifier, mapping={'a': b'1'})
+
+    for name, shard in sch.shards.items():
+        identifiers = {key.split(':')[1] for key in shard.keys('*')}
+        assert (len(identifiers) > 50 and
+                len(shard.keys('*')) == 3 * len(identifiers) and
+                all(sch.ring.get_node(each) == name for each in identifiers))
+
+    assert (sch.get(domain='role', identifier='user1') == SimpleRole('r') and
+            sch.get_raw(domain='session', identifier='user1') == b'x' and
+            sch.hget(domain='hash', identifier='user1', field='a') == b'1' and
+            len(sch.keys('yosai:*:session')) == 300)
+
+
+def test_sch_get_or_create_delete(sharded_cache_handler):
+    """
+    unit tested:  get_or_create, delete
+
+    test case:
+    entries are created in, and deleted from, the identifier's shard
+    """
+    sch = sharded_cache_handler
+    role = sch.get_or_create(domain='role', identifier='admin',
+                             creator_func=lambda creator: SimpleRole('admin'),
+                             creator=None)
+    shard = sch.get_shard('admin')
+    cached = shard.get(domain='role', identifier='admin')
+    sch.delete(domain='role', identifier='admin')
+    assert (role == cached == SimpleRole('admin') and
+            sch.get(domain='role', identifier='admin') is None and
+            sch.get(domain='role', identifier=None) is None)
+
+
+def test_sch_requires_shards():
+    """
+    unit tested:  __init__
+
+    test case:
+    a ShardedCacheHandler without shards is rejected
+    """
+    with pytest.raises(InvalidArgumentException):
+        ShardedCacheHandler({})
+
+
+def test_sch_serialization_manager(sharded_cache_handler):
+    """
+    unit tested:  serialization_manager
+
+    test case:
+    setting the serialization manager sets it for every shard
+    """
+    manager = SerializationManager(format='json')
+    sharded_cache_handler.serialization_manager = manager
+    assert (sharded_cache_handler.serialization_manager is manager and
+            all(shard.serialization_manager is manager
+                for shard in sharded_cache_handler.shards.values()))
+
+
+def test_sch_add_shard_rebalance(sharded_cache_handler):
+    """
+    unit tested:  add_shard, rebalance
+
+    test case:
+    after a shard is added, only the entries that it now owns are missing,
+    and rebalance moves them to it
+    """
+    sch = sharded_cache_handler
+    identifiers = ['session{0}'.format(i) for i in range(400)]
+    for identifier in identifiers:
+        sch.set_raw(domain='session', identifier=identifier,
+                    payload=identifier.encode())
+
+    sch.add_shard('shard3', MemoryCacheHandler())
+    missing = [each for each in identifiers
+               if sch.get_raw(domain='session', identifier=each) is None]
+    moved = sch.rebalance(domains=['session'])
+
+    assert (moved == len(missing) and 0 < moved < len(identifiers) / 2 and
+            all(sch.get_shard(each) is sch.shards['shard3']
+                for each in missing) and
+            all(sch.get_raw(domain='session', identifier=each) ==
+                each.encode() for each in identifiers) and
+            len(sch.keys('*')) == len(identifiers))
+
+
+def test_sch_rebalance_hash_entries(sharded_cache_handler):
+    """
+    unit tested:  rebalance
+
+    test case:
+    rebalance moves hash entries as well as other entries
+    """
+    sch = sharded_cache_handler
+    identifiers = ['user{0}'.format(i) for i in range(200)]
+    for identifier in identifiers:
+        sch.hset(domain='identifier_sessions', identifier=identifier,
+                 mapping={'session1': b'1', 'session2': b'2'})
+        sch.set_raw(domain='session', identifier=identifier, payload=b'x')
+
+    sch.add_shard('shard3', MemoryCacheHandler())
+    missing = [each for each in identifiers
+               if not sch.hgetall(domain='identifier_sessions',
+                                  identifier=each)]
+    moved = sch.rebalance(domains=['session', 'identifier_sessions'])
+
+    assert (moved == 2 * len(missing) and missing and
+            all(sch.hgetall(domain='identifier_sessions', identifier=each) ==
+                {'session1': b'1', 'session2': b'2'} for each in identifiers) and
+            len(sch.keys('*')) == 2 * len(identifiers))
+
+
+def test_sch_none_identifier(sharded_cache_handler):
+    """
+    unit tested:  set, set_raw, delete, delete_many, hget, hgetall, hset, hdel
+
+    test case:
+    operations on a None identifier do nothing rather than hashing None
+    """
+    sch = sharded_cache_handler
+    with mock.patch.object(sch.ring, 'get_node') as get_node:
+        sch.set(domain='role', identifier=None, value=SimpleRole('r'))
+        sch.set_raw(domain='session', identifier=None, payload=b'x')
+        sch.delete(domain='session', identifier=None)
+        sch.delete_many(domain='session', identifiers=[None])
+        sch.hset(domain='hash', identifier=None, mapping={'a': b'1'})
+        sch.hdel(domain='hash', identifier=None, fields=['a'])
+        assert (sch.hget(domain='hash', identifier=None, field='a') is None and
+                sch.hgetall(domain='hash', identifier=None) == {})
+
+    assert not get_node.called and sch.keys('*') == []
+
+
+def test_sch_remove_shard(sharded_cache_handler):
+    """
+    unit tested:  remove_shard
+
+    test case:
+    a removed shard's identifiers are routed to the remaining shards
+    """
+    sch = sharded_cache_handler
+    removed = sch.remove_shard('shard1')
+    assert (isinstance(removed, MemoryCacheHandler) and
+            {sch.ring.get_node(i) for i in range(300)} == {'shard0', 'shard2'})
+
+
+def test_sch_delete_many(sharded_cache_handler):
+    """
+    unit tested:  delete_many
+
+    test case:
+    entries are deleted with one request per shard
+    """
+    sch = sharded_cache_handler
+    identifiers = ['session{0}'.format(i) for i in range(30)]
+    for identifier in identifiers:
+        sch.set_raw(domain='session', identifier=identifier, payload=b'x')
+
+    with mock.patch.object(MemoryCacheHandler, 'delete_many',
+                           autospec=True,
+                           side_effect=MemoryCacheHandler.delete_many) as dm:
+        sch.delete_many(domain='session', identifiers=identifiers)
+    assert dm.call_count == 3 and sch.keys('*') == []
+
+
+def test_ich_instruments_delete_many(memory_cache_handler):
+    """
+    unit tested:  InstrumentedCacheHandler.delete_many
+
+    test case:
+    deleting several entries at once counts an eviction for each
+    """
+    ich = InstrumentedCacheHandler(memory_cache_handler)
+    ich.delete_many(domain='session', identifiers=['abc', 'def'])
+    stats = ich.snapshot()['session']
+    assert stats['evictions'] == 2
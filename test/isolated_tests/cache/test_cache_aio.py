@@ -0,0 +1,125 @@
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from yosai.core import (
+    CacheException,
+    MemoryCacheHandler,
+    SimpleRole,
+)
+from yosai.core.cache.aio import (
+    AsyncMemoryCacheHandler,
+    ExecutorCacheHandler,
+)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+# -----------------------------------------------------------------------------
+# AsyncMemoryCacheHandler Tests
+# -----------------------------------------------------------------------------
+
+
+def test_amch_set_get_delete():
+    """
+    unit tested:  set, get, delete
+
+    test case:
+    entries are cached serialized, de-serialize to equal objects, and can be
+    deleted
+    """
+    amch = AsyncMemoryCacheHandler()
+
+    async def scenario():
+        await amch.set(domain='role', identifier='admin',
+                       value=SimpleRole('admin'))
+        cached = await amch.get(domain='role', identifier='admin')
+        raw = await amch.get_raw(domain='role', identifier='admin')
+        await amch.delete(domain='role', identifier='admin')
+        return cached, raw, await amch.get(domain='role', identifier='admin')
+
+    cached, raw, deleted = run(scenario())
+    assert (cached == SimpleRole('admin') and isinstance(raw, bytes) and
+            deleted is None)
+
+
+def test_amch_hash_and_bulk_operations():
+    """
+    unit tested:  hset, hgetall, hdel, delete_many, keys
+
+    test case:
+    the hash and bulk operations of the MemoryCacheHandler are available as
+    coroutines
+    """
+    amch = AsyncMemoryCacheHandler()
+
+    async def scenario():
+        await amch.hset(domain='hash', identifier='abc',
+                        mapping={'a': b'1', 'b': b'2'})
+        await amch.hdel(domain='hash', identifier='abc', fields=['a'])
+        fields = await amch.hgetall(domain='hash', identifier='abc')
+        await amch.set_raw(domain='session', identifier='x', payload=b'1')
+        await amch.set_raw(domain='session', identifier='y', payload=b'2')
+        await amch.delete_many(domain='session', identifiers=['x', 'y'])
+        return fields, await amch.keys('*')
+
+    fields, keys = run(scenario())
+    assert fields == {'b': b'2'} and keys == ['yosai:abc:hash']
+
+
+# -----------------------------------------------------------------------------
+# ExecutorCacheHandler Tests
+# -----------------------------------------------------------------------------
+
+
+def test_ech_calls_from_executor():
+    """
+    unit tested:  get_or_create, get
+
+    test case:
+    the wrapped handler, and a creator, are called from the executor rather
+    than the event loop's thread
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    ech = ExecutorCacheHandler(MemoryCacheHandler(), executor=executor)
+    threads = []
+
+    def creator_func(creator):
+        threads.append(threading.current_thread())
+        return SimpleRole('admin')
+
+    async def scenario():
+        created = await ech.get_or_create(domain='role', identifier='admin',
+                                          creator_func=creator_func,
+                                          creator=None)
+        return created, await ech.get(domain='role', identifier='admin')
+
+    try:
+        created, cached = run(scenario())
+    finally:
+        executor.shutdown()
+
+    assert (created == cached == SimpleRole('admin') and
+            threads[0].name.startswith('ThreadPoolExecutor') and
+            ech.serialization_manager is ech.cache_handler.serialization_manager)
+
+
+def test_ech_unsupported_hash_operation(dict_cache_handler):
+    """
+    unit tested:  hset
+
+    test case:
+    hash operations that the wrapped handler doesn't support raise
+    """
+    ech = ExecutorCacheHandler(dict_cache_handler)
+    with pytest.raises(CacheException):
+        run(ech.hset(domain='session', identifier='abc', mapping={}))
+
@@ -130,6 +130,27 @@ def test_nsm_set_cachehandler(native_security_manager):
                 nsm.realms == nsm.authorizer.realms)
 
 
+def test_nsm_warm_cache(native_security_manager, monkeypatch):
+    """
+    unit tested:  warm_cache
+
+    test case:
+    a CacheWarmer warms the realms' caches, whose report is returned once
+    warm up completes
+    """
+    nsm = native_security_manager
+    warmed = []
+
+    def mock_warm(self, identifier_s):
+        warmed.append(identifier_s)
+        return 'report'
+
+    monkeypatch.setattr('yosai.core.CacheWarmer.warm', mock_warm)
+
+    result = nsm.warm_cache(['thedude', 'walter'])
+    assert result == 'report' and warmed == [['thedude', 'walter']]
+
+
 def test_nsm_set_cachehandler_raises(native_security_manager):
     """
     unit tested:  cache_handler.setter
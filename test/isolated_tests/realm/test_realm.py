@@ -147,6 +147,35 @@ def test_asr_get_credentials_cannot_locate(
         asr.get_credentials('identifier')
 
 
+def test_asr_warm_cache(default_accountstorerealm, monkeypatch):
+    """
+    unit tested:  warm_cache
+
+    test case:
+    obtains credentials and authz_info through their cached loaders
+    """
+    asr = default_accountstorerealm
+    mock_cache = mock.Mock()
+    monkeypatch.setattr(asr, 'cache_handler', mock_cache)
+    assert asr.warm_cache('identifier') is True
+
+    domains = [c[1]['domain'] for c in mock_cache.get_or_create.call_args_list]
+    assert domains == ['credentials', 'authz_info']
+
+
+def test_asr_warm_cache_cannot_locate(default_accountstorerealm, monkeypatch):
+    """
+    unit tested:  warm_cache
+
+    test case:
+    returns False when the account store has no data for the identifier
+    """
+    asr = default_accountstorerealm
+    monkeypatch.setattr(asr.account_store, 'get_credentials', lambda x: None)
+    monkeypatch.setattr(asr.account_store, 'get_authz_info', lambda x: None)
+    assert asr.warm_cache('identifier') is False
+
+
 def test_asr_authenticate_account_invalidtoken(default_accountstorerealm):
     asr = default_accountstorerealm
 
@@ -27,3 +27,45 @@ class MockSerializable(serialize_abcs.Serializable):
                 return instance
         return SerializationSchema
 
+
+
+class MockSerializableSubclass(MockSerializable):
+
+    @classmethod
+    def serialization_schema(self):
+        class SerializationSchema(Schema):
+            myname = fields.Str()
+        return SerializationSchema
+
+
+class MockNestingSerializable(serialize_abcs.Serializable):
+    """
+    a Serializable whose schema nests MockSerializable's
+    """
+
+    @classmethod
+    def serialization_schema(cls):
+        class SerializationSchema(Schema):
+            mock = fields.Nested(MockSerializable.schema_class())
+        return SerializationSchema
+
+
+class ShoppingCart(serialize_abcs.Serializable):
+    """
+    an application-defined Serializable, not exported by yosai.core
+    """
+
+    def __init__(self, items=None):
+        self.items = items or []
+
+    @classmethod
+    def serialization_schema(cls):
+        class SerializationSchema(Schema):
+            items = fields.List(fields.Str())
+
+            @post_load
+            def make_cart(self, data):
+                instance = cls.__new__(cls)
+                instance.__dict__.update(data)
+                return instance
+        return SerializationSchema
@@ -0,0 +1,257 @@
+import collections
+import datetime
+import random
+
+import pytest
+import pytz
+
+from yosai.core import (
+    CompactSession,
+    Credential,
+    DefaultPermission,
+    DefaultSessionKey,
+    IndexedAuthorizationInfo,
+    MSGPackSerializer,
+    SerializationManager,
+    SimpleIdentifierCollection,
+    SimpleRole,
+    SimpleSession,
+)
+
+# -----------------------------------------------------------------------------
+# Codec Tests
+#
+# Round-trip properties, checked against randomly generated objects:
+#   1) a codec encodes an object to the same dict as its marshmallow schema
+#   2) a codec decodes the schema's (msgpack-encoded) dict to an object equal
+#      to the one that the schema loads
+# -----------------------------------------------------------------------------
+
+ALPHABET = 'abcdefghijklmnopqrstuvwxyz0123456789_-.@ äöüßñ€日本'
+SEEDS = range(25)
+
+
+def random_str(rand, allow_none=False):
+    if allow_none and rand.random() < 0.2:
+        return None
+    return ''.join(rand.choice(ALPHABET) for _ in range(rand.randint(0, 20)))
+
+
+def random_role(rand):
+    return SimpleRole(random_str(rand, allow_none=True))
+
+
+def random_credential(rand):
+    return Credential(random_str(rand).encode('utf-8'))
+
+
+def random_session_key(rand):
+    return DefaultSessionKey(random_str(rand, allow_none=True))
+
+
+def random_permission(rand):
+    parts = [','.join(random_str(rand) or '*'
+                      for _ in range(rand.randint(1, 3)))
+             for _ in range(rand.randint(1, 3))]
+    permission = DefaultPermission(
+        wildcard_string=':'.join(parts).replace(' ', ''))
+    chance = rand.random()
+    if chance < 0.1:
+        permission.parts = None
+    elif chance < 0.2:
+        permission.parts[rand.choice(['domain', 'action', 'target'])] = None
+    return permission
+
+
+def random_identifiers(rand):
+    identifiers = SimpleIdentifierCollection()
+    for _ in range(rand.randint(0, 3)):
+        identifiers.add(source_name=random_str(rand),
+                        identifier=random_str(rand))
+    if not identifiers.is_empty and rand.random() < 0.5:
+        identifiers.primary_identifier  # computes _primary_identifier
+    return identifiers
+
+
+def random_authz_info(rand):
+    roles = {random_role(rand) for _ in range(rand.randint(0, 5))}
+    if rand.random() < 0.2:
+        roles = None
+    # permissions without parts can't be indexed:
+    permissions = {permission for permission in
+                   (random_permission(rand) for _ in range(rand.randint(0, 8)))
+                   if permission.parts is not None}
+    return IndexedAuthorizationInfo(roles=roles, permissions=permissions)
+
+
+def random_datetime(rand):
+    return datetime.datetime(rand.randint(2000, 2030), rand.randint(1, 12),
+                             rand.randint(1, 28), rand.randint(0, 23),
+                             rand.randint(0, 59), rand.randint(0, 59),
+                             rand.choice([0, rand.randint(1, 999999)]),
+                             tzinfo=pytz.utc)
+
+
+def random_session(rand):
+    session = SimpleSession(host=random_str(rand, allow_none=True))
+    session.session_id = random_str(rand, allow_none=True)
+    session.start_timestamp = random_datetime(rand)
+    session.last_access_time = random_datetime(rand)
+    session.idle_timeout = datetime.timedelta(seconds=rand.randint(0, 10**6))
+    session.absolute_timeout = rand.choice(
+        [None, datetime.timedelta(seconds=rand.randint(0, 10**6))])
+    session.is_expired = rand.choice([None, True, False])
+    if rand.random() < 0.5:
+        session.stop_timestamp = random_datetime(rand)
+    if rand.random() < 0.8:
+        session.set_internal_attribute('identifiers_session_key',
+                                       random_identifiers(rand))
+        session.set_internal_attribute('authenticated_session_key',
+                                       rand.choice([True, False]))
+    if rand.random() < 0.3:
+        session.set_internal_attribute(
+            'run_as_identifiers_session_key',
+            collections.deque(random_identifiers(rand)
+                              for _ in range(rand.randint(1, 3))))
+    return session
+
+
+def random_compact_session(rand):
+    session = CompactSession(host=random_str(rand, allow_none=True))
+    session.session_id = random_str(rand, allow_none=True)
+    session.start_timestamp = random_datetime(rand)
+    session.last_access_time = random_datetime(rand)
+    session.idle_timeout = datetime.timedelta(seconds=rand.randint(0, 10**6))
+    session.absolute_timeout = rand.choice(
+        [None, datetime.timedelta(seconds=rand.randint(0, 10**6))])
+    session.is_expired = rand.choice([None, True, False])
+    if rand.random() < 0.5:
+        session.stop_timestamp = random_datetime(rand)
+    if rand.random() < 0.8:
+        session.set_internal_attribute('identifiers_session_key',
+                                       random_identifiers(rand))
+    return session
+
+
+generators = [random_role, random_credential, random_session_key,
+              random_permission, random_identifiers, random_authz_info,
+              random_session, random_compact_session]
+
+
+def state_of(obj):
+    if isinstance(obj, (SimpleSession, CompactSession)):
+        obj.attributes  # decodes lazily de-serialized attributes
+    if isinstance(obj, CompactSession):
+        return {name: getattr(obj, name) for name in CompactSession.__slots__
+                if name != '_dirty_fields'}
+    return obj.__dict__
+
+
+def msgpack_round_trip(data):
+    return MSGPackSerializer.deserialize(MSGPackSerializer.serialize(data))
+
+
+@pytest.mark.parametrize('generator', generators)
+@pytest.mark.parametrize('seed', SEEDS)
+def test_codec_encodes_as_schema(generator, seed):
+    """
+    unit tested:  codecs (encode)
+
+    test case:
+    a codec encodes an object to the same dict as its marshmallow schema does
+    """
+    obj = generator(random.Random(seed))
+    encode, _ = SerializationManager.codecs[obj.__class__]
+    assert encode(obj) == obj.schema().dump(obj).data
+
+
+@pytest.mark.parametrize('generator', generators)
+@pytest.mark.parametrize('seed', SEEDS)
+def test_codec_decodes_as_schema(generator, seed):
+    """
+    unit tested:  codecs (decode)
+
+    test case:
+    a codec decodes the schema's wire format to an object equal to the one that
+    the schema loads
+    """
+    obj = generator(random.Random(seed))
+    cls = obj.__class__
+    _, decode = SerializationManager.codecs[cls]
+    data = msgpack_round_trip(obj.schema().dump(obj).data)
+
+    from_codec = decode(dict(data))
+    from_schema = cls.deserialize(dict(msgpack_round_trip(data)))
+    assert (from_codec.__class__ is cls and
+            state_of(from_codec) == state_of(from_schema))
+
+
+@pytest.mark.parametrize('generator', generators)
+def test_sm_codec_and_schema_interoperate(generator):
+    """
+    unit tested:  SerializationManager.serialize, deserialize
+
+    test case:
+    payloads serialized with codecs are read without them, and vice versa
+    """
+    obj = generator(random.Random(0))
+    with_codecs = SerializationManager()
+    without_codecs = SerializationManager(use_codecs=False)
+
+    one = without_codecs.deserialize(with_codecs.serialize(obj))
+    two = with_codecs.deserialize(without_codecs.serialize(obj))
+    assert state_of(one) == state_of(two)
+
+
+def test_sm_register_codec_exact_class():
+    """
+    unit tested:  SerializationManager.to_dict
+
+    test case:
+    a codec isn't used for subclasses of the class that it is registered for
+    """
+    class MyRole(SimpleRole):
+        pass
+
+    sm = SerializationManager()
+    encode, _ = SerializationManager.codecs[SimpleRole]
+    assert MyRole not in SerializationManager.codecs
+    assert sm.to_dict(MyRole('admin')) == MyRole('admin').serialize()
+
+
+def test_session_codec_decodes_format_version_one():
+    """
+    unit tested:  codecs (decode_simple_session)
+
+    test case:
+    a session serialized by an earlier release, with ISO timestamps and integer
+    timeouts, is decoded by both the codec and the schema
+    """
+    session = random_session(random.Random(0))
+    session.stop_timestamp = None
+    data = {'_session_id': session.session_id,
+            '_start_timestamp': session.start_timestamp.isoformat(),
+            '_last_access_time': session.last_access_time.isoformat(),
+            '_idle_timeout': int(session.idle_timeout.total_seconds()),
+            '_host': session.host}
+
+    _, decode = SerializationManager.codecs[SimpleSession]
+    from_codec = decode(dict(data))
+    from_schema = SimpleSession.deserialize(dict(data))
+    assert (state_of(from_codec) == state_of(from_schema) and
+            from_codec.start_timestamp == session.start_timestamp and
+            from_codec.idle_timeout == session.idle_timeout)
+
+
+def test_session_codec_writes_format_version():
+    """
+    unit tested:  codecs (encode_simple_session)
+
+    test case:
+    sessions are encoded in the current format version, with native datetimes
+    """
+    session = random_session(random.Random(0))
+    encode, _ = SerializationManager.codecs[SimpleSession]
+    encoded = encode(session)
+    assert (encoded['_format_version'] == SimpleSession.format_version and
+            encoded['_start_timestamp'] is session.start_timestamp)
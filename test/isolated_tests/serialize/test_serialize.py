@@ -1,20 +1,40 @@
 import pytest
 import msgpack
 import datetime
+import pytz
+import threading
 from unittest import mock
 
 from .doubles import (
+    MockNestingSerializable,
     MockSerializable,
+    MockSerializableSubclass,
+    ShoppingCart,
 )
 from yosai.core import (
     Credential,
+    InvalidArgumentException,
     InvalidSerializationFormatException,
+    JSONSerializer,
+    LazyPayload,
+    MarshalSerializer,
+    MisconfiguredException,
+    PickleSerializer,
     SerializationException,
     serialize_abcs,
     MSGPackSerializer,
+    PayloadCompressor,
     SerializationManager,
+    SimpleRole,
+    SimpleSession,
+    TypeRegistry,
+    serializable_type,
+    serialization_settings,
+    type_registry,
 )
 
+from yosai.core.serialize import serialize
+
 from ..matcher import (
     DictMatcher,
 )
@@ -44,6 +64,221 @@ def test_sm_init_unrecognized_format():
         SerializationManager(format='protobufferoni')
 
 
+def test_sm_compressed_round_trip():
+    """
+    unit tested:  serialize, deserialize
+
+    test case:
+    a payload larger than the compression threshold is compressed and tagged
+    and then de-serializes to an equal object
+    """
+    sm = SerializationManager(compressor=PayloadCompressor(threshold=64))
+    roles = [SimpleRole('role' + str(x)) for x in range(100)]
+
+    message = sm.serialize(roles)
+    assert (message[:2] == b'\xc1z' and
+            len(message) < len(SerializationManager().serialize(roles)) and
+            sm.deserialize(message) == roles)
+
+
+def test_sm_deserializes_compressed_without_compressor():
+    """
+    unit tested:  deserialize
+
+    test case:
+    tagged payloads are recognized even when compression is disabled
+    """
+    compressing_sm = SerializationManager(compressor=PayloadCompressor(threshold=0))
+    message = compressing_sm.serialize([SimpleRole('role') for x in range(20)])
+    assert SerializationManager().deserialize(message) == [SimpleRole('role')] * 20
+
+
+def test_sm_deserialize_lazily(serialization_manager):
+    """
+    unit tested:  deserialize_lazily
+
+    test case:
+    returns a LazyPayload, or None when there is no message
+    """
+    sm = serialization_manager
+    lazy = sm.deserialize_lazily(sm.serialize(SimpleRole('role')))
+    assert (isinstance(lazy, LazyPayload) and
+            sm.deserialize_lazily(None) is None)
+
+
+def test_sm_serialize_compact_envelope(serialization_manager):
+    """
+    unit tested:  serialize
+
+    test case:
+    a serialized dict is enveloped by a version tag and a type code
+    """
+    sm = serialization_manager
+    unpacked = msgpack.unpackb(sm.serialize(SimpleRole('role')),
+                               encoding='utf-8')
+    assert (unpacked['~t'] == 7 and 'serialized_cls' not in unpacked and
+            unpacked['~v'] == serialize.dist_version())
+
+
+def test_sm_serialize_type_name_without_code(serialization_manager):
+    """
+    unit tested:  serialize, deserialize
+
+    test case:
+    a class without a type code is identified by its qualified name
+    """
+    sm = serialization_manager
+    message = sm.serialize([MockSerializable()])
+    unpacked = msgpack.unpackb(message, encoding='utf-8')
+    assert unpacked[0]['~t'] == '{0}.MockSerializable'.format(
+        MockSerializable.__module__)
+
+
+def test_sm_deserialize_legacy_envelope(serialization_manager):
+    """
+    unit tested:  deserialize
+
+    test case:
+    payloads enveloped by earlier releases remain readable
+    """
+    sm = serialization_manager
+    legacy = {'serialized_dist_version': '0.2.0',
+              'serialized_record_dt': '2016-01-01T00:00:00',
+              'serialized_cls': 'SimpleRole',
+              'identifier': 'role'}
+    legacy_list = [dict(legacy), dict(legacy, identifier='other')]
+
+    assert (sm.deserialize(msgpack.packb(legacy)) == SimpleRole('role') and
+            sm.deserialize(msgpack.packb(legacy_list)) ==
+            [SimpleRole('role'), SimpleRole('other')])
+
+
+def test_sm_dist_version_obtained_once(serialization_manager):
+    """
+    unit tested:  dist_version
+
+    test case:
+    the distribution version is obtained once rather than per serialization
+    """
+    sm = serialization_manager
+    serialize.dist_version.cache_clear()
+    for _ in range(3):
+        sm.serialize(SimpleRole('role'))
+    assert serialize.dist_version.cache_info().misses == 1
+
+
+# ----------------------------------------------------------------------------
+# LazyPayload Tests
+# ----------------------------------------------------------------------------
+
+def test_lp_defers_deserialization(serialization_manager):
+    """
+    unit tested:  __getattr__
+
+    test case:
+    the payload isn't de-serialized until an attribute is accessed
+    """
+    sm = serialization_manager
+    payload = sm.serialize(SimpleRole('role'))
+    lazy = LazyPayload(payload, sm)
+
+    with mock.patch.object(sm, 'deserialize', wraps=sm.deserialize) as deser:
+        assert lazy.payload == payload and not deser.called
+        assert lazy.identifier == 'role' and lazy.identifier == 'role'
+        deser.assert_called_once_with(payload)
+
+
+def test_lp_eq(serialization_manager):
+    """
+    unit tested:  __eq__
+
+    test case:
+    a LazyPayload equals the object that it represents
+    """
+    sm = serialization_manager
+    lazy = LazyPayload(sm.serialize(SimpleRole('role')), sm)
+    assert lazy == SimpleRole('role') and lazy.unwrap() == SimpleRole('role')
+
+
+# ----------------------------------------------------------------------------
+# PayloadCompressor Tests
+# ----------------------------------------------------------------------------
+
+def test_pc_init_unrecognized_codec():
+    """
+    unit tested:  __init__
+
+    test case:
+    an unrecognized compression codec raises an exception
+    """
+    with pytest.raises(InvalidSerializationFormatException):
+        PayloadCompressor(codec='zippity')
+
+
+def test_pc_compress_below_threshold():
+    """
+    unit tested:  compress
+
+    test case:
+    payloads smaller than the threshold are returned unchanged
+    """
+    pc = PayloadCompressor(threshold=1024)
+    payload = b'a' * 1023
+    assert pc.compress(payload) is payload
+
+
+def test_pc_compress_incompressible():
+    """
+    unit tested:  compress
+
+    test case:
+    payloads that don't shrink are returned unchanged
+    """
+    pc = PayloadCompressor(threshold=0)
+    payload = bytes(range(256))
+    assert pc.compress(payload) is payload
+
+
+@pytest.mark.parametrize('codec, level', [('zlib', None), ('zlib', 1),
+                                          ('bz2', 9), ('lzma', 0)])
+def test_pc_compress_decompress(codec, level):
+    """
+    unit tested:  compress, decompress
+
+    test case:
+    compressed payloads are tagged with the marker and their codec and
+    decompress to the original payload
+    """
+    pc = PayloadCompressor(threshold=16, codec=codec, level=level)
+    payload = b'permission:read,write:*' * 50
+    compressed = pc.compress(payload)
+    assert (compressed[:2] == PayloadCompressor.marker + pc.tag and
+            PayloadCompressor.decompress(compressed) == payload)
+
+
+@pytest.mark.parametrize('message', [None, b'', b'\x83\xa3one\x01', b'{}'])
+def test_pc_decompress_untagged(message):
+    """
+    unit tested:  decompress
+
+    test case:
+    untagged messages are returned unchanged
+    """
+    assert PayloadCompressor.decompress(message) is message
+
+
+@pytest.mark.parametrize('message', [b'\xc1?abc', b'\xc1zabc'])
+def test_pc_decompress_raises(message):
+    """
+    unit tested:  decompress
+
+    test case:
+    an unknown codec tag or a corrupt payload raises an exception
+    """
+    with pytest.raises(SerializationException):
+        PayloadCompressor.decompress(message)
+
+
 # ----------------------------------------------------------------------------
 # MSGPackSerializer Tests
 # ----------------------------------------------------------------------------
@@ -100,3 +335,456 @@ def test_serializable_deserialize():
     newobj = MockSerializable.deserialize(dumbstate)
     print(newobj)
     assert isinstance(newobj, MockSerializable) and hasattr(newobj, 'myname')
+
+
+def test_serializable_schema_class_memoized():
+    """
+    unit tested:  schema_class
+
+    test case:
+    serialization_schema is called once per class, and subclasses memoize
+    their own schema
+    """
+    MockSerializable.invalidate_schema()
+    with mock.patch.object(MockSerializable, 'serialization_schema',
+                           wraps=MockSerializable.serialization_schema) as ss:
+        first = MockSerializable.schema_class()
+        second = MockSerializable.schema_class()
+        assert first is second and ss.call_count == 1
+
+    assert MockSerializableSubclass.schema_class() is not first
+
+
+def test_serializable_schema_per_thread():
+    """
+    unit tested:  schema
+
+    test case:
+    a schema instance is re-used within a thread but not shared across threads
+    """
+    schemas = []
+    thread = threading.Thread(
+        target=lambda: schemas.append(MockSerializable.schema()))
+    thread.start()
+    thread.join()
+
+    assert (MockSerializable.schema() is MockSerializable.schema() and
+            schemas[0] is not MockSerializable.schema())
+
+
+def test_serializable_invalidate_schema():
+    """
+    unit tested:  invalidate_schema
+
+    test case:
+    the schema is rebuilt upon next use after invalidation
+    """
+    schema_class = MockSerializable.schema_class()
+    MockSerializable.invalidate_schema()
+    assert MockSerializable.schema_class() is not schema_class
+
+
+def test_serializable_invalidate_schema_cascades():
+    """
+    unit tested:  invalidate_schema
+
+    test case:
+    the schemas of subclasses, and of classes whose schemas nest the
+    invalidated one, are rebuilt too, nesting the rebuilt schema
+    """
+    subclass_schema = MockSerializableSubclass.schema_class()
+    nesting_schema = MockNestingSerializable.schema_class()
+    MockSerializable.invalidate_schema()
+
+    rebuilt = MockNestingSerializable.schema_class()
+    assert (MockSerializableSubclass.schema_class() is not subclass_schema and
+            rebuilt is not nesting_schema and
+            rebuilt._declared_fields['mock'].nested is
+            MockSerializable.schema_class())
+
+
+# ----------------------------------------------------------------------------
+# TypeRegistry Tests
+# ----------------------------------------------------------------------------
+
+def test_tr_core_classes_registered_by_code():
+    """
+    unit tested:  register, tag_of, lookup
+
+    test case:
+    a yosai.core Serializable is registered under its type code, and its name
+    remains an alias for legacy envelopes
+    """
+    assert (type_registry.tag_of(SimpleRole) == 7 and
+            type_registry.lookup(7) is SimpleRole and
+            type_registry.lookup('SimpleRole') is SimpleRole)
+
+
+def test_tr_subclass_registered_upon_creation(serialization_manager):
+    """
+    unit tested:  SerializableMeta
+
+    test case:
+    a Serializable defined outside of yosai.core is registered by qualified
+    name upon creation, its name remaining an alias, and so round-trips
+    """
+    sm = serialization_manager
+    cart = ShoppingCart(['rug', 'bowling ball'])
+    tag = '{0}.ShoppingCart'.format(ShoppingCart.__module__)
+    assert (type_registry.tag_of(ShoppingCart) == tag and
+            type_registry.lookup(tag) is ShoppingCart and
+            type_registry.lookup('ShoppingCart') is ShoppingCart and
+            sm.deserialize(sm.serialize(cart)) == cart)
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_tr_tags_dont_depend_on_order(reverse):
+    """
+    unit tested:  register
+
+    test case:
+    classes that share a name are given their qualified names as tags,
+    whichever of them is registered first, and the first keeps the alias
+    """
+    tr = TypeRegistry()
+
+    first = type('SharedName', (object,), {'__module__': 'yourapp'})
+    second = type('SharedName', (object,), {'__module__': 'myapp'})
+    classes = [second, first] if reverse else [first, second]
+    for cls in classes:
+        tr.register(cls)
+    assert (tr.tag_of(first) == 'yourapp.SharedName' and
+            tr.tag_of(second) == 'myapp.SharedName' and
+            tr.lookup('yourapp.SharedName') is first and
+            tr.lookup('myapp.SharedName') is second and
+            tr.lookup('SharedName') is classes[0])
+
+
+def test_tr_namesake_of_core_class(serialization_manager):
+    """
+    unit tested:  register
+
+    test case:
+    a class that shares its name with a yosai.core class is given neither its
+    type code nor its name, and so round-trips as itself
+    """
+    class SimpleRole(ShoppingCart):
+        pass
+
+    sm = serialization_manager
+    role = SimpleRole(['dude'])
+    tag = type_registry.tag_of(SimpleRole)
+    assert (tag not in (7, 'SimpleRole') and
+            type_registry.lookup(tag) is SimpleRole and
+            sm.deserialize(sm.serialize(role)).__class__ is SimpleRole)
+
+
+def test_tr_serializable_type_decorator(serialization_manager):
+    """
+    unit tested:  serializable_type
+
+    test case:
+    a class registered under an explicit tag serializes with that tag
+    """
+    @serializable_type('test.GiftCart')
+    class GiftCart(ShoppingCart):
+        pass
+
+    sm = serialization_manager
+    message = sm.serialize(GiftCart(['white russian']))
+    unpacked = msgpack.unpackb(message, encoding='utf-8')
+    assert (unpacked['~t'] == 'test.GiftCart' and
+            sm.deserialize(message) == GiftCart(['white russian']))
+
+
+def test_tr_lookup_unknown_tag(serialization_manager):
+    """
+    unit tested:  lookup
+
+    test case:
+    an unregistered tag raises an exception
+    """
+    message = msgpack.packb({'~t': 'NoSuchClass', 'identifier': 'x'})
+    with pytest.raises(SerializationException):
+        serialization_manager.deserialize(message)
+
+
+@pytest.mark.parametrize('tag', [1.5, True, ('a',)])
+def test_tr_register_invalid_tag(tag):
+    """
+    unit tested:  register
+
+    test case:
+    tags must be integers or strings
+    """
+    with pytest.raises(InvalidArgumentException):
+        TypeRegistry().register(SimpleRole, tag)
+
+
+@pytest.mark.parametrize('serializer', [MSGPackSerializer, JSONSerializer])
+@pytest.mark.parametrize('value', [
+    datetime.datetime(2016, 2, 29, 23, 59, 59, 999999, tzinfo=pytz.utc),
+    datetime.datetime(1901, 1, 1, tzinfo=pytz.utc),
+    datetime.timedelta(days=-1, microseconds=1),
+    datetime.timedelta(minutes=30)])
+def test_serializer_native_temporal_types(serializer, value):
+    """
+    unit tested:  MSGPackSerializer, JSONSerializer
+
+    test case:
+    datetimes and timedeltas round-trip exactly, to the microsecond
+    """
+    result = serializer.deserialize(serializer.serialize({'value': value}))
+    assert result['value'] == value and type(result['value']) is type(value)
+
+
+@pytest.mark.parametrize('value', [
+    {'~dt': 5},
+    {'~td': [1, 2, 3]},
+    {'~x': 1},
+    {'~~td': 2},
+    {'~': None},
+    {'outer': [{'~dt': {'~td': 'nested'}}]},
+    {'when': datetime.datetime(2016, 1, 1, tzinfo=pytz.utc), '~dt': 1}])
+def test_json_serializer_escapes_tag_like_keys(value):
+    """
+    unit tested:  JSONSerializer.serialize, JSONSerializer.deserialize
+
+    test case:
+    user dicts whose only key starts with '~' come back unchanged rather
+    than being decoded as tagged values
+    """
+    result = JSONSerializer.deserialize(JSONSerializer.serialize(value))
+    assert result == value
+
+
+@pytest.mark.parametrize('serializer', [MSGPackSerializer, JSONSerializer])
+def test_serializer_naive_datetime_as_utc(serializer):
+    """
+    unit tested:  MSGPackSerializer, JSONSerializer
+
+    test case:
+    naive datetimes are taken to be utc
+    """
+    naive = datetime.datetime(2016, 1, 1, 12)
+    result = serializer.deserialize(serializer.serialize([naive]))
+    assert result == [naive.replace(tzinfo=pytz.utc)]
+
+
+def test_msgpack_serializer_datetime_ext_type():
+    """
+    unit tested:  MSGPackSerializer.serialize
+
+    test case:
+    a datetime is packed as extension type 1 holding 8 bytes, not as a string
+    """
+    value = datetime.datetime(2016, 1, 1, tzinfo=pytz.utc)
+    unpacked = msgpack.unpackb(MSGPackSerializer.serialize(value))
+    assert (unpacked == msgpack.ExtType(1, unpacked.data) and
+            len(unpacked.data) == 8)
+
+
+def test_msgpack_serializer_unknown_ext_type():
+    """
+    unit tested:  MSGPackSerializer.deserialize
+
+    test case:
+    an extension type without a registered decoder is returned as-is
+    """
+    message = msgpack.packb(msgpack.ExtType(99, b'data'))
+    assert MSGPackSerializer.deserialize(message) == msgpack.ExtType(99, b'data')
+
+
+@pytest.mark.parametrize('format', ['msgpack', 'json'])
+def test_sm_session_round_trip(format):
+    """
+    unit tested:  SerializationManager.serialize, deserialize
+
+    test case:
+    a session's timestamps and timeouts survive, to the microsecond, in either
+    format
+    """
+    sm = SerializationManager(format=format)
+    session = SimpleSession(host='127.0.0.1')
+    session.idle_timeout = datetime.timedelta(minutes=15, microseconds=5)
+    result = sm.deserialize(sm.serialize(session))
+    assert (result.start_timestamp == session.start_timestamp and
+            result.idle_timeout == session.idle_timeout)
+
+
+@pytest.fixture
+def serializers(monkeypatch):
+    """
+    isolates the serializers registered by a test from other tests
+    """
+    monkeypatch.setattr(SerializationManager, 'serializers',
+                        dict(SerializationManager.serializers))
+    monkeypatch.setattr(SerializationManager, '_plugins_loaded', False)
+    monkeypatch.setattr(serialization_settings, 'serializers', {})
+    return SerializationManager.serializers
+
+
+@pytest.mark.parametrize('format', ['pickle', 'marshal'])
+def test_sm_stdlib_formats_round_trip(format):
+    """
+    unit tested:  PickleSerializer, MarshalSerializer
+
+    test case:
+    sessions and authz_info round-trip through the standard library formats
+    """
+    sm = SerializationManager(format=format)
+    session = SimpleSession(host='127.0.0.1')
+    session.idle_timeout = datetime.timedelta(minutes=15, microseconds=5)
+    roles = [SimpleRole('role' + str(x)) for x in range(3)]
+
+    result = sm.deserialize(sm.serialize(session))
+    assert (result.start_timestamp == session.start_timestamp and
+            result.idle_timeout == session.idle_timeout and
+            sm.deserialize(sm.serialize(roles)) == roles)
+
+
+def test_sm_init_format_from_settings(serializers, monkeypatch):
+    """
+    unit tested:  __init__
+
+    test case:
+    without a format, the format of the settings is used
+    """
+    monkeypatch.setattr(serialization_settings, 'format', 'json')
+    assert SerializationManager().serializer is JSONSerializer
+
+
+def test_sm_register_serializer(serializers):
+    """
+    unit tested:  register_serializer
+
+    test case:
+    a registered serializer is used for its format
+    """
+    SerializationManager.register_serializer('pickle2', PickleSerializer)
+    sm = SerializationManager(format='pickle2')
+    assert (sm.serializer is PickleSerializer and
+            sm.deserialize(sm.serialize(SimpleRole('admin'))) ==
+            SimpleRole('admin'))
+
+
+def test_sm_serializer_from_settings(serializers, monkeypatch):
+    """
+    unit tested:  get_serializer
+
+    test case:
+    a serializer named by settings is imported when its format is requested
+    """
+    path = 'yosai.core.serialize.serialize:MarshalSerializer'
+    monkeypatch.setattr(serialization_settings, 'serializers',
+                        {'compact': path})
+    assert SerializationManager(format='compact').serializer is MarshalSerializer
+
+
+def test_sm_serializer_from_settings_misconfigured(serializers, monkeypatch):
+    """
+    unit tested:  get_serializer
+
+    test case:
+    a serializer that can't be imported raises MisconfiguredException
+    """
+    monkeypatch.setattr(serialization_settings, 'serializers',
+                        {'compact': 'yosai.core.serialize.nonexistent:Nope'})
+    with pytest.raises(MisconfiguredException):
+        SerializationManager(format='compact')
+
+
+def test_sm_serializer_from_entry_point(serializers):
+    """
+    unit tested:  get_serializer
+
+    test case:
+    serializers are loaded from entry points, without replacing those that
+    are registered already
+    """
+    compact = mock.MagicMock()
+    compact.name = 'compact'
+    compact.load.return_value = MarshalSerializer
+    json = mock.MagicMock()
+    json.name = 'json'
+    json.load.return_value = PickleSerializer
+
+    with mock.patch('pkg_resources.iter_entry_points',
+                    return_value=[compact, json]) as iter_entry_points:
+        sm = SerializationManager(format='compact')
+        iter_entry_points.assert_called_once_with('yosai.serializers')
+
+    assert (sm.serializer is MarshalSerializer and
+            serializers['json'] is JSONSerializer)
+
+
+@pytest.mark.parametrize('format', ['msgpack', 'json', 'pickle', 'marshal'])
+@pytest.mark.parametrize('buffer_type', [bytearray, memoryview])
+def test_sm_deserialize_buffer(format, buffer_type):
+    """
+    unit tested:  SerializationManager.deserialize
+
+    test case:
+    any buffer-protocol object de-serializes like bytes
+    """
+    sm = SerializationManager(format=format)
+    session = SimpleSession(host='127.0.0.1')
+    message = buffer_type(bytearray(sm.serialize(session)))
+    assert sm.deserialize(message) == session
+
+
+@pytest.mark.parametrize('buffer_type', [bytearray, memoryview])
+def test_sm_deserialize_compressed_buffer(buffer_type):
+    """
+    unit tested:  PayloadCompressor.decompress
+
+    test case:
+    a compressed payload is recognized and decompressed from any buffer
+    """
+    sm = SerializationManager(compressor=PayloadCompressor(threshold=64))
+    roles = [SimpleRole('role' + str(x)) for x in range(100)]
+    message = buffer_type(bytearray(sm.serialize(roles)))
+    assert sm.deserialize(message) == roles
+
+
+def test_sm_deserialize_stream(serialization_manager):
+    """
+    unit tested:  SerializationManager.deserialize_stream
+
+    test case:
+    consecutive messages in one buffer de-serialize, in order, as a stream
+    """
+    sm = serialization_manager
+    objects = [SimpleRole('admin'), [SimpleRole('one'), SimpleRole('two')],
+               SimpleSession(host='127.0.0.1')]
+    buffer = memoryview(b''.join(sm.serialize(obj) for obj in objects))
+    assert list(sm.deserialize_stream(buffer)) == objects
+
+
+def test_sm_deserialize_stream_truncated(serialization_manager):
+    """
+    unit tested:  SerializationManager.deserialize_stream
+
+    test case:
+    a stream that ends in the middle of a message raises an exception, once
+    the complete messages are de-serialized
+    """
+    sm = serialization_manager
+    buffer = sm.serialize(SimpleRole('admin')) + sm.serialize(SimpleRole('x'))
+    stream = sm.deserialize_stream(buffer[:-2])
+
+    assert next(stream) == SimpleRole('admin')
+    with pytest.raises(SerializationException):
+        next(stream)
+
+
+def test_sm_deserialize_stream_unsupported():
+    """
+    unit tested:  SerializationManager.deserialize_stream
+
+    test case:
+    formats without a streaming serializer raise an exception
+    """
+    sm = SerializationManager(format='json')
+    with pytest.raises(InvalidSerializationFormatException):
+        next(sm.deserialize_stream(b'{}'))
@@ -1,13 +1,20 @@
+import sys
+
 import pytest
+from marshmallow import Schema, fields
 
 from yosai.core import (
     CachingSessionStore,
+    ClientSideSessionStore,
     DefaultNativeSessionManager,
+    DefaultSessionContext,
     DefaultSessionKey,
     DefaultSessionSettings,
     DefaultSessionStorageEvaluator,
     DelegatingSession,
-    # ExecutorServiceSessionValidationScheduler,
+    ExecutorServiceSessionValidationScheduler,
+    HashCachingSessionStore,
+    MemoryCacheHandler,
     MemorySessionStore,
     ProxiedSession,
     SessionEventHandler,
@@ -27,6 +34,10 @@ from ..doubles import (
 )
 
 
+# the asyncio counterparts require python 3.5 (async def)
+collect_ignore = ['test_session_aio.py'] if sys.version_info < (3, 5) else []
+
+
 @pytest.fixture(scope='function')
 def mock_cache_handler():
     return MockCacheHandler()
@@ -55,11 +66,15 @@ def default_native_session_manager():
 
 
 @pytest.fixture(scope='function')
-def executor_session_validation_scheduler(patched_abstract_native_session_manager):
-    pansm = patched_abstract_native_session_manager
-    interval = 360
-    return ExecutorServiceSessionValidationScheduler(session_manager=pansm,
-                                                     interval=interval)
+def executor_session_validation_scheduler(session_handler):
+    """
+    a scheduler that validates the sessions of a MemorySessionStore, two at a
+    time
+    """
+    session_handler.session_store = MemorySessionStore(expire_on_write=False)
+    return ExecutorServiceSessionValidationScheduler(session_handler,
+                                                     interval=360,
+                                                     batch_size=2)
 
 
 @pytest.fixture(scope='function')
@@ -97,3 +112,46 @@ def session_handler(session_event_handler):
 @pytest.fixture(scope='function')
 def session_key():
     return DefaultSessionKey('sessionid123')
+
+
+@pytest.fixture(scope='function')
+def cached_session_manager(default_native_session_manager):
+    """
+    a DefaultNativeSessionManager whose sessions are serialized to a
+    MemoryCacheHandler, along with the DelegatingSession of a started session
+    """
+    nsm = default_native_session_manager
+    nsm.cache_handler = MemoryCacheHandler()
+    session = nsm.start(DefaultSessionContext())
+    return nsm, session
+
+
+@pytest.fixture(scope='function')
+def cart_attributes_schema(monkeypatch):
+    """
+    declares the 'cart' and 'color' session attributes for the duration of a
+    test
+    """
+    class AttributesSchema(Schema):
+        cart = fields.Str()
+        color = fields.Str()
+
+    monkeypatch.setattr(SimpleSession, 'AttributesSchema',
+                        SimpleSession.AttributesSchema)
+    SimpleSession.set_attributes_schema(AttributesSchema)
+    yield AttributesSchema
+    SimpleSession.invalidate_schema()  # monkeypatch restores AttributesSchema
+
+
+@pytest.fixture(scope='function')
+def hash_caching_session_store(cart_attributes_schema):
+    store = HashCachingSessionStore()
+    store.cache_handler = MemoryCacheHandler()
+    return store
+
+
+@pytest.fixture(scope='function')
+def client_side_session_store(cart_attributes_schema):
+    keys = ['4AUdxQ6KrKe9ItbZ8j0MmnAP1TGx4gVEVjkd52e1Ihc=',
+            'Shqpo3jfSvX-AOJYPgrPcVgvwcn7DnRy8U8d7D0B3Ls=']
+    return ClientSideSessionStore(keys)
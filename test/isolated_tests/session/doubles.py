@@ -2,6 +2,8 @@ import datetime
 from yosai.core import (
     DefaultNativeSessionManager,
     AbstractSessionStore,
+    SerializationManager,
+    cache_abcs,
     event_bus,
     session_abcs,
 )
@@ -109,3 +111,35 @@ class MockAbstractSessionStore(AbstractSessionStore):
 
     def _do_read(self, session_id):
         pass
+
+
+class SerializingCacheHandler(cache_abcs.CacheHandler):
+    """
+    A CacheHandler that implements only the abstract methods, storing
+    serialized payloads as a remote cache does.  Everything else, such as
+    get_raw and hset, is left to the CacheHandler defaults.
+    """
+
+    def __init__(self):
+        self.serialization_manager = SerializationManager()
+        self.store = {}
+
+    def get(self, domain, identifier):
+        payload = self.store.get((domain, identifier))
+        if payload is None:
+            return None
+        return self.serialization_manager.deserialize(payload)
+
+    def get_or_create(self, domain, identifier, creator_func, creator):
+        value = self.get(domain, identifier)
+        if value is None:
+            value = creator_func(creator)
+            self.set(domain, identifier, value)
+        return value
+
+    def set(self, domain, identifier, value):
+        self.store[(domain, identifier)] = (
+            self.serialization_manager.serialize(value))
+
+    def delete(self, domain, identifier):
+        self.store.pop((domain, identifier), None)
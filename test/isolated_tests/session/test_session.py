@@ -2,6 +2,7 @@ import pytest
 import pytz
 from unittest import mock
 import datetime
+from marshmallow import Schema, fields
 
 from .doubles import (
     MockSessionManager,
@@ -12,6 +13,8 @@ from ..doubles import (
 )
 
 from yosai.core import (
+    CompactSession,
+    CompactSessionFactory,
     DefaultSessionSettings,
     DefaultSessionKey,
     DelegatingSession,
@@ -19,6 +22,8 @@ from yosai.core import (
     StoppedSessionException,
     IllegalStateException,
     InvalidSessionException,
+    SerializationManager,
+    SimpleIdentifierCollection,
     SimpleSession,
     RandomSessionIDGenerator,
     UUIDSessionIDGenerator,
@@ -486,6 +491,102 @@ def test_ss_eq_clone():
     assert s1 == s2
 
 
+def test_ss_set_attributes_schema_invalidates(monkeypatch):
+    """
+    unit tested:  set_attributes_schema
+
+    test case:
+    setting an attributes schema discards the memoized serialization schema,
+    so that the new attributes schema is used
+    """
+    class MyAttributesSchema(Schema):
+        name = fields.Str()
+
+    monkeypatch.setattr(SimpleSession, 'AttributesSchema',
+                        SimpleSession.AttributesSchema)
+    before = SimpleSession.schema_class()
+    SimpleSession.set_attributes_schema(MyAttributesSchema)
+    after = SimpleSession.schema_class()
+
+    SimpleSession.invalidate_schema()  # monkeypatch restores AttributesSchema
+    assert (after is not before and
+            after._declared_fields['_attributes'].nested is MyAttributesSchema)
+
+
+def test_ss_invalidate_schema_rebuilds_dependents():
+    """
+    unit tested:  invalidate_schema
+
+    test case:
+    invalidating the schema that a SimpleSession's schema nests discards it,
+    along with the CompactSession schema that is built from it
+    """
+    simple_before = SimpleSession.schema_class()
+    compact_before = CompactSession.schema_class()
+    SimpleIdentifierCollection.invalidate_schema()
+
+    compact_after = CompactSession.schema_class()
+    assert (SimpleSession.schema_class() is not simple_before and
+            compact_after is not compact_before and
+            compact_after._declared_fields['_internal_attributes'] is
+            SimpleSession.schema_class()._declared_fields[
+                '_internal_attributes'])
+
+
+@pytest.fixture
+def attributes_schema(monkeypatch):
+    class MyAttributesSchema(Schema):
+        name = fields.Str()
+        visits = fields.Int()
+
+    monkeypatch.setattr(SimpleSession, 'AttributesSchema',
+                        SimpleSession.AttributesSchema)
+    SimpleSession.set_attributes_schema(MyAttributesSchema)
+    yield MyAttributesSchema
+    SimpleSession.invalidate_schema()  # monkeypatch restores AttributesSchema
+
+
+def test_ss_attributes_decoded_lazily(attributes_schema):
+    """
+    unit tested:  attributes
+
+    test case:
+    a de-serialized session validates without decoding its attributes, which
+    are decoded upon first use
+    """
+    sm = SerializationManager()
+    session = SimpleSession()
+    session.set_attribute('name', 'Jeffrey')
+    session.set_attribute('visits', 3)
+
+    result = sm.deserialize(sm.serialize(session))
+    result.validate()
+    undecoded = '_attributes' not in result.__dict__
+
+    assert (undecoded and result.get_attribute('name') == 'Jeffrey' and
+            result.attribute_keys == {'name', 'visits'} and
+            '_encoded_attributes' not in result.__dict__)
+
+
+@pytest.mark.parametrize('use_codecs', [True, False])
+def test_ss_undecoded_attributes_reserialized(attributes_schema, use_codecs):
+    """
+    unit tested:  attributes
+
+    test case:
+    a session whose attributes were never decoded is serialized with them
+    """
+    sm = SerializationManager(use_codecs=use_codecs)
+    session = SimpleSession()
+    session.set_attribute('visits', 3)
+
+    result = SerializationManager().deserialize(sm.serialize(session))
+    result.touch()
+    result = sm.deserialize(sm.serialize(result))
+    assert result.get_attribute('visits') == 3
+
+
+
 def test_ss_eq_different_values():
     """
     unit tested:
@@ -964,3 +1065,281 @@ def test_dsse_isse_w_subject(default_session_storage_evaluator, monkeypatch):
     monkeypatch.setattr(dsse, '_session_storage_enabled', False)
     result = dsse.is_session_storage_enabled(subject=MockSubject())
     assert result is False
+
+
+def test_ss_dirty_tracking():
+    """
+    unit tested:  mark_dirty, mark_clean, dirty_fields
+
+    test case:
+    changes through setters and attribute methods mark the session dirty,
+    until it is marked clean
+    """
+    session = SimpleSession()
+    session.mark_clean()
+    clean = session.is_dirty
+
+    session.set_attribute('name', 'Jeffrey')
+    session.idle_timeout = datetime.timedelta(minutes=5)
+    session.remove_internal_attribute('not_there')
+    dirty_fields = session.dirty_fields
+
+    session.mark_clean()
+    assert (not clean and not session.is_dirty and
+            dirty_fields == {'attributes', 'idle_timeout'})
+
+
+def test_ss_deserialized_session_is_clean():
+    """
+    unit tested:  is_dirty
+
+    test case:
+    a de-serialized session has no changes
+    """
+    sm = SerializationManager()
+    session = SimpleSession()
+    session.session_id = 'sessionid123'
+    assert session.is_dirty and not sm.deserialize(sm.serialize(session)).is_dirty
+
+
+@pytest.mark.parametrize('elapsed, threshold, dirty',
+                         [(datetime.timedelta(seconds=29), 0.1, False),
+                          (datetime.timedelta(seconds=30), 0.1, True),
+                          (datetime.timedelta(seconds=1), 0.0, True)])
+def test_ss_touch_throttled(elapsed, threshold, dirty, monkeypatch):
+    """
+    unit tested:  touch
+
+    test case:
+    touching marks last_access_time dirty only once it has moved by the
+    threshold fraction of idle_timeout since the session was written
+    """
+    monkeypatch.setattr(SimpleSession, 'touch_write_threshold', threshold)
+    now = datetime.datetime.now(pytz.utc)
+    session = SimpleSession()
+    session.idle_timeout = datetime.timedelta(minutes=5)
+    session.last_access_time = now - elapsed
+    session.mark_clean()
+
+    session.touch()
+    assert session.is_dirty is dirty and session.last_access_time >= now
+
+
+def test_ss_touch_accumulates():
+    """
+    unit tested:  touch
+
+    test case:
+    the threshold is measured from the last written access time, not from the
+    last touch
+    """
+    session = SimpleSession()
+    session.idle_timeout = datetime.timedelta(minutes=5)
+    session.last_access_time = (datetime.datetime.now(pytz.utc) -
+                                datetime.timedelta(seconds=20))
+    session.mark_clean()
+    session.touch()
+    first = session.is_dirty
+
+    session._written_access_time -= datetime.timedelta(seconds=20)
+    session.touch()
+    assert not first and session.is_dirty
+
+
+# ----------------------------------------------------------------------------
+# CompactSession
+# ----------------------------------------------------------------------------
+
+
+def test_cs_is_slotted():
+    """
+    unit tested:  __slots__
+
+    test case:
+    a CompactSession keeps its fields in slots rather than in a __dict__
+    """
+    session = CompactSession()
+    with pytest.raises(AttributeError):
+        session.unknown = 'value'
+    assert not hasattr(session, '__dict__')
+
+
+def test_cs_datetime_api():
+    """
+    unit tested:  timestamp and timeout properties
+
+    test case:
+    the properties return and accept datetimes and timedeltas, as those of a
+    SimpleSession do, while epoch seconds are kept internally
+    """
+    start = datetime.datetime(2016, 3, 1, 12, 0, 0, 250000, tzinfo=pytz.utc)
+    session = CompactSession()
+    session.start_timestamp = start
+    session.last_access_time = start + datetime.timedelta(minutes=1)
+    session.idle_timeout = datetime.timedelta(minutes=5)
+    session.absolute_timeout = datetime.timedelta(minutes=30)
+
+    assert (session.start_timestamp == start and
+            session._start == start.timestamp() and
+            session._idle_timeout == 300 and
+            session.idle_expiration == start + datetime.timedelta(minutes=6) and
+            session.absolute_expiration == start + datetime.timedelta(minutes=30)
+            and session.stop_timestamp is None)
+
+
+@pytest.mark.parametrize('timeout, seconds',
+                         [(datetime.timedelta(milliseconds=500), 1),
+                          (datetime.timedelta(seconds=90.1), 91),
+                          (datetime.timedelta(0), 0),
+                          (0.5, 1)])
+def test_cs_timeouts_rounded_up(timeout, seconds):
+    """
+    unit tested:  idle_timeout, absolute_timeout
+
+    test case:
+    timeouts are kept as whole seconds, rounded up so that a sub-second
+    timeout doesn't become 0, which means no timeout at all
+    """
+    session = CompactSession()
+    session.idle_timeout = timeout
+    session.absolute_timeout = timeout
+    assert session._idle_timeout == session._absolute_timeout == seconds
+
+
+def test_cs_validate_valid():
+    """
+    unit tested:  validate
+
+    test case:
+    a session within its timeouts validates without raising
+    """
+    session = CompactSession()
+    session.validate()
+    assert session.is_valid and not session.is_expired
+
+
+def test_cs_validate_stopped():
+    """
+    unit tested:  validate
+
+    test case:
+    a stopped session raises StoppedSessionException
+    """
+    session = CompactSession()
+    session.stop()
+    with pytest.raises(StoppedSessionException):
+        session.validate()
+
+
+def test_cs_validate_expired():
+    """
+    unit tested:  validate
+
+    test case:
+    an idle session is expired and stopped, and raises ExpiredSessionException
+    whose message is a str, as SimpleSession's is
+    """
+    session = CompactSession()
+    session.session_id = 'sessionid123'
+    session._last_access -= 600
+
+    with pytest.raises(ExpiredSessionException) as exc_info:
+        session.validate()
+
+    assert (session.is_expired and session.is_stopped and
+            session.stop_timestamp >= session.last_access_time and
+            isinstance(exc_info.value.args[0], str) and
+            'sessionid123' in exc_info.value.args[0])
+
+
+def test_cs_is_timed_out_absolute():
+    """
+    unit tested:  is_timed_out
+
+    test case:
+    a session is timed out once the absolute timeout has passed, however
+    recently it was accessed
+    """
+    session = CompactSession()
+    now = session._start + session._absolute_timeout + 1
+    session._last_access = now
+    assert session.is_timed_out(now) and not session.is_timed_out()
+
+
+@pytest.mark.parametrize('elapsed, dirty',
+                         [(20, False), (100, True)])
+def test_cs_touch_throttled(elapsed, dirty, monkeypatch):
+    """
+    unit tested:  touch
+
+    test case:
+    touching marks last_access_time dirty only once it has moved by the
+    threshold fraction of idle_timeout since the session was written
+    """
+    monkeypatch.setattr(CompactSession, 'touch_write_threshold', 0.2)
+    session = CompactSession()
+    session.idle_timeout = datetime.timedelta(minutes=5)
+    session._last_access -= elapsed
+    session.mark_clean()
+
+    session.touch()
+    assert session.is_dirty is dirty
+
+
+def test_cs_serialization_round_trip(cart_attributes_schema):
+    """
+    unit tested:  serialization
+
+    test case:
+    a CompactSession de-serializes to an equal session, decoding its
+    attributes upon first use
+    """
+    session = CompactSession(host='127.0.0.1')
+    session.session_id = 'sessionid123'
+    session.set_attribute('cart', 'book')
+    session.set_internal_attribute('authenticated_session_key', True)
+
+    sm = SerializationManager()
+    result = sm.deserialize(sm.serialize(session))
+
+    assert (result == session and result._attributes is None and
+            result.get_attribute('cart') == 'book' and
+            result.get_internal_attribute('authenticated_session_key') and
+            result.host == '127.0.0.1' and not result.is_dirty)
+
+
+def test_cs_equals_simple_session():
+    """
+    unit tested:  __eq__
+
+    test case:
+    a CompactSession and a SimpleSession of the same state are equal, in both
+    directions, and unequal once their state differs
+    """
+    compact = CompactSession()
+    compact.session_id = 'sessionid123'
+    simple = SimpleSession()
+    simple.session_id = 'sessionid123'
+    simple.start_timestamp = compact.start_timestamp
+    simple.idle_timeout = compact.idle_timeout
+    simple.absolute_timeout = compact.absolute_timeout
+
+    assert compact == simple and simple == compact
+
+    simple.idle_timeout = compact.idle_timeout + datetime.timedelta(minutes=1)
+
+    assert compact != simple and simple != compact
+
+
+@pytest.mark.parametrize('context, expected',
+                         [(None, None), (mock.Mock(host='127.0.0.1'),
+                                         '127.0.0.1')])
+def test_csf_create_session(context, expected):
+    """
+    unit tested:  create_session
+
+    test case:
+    a CompactSession is created, with the host of the context
+    """
+    session = CompactSessionFactory.create_session(session_context=context)
+    assert isinstance(session, CompactSession) and session.host == expected
@@ -0,0 +1,215 @@
+import asyncio
+import datetime
+from unittest import mock
+
+import pytest
+import pytz
+
+from yosai.core import (
+    CachingSessionStore,
+    DefaultSessionContext,
+    DefaultSessionKey,
+    ExpiredSessionException,
+    UnknownSessionException,
+    event_bus,
+)
+from yosai.core.cache.aio import (
+    AsyncMemoryCacheHandler,
+    ExecutorCacheHandler,
+)
+from yosai.core.session.aio import AsyncNativeSessionManager
+
+from .doubles import (
+    SerializingCacheHandler,
+)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.fixture(scope='function')
+def async_native_session_manager(cart_attributes_schema):
+    ansm = AsyncNativeSessionManager()
+    ansm.cache_handler = AsyncMemoryCacheHandler(absolute_ttl=3600)
+    ansm.event_bus = event_bus
+    return ansm
+
+
+# -----------------------------------------------------------------------------
+# AsyncNativeSessionManager Tests
+# -----------------------------------------------------------------------------
+
+
+def test_ansm_start_get_set_attribute(async_native_session_manager):
+    """
+    unit tested:  start, get_session, set_attribute, get_attribute
+
+    test case:
+    a session started by the manager is cached, and its attributes are set
+    and read by awaiting the manager
+    """
+    ansm = async_native_session_manager
+
+    async def scenario():
+        session = await ansm.start(DefaultSessionContext())
+        await session.set_attribute('cart', 'eggs')
+        found = await ansm.get_session(DefaultSessionKey(session.session_id))
+        return (await found.get_attribute('cart'),
+                await found.get_attribute_keys())
+
+    assert run(scenario()) == ('eggs', ('cart',))
+
+
+def test_ansm_shares_cache_with_sync_store(async_native_session_manager):
+    """
+    unit tested:  AsyncCachingSessionStore
+
+    test case:
+    a session cached by the async manager is read by a synchronous
+    CachingSessionStore that shares its cache
+    """
+    ansm = async_native_session_manager
+    session = run(ansm.start(DefaultSessionContext()))
+    run(session.set_attribute('cart', 'eggs'))
+
+    store = CachingSessionStore()
+    store.cache_handler = ansm.cache_handler.cache_handler
+    assert store.read(session.session_id).get_attribute('cart') == 'eggs'
+
+
+def test_ansm_touch_throttled(async_native_session_manager):
+    """
+    unit tested:  AsyncNativeSessionHandler.on_change
+
+    test case:
+    reading a session doesn't write it back while its touch is recent, as
+    with the synchronous session handler
+    """
+    ansm = async_native_session_manager
+    session = run(ansm.start(DefaultSessionContext()))
+    store = ansm.session_handler.session_store
+    with mock.patch.object(store, 'update', wraps=store.update) as update:
+        for _ in range(3):
+            assert run(ansm.is_valid(session.session_key))
+    assert update.call_count == 0
+
+
+def test_ansm_stop(async_native_session_manager):
+    """
+    unit tested:  stop
+
+    test case:
+    a stopped session is deleted and its stop is published
+    """
+    ansm = async_native_session_manager
+
+    async def scenario():
+        session = await ansm.start(DefaultSessionContext())
+        with mock.patch.object(ansm.session_event_handler,
+                               'notify_stop') as notify_stop:
+            await session.stop(None)
+        return notify_stop.call_count, await ansm.is_valid(session.session_key)
+
+    assert run(scenario()) == (1, False)
+
+
+def test_ansm_expired_session(async_native_session_manager):
+    """
+    unit tested:  AsyncNativeSessionHandler.validate
+
+    test case:
+    reading an idle-expired session raises, publishes its expiration and
+    deletes it
+    """
+    ansm = async_native_session_manager
+    session = run(ansm.start(DefaultSessionContext()))
+    store = ansm.session_handler.session_store
+    cached = run(store.read(session.session_id))
+    cached.last_access_time = (datetime.datetime.now(pytz.utc) -
+                               datetime.timedelta(hours=1))
+    run(store.update(cached))
+
+    with mock.patch.object(ansm.session_event_handler,
+                           'notify_expiration') as notify_expiration:
+        with pytest.raises(ExpiredSessionException):
+            run(ansm.get_attribute(session.session_key, 'cart'))
+    with pytest.raises(UnknownSessionException):
+        run(ansm.get_attribute(session.session_key, 'cart'))
+    assert notify_expiration.call_count == 1
+
+
+def test_ansm_revoke_all_sessions(async_native_session_manager,
+                                  simple_identifier_collection):
+    """
+    unit tested:  revoke_all_sessions
+
+    test case:
+    every session of a user is stopped and deleted
+    """
+    ansm = async_native_session_manager
+    sic = simple_identifier_collection
+
+    async def scenario():
+        sessions = [await ansm.start(DefaultSessionContext())
+                    for _ in range(3)]
+        for session in sessions[:2]:
+            await session.set_internal_attribute('identifiers_session_key',
+                                                 sic)
+        with mock.patch.object(ansm.session_event_handler, 'notify_stop'):
+            count = await ansm.revoke_all_sessions(sic.primary_identifier)
+        return count, [await ansm.is_valid(session.session_key)
+                       for session in sessions]
+
+    assert run(scenario()) == (2, [False, False, True])
+
+
+def test_ansm_revoke_all_sessions_without_hash_entries(
+        async_native_session_manager, simple_identifier_collection):
+    """
+    unit tested:  revoke_all_sessions
+
+    test case:
+    a user's sessions are indexed, and revoked, using a cache handler that
+    doesn't support hash entries
+    """
+    ansm = async_native_session_manager
+    ansm.cache_handler = ExecutorCacheHandler(SerializingCacheHandler())
+    sic = simple_identifier_collection
+
+    async def scenario():
+        sessions = [await ansm.start(DefaultSessionContext())
+                    for _ in range(2)]
+        for session in sessions:
+            await session.set_internal_attribute('identifiers_session_key',
+                                                 sic)
+        with mock.patch.object(ansm.session_event_handler, 'notify_stop'):
+            count = await ansm.revoke_all_sessions(sic.primary_identifier)
+        return count, [await ansm.is_valid(session.session_key)
+                       for session in sessions]
+
+    assert run(scenario()) == (2, [False, False])
+
+
+def test_ansm_concurrent_requests(async_native_session_manager):
+    """
+    unit tested:  AsyncNativeSessionManager
+
+    test case:
+    many sessions are served concurrently by one event loop
+    """
+    ansm = async_native_session_manager
+
+    async def request(i):
+        session = await ansm.start(DefaultSessionContext())
+        await session.set_attribute('cart', 'cart{0}'.format(i))
+        return await session.get_attribute('cart')
+
+    async def scenario():
+        return await asyncio.gather(*[request(i) for i in range(50)])
+
+    assert run(scenario()) == ['cart{0}'.format(i) for i in range(50)]
@@ -3,24 +3,36 @@ from unittest import mock
 import datetime
 import pytz
 import collections
+import threading
 from ..doubles import (
     MockSession,
 )
 
+from .doubles import (
+    SerializingCacheHandler,
+)
+
 from yosai.core import (
     CachingSessionStore,
+    CompactSession,
+    CompactSessionFactory,
+    DefaultSessionContext,
     DelegatingSession,
-    # ExecutorServiceSessionValidationScheduler,
+    ExecutorServiceSessionValidationScheduler,
     ExpiredSessionException,
     InvalidArgumentException,
+    MemoryCacheHandler,
+    MemorySessionStore,
     SessionEventException,
     DefaultNativeSessionHandler,
     SessionCreationException,
+    SimpleSession,
     StoppableScheduledExecutor,
     StoppedSessionException,
     IllegalStateException,
     InvalidSessionException,
     UnknownSessionException,
+    session_settings,
 )
 
 # ----------------------------------------------------------------------------
@@ -1184,3 +1196,511 @@ def test_nsm_remove_attribute_nothing(
                                       attribute_key='attr321')
 
         assert result is None
+
+
+# ----------------------------------------------------------------------------
+# DefaultNativeSessionManager Unit of Work
+# ----------------------------------------------------------------------------
+
+
+def test_nsm_unit_of_work_reads_and_writes_once(cached_session_manager):
+    """
+    unit tested:  unit_of_work
+
+    test case:
+    within a unit of work, a session is read once and its changes are written
+    once, upon leaving the block
+    """
+    nsm, session = cached_session_manager
+    store = nsm.session_handler.session_store
+
+    with mock.patch.object(store, 'read', wraps=store.read) as read:
+        with mock.patch.object(store, 'update', wraps=store.update) as update:
+            with nsm.unit_of_work():
+                for x in range(5):
+                    session.set_attribute('attribute' + str(x), x)
+                    session.get_attribute('attribute' + str(x))
+                assert update.call_count == 0
+            assert read.call_count == 1 and update.call_count == 1
+
+    assert nsm.current_unit_of_work is None
+
+
+def test_nsm_without_unit_of_work_writes_each_change(cached_session_manager):
+    """
+    unit tested:  set_attribute
+
+    test case:
+    outside of a unit of work, every access reads and every change writes,
+    while the touch that accompanies each read doesn't
+    """
+    nsm, session = cached_session_manager
+    store = nsm.session_handler.session_store
+
+    with mock.patch.object(store, 'read', wraps=store.read) as read:
+        with mock.patch.object(store, 'update', wraps=store.update) as update:
+            for x in range(5):
+                session.set_internal_attribute('key' + str(x), 'value')
+            assert read.call_count == 5 and update.call_count == 5
+
+
+def test_nsm_unit_of_work_flush(cached_session_manager):
+    """
+    unit tested:  flush
+
+    test case:
+    flush writes the changes made so far, which are then visible outside of
+    the unit of work
+    """
+    nsm, session = cached_session_manager
+    work = nsm.begin()
+    session.set_internal_attribute('authenticated_session_key', True)
+    assert list(work.changed)
+
+    nsm.flush()
+    stored = nsm.session_handler.session_store.read(session.session_id)
+    nsm.end()
+    assert (not work.changed and
+            stored.get_internal_attribute('authenticated_session_key') is True)
+
+
+def test_nsm_unit_of_work_discarded_upon_exception(cached_session_manager):
+    """
+    unit tested:  unit_of_work
+
+    test case:
+    when the block raises, the unit of work's changes aren't written
+    """
+    nsm, session = cached_session_manager
+    with pytest.raises(ValueError):
+        with nsm.unit_of_work():
+            session.set_internal_attribute('authenticated_session_key', True)
+            raise ValueError
+
+    assert (nsm.current_unit_of_work is None and
+            session.get_internal_attribute('authenticated_session_key') is None)
+
+
+def test_nsm_unit_of_work_nested(cached_session_manager):
+    """
+    unit tested:  begin, end
+
+    test case:
+    a nested unit of work joins the outer one, which alone flushes
+    """
+    nsm, session = cached_session_manager
+    store = nsm.session_handler.session_store
+
+    with mock.patch.object(store, 'update', wraps=store.update) as update:
+        with nsm.unit_of_work() as outer:
+            with nsm.unit_of_work() as inner:
+                session.set_internal_attribute('authenticated_session_key', True)
+            assert inner is outer and update.call_count == 0
+        assert update.call_count == 1
+
+
+def test_nsm_unit_of_work_nested_exception_caught(cached_session_manager):
+    """
+    unit tested:  unit_of_work
+
+    test case:
+    the changes of a nested block that raises are discarded only with the
+    outermost unit of work, so they're written when the exception is caught
+    """
+    nsm, session = cached_session_manager
+
+    with nsm.unit_of_work():
+        try:
+            with nsm.unit_of_work():
+                session.set_internal_attribute('authenticated_session_key',
+                                               True)
+                raise ValueError
+        except ValueError:
+            pass
+        assert nsm.current_unit_of_work is not None
+
+    assert (nsm.current_unit_of_work is None and
+            session.get_internal_attribute('authenticated_session_key'))
+
+
+def test_nsm_unit_of_work_thread_local(cached_session_manager):
+    """
+    unit tested:  current_unit_of_work
+
+    test case:
+    a unit of work belongs to the thread that began it
+    """
+    nsm, session = cached_session_manager
+    others = []
+    with nsm.unit_of_work():
+        thread = threading.Thread(
+            target=lambda: others.append(nsm.current_unit_of_work))
+        thread.start()
+        thread.join()
+        assert nsm.current_unit_of_work is not None
+    assert others == [None]
+
+
+def test_nsm_unit_of_work_stop(cached_session_manager):
+    """
+    unit tested:  stop
+
+    test case:
+    a session stopped within a unit of work is forgotten by it, so it isn't
+    written back by the flush
+    """
+    nsm, session = cached_session_manager
+    store = nsm.session_handler.session_store
+
+    with nsm.unit_of_work() as work:
+        session.set_internal_attribute('authenticated_session_key', True)
+        session.stop(None)
+        assert not work.sessions and not work.changed
+
+    assert store.read(session.session_id) is None
+
+
+def test_sh_on_change_skips_clean_session(session_handler, caching_session_store):
+    """
+    unit tested:  on_change
+
+    test case:
+    a session without changes isn't written;  a written session is marked
+    clean
+    """
+    sh = session_handler
+    sh.session_store = caching_session_store
+    session = SimpleSession()
+    session.session_id = 'sessionid123'
+
+    with mock.patch.object(caching_session_store, 'update') as ss_up:
+        sh.on_change(session)
+        sh.on_change(session)
+        ss_up.assert_called_once_with(session)
+    assert not session.is_dirty
+
+
+# ----------------------------------------------------------------------------
+# ExecutorServiceSessionValidationScheduler
+# ----------------------------------------------------------------------------
+
+
+def create_session(store, idle_age=None):
+    """
+    :param idle_age: how long ago, as a timedelta, the session was accessed
+    """
+    session = SimpleSession()
+    session.idle_timeout = datetime.timedelta(minutes=15)
+    if idle_age:
+        session.last_access_time = datetime.datetime.now(pytz.utc) - idle_age
+    store.create(session)
+    return session
+
+
+def test_esvs_validate_sessions_in_batches(
+        executor_session_validation_scheduler):
+    """
+    unit tested:  validate_sessions
+
+    test case:
+    expired sessions are validated a batch at a time, publishing their
+    expiration and deleting them, while others are left alone
+    """
+    esvs = executor_session_validation_scheduler
+    store = esvs.session_handler.session_store
+    for _ in range(5):
+        create_session(store, idle_age=datetime.timedelta(hours=1))
+    fresh = create_session(store)
+
+    handler = esvs.session_handler
+    with mock.patch.object(handler.session_event_handler,
+                           'notify_expiration') as notify:
+        with mock.patch.object(store, 'expired_sessions',
+                               wraps=store.expired_sessions) as expired:
+            result = esvs.validate_sessions()
+
+    metrics = esvs.snapshot()
+    assert (result == 5 and notify.call_count == 5 and
+            expired.call_count == 3 and list(store.sessions) ==
+            [fresh.session_id] and metrics['sessions_validated'] == 5 and
+            metrics['sessions_invalidated'] == 5 and
+            metrics['sweep_latency']['count'] == 1 and
+            metrics['last_sweep_seconds'] is not None)
+
+
+def test_esvs_validate_sessions_skips_unexpired(
+        executor_session_validation_scheduler):
+    """
+    unit tested:  validate_sessions
+
+    test case:
+    sessions that haven't expired, including one touched since it was
+    stored, are never validated
+    """
+    esvs = executor_session_validation_scheduler
+    store = esvs.session_handler.session_store
+    create_session(store)
+    touched = create_session(store, idle_age=datetime.timedelta(hours=1))
+    touched.touch()
+
+    with mock.patch.object(esvs.session_handler, 'validate') as validate:
+        result = esvs.validate_sessions()
+    assert result == 0 and not validate.called and len(store) == 2
+
+
+def test_esvs_validate_sessions_publish_fails(
+        executor_session_validation_scheduler):
+    """
+    unit tested:  validate_sessions
+
+    test case:
+    a session whose expiration can't be published is deleted nonetheless, and
+    the sweep continues
+    """
+    esvs = executor_session_validation_scheduler
+    store = esvs.session_handler.session_store
+    for _ in range(3):
+        create_session(store, idle_age=datetime.timedelta(hours=1))
+
+    with mock.patch.object(esvs.session_handler.session_event_handler,
+                           'notify_expiration') as notify:
+        notify.side_effect = SessionEventException
+        result = esvs.validate_sessions()
+    assert result == 3 and len(store) == 0
+
+
+def test_esvs_validate_sessions_without_index(session_handler):
+    """
+    unit tested:  validate_sessions
+
+    test case:
+    a session store without an expiration index can't be validated
+    """
+    session_handler.session_store = mock.Mock(spec=['read', 'update'])
+    esvs = ExecutorServiceSessionValidationScheduler(session_handler)
+    with pytest.raises(IllegalStateException):
+        esvs.validate_sessions()
+
+
+def test_esvs_enable_disable_session_validation(
+        executor_session_validation_scheduler):
+    """
+    unit tested:  enable_session_validation, disable_session_validation, run
+
+    test case:
+    enabling starts a daemon thread that sweeps at once;  disabling stops it
+    """
+    esvs = executor_session_validation_scheduler
+    swept = threading.Event()
+    with mock.patch.object(esvs, 'validate_sessions') as validate:
+        validate.side_effect = lambda: swept.set()
+        esvs.enable_session_validation()
+        service = esvs.service
+        assert swept.wait(5) and esvs.is_enabled and service.daemon
+        esvs.disable_session_validation()
+
+    assert not esvs.is_enabled and not service.is_alive()
+
+
+def test_esvs_run_survives_exceptions(executor_session_validation_scheduler):
+    """
+    unit tested:  run
+
+    test case:
+    a failed sweep is logged rather than raised, so the thread lives on
+    """
+    esvs = executor_session_validation_scheduler
+    with mock.patch.object(esvs, 'validate_sessions') as validate:
+        validate.side_effect = ValueError
+        esvs.run()
+    assert validate.called
+
+
+def test_csd_expired_sessions():
+    """
+    unit tested:  CachingSessionStore.expired_sessions
+
+    test case:
+    expired sessions are read from cache;  those touched since (as by another
+    process) are indexed anew, and those that left the cache are skipped
+    """
+    store = CachingSessionStore(expire_on_write=False)
+    store.cache_handler = MemoryCacheHandler(absolute_ttl=3600)
+    expired = create_session(store, idle_age=datetime.timedelta(hours=1))
+    touched = create_session(store, idle_age=datetime.timedelta(hours=1))
+    gone = create_session(store, idle_age=datetime.timedelta(hours=1))
+
+    touched.last_access_time = datetime.datetime.now(pytz.utc)
+    store.cache_handler.set(domain='session', identifier=touched.session_id,
+                            value=touched)
+    store.cache_handler.delete(domain='session', identifier=gone.session_id)
+
+    result = store.expired_sessions()
+    assert ([session.session_id for session in result] ==
+            [expired.session_id] and
+            list(store.expiration_index.expirations) == [touched.session_id])
+
+
+@pytest.mark.parametrize('scheduler_enabled, expire_on_write',
+                         [(True, False), (False, True)])
+def test_csd_expire_on_write_default(scheduler_enabled, expire_on_write,
+                                     monkeypatch):
+    """
+    unit tested:  CachingSessionStore.__init__
+
+    test case:
+    the expiration index is pruned on write unless the validation scheduler,
+    which drains it, is enabled
+    """
+    monkeypatch.setattr(session_settings, 'validation_scheduler_enable',
+                        scheduler_enabled)
+    assert CachingSessionStore().expire_on_write is expire_on_write
+
+
+def test_csd_expire_on_write_bounds_index():
+    """
+    unit tested:  CachingSessionStore.create, update
+
+    test case:
+    without a scheduler, sessions that expired are dropped from the
+    expiration index whenever a session is written, so it doesn't grow with
+    abandoned sessions
+    """
+    store = CachingSessionStore(expire_on_write=True)
+    store.cache_handler = MemoryCacheHandler(absolute_ttl=3600)
+    abandoned = [create_session(store, idle_age=datetime.timedelta(hours=1))
+                 for _ in range(10)]
+    active = create_session(store)
+    assert (list(store.expiration_index.expirations) == [active.session_id]
+            and all(store.read(session.session_id) is not None
+                    for session in abandoned))
+
+
+def test_nsm_enables_session_validation_upon_start(
+        default_native_session_manager):
+    """
+    unit tested:  enable_session_validation_if_necessary
+
+    test case:
+    when configured, the first session to start enables a scheduler, with the
+    configured interval, once
+    """
+    nsm = default_native_session_manager
+    nsm.session_validation_scheduler_enabled = True
+    nsm.session_validation_interval = datetime.timedelta(minutes=5)
+    nsm.cache_handler = MemoryCacheHandler()
+
+    with mock.patch.object(StoppableScheduledExecutor, 'start') as start:
+        nsm.start(DefaultSessionContext())
+        nsm.start(DefaultSessionContext())
+
+    scheduler = nsm.session_validation_scheduler
+    assert (start.call_count == 1 and scheduler.is_enabled and
+            scheduler.interval == 300)
+
+
+def test_nsm_validate_sessions(default_native_session_manager):
+    """
+    unit tested:  validate_sessions
+
+    test case:
+    sessions are validated on demand, without a scheduler enabled
+    """
+    nsm = default_native_session_manager
+    nsm.cache_handler = MemoryCacheHandler(absolute_ttl=3600)
+    store = nsm.session_handler.session_store
+    store.expire_on_write = False
+    create_session(store, idle_age=datetime.timedelta(hours=1))
+    with mock.patch.object(nsm.session_event_handler, 'notify_expiration'):
+        assert nsm.validate_sessions() == 1
+    assert nsm.session_validation_scheduler is None
+
+
+def test_nsm_revoke_all_sessions(default_native_session_manager,
+                                 simple_identifier_collection):
+    """
+    unit tested:  revoke_all_sessions
+
+    test case:
+    every session of a user is stopped and deleted at once, a stop event is
+    published for each, and the sessions of other users are left alone
+    """
+    nsm = default_native_session_manager
+    nsm.cache_handler = MemoryCacheHandler()
+    sic = simple_identifier_collection
+
+    sessions = [nsm.start(DefaultSessionContext()) for _ in range(4)]
+    for session in sessions[:3]:
+        session.set_internal_attribute('identifiers_session_key', sic)
+
+    cache_handler = nsm.cache_handler
+    with mock.patch.object(nsm.session_event_handler,
+                           'notify_stop') as notify_stop:
+        with mock.patch.object(cache_handler, 'delete_many',
+                               wraps=cache_handler.delete_many) as delete_many:
+            count = nsm.revoke_all_sessions(sic.primary_identifier)
+
+    assert (count == 3 and notify_stop.call_count == 3 and
+            delete_many.call_count == 1 and
+            not any(nsm.is_valid(session.session_key)
+                    for session in sessions[:3]) and
+            nsm.is_valid(sessions[3].session_key) and
+            nsm.revoke_all_sessions(sic.primary_identifier) == 0)
+
+
+def test_nsm_revoke_all_sessions_without_hash_entries(
+        default_native_session_manager, simple_identifier_collection):
+    """
+    unit tested:  revoke_all_sessions
+
+    test case:
+    a user's sessions are revoked using a cache handler that implements only
+    the abstract methods of CacheHandler, and so doesn't support hash entries
+    """
+    nsm = default_native_session_manager
+    nsm.cache_handler = SerializingCacheHandler()
+    sic = simple_identifier_collection
+
+    sessions = [nsm.start(DefaultSessionContext()) for _ in range(2)]
+    for session in sessions:
+        session.set_internal_attribute('identifiers_session_key', sic)
+
+    assert (nsm.revoke_all_sessions(sic.primary_identifier) == 2 and
+            not any(nsm.is_valid(session.session_key)
+                    for session in sessions))
+
+
+def test_nsm_revoke_all_sessions_unsupported(default_native_session_manager):
+    """
+    unit tested:  revoke_all_sessions
+
+    test case:
+    a session store that can't find a user's sessions raises
+    """
+    nsm = default_native_session_manager
+    nsm.session_handler.session_store = MemorySessionStore()
+    with pytest.raises(IllegalStateException):
+        nsm.revoke_all_sessions('thedude')
+
+
+def test_nsm_with_compact_sessions(default_native_session_manager):
+    """
+    unit tested:  session_factory
+
+    test case:
+    a session manager whose factory creates CompactSessions starts, touches,
+    validates and stops them as it does SimpleSessions
+    """
+    nsm = default_native_session_manager
+    nsm.cache_handler = MemoryCacheHandler()
+    nsm.session_factory = CompactSessionFactory()
+
+    session = nsm.start(DefaultSessionContext())
+    session_key = session.session_key
+    nsm.touch(session_key)
+    stored = nsm.session_handler.session_store.read(session.session_id)
+    valid = nsm.is_valid(session_key)
+    nsm.stop(session_key, None)
+
+    assert (isinstance(stored, CompactSession) and valid and
+            not nsm.is_valid(session_key))
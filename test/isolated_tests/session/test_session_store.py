@@ -1,15 +1,37 @@
+import datetime
+import threading
+
 import pytest
 from unittest import mock
 from yosai.core import (
     AbstractSessionStore,
+    CachedAttributes,
     CachingSessionStore,
+    ClientSideSessionStore,
+    CompactSession,
+    DefaultNativeSessionHandler,
     DefaultSessionKey,
+    DefaultSessionContext,
     InvalidArgumentException,
+    LazyPayload,
+    MemoryCacheHandler,
+    MemorySessionStore,
     IllegalStateException,
     RandomSessionIDGenerator,
     SessionCacheException,
+    SessionCreationException,
+    SessionExpirationIndex,
+    SessionRevocationList,
+    SessionTokenException,
+    ShardedCacheHandler,
+    SimpleSession,
     UnknownSessionException,
     UUIDSessionIDGenerator,
+    session_settings,
+)
+
+from .doubles import (
+    SerializingCacheHandler,
 )
 
 # -----------------------------------------------------------------------------
@@ -256,6 +278,188 @@ def test_msd_delete_raises_ae(memory_session_store):
         msd.delete(session='dumbsession')
 
 
+def create_timed_session(store, idle_minutes):
+    session = SimpleSession()
+    session.idle_timeout = datetime.timedelta(minutes=idle_minutes)
+    store.create(session)
+    return session
+
+
+def test_msd_remove_expired(memory_session_store):
+    """
+    unit tested:  remove_expired
+
+    test case:
+    sessions are removed once their idle or absolute expiration has passed,
+    including sessions whose expiration moved
+    """
+    msd = memory_session_store
+    soon = create_timed_session(msd, 1)
+    later = create_timed_session(msd, 10)
+    moved = create_timed_session(msd, 1)
+    moved.idle_timeout = datetime.timedelta(minutes=20)
+    msd.update(moved)
+
+    now = SessionExpirationIndex.expiration_of(soon) + 1
+    assert (msd.remove_expired(now=now) == [soon.session_id] and
+            set(msd.sessions) == {later.session_id, moved.session_id} and
+            msd.remove_expired(now=now + 15 * 60) == [later.session_id] and
+            len(msd) == 1)
+
+
+@pytest.mark.parametrize('scheduler_enabled, expire_on_write',
+                         [(True, False), (False, True)])
+def test_msd_expire_on_write_default(scheduler_enabled, expire_on_write,
+                                     monkeypatch):
+    """
+    unit tested:  MemorySessionStore.__init__
+
+    test case:
+    expired sessions are removed on write unless the validation scheduler,
+    which removes them, is enabled
+    """
+    monkeypatch.setattr(session_settings, 'validation_scheduler_enable',
+                        scheduler_enabled)
+    assert MemorySessionStore().expire_on_write is expire_on_write
+
+
+def test_msd_expired_on_write_publishes_expiration():
+    """
+    unit tested:  remove_expired
+
+    test case:
+    a session removed on write passes through the session handler's expiry
+    path, which publishes its expiration and deletes it
+    """
+    event_handler = mock.MagicMock()
+    handler = DefaultNativeSessionHandler(event_handler)
+    msd = MemorySessionStore(expire_on_write=True)
+    handler.session_store = msd
+
+    stale = create_timed_session(msd, 1)
+    stale.last_access_time = (stale.last_access_time -
+                              datetime.timedelta(minutes=5))
+    msd.update(stale)
+    fresh = create_timed_session(msd, 10)
+
+    session_tuple, = event_handler.notify_expiration.call_args[0]
+    assert (event_handler.notify_expiration.call_count == 1 and
+            session_tuple.session_key.session_id == stale.session_id and
+            set(msd.sessions) == {fresh.session_id})
+
+
+def test_msd_update_invalid_session_deletes(memory_session_store):
+    """
+    unit tested:  update
+
+    test case:
+    an invalid (stopped) session is removed rather than stored
+    """
+    msd = memory_session_store
+    session = create_timed_session(msd, 10)
+    session.stop()
+    msd.update(session)
+    assert len(msd) == 0 and len(msd.expiration_index) == 0
+
+
+def test_msd_max_sessions_evicts_soonest_expiration():
+    """
+    unit tested:  create
+
+    test case:
+    a full store evicts the session that would expire soonest
+    """
+    msd = MemorySessionStore(max_sessions=2)
+    later = create_timed_session(msd, 10)
+    soon = create_timed_session(msd, 5)
+    newest = create_timed_session(msd, 1)
+    assert (soon.session_id not in msd.sessions and
+            set(msd.sessions) == {later.session_id, newest.session_id})
+
+
+def test_msd_max_sessions_rejects():
+    """
+    unit tested:  create
+
+    test case:
+    a full store with the reject policy refuses new sessions, unless one has
+    expired
+    """
+    msd = MemorySessionStore(max_sessions=1, eviction_policy='reject')
+    first = create_timed_session(msd, 10)
+    with pytest.raises(SessionCreationException):
+        create_timed_session(msd, 10)
+
+    msd.clock = lambda: SessionExpirationIndex.expiration_of(first) + 1
+    create_timed_session(msd, 10)
+    assert first.session_id not in msd.sessions and len(msd) == 1
+
+
+def test_msd_invalid_eviction_policy():
+    """
+    unit tested:  __init__
+
+    test case:
+    an unrecognized eviction policy raises
+    """
+    with pytest.raises(InvalidArgumentException):
+        MemorySessionStore(eviction_policy='random')
+
+
+def test_msd_compacts_superseded_entries(memory_session_store):
+    """
+    unit tested:  update
+
+    test case:
+    the entries of the expiration heap that are superseded are compacted, so
+    the heap doesn't grow with the number of updates
+    """
+    msd = memory_session_store
+    session = create_timed_session(msd, 10)
+    for minutes in range(11, 511):
+        session.idle_timeout = datetime.timedelta(minutes=minutes)
+        msd.update(session)
+    index = msd.expiration_index
+    assert len(index._heap) <= 2 * len(index) + 65
+
+
+def test_msd_concurrent_creates():
+    """
+    unit tested:  create
+
+    test case:
+    concurrent creates never exceed max_sessions
+    """
+    msd = MemorySessionStore(max_sessions=50)
+
+    def create_many():
+        for _ in range(100):
+            create_timed_session(msd, 10)
+
+    threads = [threading.Thread(target=create_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(msd) == 50 and len(msd.expiration_index) == 50
+
+
+def test_msd_with_session_manager(default_native_session_manager):
+    """
+    unit tested:  MemorySessionStore, used by a session manager
+
+    test case:
+    a session manager keeps sessions in a MemorySessionStore without any
+    CacheHandler
+    """
+    nsm = default_native_session_manager
+    nsm.session_handler.session_store = MemorySessionStore()
+    session = nsm.start(DefaultSessionContext())
+    session.set_attribute('cart', 'eggs')
+    assert (session.get_attribute('cart') == 'eggs' and
+            len(nsm.session_handler.session_store) == 1)
+
+
 # -----------------------------------------------------------------------------
 # CachingSessionStore
 # -----------------------------------------------------------------------------
@@ -383,6 +587,52 @@ def test_csd_getcachedsession_none_default(
     assert result is None
 
 
+def test_csd_read_write_raw(caching_session_store, simple_session):
+    """
+    unit tested:  read_raw, write_raw
+
+    test case:
+    a serialized session is moved from one cache to another without being
+    de-serialized, and de-serializes upon first use
+    """
+    source = MemoryCacheHandler()
+    source.set(domain='session', identifier='sessionid123',
+               value=simple_session)
+    csd = caching_session_store
+    csd.cache_handler = source
+    payload = csd.read_raw('sessionid123')
+
+    replica = CachingSessionStore()
+    replica.cache_handler = MemoryCacheHandler()
+    replica.write_raw('sessionid123', payload)
+    replicated = replica.read_raw('sessionid123')
+
+    lazy = LazyPayload(replicated, source.serialization_manager)
+    assert (replicated == payload and not lazy.is_deserialized and
+            lazy.start_timestamp == simple_session.start_timestamp)
+
+
+def test_csd_read_raw_without_cache_handler(caching_session_store):
+    """
+    unit tested:  read_raw
+
+    test case:
+    without a cache_handler, there is no session to read
+    """
+    assert caching_session_store.read_raw('sessionid123') is None
+
+
+def test_csd_write_raw_without_cache_handler(caching_session_store):
+    """
+    unit tested:  write_raw
+
+    test case:
+    without a cache_handler, an exception is raised
+    """
+    with pytest.raises(SessionCacheException):
+        caching_session_store.write_raw('sessionid123', b'payload')
+
+
 def test_csd_cache_identifiers_to_key_map_w_idents(
         caching_session_store, mock_cache_handler, mock_session, monkeypatch,
         simple_identifier_collection):
@@ -391,14 +641,14 @@ def test_csd_cache_identifiers_to_key_map_w_idents(
     monkeypatch.setattr(csd, 'cache_handler', mock_cache_handler)
     monkeypatch.setattr(mock_session, 'get_internal_attribute', lambda x: sic)
 
-    with mock.patch.object(mock_cache_handler, 'set') as mock_set:
-        mock_set.return_value = None
+    with mock.patch.object(mock_cache_handler, 'hset') as mock_hset:
+        mock_hset.return_value = None
 
         csd._cache_identifiers_to_key_map(mock_session, 'sessionid123')
 
-        mock_set.assert_called_once_with(domain='session',
-                                         identifier=sic.primary_identifier,
-                                         value=DefaultSessionKey('sessionid123'))
+        mock_hset.assert_called_once_with(domain='identifier_sessions',
+                                          identifier=sic.primary_identifier,
+                                          mapping={'sessionid123': b''})
 
 
 def test_csd_cache_identifiers_to_key_map_wo_idents(
@@ -460,10 +710,14 @@ def test_csd_uncache(
     monkeypatch.setattr(mock_session, 'get_internal_attribute', lambda x: sic)
     with mock.patch.object(mock_cache_handler, 'delete') as mock_remove:
         mock_remove.return_value = None
-        csd._uncache(mock_session)
-        calls = [mock.call(domain='session', identifier=mock_session.session_id),
-                 mock.call(domain='session', identifier=sic.primary_identifier)]
-        mock_remove.assert_has_calls(calls)
+        with mock.patch.object(mock_cache_handler, 'hdel') as mock_hdel:
+            csd._uncache(mock_session)
+            mock_remove.assert_called_once_with(
+                domain='session', identifier=mock_session.session_id)
+            mock_hdel.assert_called_once_with(
+                domain='identifier_sessions',
+                identifier=sic.primary_identifier,
+                fields=[mock_session.session_id])
 
 
 def test_csd_uncache_raises(caching_session_store):
@@ -477,3 +731,581 @@ def test_csd_uncache_raises(caching_session_store):
 
     with pytest.raises(SessionCacheException):
         csd._uncache('session')
+
+
+def test_csd_sessions_by_identifier(caching_session_store,
+                                    simple_identifier_collection):
+    """
+    unit tested:  create, session_ids_of, delete
+
+    test case:
+    a user's second session is added to, rather than replacing, the first,
+    and a deleted session is removed from the user's sessions
+    """
+    csd = caching_session_store
+    csd.cache_handler = MemoryCacheHandler()
+    sic = simple_identifier_collection
+    sessions = [SimpleSession() for _ in range(3)]
+    for session in sessions:
+        session.set_internal_attribute('identifiers_session_key', sic)
+        csd.create(session)
+
+    first = set(csd.session_ids_of(sic.primary_identifier))
+    csd.delete(sessions[0])
+    assert (first == {session.session_id for session in sessions} and
+            set(csd.session_ids_of(sic.primary_identifier)) ==
+            {sessions[1].session_id, sessions[2].session_id})
+
+
+@pytest.mark.parametrize('cache_handler_cls',
+                         [MemoryCacheHandler, SerializingCacheHandler])
+def test_csd_sessions_by_identifier_any_handler(
+        caching_session_store, simple_identifier_collection,
+        cache_handler_cls):
+    """
+    unit tested:  create, session_ids_of, delete_sessions, delete
+
+    test case:
+    a user's sessions are indexed whether or not the cache handler supports
+    hash entries:  without them, as a list of session keys
+    """
+    csd = caching_session_store
+    csd.cache_handler = cache_handler_cls()
+    sic = simple_identifier_collection
+    sessions = [SimpleSession() for _ in range(3)]
+    for session in sessions:
+        session.set_internal_attribute('identifiers_session_key', sic)
+        csd.create(session)
+    csd.update(sessions[0])  # indexes no session twice
+
+    first = sorted(csd.session_ids_of(sic.primary_identifier))
+    csd.delete(sessions[0])
+    second = set(csd.session_ids_of(sic.primary_identifier))
+    csd.delete_sessions(sic.primary_identifier,
+                        [sessions[1].session_id, sessions[2].session_id])
+
+    assert (first == sorted(session.session_id for session in sessions) and
+            second == {sessions[1].session_id, sessions[2].session_id} and
+            csd.session_ids_of(sic.primary_identifier) == [])
+
+
+def test_csd_delete_sessions(caching_session_store):
+    """
+    unit tested:  delete_sessions
+
+    test case:
+    sessions are deleted with one request, and removed from their user's
+    sessions with another
+    """
+    csd = caching_session_store
+    csd.cache_handler = MemoryCacheHandler()
+    csd.cache_handler.hset(domain='identifier_sessions', identifier='thedude',
+                           mapping={'abc': b'', 'def': b''})
+    with mock.patch.object(csd.cache_handler, 'delete_many',
+                           wraps=csd.cache_handler.delete_many) as delete_many:
+        csd.delete_sessions('thedude', ['abc', 'def'])
+    delete_many.assert_called_once_with(domain='session',
+                                        identifiers=['abc', 'def'])
+    assert csd.session_ids_of('thedude') == []
+
+
+def test_csd_session_keys_with_without():
+    """
+    unit tested:  session_keys_with, session_keys_without
+
+    test case:
+    the list of a user's session keys is rewritten only when it changes, and
+    emptied once the user's last session is removed
+    """
+    keys = [DefaultSessionKey('abc')]
+    added = CachingSessionStore.session_keys_with(keys, 'def')
+    assert (CachingSessionStore.session_keys_with(keys, 'abc') is None and
+            [key.session_id for key in added] == ['abc', 'def'] and
+            len(keys) == 1 and
+            CachingSessionStore.session_keys_without(added, ['xyz']) is None and
+            CachingSessionStore.session_keys_without(added, ['def']) == keys and
+            CachingSessionStore.session_keys_without(keys, ['abc']) == [])
+
+
+def test_csd_with_sharded_cache_handler(caching_session_store,
+                                        cart_attributes_schema,
+                                        default_native_session_manager):
+    """
+    unit tested:  CachingSessionStore, used with a ShardedCacheHandler
+
+    test case:
+    sessions started through a session manager are spread across the shards,
+    each session kept by the shard of its session id
+    """
+    sch = ShardedCacheHandler({name: MemoryCacheHandler()
+                               for name in ('shard0', 'shard1', 'shard2')})
+    nsm = default_native_session_manager
+    nsm.cache_handler = sch
+    nsm.session_handler.session_store = caching_session_store
+    caching_session_store.cache_handler = sch
+
+    sessions = [nsm.start(DefaultSessionContext()) for _ in range(60)]
+    for session in sessions:
+        session.set_attribute('color', 'blue')
+
+    assert (all(len(shard.keys('*:session')) > 0
+                for shard in sch.shards.values()) and
+            all(sch.get_shard(session.session_id).get(
+                domain='session', identifier=session.session_id) is not None
+                for session in sessions) and
+            all(session.get_attribute('color') == 'blue'
+                for session in sessions))
+
+
+# -----------------------------------------------------------------------------
+# HashCachingSessionStore
+# -----------------------------------------------------------------------------
+
+def create_cart_session(store):
+    session = SimpleSession(host='127.0.0.1')
+    session.set_attribute('cart', 'eggs')
+    session.set_attribute('color', 'blue')
+    session_id = store.create(session)
+    session.mark_clean()
+    return session_id
+
+
+def test_hcss_create_read(hash_caching_session_store):
+    """
+    unit tested:  create, read
+
+    test case:
+    a session is cached as a header field and a field per attribute, and
+    reads back with attributes that are read upon first use
+    """
+    hcss = hash_caching_session_store
+    session_id = create_cart_session(hcss)
+
+    fields = hcss.cache_handler.hgetall(domain='session',
+                                        identifier=session_id)
+    session = hcss.read(session_id)
+    attributes = session.__dict__['_attributes']
+    assert (set(fields) == {'~session', 'attribute:cart', 'attribute:color'}
+            and session.host == '127.0.0.1' and
+            isinstance(attributes, CachedAttributes) and
+            attributes.loaded == {} and
+            session.get_attribute('cart') == 'eggs' and
+            attributes.loaded == {'cart': 'eggs'} and
+            session.attribute_keys == {'cart', 'color'})
+
+
+def test_hcss_get_attribute_reads_one_field(hash_caching_session_store):
+    """
+    unit tested:  read, CachedAttributes.__getitem__
+
+    test case:
+    reading an attribute reads its field alone, once
+    """
+    hcss = hash_caching_session_store
+    session_id = create_cart_session(hcss)
+    session = hcss.read(session_id)
+
+    with mock.patch.object(hcss.cache_handler, 'hget',
+                           wraps=hcss.cache_handler.hget) as hget:
+        with mock.patch.object(hcss.cache_handler, 'hgetall') as hgetall:
+            session.get_attribute('cart')
+            session.get_attribute('cart')
+            session.get_attribute('missing')
+            session.get_attribute('missing')
+    fields = [call[1]['field'] for call in hget.call_args_list]
+    assert (fields == ['attribute:cart', 'attribute:missing'] and
+            not hgetall.called)
+
+
+def test_hcss_update_writes_changed_attribute(hash_caching_session_store):
+    """
+    unit tested:  update
+
+    test case:
+    updating a session whose attribute changed writes that attribute's field
+    alone, while removed attributes are deleted
+    """
+    hcss = hash_caching_session_store
+    session_id = create_cart_session(hcss)
+    session = hcss.read(session_id)
+    session.set_attribute('cart', 'spam')
+    session.remove_attribute('color')
+
+    with mock.patch.object(hcss.cache_handler, 'hset',
+                           wraps=hcss.cache_handler.hset) as hset:
+        hcss.update(session)
+
+    reread = hcss.read(session_id)
+    assert (list(hset.call_args[1]['mapping']) == ['attribute:cart'] and
+            reread.get_attribute('cart') == 'spam' and
+            reread.attribute_keys == {'cart'})
+
+
+def test_hcss_update_writes_changed_header(hash_caching_session_store):
+    """
+    unit tested:  update
+
+    test case:
+    updating a session whose other fields changed writes its header, and
+    none of its attributes
+    """
+    hcss = hash_caching_session_store
+    session_id = create_cart_session(hcss)
+    session = hcss.read(session_id)
+    session.idle_timeout = datetime.timedelta(minutes=1)
+
+    with mock.patch.object(hcss.cache_handler, 'hset',
+                           wraps=hcss.cache_handler.hset) as hset:
+        hcss.update(session)
+
+    assert (list(hset.call_args[1]['mapping']) == ['~session'] and
+            hcss.read(session_id).idle_timeout ==
+            datetime.timedelta(minutes=1) and
+            hcss.read(session_id).get_attribute('color') == 'blue')
+
+
+def test_hcss_update_session_from_elsewhere(hash_caching_session_store):
+    """
+    unit tested:  update
+
+    test case:
+    a session that wasn't read from the store is written whole, leaving no
+    fields of attributes that it lacks
+    """
+    hcss = hash_caching_session_store
+    session_id = create_cart_session(hcss)
+    session = SimpleSession()
+    session.session_id = session_id
+    session.set_attribute('color', 'red')
+    hcss.update(session)
+
+    reread = hcss.read(session_id)
+    assert (reread.attribute_keys == {'color'} and
+            reread.get_attribute('color') == 'red')
+
+
+def test_hcss_raw_methods_raise(hash_caching_session_store):
+    """
+    unit tested:  read_raw, write_raw
+
+    test case:
+    hash entries can't be moved as raw payloads
+    """
+    hcss = hash_caching_session_store
+    with pytest.raises(SessionCacheException):
+        hcss.read_raw('sessionid123')
+    with pytest.raises(SessionCacheException):
+        hcss.write_raw('sessionid123', b'payload')
+
+
+def test_hcss_rejects_compact_session(hash_caching_session_store):
+    """
+    unit tested:  create, update
+
+    test case:
+    a CompactSession, which has no __dict__ to encode a header from, is
+    rejected with an exception that says so
+    """
+    hcss = hash_caching_session_store
+    session = CompactSession(host='127.0.0.1')
+    with pytest.raises(SessionCacheException) as create_info:
+        hcss.create(session)
+    session.session_id = 'sessionid123'
+    with pytest.raises(SessionCacheException) as update_info:
+        hcss.update(session)
+    assert ('CompactSession' in str(create_info.value) and
+            'CompactSession' in str(update_info.value) and
+            hcss.cache_handler.keys('*') == [])
+
+
+def test_hcss_with_session_manager(hash_caching_session_store,
+                                   default_native_session_manager):
+    """
+    unit tested:  HashCachingSessionStore, used by a session manager
+
+    test case:
+    setting an attribute through a session manager writes that attribute's
+    field alone
+    """
+    nsm = default_native_session_manager
+    nsm.cache_handler = hash_caching_session_store.cache_handler
+    nsm.session_handler.session_store = hash_caching_session_store
+    session = nsm.start(DefaultSessionContext())
+    session.set_attribute('cart', 'eggs')
+
+    cache_handler = hash_caching_session_store.cache_handler
+    with mock.patch.object(cache_handler, 'hset',
+                           wraps=cache_handler.hset) as hset:
+        session.set_attribute('color', 'blue')
+
+    assert (session.get_attribute('cart') == 'eggs' and
+            session.get_attribute('color') == 'blue' and
+            [list(call[1]['mapping']) for call in hset.call_args_list] ==
+            [['attribute:color']])
+
+
+# -----------------------------------------------------------------------------
+# SessionRevocationList Tests
+# -----------------------------------------------------------------------------
+
+
+def test_srl_revoke_in_memory():
+    """
+    unit tested:  revoke, is_revoked, refresh
+
+    test case:
+    revoked sessions are revoked until they would have expired, after which
+    refresh forgets them
+    """
+    srl = SessionRevocationList(capacity=100)
+    srl.clock = lambda: 1000.0
+    srl.revoke('abc', expiration=2000.0)
+    srl.revoke('def', expiration=500.0)  # already expired:  moot
+    first = (srl.is_revoked('abc'), srl.is_revoked('def'),
+             srl.is_revoked('ghi'))
+    srl.clock = lambda: 3000.0
+    assert (first == (True, False, False) and not srl.is_revoked('abc') and
+            srl.refresh() == 0 and len(srl) == 0)
+
+
+def test_srl_bloom_filter_in_memory():
+    """
+    unit tested:  is_revoked
+
+    test case:
+    in memory, sessions absent from the bloom filter are checked without
+    taking the lock
+    """
+    srl = SessionRevocationList(capacity=1000)
+    for i in range(500):
+        srl.revoke('revoked{0}'.format(i))
+
+    lock = srl._lock
+    srl._lock = mock.MagicMock(wraps=lock)
+    revoked = [srl.is_revoked('session{0}'.format(i)) for i in range(10000)]
+
+    # the expected rate of false positives is 0.001, at capacity:
+    assert (not any(revoked) and srl._lock.__enter__.call_count < 50 and
+            srl.is_revoked('revoked1'))
+
+
+def test_srl_cached_revocations_are_shared():
+    """
+    unit tested:  revoke, is_revoked
+
+    test case:
+    a revocation made by another process is seen once the filter is synced,
+    every refresh_interval
+    """
+    cache_handler = MemoryCacheHandler()
+    srl1, srl2 = SessionRevocationList(), SessionRevocationList()
+    srl1.cache_handler = srl2.cache_handler = cache_handler
+    srl1.clock = srl2.clock = lambda: 1000.0
+    before = srl2.is_revoked('abc')  # syncs
+    srl1.revoke('abc', expiration=5000.0)
+    unsynced = srl2.is_revoked('abc')
+    srl2.clock = lambda: 1061.0
+    assert (not before and not unsynced and srl1.is_revoked('abc') and
+            srl2.is_revoked('abc') and not srl2.is_revoked('def') and
+            len(srl2) == 1)
+
+
+def test_srl_cached_revocation_outlasts_domain_ttl():
+    """
+    unit tested:  is_revoked, refresh
+
+    test case:
+    a cached revocation remains in force past the time-to-live of its domain,
+    until the session would have expired, as syncs renew it
+    """
+    cache_handler = MemoryCacheHandler(absolute_ttl=60)
+    cache_handler.now = 1000.0
+    cache_handler.clock = lambda: cache_handler.now
+
+    revoker = SessionRevocationList(refresh_interval=30)
+    revoker.cache_handler = cache_handler
+    revoker.clock = cache_handler.clock
+    revoker.revoke('sid', expiration=2800.0)
+
+    checked = []
+    for now in range(1000, 2800, 30):
+        cache_handler.now = float(now)
+        revoker.is_revoked('other')  # syncs, when due
+        reader = SessionRevocationList()  # another process, just started
+        reader.cache_handler = cache_handler
+        reader.clock = cache_handler.clock
+        checked.append(reader.is_revoked('sid'))
+
+    cache_handler.now = 2801.0
+    reader = SessionRevocationList()
+    reader.cache_handler = cache_handler
+    reader.clock = cache_handler.clock
+    assert all(checked) and not reader.is_revoked('sid')
+
+
+def test_srl_bloom_filter_before_cache():
+    """
+    unit tested:  is_revoked
+
+    test case:
+    once synced, sessions absent from the bloom filter are checked without a
+    round trip to cache
+    """
+    cache_handler = MemoryCacheHandler()
+    srl = SessionRevocationList(capacity=1000)
+    srl.cache_handler = cache_handler
+    srl.revoke('revoked')
+    srl.refresh()
+
+    with mock.patch.object(cache_handler, 'get',
+                           wraps=cache_handler.get) as get:
+        revoked = [srl.is_revoked('session{0}'.format(i)) for i in range(1000)]
+    assert not any(revoked) and get.call_count < 10
+
+
+def test_srl_with_abstract_cache_handler():
+    """
+    unit tested:  revoke, is_revoked
+
+    test case:
+    revocations work with a cache handler that implements only the abstract
+    methods of CacheHandler
+    """
+    srl = SessionRevocationList()
+    srl.cache_handler = SerializingCacheHandler()
+    srl.revoke('abc')
+    assert srl.is_revoked('abc') and not srl.is_revoked('def')
+
+
+# -----------------------------------------------------------------------------
+# ClientSideSessionStore Tests
+# -----------------------------------------------------------------------------
+
+
+def test_csss_token_round_trip(client_side_session_store, simple_session):
+    """
+    unit tested:  create, issue_token, load_token, read
+
+    test case:
+    a session is recovered from its token alone, in another thread
+    """
+    csss = client_side_session_store
+    simple_session.set_attribute('cart', 'eggs')
+    session_id = csss.create(simple_session)
+    token = csss.issue_token(session_id)
+    csss.release(session_id)
+
+    result = {}
+
+    def handle_request():
+        loaded_id = csss.load_token(token)
+        result['session'] = csss.read(loaded_id)
+
+    thread = threading.Thread(target=handle_request)
+    thread.start()
+    thread.join()
+
+    with pytest.raises(UnknownSessionException):
+        csss.read(session_id)  # released by this thread
+    assert (result['session'] == simple_session and
+            result['session'].get_attribute('cart') == 'eggs' and
+            b'eggs' not in token)
+
+
+def test_csss_tampered_token(client_side_session_store, simple_session):
+    """
+    unit tested:  load_token
+
+    test case:
+    a token that was altered, or issued with an unknown key, is rejected
+    """
+    csss = client_side_session_store
+    token = csss.issue_token(csss.create(simple_session))
+    tampered = token[:-5] + (b'AAAAA' if token[-5:] != b'AAAAA' else b'BBBBB')
+    other = ClientSideSessionStore('VpSG4_dpNkgsWp2WdEzPNwRzcGiPbVaFgmLXUiXQMxE=')
+    for each in (tampered, other.issue_token(other.create(simple_session)),
+                 b'x' * 5000):
+        with pytest.raises(UnknownSessionException):
+            csss.load_token(each)
+
+
+def test_csss_key_rotation(client_side_session_store, simple_session):
+    """
+    unit tested:  load_token, issue_token
+
+    test case:
+    after a new key is added, tokens issued with the former key remain
+    readable and are reissued with the new key
+    """
+    old = ClientSideSessionStore('Shqpo3jfSvX-AOJYPgrPcVgvwcn7DnRy8U8d7D0B3Ls=')
+    token = old.issue_token(old.create(simple_session))
+
+    csss = client_side_session_store  # the new key comes first
+    session_id = csss.load_token(token)
+    csss.update(csss.read(session_id))
+    reissued = csss.issue_token(session_id)
+    with pytest.raises(UnknownSessionException):
+        old.load_token(reissued)
+
+
+def test_csss_size_limit(client_side_session_store, simple_session):
+    """
+    unit tested:  update
+
+    test case:
+    a change that outgrows the size limit raises, rather than issuing an
+    unusable token
+    """
+    csss = client_side_session_store
+    csss.max_token_size = 512
+    csss.create(simple_session)
+    simple_session.set_attribute('cart', 'eggs' * 200)
+    with pytest.raises(SessionTokenException):
+        csss.update(simple_session)
+
+
+def test_csss_delete_revokes(client_side_session_store, simple_session):
+    """
+    unit tested:  delete
+
+    test case:
+    once a session is deleted, its earlier tokens are rejected
+    """
+    csss = client_side_session_store
+    session_id = csss.create(simple_session)
+    token = csss.issue_token(session_id)
+    csss.delete(simple_session)
+    with pytest.raises(UnknownSessionException):
+        csss.load_token(token)
+    assert csss.issue_token(session_id) is None
+
+
+def test_csss_with_session_manager(client_side_session_store,
+                                   default_native_session_manager):
+    """
+    unit tested:  ClientSideSessionStore, used by a session manager
+
+    test case:
+    a session's changes are carried by its token from one request to the
+    next, and a stopped session's token is rejected
+    """
+    csss = client_side_session_store
+    nsm = default_native_session_manager
+    nsm.session_handler.session_store = csss
+
+    session = nsm.start(DefaultSessionContext())
+    session.set_attribute('cart', 'eggs')
+    token = csss.issue_token(session.session_id)
+    csss.release(session.session_id)
+
+    # the next request:
+    session_key = DefaultSessionKey(csss.load_token(token))
+    session = nsm.get_session(session_key)
+    cart = session.get_attribute('cart')
+    session.set_attribute('color', 'blue')
+    token = csss.issue_token(session.session_id)
+    nsm.stop(session_key, None)
+
+    with pytest.raises(UnknownSessionException):
+        csss.load_token(token)
+    assert cart == 'eggs'
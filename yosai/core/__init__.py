@@ -95,6 +95,7 @@ from .exceptions import (
     SessionDeleteException,
     SessionException,
     SessionEventException,
+    SessionTokenException,
     StoppedSessionException,
     SubjectException,
     UnauthenticatedException,
@@ -134,13 +135,43 @@ from yosai.core.logging.slogging import (
 )
 
 
+from yosai.core.serialize.registry import (
+    TypeRegistry,
+    serializable_type,
+    type_registry,
+)
+
+from yosai.core.serialize.serialize_settings import (
+    SerializationSettings,
+    serialization_settings,
+)
+
 from yosai.core.serialize.serialize import (
     CollectionDict,
     JSONSerializer,
+    LazyPayload,
+    MarshalSerializer,
     MSGPackSerializer,
+    NativeDateTime,
+    NativeTimeDelta,
+    PayloadCompressor,
+    PickleSerializer,
     SerializationManager,
 )
 
+from yosai.core.cache.cache import (
+    CacheStatistics,
+    CacheWarmer,
+    CacheWarmupReport,
+    ConsistentHashRing,
+    EarlyRefreshCacheHandler,
+    EarlyRefreshStamp,
+    InstrumentedCacheHandler,
+    LatencyHistogram,
+    MemoryCacheHandler,
+    ShardedCacheHandler,
+)
+
 from yosai.core.account.account import (
     Account,
 )
@@ -158,6 +189,7 @@ from yosai.core.concurrency.concurrency import (
 
 
 from yosai.core.utils.utils import (
+    BloomFilter,
     OrderedSet,
     memoized_property,
     unix_epoch_time,
@@ -191,23 +223,35 @@ from yosai.core.subject.identifier import (
 from yosai.core.session.session import (
     AbstractSessionStore,
     SessionEventHandler,
+    CachedAttributes,
     CachingSessionStore,
+    ClientSideSessionStore,
+    CompactSession,
+    CompactSessionFactory,
     DefaultSessionContext,
     DefaultSessionKey,
     DefaultNativeSessionManager,
     DelegatingSession,
     DefaultSessionStorageEvaluator,
-    # ExecutorServiceSessionValidationScheduler,
+    ExecutorServiceSessionValidationScheduler,
+    HashCachingSessionStore,
     MemorySessionStore,
     ProxiedSession,
     # SessionTokenGenerator,
     # ScheduledSessionValidator,
     DefaultNativeSessionHandler,
+    SessionExpirationIndex,
+    SessionRevocation,
+    SessionRevocationList,
     SimpleSession,
     SimpleSessionFactory,
 )
 
 
+# the asyncio counterparts, yosai.core.cache.aio and yosai.core.session.aio,
+# require python 3.5 and so are imported by those who use them
+
+
 thread_local = threading.local()  # use only one global instance
 
 from yosai.core.subject.subject import(
@@ -271,6 +315,9 @@ from yosai.core.realm.realm import (
     AccountStoreRealm,
 )
 
+# codecs register themselves with the SerializationManager upon import:
+from yosai.core.serialize import codecs as serialize_codecs
+
 
 from yosai.core.mgt.mgt_settings import(
     DefaultMGTSettings,
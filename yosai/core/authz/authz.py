@@ -255,7 +255,7 @@ class WildcardPermission(serialize_abcs.Serializable):
                 target = fields.List(fields.Str, allow_none=True)
 
         class SerializationSchema(Schema):
-            parts = fields.Nested(WildcardPartsSchema)
+            parts = fields.Nested(WildcardPartsSchema, allow_none=True)
 
             @post_load
             def make_wildcard_permission(self, data):
@@ -265,16 +265,18 @@ class WildcardPermission(serialize_abcs.Serializable):
 
                 # have to convert to set from post_load due to the
                 # WildcardPartsSchema
-                for key, val in instance.parts.items():
-                    instance.parts[key] = frozenset(val)
+                for key, val in (instance.parts or {}).items():
+                    if val is not None:
+                        instance.parts[key] = frozenset(val)
                 return instance
 
             # prior to serializing, convert a dict of sets to a dict of lists
             # because sets cannot be serialized
             @post_dump
             def convert_sets(self, data):
-                for attribute, value in data['parts'].items():
-                    data['parts'][attribute] = list(value)
+                for attribute, value in (data.get('parts') or {}).items():
+                    if value is not None:
+                        data['parts'][attribute] = list(value)
                 return data
 
         return SerializationSchema
@@ -517,7 +519,7 @@ class DefaultPermission(WildcardPermission):
                 target = fields.List(fields.Str, allow_none=True)
 
         class SerializationSchema(Schema):
-            parts = fields.Nested(PermissionPartsSchema)
+            parts = fields.Nested(PermissionPartsSchema, allow_none=True)
 
             @post_load
             def make_default_permission(self, data):
@@ -527,16 +529,18 @@ class DefaultPermission(WildcardPermission):
 
                 # have to convert to set from post_load due to the
                 # WildcardPartsSchema
-                for key, val in instance.parts.items():
-                    instance.parts[key] = frozenset(val)
+                for key, val in (instance.parts or {}).items():
+                    if val is not None:
+                        instance.parts[key] = frozenset(val)
                 return instance
 
             # prior to serializing, convert a dict of sets to a dict of lists
             # because sets cannot be serialized
             @post_dump
             def convert_sets(self, data):
-                for attribute, value in data['parts'].items():
-                    data['parts'][attribute] = list(value)
+                for attribute, value in (data.get('parts') or {}).items():
+                    if value is not None:
+                        data['parts'][attribute] = list(value)
                 return data
 
         return SerializationSchema
@@ -1064,7 +1068,7 @@ class IndexedAuthorizationInfo(authz_abcs.AuthorizationInfo,
             raise PermissionIndexingException(msg)
 
     def __len__(self):
-        return len(self.permissions) + len(self.roles)
+        return len(self.permissions) + len(self.roles or ())
 
     def __repr__(self):
         perms = ','.join(str(perm) for perm in self.permissions)
@@ -1075,17 +1079,18 @@ class IndexedAuthorizationInfo(authz_abcs.AuthorizationInfo,
     def serialization_schema(cls):
 
         class SerializationSchema(Schema):
-            _roles = fields.Nested(SimpleRole.serialization_schema(), many=True,
+            _roles = fields.Nested(SimpleRole.schema_class(), many=True,
                                    allow_none=True)
             _permissions = CollectionDict(fields.Nested(
-                DefaultPermission.serialization_schema()), allow_none=True)
+                DefaultPermission.schema_class()), allow_none=True)
 
             @post_load
             def make_authz_info(self, data):
                 mycls = IndexedAuthorizationInfo
                 instance = mycls.__new__(mycls)
                 instance.__dict__.update(data)
-                instance._roles = set(instance._roles)
+                if instance._roles is not None:
+                    instance._roles = set(instance._roles)
                 return instance
 
         return SerializationSchema
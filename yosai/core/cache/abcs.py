@@ -19,6 +19,8 @@ under the License.
 
 from abc import ABCMeta, abstractmethod
 
+from yosai.core.exceptions import CacheException
+
 
 class CacheHandlerAware(metaclass=ABCMeta):
 
@@ -48,3 +50,81 @@ class CacheHandler(metaclass=ABCMeta):
     @abstractmethod
     def delete(self, key, identifier):
         pass
+
+    def get_raw(self, domain, identifier):
+        """
+        Obtains a cache entry as the serialized bytes that are stored, without
+        de-serializing it.  Cache handlers that store serialized payloads
+        should override this default, which re-serializes the de-serialized
+        entry using the handler's serialization_manager.
+
+        :returns: bytes, or None when there is no entry
+        """
+        value = self.get(domain=domain, identifier=identifier)
+        if value is None:
+            return None
+        return self.serialization_manager.serialize(value)
+
+    def set_raw(self, domain, identifier, payload):
+        """
+        Caches an already-serialized payload, as produced by a
+        SerializationManager, without serializing it again.  Cache handlers
+        that store serialized payloads should override this default, which
+        de-serializes the payload using the handler's serialization_manager.
+
+        :type payload: bytes
+        """
+        value = self.serialization_manager.deserialize(payload)
+        self.set(domain=domain, identifier=identifier, value=value)
+
+    def delete_many(self, domain, identifiers):
+        """
+        Deletes several entries of a domain at once.  Cache handlers whose
+        backend deletes many keys in a single request (such as redis' DEL)
+        should override this default, which deletes each entry in turn.
+
+        :param identifiers: the identifiers of the entries to delete
+        """
+        for identifier in identifiers:
+            self.delete(domain=domain, identifier=identifier)
+
+    # hash entries:  a cache entry of named fields, each holding bytes, that
+    # are read and written individually (as with a redis hash).  Cache
+    # handlers whose backend supports hashes override these defaults.
+
+    def hget(self, domain, identifier, field):
+        """
+        :returns: the bytes of a field of a hash entry, or None when either
+                  the entry or the field doesn't exist
+        """
+        self._unsupported_hash_operation('hget')
+
+    def hgetall(self, domain, identifier):
+        """
+        :returns: a dict of the fields of a hash entry, empty when the entry
+                  doesn't exist
+        """
+        self._unsupported_hash_operation('hgetall')
+
+    def hset(self, domain, identifier, mapping):
+        """
+        Sets fields of a hash entry, creating the entry when it doesn't exist,
+        and renews the entry's time-to-live.
+
+        :param mapping: the bytes of each field to set, keyed by field name
+        :type mapping: dict
+        """
+        self._unsupported_hash_operation('hset')
+
+    def hdel(self, domain, identifier, fields):
+        """
+        Removes fields from a hash entry.
+
+        :param fields: the names of the fields to remove
+        """
+        self._unsupported_hash_operation('hdel')
+
+    def _unsupported_hash_operation(self, operation):
+        msg = '{0} does not support hash entries ({1})'.format(
+            self.__class__.__name__, operation)
+        raise CacheException(msg)
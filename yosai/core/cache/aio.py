@@ -0,0 +1,199 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+asyncio counterparts of the CacheHandler interface, for use under an event
+loop (such as by an ASGI application), where a blocking round trip to the
+cache would stall every other request.  They require python 3.5 or later,
+so yosai.core doesn't import them:
+
+    from yosai.core.cache.aio import ExecutorCacheHandler
+
+An AsyncCacheHandler offers the methods of a CacheHandler, as coroutines.
+An ExecutorCacheHandler adapts a synchronous CacheHandler by calling it from
+an executor, and an AsyncMemoryCacheHandler keeps entries within process
+memory, for tests and benchmarks.
+"""
+
+import asyncio
+import functools
+from abc import ABCMeta, abstractmethod
+
+from yosai.core import (
+    CacheException,
+    MemoryCacheHandler,
+)
+
+
+class AsyncCacheHandler(metaclass=ABCMeta):
+
+    @abstractmethod
+    async def get(self, domain, identifier):
+        pass
+
+    @abstractmethod
+    async def get_or_create(self, domain, identifier, creator_func, creator):
+        pass
+
+    @abstractmethod
+    async def set(self, domain, identifier, value):
+        pass
+
+    @abstractmethod
+    async def delete(self, domain, identifier):
+        pass
+
+    async def delete_many(self, domain, identifiers):
+        """
+        Deletes several entries of a domain at once.  This default deletes
+        each entry in turn.
+        """
+        for identifier in identifiers:
+            await self.delete(domain=domain, identifier=identifier)
+
+    async def get_raw(self, domain, identifier):
+        """
+        :returns: bytes, or None when there is no entry
+        """
+        value = await self.get(domain=domain, identifier=identifier)
+        if value is None:
+            return None
+        return self.serialization_manager.serialize(value)
+
+    async def set_raw(self, domain, identifier, payload):
+        value = self.serialization_manager.deserialize(payload)
+        await self.set(domain=domain, identifier=identifier, value=value)
+
+    # hash entries (see CacheHandler):
+
+    async def hget(self, domain, identifier, field):
+        self._unsupported_hash_operation('hget')
+
+    async def hgetall(self, domain, identifier):
+        self._unsupported_hash_operation('hgetall')
+
+    async def hset(self, domain, identifier, mapping):
+        self._unsupported_hash_operation('hset')
+
+    async def hdel(self, domain, identifier, fields):
+        self._unsupported_hash_operation('hdel')
+
+    def _unsupported_hash_operation(self, operation):
+        msg = '{0} does not support hash entries ({1})'.format(
+            self.__class__.__name__, operation)
+        raise CacheException(msg)
+
+
+class ExecutorCacheHandler(AsyncCacheHandler):
+    """
+    An ExecutorCacheHandler adapts a synchronous CacheHandler, such as a
+    DPCacheHandler, to the AsyncCacheHandler interface by calling it from an
+    executor, so that its round trips don't block the event loop:
+
+        cache_handler = ExecutorCacheHandler(DPCacheHandler())
+
+    Anything other than the cache operations, such as the
+    serialization_manager, passes through to the wrapped handler.
+    """
+
+    def __init__(self, cache_handler, executor=None):
+        """
+        :param cache_handler: the synchronous CacheHandler to adapt
+        :param executor: a concurrent.futures.Executor, or None for the event
+                         loop's default executor
+        """
+        self.cache_handler = cache_handler
+        self.executor = executor
+
+    async def _call(self, operation, **kwargs):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self.executor,
+            functools.partial(getattr(self.cache_handler, operation),
+                              **kwargs))
+
+    async def get(self, domain, identifier):
+        return await self._call('get', domain=domain, identifier=identifier)
+
+    async def get_or_create(self, domain, identifier, creator_func, creator):
+        # creator_func is synchronous, so it is called from the executor too
+        return await self._call('get_or_create', domain=domain,
+                                identifier=identifier,
+                                creator_func=creator_func, creator=creator)
+
+    async def set(self, domain, identifier, value):
+        return await self._call('set', domain=domain, identifier=identifier,
+                                value=value)
+
+    async def delete(self, domain, identifier):
+        return await self._call('delete', domain=domain,
+                                identifier=identifier)
+
+    async def delete_many(self, domain, identifiers):
+        return await self._call('delete_many', domain=domain,
+                                identifiers=list(identifiers))
+
+    async def get_raw(self, domain, identifier):
+        return await self._call('get_raw', domain=domain,
+                                identifier=identifier)
+
+    async def set_raw(self, domain, identifier, payload):
+        return await self._call('set_raw', domain=domain,
+                                identifier=identifier, payload=payload)
+
+    async def hget(self, domain, identifier, field):
+        return await self._call('hget', domain=domain, identifier=identifier,
+                                field=field)
+
+    async def hgetall(self, domain, identifier):
+        return await self._call('hgetall', domain=domain,
+                                identifier=identifier)
+
+    async def hset(self, domain, identifier, mapping):
+        return await self._call('hset', domain=domain, identifier=identifier,
+                                mapping=mapping)
+
+    async def hdel(self, domain, identifier, fields):
+        return await self._call('hdel', domain=domain, identifier=identifier,
+                                fields=fields)
+
+    async def keys(self, pattern):
+        return await self._call('keys', pattern=pattern)
+
+    def __getattr__(self, name):
+        if name == 'cache_handler':
+            raise AttributeError(name)
+        return getattr(self.cache_handler, name)
+
+    def __repr__(self):
+        return "{0}({1})".format(self.__class__.__name__, self.cache_handler)
+
+
+class AsyncMemoryCacheHandler(ExecutorCacheHandler):
+    """
+    An AsyncMemoryCacheHandler keeps cache entries within process memory,
+    using a MemoryCacheHandler, for tests and benchmarks.  Its operations
+    never block, so they are called directly rather than from an executor.
+    """
+
+    def __init__(self, ttl=None, absolute_ttl=60, serialization_manager=None):
+        super().__init__(MemoryCacheHandler(
+            ttl=ttl, absolute_ttl=absolute_ttl,
+            serialization_manager=serialization_manager))
+
+    async def _call(self, operation, **kwargs):
+        return getattr(self.cache_handler, operation)(**kwargs)
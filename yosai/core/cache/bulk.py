@@ -0,0 +1,238 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+Bulk export and import of cache entries, for migrations and backups.
+
+An export file begins with a header (a magic string and a version byte),
+followed by one record per cache entry:  a four-byte, big-endian length and
+then a msgpack-encoded [domain, identifier, payload] triple.  Payloads are the
+serialized bytes that the cache stores, moved with get_raw and set_raw, so
+entries are never de-serialized.  The payload of a hash entry (see
+CacheHandler.hset) is a map of its fields' bytes, moved with hgetall and hset.
+Records are read and written one at a time, so memory use doesn't grow with
+the number of entries.  Version 1 exports, which predate hash entries, remain
+readable.
+
+Exporting requires a CacheHandler that supports key iteration (a keys method
+that accepts a glob-style pattern).  From the command line:
+
+    python -m yosai.core.cache.bulk export backup.ysb \\
+        --cache-handler yosai_dpcache.cache:DPCacheHandler
+    python -m yosai.core.cache.bulk import backup.ysb \\
+        --cache-handler yosai_dpcache.cache:DPCacheHandler
+"""
+
+import argparse
+import collections
+import importlib
+import struct
+import sys
+
+import msgpack
+
+from yosai.core import (
+    CacheException,
+    MisconfiguredException,
+    SerializationException,
+    SerializationManager,
+)
+
+header = b'YOSAI-BULK\x02'
+legacy_headers = (b'YOSAI-BULK\x01',)
+record_length = struct.Struct('>I')
+
+default_domains = ('session', 'identifier_sessions', 'authz_info')
+
+
+def generate_identifiers(cache_handler, domain):
+    """
+    Yields the identifier of each key of a domain of the cache, hash entries
+    included.
+
+    :returns: a generator of identifiers
+    """
+    # keys are parsed using the handler's own key scheme:
+    prefix, _, suffix = cache_handler.generate_key('\x00', domain).\
+        partition('\x00')
+    pattern = cache_handler.generate_key('*', domain)
+
+    for key in cache_handler.keys(pattern):
+        if isinstance(key, bytes):
+            key = key.decode('utf-8')
+        yield key[len(prefix):len(key) - len(suffix)]
+
+
+def generate_records(cache_handler, domains=default_domains):
+    """
+    Yields the entries of each domain of the cache, in turn, hash entries
+    included.  Entries that expire before they are read are skipped.
+
+    :returns: a generator of (domain, identifier, payload) tuples, whose
+              payload is bytes or, for a hash entry, a dict of bytes
+    """
+    for domain in domains:
+        # a key may be listed twice, when both kinds of entry share it:
+        identifiers = collections.OrderedDict.fromkeys(
+            generate_identifiers(cache_handler, domain))
+        for identifier in identifiers:
+            payload = cache_handler.get_raw(domain=domain,
+                                            identifier=identifier)
+            if payload is not None:
+                yield (domain, identifier, payload)
+
+            try:
+                mapping = cache_handler.hgetall(domain=domain,
+                                                identifier=identifier)
+            except CacheException:  # the handler doesn't support hashes
+                continue
+            if mapping:
+                yield (domain, identifier, mapping)
+
+
+def write_records(stream, records):
+    """
+    :param stream: a writable, binary file-like object
+    :param records: an iterable of (domain, identifier, payload) tuples
+    :returns: the number of records written
+    """
+    stream.write(header)
+    count = 0
+    for domain, identifier, payload in records:
+        if isinstance(payload, dict):
+            payload = {field: bytes(value) for field, value in payload.items()}
+        else:
+            payload = bytes(payload)
+        record = msgpack.packb([domain, identifier, payload],
+                               use_bin_type=True)
+        stream.write(record_length.pack(len(record)))
+        stream.write(record)
+        count += 1
+    return count
+
+
+def read_records(stream):
+    """
+    :param stream: a readable, binary file-like object
+    :returns: a generator of (domain, identifier, payload) tuples
+    :raises SerializationException: when the stream isn't a complete export
+    """
+    if stream.read(len(header)) not in (header,) + legacy_headers:
+        msg = 'Not a yosai bulk export, or of an unsupported version'
+        raise SerializationException(msg)
+
+    while True:
+        prefix = stream.read(record_length.size)
+        if not prefix:
+            return
+
+        record = b''
+        if len(prefix) == record_length.size:
+            length = record_length.unpack(prefix)[0]
+            record = stream.read(length)
+
+        if len(prefix) < record_length.size or len(record) < length:
+            msg = 'A yosai bulk export ended in the middle of a record'
+            raise SerializationException(msg)
+
+        domain, identifier, payload = msgpack.unpackb(record, raw=False)
+        yield (domain, identifier, payload)
+
+
+def export_cache(cache_handler, stream, domains=default_domains):
+    """
+    :returns: the number of entries exported
+    """
+    return write_records(stream, generate_records(cache_handler, domains))
+
+
+def import_cache(cache_handler, stream, domains=None):
+    """
+    Caches the entries of an export, using the time-to-live of their domain.
+    Hash entries are merged into any that the cache handler already keeps.
+
+    :param domains: the domains to import, or None for all of them
+    :returns: the number of entries imported
+    """
+    count = 0
+    for domain, identifier, payload in read_records(stream):
+        if domains is None or domain in domains:
+            if isinstance(payload, dict):
+                cache_handler.hset(domain=domain, identifier=identifier,
+                                   mapping=payload)
+            else:
+                cache_handler.set_raw(domain=domain, identifier=identifier,
+                                      payload=payload)
+            count += 1
+    return count
+
+
+def create_cache_handler(path):
+    """
+    :param path: the import path of a CacheHandler class (or factory), as
+                 'package.module:Class', that can be called without arguments
+    """
+    try:
+        module_name, _, attribute = path.partition(':')
+        factory = getattr(importlib.import_module(module_name), attribute)
+    except (AttributeError, ImportError, ValueError):
+        msg = 'Could not import the cache handler: {0}'.format(path)
+        raise MisconfiguredException(msg)
+
+    cache_handler = factory()
+    if getattr(cache_handler, 'serialization_manager', None) is None:
+        cache_handler.serialization_manager = SerializationManager()
+    return cache_handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m yosai.core.cache.bulk',
+        description='Exports cache entries to, or imports them from, a file.')
+    parser.add_argument('command', choices=['export', 'import'])
+    parser.add_argument('path', help="the export file, or '-' for stdout/stdin")
+    parser.add_argument('--cache-handler', required=True,
+                        help="the CacheHandler's import path, "
+                             "as 'package.module:Class'")
+    parser.add_argument('--domain', action='append', dest='domains',
+                        help='a cache domain to transfer (default: session, '
+                             'identifier_sessions and authz_info on export, '
+                             'all on import)')
+    args = parser.parse_args(argv)
+
+    cache_handler = create_cache_handler(args.cache_handler)
+
+    if args.command == 'export':
+        domains = args.domains or default_domains
+        if args.path == '-':
+            count = export_cache(cache_handler, sys.stdout.buffer, domains)
+        else:
+            with open(args.path, 'wb') as stream:
+                count = export_cache(cache_handler, stream, domains)
+    else:
+        if args.path == '-':
+            count = import_cache(cache_handler, sys.stdin.buffer, args.domains)
+        else:
+            with open(args.path, 'rb') as stream:
+                count = import_cache(cache_handler, stream, args.domains)
+
+    print('{0}ed {1} entries'.format(args.command, count), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -16,3 +16,1225 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+import bisect
+import collections
+import concurrent.futures
+import fnmatch
+import hashlib
+import logging
+import math
+import random
+import threading
+import time
+
+from marshmallow import Schema, fields, post_load
+
+from yosai.core import (
+    CacheException,
+    InvalidArgumentException,
+    SerializationManager,
+    cache_abcs,
+    serialize_abcs,
+)
+
+logger = logging.getLogger(__name__)
+
+clock = time.perf_counter
+
+
+class MemoryCacheHandler(cache_abcs.CacheHandler):
+    """
+    A MemoryCacheHandler keeps cache entries within process memory, serialized
+    in the same way as entries kept by a remote cache backend and expiring in
+    accordance with the time-to-live of their domain.  It is a stand-in for a
+    cache server when developing and testing, or for single-process
+    deployments.
+
+    Entries are stored as serialized bytes, so get_raw and set_raw move
+    payloads in and out of cache without any (de)serialization.  Hash entries
+    (see hget and hset) are kept apart from other entries, as a dict of bytes.
+    """
+
+    def __init__(self, ttl=None, absolute_ttl=60, serialization_manager=None):
+        """
+        :param ttl: time-to-live, in seconds, keyed by domain
+        :type ttl: dict
+        :param absolute_ttl: the time-to-live of domains absent from ttl
+        :type serialization_manager: SerializationManager
+        """
+        self.ttl = ttl or {}
+        self.absolute_ttl = absolute_ttl
+        self.serialization_manager = (serialization_manager or
+                                      SerializationManager())
+        self.clock = time.monotonic
+        self.store = {}  # key: (expiry, payload)
+        self.hashes = {}  # key: (expiry, {field: payload})
+        self._creation_locks = {}  # key: [lock, the number of its callers]
+        self._creation_locks_lock = threading.Lock()
+
+    def get_ttl(self, domain):
+        return self.ttl.get(domain, self.absolute_ttl)
+
+    def generate_key(self, identifier, domain):
+        return "yosai:{0}:{1}".format(identifier, domain)
+
+    def get_raw(self, domain, identifier):
+        if identifier is None:
+            return None
+
+        key = self.generate_key(identifier, domain)
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+
+        expiry, payload = entry
+        if expiry <= self.clock():
+            if self.store.get(key) is entry:
+                self.store.pop(key, None)
+            return None
+        return payload
+
+    def set_raw(self, domain, identifier, payload):
+        if payload is None:
+            return
+        key = self.generate_key(identifier, domain)
+        self.store[key] = (self.clock() + self.get_ttl(domain), payload)
+
+    def get(self, domain, identifier):
+        payload = self.get_raw(domain=domain, identifier=identifier)
+        if payload is None:
+            return None
+        return self.serialization_manager.deserialize(payload)
+
+    def get_or_create(self, domain, identifier, creator_func, creator):
+        """
+        Concurrent callers that miss on the same entry wait for the first of
+        them to create it rather than each calling creator_func.
+        """
+        if identifier is None:
+            return None
+
+        value = self.get(domain=domain, identifier=identifier)
+        if value is not None:
+            return value
+
+        key = self.generate_key(identifier, domain)
+        # a lock is shared by the callers of its key and discarded once the
+        # last of them is done, so that every caller waits on the same lock:
+        with self._creation_locks_lock:
+            entry = self._creation_locks.get(key)
+            if entry is None:
+                entry = self._creation_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+        try:
+            with entry[0]:
+                value = self.get(domain=domain, identifier=identifier)
+                if value is None:
+                    value = creator_func(creator)
+                    self.set(domain=domain, identifier=identifier, value=value)
+        finally:
+            with self._creation_locks_lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._creation_locks[key]
+        return value
+
+    def set(self, domain, identifier, value):
+        if value is None:
+            return
+        payload = self.serialization_manager.serialize(value)
+        self.set_raw(domain=domain, identifier=identifier, payload=payload)
+
+    def delete(self, domain, identifier):
+        if identifier is None:
+            return
+        key = self.generate_key(identifier, domain)
+        self.store.pop(key, None)
+        self.hashes.pop(key, None)
+
+    def _get_hash(self, domain, identifier):
+        """
+        :returns: the fields of an unexpired hash entry, or None
+        """
+        if identifier is None:
+            return None
+
+        key = self.generate_key(identifier, domain)
+        entry = self.hashes.get(key)
+        if entry is None:
+            return None
+
+        expiry, fields = entry
+        if expiry <= self.clock():
+            if self.hashes.get(key) is entry:
+                self.hashes.pop(key, None)
+            return None
+        return fields
+
+    def hget(self, domain, identifier, field):
+        fields = self._get_hash(domain, identifier)
+        if fields is None:
+            return None
+        return fields.get(field)
+
+    def hgetall(self, domain, identifier):
+        return dict(self._get_hash(domain, identifier) or {})
+
+    def hset(self, domain, identifier, mapping):
+        if not mapping:
+            return
+        fields = self._get_hash(domain, identifier) or {}
+        fields.update(mapping)
+        key = self.generate_key(identifier, domain)
+        self.hashes[key] = (self.clock() + self.get_ttl(domain), fields)
+
+    def hdel(self, domain, identifier, fields):
+        existing = self._get_hash(domain, identifier)
+        if existing is None:
+            return
+        for field in fields:
+            existing.pop(field, None)
+        if not existing:
+            self.hashes.pop(self.generate_key(identifier, domain), None)
+
+    def keys(self, pattern):
+        """
+        :param pattern: a glob-style pattern, such as 'yosai:*:session'
+        :returns: a list of the keys of unexpired entries, hash entries
+                  included, that match pattern
+        """
+        now = self.clock()
+        keys = []
+        for entries in (self.store, self.hashes):
+            keys.extend(key for key in fnmatch.filter(list(entries), pattern)
+                        if entries.get(key, (0, None))[0] > now)
+        return keys
+
+    def clear(self):
+        self.store.clear()
+        self.hashes.clear()
+
+    def __repr__(self):
+        return "MemoryCacheHandler({0} entries)".format(len(self.store) +
+                                                        len(self.hashes))
+
+
+class LatencyHistogram:
+    """
+    A histogram of operation latencies, bucketed by powers of two and measured
+    in microseconds:  bucket 0 counts operations that took less than one
+    microsecond and bucket N counts those that took [2**(N-1), 2**N)
+    microseconds.  The final bucket absorbs everything slower.
+    """
+
+    bucket_count = 24
+
+    __slots__ = ('total', 'buckets')
+
+    def __init__(self):
+        self.total = 0.0
+        self.buckets = [0] * self.bucket_count
+
+    def record(self, elapsed, frexp=math.frexp):
+        """
+        :param elapsed: the duration of an operation, in seconds
+        :type elapsed: float
+        """
+        # frexp's exponent is the bit length of the microsecond count:
+        bucket = frexp(elapsed * 1000000)[1]
+        if bucket < 0:
+            bucket = 0
+        elif bucket > 23:
+            bucket = 23
+        self.buckets[bucket] += 1
+        self.total += elapsed
+
+    @property
+    def count(self):
+        return sum(self.buckets)
+
+    def snapshot(self):
+        count = self.count
+        return {'count': count,
+                'total_seconds': self.total,
+                'mean_seconds': self.total / count if count else None,
+                'buckets': list(self.buckets)}
+
+
+class CacheStatistics:
+    """
+    CacheStatistics accumulates the activity recorded for a single cache
+    domain (such as 'credentials', 'authz_info' or 'session'), including a
+    LatencyHistogram for each cache operation.
+
+    Counters are updated without locking so as to keep the cost of recording
+    an operation well under a microsecond.  Under heavy thread contention,
+    counts are therefore approximate.
+    """
+
+    operations = ('get', 'get_or_create', 'set', 'delete')
+
+    __slots__ = ('hits', 'misses', 'loads', 'evictions', 'sets',
+                 'get_latency', 'get_or_create_latency', 'set_latency',
+                 'delete_latency')
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.evictions = 0
+        self.sets = 0
+        self.get_latency = LatencyHistogram()
+        self.get_or_create_latency = LatencyHistogram()
+        self.set_latency = LatencyHistogram()
+        self.delete_latency = LatencyHistogram()
+
+    def latency(self, operation):
+        """
+        :returns: the LatencyHistogram of the named operation
+        """
+        return getattr(self, operation + '_latency')
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        if not lookups:
+            return None
+        return self.hits / lookups
+
+    def snapshot(self):
+        """
+        :returns: a dict copy of the statistics, suitable for exporting
+        """
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'sets': self.sets,
+                'hit_ratio': self.hit_ratio,
+                'latency': {op: self.latency(op).snapshot()
+                            for op in self.operations}}
+
+    def __repr__(self):
+        return ("CacheStatistics(hits={0}, misses={1}, loads={2}, "
+                "evictions={3}, sets={4})".format(self.hits, self.misses,
+                                                  self.loads, self.evictions,
+                                                  self.sets))
+
+
+class InstrumentedCacheHandler(cache_abcs.CacheHandler):
+    """
+    An InstrumentedCacheHandler wraps any other CacheHandler, recording the
+    hits, misses, loads, evictions and latency of every cache operation,
+    per domain.  It is transparent to its callers:  configure it wherever a
+    CacheHandler is expected (such as the NativeSecurityManager) and it
+    will proxy all cache communication to the handler that it wraps.
+
+        cache_handler = InstrumentedCacheHandler(DPCacheHandler())
+        security_manager.cache_handler = cache_handler
+        ...
+        cache_handler.snapshot()['authz_info']['hit_ratio']
+
+    Definitions
+    -----------
+    - hit:  a get or get_or_create that was satisfied from cache
+    - miss:  a get that returned None or a get_or_create that had to call
+             its creator_func
+    - load:  a call to a creator_func, made by the wrapped cache handler
+    - eviction:  an explicit removal of a cache entry (delete)
+
+    Entries that expire within the cache backend are not observable from
+    here and so are not counted as evictions.
+    """
+
+    def __init__(self, cache_handler, enabled=True):
+        """
+        :type cache_handler: cache_abcs.CacheHandler
+        :param enabled: when False, operations are passed through unrecorded
+        """
+        self.cache_handler = cache_handler
+        self.enabled = enabled
+        self.statistics = {}
+
+    def get_statistics(self, domain):
+        """
+        :returns: the CacheStatistics for domain, creating it when needed
+        """
+        stats = self.statistics.get(domain)
+        if stats is None:
+            stats = self.statistics.setdefault(domain, CacheStatistics())
+        return stats
+
+    def get(self, domain, identifier):
+        if not self.enabled:
+            return self.cache_handler.get(domain=domain, identifier=identifier)
+
+        start = clock()
+        try:
+            value = self.cache_handler.get(domain=domain, identifier=identifier)
+        finally:
+            stats = (self.statistics.get(domain) or
+                     self.get_statistics(domain))
+            stats.get_latency.record(clock() - start)
+
+        if value is None:
+            stats.misses += 1
+        else:
+            stats.hits += 1
+        return value
+
+    def get_or_create(self, domain, identifier, creator_func, creator):
+        if not self.enabled:
+            return self.cache_handler.get_or_create(domain=domain,
+                                                    identifier=identifier,
+                                                    creator_func=creator_func,
+                                                    creator=creator)
+        stats = (self.statistics.get(domain) or
+                 self.get_statistics(domain))
+        loaded = False
+
+        def counting_creator_func(creator):
+            nonlocal loaded
+            loaded = True
+            stats.loads += 1
+            return creator_func(creator)
+
+        start = clock()
+        try:
+            value = self.cache_handler.get_or_create(
+                domain=domain,
+                identifier=identifier,
+                creator_func=counting_creator_func,
+                creator=creator)
+        finally:
+            stats.get_or_create_latency.record(clock() - start)
+
+        if loaded:
+            stats.misses += 1
+        else:
+            stats.hits += 1
+        return value
+
+    def set(self, domain, identifier, value):
+        if not self.enabled:
+            return self.cache_handler.set(domain=domain,
+                                          identifier=identifier,
+                                          value=value)
+        start = clock()
+        try:
+            return self.cache_handler.set(domain=domain,
+                                          identifier=identifier,
+                                          value=value)
+        finally:
+            stats = (self.statistics.get(domain) or
+                     self.get_statistics(domain))
+            stats.set_latency.record(clock() - start)
+            stats.sets += 1
+
+    def delete(self, domain, identifier):
+        if not self.enabled:
+            return self.cache_handler.delete(domain=domain,
+                                             identifier=identifier)
+        start = clock()
+        try:
+            return self.cache_handler.delete(domain=domain,
+                                             identifier=identifier)
+        finally:
+            stats = (self.statistics.get(domain) or
+                     self.get_statistics(domain))
+            stats.delete_latency.record(clock() - start)
+            stats.evictions += 1
+
+    def delete_many(self, domain, identifiers):
+        identifiers = list(identifiers)
+        if not self.enabled:
+            return self.cache_handler.delete_many(domain=domain,
+                                                  identifiers=identifiers)
+        start = clock()
+        try:
+            return self.cache_handler.delete_many(domain=domain,
+                                                  identifiers=identifiers)
+        finally:
+            stats = (self.statistics.get(domain) or
+                     self.get_statistics(domain))
+            stats.delete_latency.record(clock() - start)
+            stats.evictions += len(identifiers)
+
+    def get_raw(self, domain, identifier):
+        if not self.enabled:
+            return self.cache_handler.get_raw(domain=domain,
+                                              identifier=identifier)
+        start = clock()
+        try:
+            payload = self.cache_handler.get_raw(domain=domain,
+                                                 identifier=identifier)
+        finally:
+            stats = (self.statistics.get(domain) or
+                     self.get_statistics(domain))
+            stats.get_latency.record(clock() - start)
+
+        if payload is None:
+            stats.misses += 1
+        else:
+            stats.hits += 1
+        return payload
+
+    def set_raw(self, domain, identifier, payload):
+        if not self.enabled:
+            return self.cache_handler.set_raw(domain=domain,
+                                              identifier=identifier,
+                                              payload=payload)
+        start = clock()
+        try:
+            return self.cache_handler.set_raw(domain=domain,
+                                              identifier=identifier,
+                                              payload=payload)
+        finally:
+            stats = (self.statistics.get(domain) or
+                     self.get_statistics(domain))
+            stats.set_latency.record(clock() - start)
+            stats.sets += 1
+
+    # hash operations are recorded as the gets, sets and deletes of entries:
+
+    def hget(self, domain, identifier, field):
+        if not self.enabled:
+            return self.cache_handler.hget(domain=domain,
+                                           identifier=identifier,
+                                           field=field)
+        start = clock()
+        try:
+            payload = self.cache_handler.hget(domain=domain,
+                                              identifier=identifier,
+                                              field=field)
+        finally:
+            stats = (self.statistics.get(domain) or
+                     self.get_statistics(domain))
+            stats.get_latency.record(clock() - start)
+
+        if payload is None:
+            stats.misses += 1
+        else:
+            stats.hits += 1
+        return payload
+
+    def hgetall(self, domain, identifier):
+        if not self.enabled:
+            return self.cache_handler.hgetall(domain=domain,
+                                              identifier=identifier)
+        start = clock()
+        try:
+            fields = self.cache_handler.hgetall(domain=domain,
+                                                identifier=identifier)
+        finally:
+            stats = (self.statistics.get(domain) or
+                     self.get_statistics(domain))
+            stats.get_latency.record(clock() - start)
+
+        if fields:
+            stats.hits += 1
+        else:
+            stats.misses += 1
+        return fields
+
+    def hset(self, domain, identifier, mapping):
+        if not self.enabled:
+            return self.cache_handler.hset(domain=domain,
+                                           identifier=identifier,
+                                           mapping=mapping)
+        start = clock()
+        try:
+            return self.cache_handler.hset(domain=domain,
+                                           identifier=identifier,
+                                           mapping=mapping)
+        finally:
+            stats = (self.statistics.get(domain) or
+                     self.get_statistics(domain))
+            stats.set_latency.record(clock() - start)
+            stats.sets += 1
+
+    def hdel(self, domain, identifier, fields):
+        # removing fields isn't an eviction, so only its latency is recorded
+        if not self.enabled:
+            return self.cache_handler.hdel(domain=domain,
+                                           identifier=identifier,
+                                           fields=fields)
+        start = clock()
+        try:
+            return self.cache_handler.hdel(domain=domain,
+                                           identifier=identifier,
+                                           fields=fields)
+        finally:
+            stats = (self.statistics.get(domain) or
+                     self.get_statistics(domain))
+            stats.delete_latency.record(clock() - start)
+
+    def snapshot(self):
+        """
+        :returns: a dict of per-domain statistics, keyed by domain name
+        """
+        return {domain: stats.snapshot()
+                for domain, stats in list(self.statistics.items())}
+
+    def reset(self):
+        self.statistics = {}
+
+    def __getattr__(self, name):
+        # anything not instrumented passes through to the wrapped handler
+        # (for instance, the serialization_manager of a DPCacheHandler):
+        if name == 'cache_handler':
+            raise AttributeError(name)
+        return getattr(self.cache_handler, name)
+
+    def __repr__(self):
+        return "InstrumentedCacheHandler({0})".format(self.cache_handler)
+
+
+class EarlyRefreshStamp(serialize_abcs.Serializable):
+    """
+    The expiry (epoch seconds) and compute time of a cache entry that an
+    EarlyRefreshCacheHandler created, cached apart from the entry's value
+    """
+
+    def __init__(self, expiry, delta):
+        self.expiry = expiry
+        self.delta = delta
+
+    def __eq__(self, other):
+        try:
+            return self.expiry == other.expiry and self.delta == other.delta
+        except AttributeError:
+            return False
+
+    def __repr__(self):
+        return "EarlyRefreshStamp(expiry={0}, delta={1})".format(
+            self.expiry, self.delta)
+
+    @classmethod
+    def serialization_schema(cls):
+        class SerializationSchema(Schema):
+            expiry = fields.Float()
+            delta = fields.Float()
+
+            @post_load
+            def make_early_refresh_stamp(self, data):
+                mycls = EarlyRefreshStamp
+                instance = mycls.__new__(mycls)
+                instance.__dict__.update(data)
+                return instance
+
+        return SerializationSchema
+
+
+class EarlyRefreshCacheHandler(cache_abcs.CacheHandler):
+    """
+    An EarlyRefreshCacheHandler wraps any other CacheHandler, adding
+    probabilistic early expiration to get_or_create so as to prevent cache
+    stampedes.  Entries that are written together, such as the credentials and
+    authz_info cached during a burst of logins, otherwise expire together,
+    triggering a synchronized wave of reloads from the account store.
+
+    The XFetch algorithm is used (Vattani, Chierichetti, Lowenstein: "Optimal
+    Probabilistic Cache Stampede Prevention", VLDB 2015):  a cache hit is
+    treated as a miss, and the entry refreshed ahead of its expiration, when
+
+        now - delta * beta * log(random()) >= expiry
+
+    where delta is the time it took to compute the entry.  Slow-to-compute
+    entries are therefore refreshed earlier and, because the decision is
+    random, only a few callers refresh any one entry.  A beta greater than 1
+    favors earlier refreshes, less than 1 favors later ones, and 0 disables
+    early refreshes altogether.
+
+    A CacheHandler doesn't expose an entry's expiration, so each entry that
+    get_or_create computes is accompanied by an EarlyRefreshStamp of its
+    expiry (in epoch seconds, from the time-to-live of its domain) and compute
+    time.  The stamp is cached under the same identifier in a domain of its
+    own (see stamp_domain), so that the entry itself is cached just as the
+    wrapped handler caches it, for get_raw, bulk exports and handlers that
+    don't wrap it alike.  Every process that shares the cache thus refreshes
+    entries that any of them computed, provided that all of them read the
+    cache through an EarlyRefreshCacheHandler.  TTLs are obtained from the ttl
+    argument or else from the wrapped handler's get_ttl method.  Entries of a
+    domain whose TTL isn't known, and entries that are set rather than
+    computed, aren't stamped.  So that writes don't cost another request,
+    setting or deleting an entry leaves its stamp until the entry is next
+    computed, which overwrites it:  at worst, an entry that was set is
+    refreshed early once.
+    """
+
+    def __init__(self, cache_handler, beta=1.0, ttl=None):
+        """
+        :type cache_handler: cache_abcs.CacheHandler
+        :param beta: the XFetch scaling factor
+        :param ttl: time-to-live, in seconds, keyed by domain
+        :type ttl: dict
+        """
+        self.cache_handler = cache_handler
+        self.beta = beta
+        self.ttl = ttl or {}
+        self.clock = time.time  # shared by processes, unlike time.monotonic
+        self.random = random.random
+
+        self.early_refreshes = collections.Counter()
+        self._lock = threading.Lock()
+
+    def get_ttl(self, domain):
+        try:
+            return self.ttl[domain]
+        except KeyError:
+            try:
+                return self.cache_handler.get_ttl(domain)
+            except AttributeError:
+                return None
+
+    @staticmethod
+    def stamp_domain(domain):
+        """
+        :returns: the domain in which the stamps of a domain's entries are
+                  cached
+        """
+        return domain + ':early_refresh'
+
+    def should_refresh(self, expiry, delta):
+        """
+        :returns: True when an entry is to be refreshed ahead of its expiry
+        """
+        # 1 - random() is within (0, 1], avoiding log(0):
+        gap = -delta * self.beta * math.log(1.0 - self.random())
+        return self.clock() + gap >= expiry
+
+    def stamp(self, domain, delta):
+        """
+        :returns: the EarlyRefreshStamp of an entry that took delta seconds to
+                  compute, or None when its domain's ttl isn't known
+        """
+        ttl = self.get_ttl(domain)
+        if not ttl:
+            return None
+        return EarlyRefreshStamp(self.clock() + ttl, delta)
+
+    def get(self, domain, identifier):
+        return self.cache_handler.get(domain=domain, identifier=identifier)
+
+    def get_or_create(self, domain, identifier, creator_func, creator):
+        stamps = []
+
+        def timed_creator_func(creator):
+            start = clock()
+            value = creator_func(creator)
+            if value is not None:
+                stamps.append(self.stamp(domain, clock() - start))
+            return value
+
+        value = self.cache_handler.get_or_create(
+            domain=domain,
+            identifier=identifier,
+            creator_func=timed_creator_func,
+            creator=creator)
+
+        if stamps:  # computed rather than read from cache
+            self._cache_stamp(domain, identifier, stamps.pop())
+            return value
+
+        if not (self.beta and self.get_ttl(domain)):
+            return value
+
+        stamp = self.cache_handler.get(domain=self.stamp_domain(domain),
+                                       identifier=identifier)
+        if stamp is not None and self.should_refresh(stamp.expiry,
+                                                     stamp.delta):
+            msg = ("Refreshing [{0}] cache entry for [{1}] ahead of its "
+                   "expiration".format(domain, identifier))
+            logger.debug(msg)
+
+            with self._lock:
+                self.early_refreshes[domain] += 1
+
+            value = timed_creator_func(creator)
+            self.cache_handler.set(domain=domain,
+                                   identifier=identifier,
+                                   value=value)
+            if stamps:
+                self._cache_stamp(domain, identifier, stamps.pop())
+
+        return value
+
+    def _cache_stamp(self, domain, identifier, stamp):
+        if stamp is not None:
+            self.cache_handler.set(domain=self.stamp_domain(domain),
+                                   identifier=identifier,
+                                   value=stamp)
+
+    def set(self, domain, identifier, value):
+        # a set value's compute time isn't known, so it isn't stamped:
+        return self.cache_handler.set(domain=domain,
+                                      identifier=identifier,
+                                      value=value)
+
+    def get_raw(self, domain, identifier):
+        return self.cache_handler.get_raw(domain=domain, identifier=identifier)
+
+    def set_raw(self, domain, identifier, payload):
+        return self.cache_handler.set_raw(domain=domain,
+                                          identifier=identifier,
+                                          payload=payload)
+
+    def delete(self, domain, identifier):
+        return self.cache_handler.delete(domain=domain, identifier=identifier)
+
+    def delete_many(self, domain, identifiers):
+        return self.cache_handler.delete_many(domain=domain,
+                                              identifiers=identifiers)
+
+    # hash entries aren't created by get_or_create, so they pass through:
+
+    def hget(self, domain, identifier, field):
+        return self.cache_handler.hget(domain=domain, identifier=identifier,
+                                       field=field)
+
+    def hgetall(self, domain, identifier):
+        return self.cache_handler.hgetall(domain=domain, identifier=identifier)
+
+    def hset(self, domain, identifier, mapping):
+        return self.cache_handler.hset(domain=domain, identifier=identifier,
+                                       mapping=mapping)
+
+    def hdel(self, domain, identifier, fields):
+        return self.cache_handler.hdel(domain=domain, identifier=identifier,
+                                       fields=fields)
+
+    def snapshot(self):
+        """
+        :returns: a dict of early refresh counts, keyed by domain name
+        """
+        return dict(self.early_refreshes)
+
+    def __getattr__(self, name):
+        if name == 'cache_handler':
+            raise AttributeError(name)
+        return getattr(self.cache_handler, name)
+
+    def __repr__(self):
+        return "EarlyRefreshCacheHandler({0}, beta={1})".format(
+            self.cache_handler, self.beta)
+
+
+class CacheWarmupReport:
+    """
+    The outcome of a cache warm up
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.completed = 0
+        self.warmed = 0
+        self.missing = []  # identifiers for which no account data was found
+        self.failed = {}  # identifier: exception
+        self.elapsed = 0.0
+
+    @property
+    def rate(self):
+        """
+        :returns: identifiers warmed per second
+        """
+        return self.completed / self.elapsed if self.elapsed else 0.0
+
+    def snapshot(self):
+        return {'total': self.total,
+                'completed': self.completed,
+                'warmed': self.warmed,
+                'missing': len(self.missing),
+                'failed': len(self.failed),
+                'elapsed': self.elapsed,
+                'rate': self.rate}
+
+    def __repr__(self):
+        return ("CacheWarmupReport(total={0}, warmed={1}, missing={2}, "
+                "failed={3}, elapsed={4:.3f}s)".format(
+                    self.total, self.warmed, len(self.missing),
+                    len(self.failed), self.elapsed))
+
+
+class CacheWarmer:
+    """
+    A CacheWarmer pre-populates cache for a collection of hot identifiers, such
+    as the accounts active just before a deploy or cache flush, so that their
+    first requests don't all miss on credentials and authz_info at the same
+    time.
+
+    Each identifier is warmed through the warm_cache method of every realm
+    that has a cache_handler, which obtains account data using the realm's
+    own loaders.  Identifiers are warmed concurrently, by at most max_workers
+    threads, so as to bound the load put on the account store.
+    """
+
+    def __init__(self, realms, max_workers=4, progress=None,
+                 progress_interval=100):
+        """
+        :param realms: the realms whose caches are to be warmed
+        :type realms: tuple
+
+        :param progress: an optional callback, called as
+                         progress(completed, total) every progress_interval
+                         identifiers and once warm up completes
+        :type progress: callable
+        """
+        self.realms = tuple(realm for realm in realms
+                            if getattr(realm, 'cache_handler', None) and
+                            hasattr(realm, 'warm_cache'))
+        self.max_workers = max_workers
+        self.progress = progress
+        self.progress_interval = progress_interval
+
+    @staticmethod
+    def read_identifiers(path):
+        """
+        Reads identifiers from a recent-activity file, one identifier per
+        line.  Blank lines and lines starting with # are ignored.
+
+        :returns: a list of identifiers
+        """
+        with open(path) as f:
+            return [line.strip() for line in f
+                    if line.strip() and not line.startswith('#')]
+
+    def resolve_identifiers(self, identifier_s):
+        """
+        :param identifier_s: an iterable of identifiers, the path of a
+                             recent-activity file, or a callable (such as a
+                             query) that returns an iterable of identifiers
+        :returns: a list of unique identifiers, in original order
+        """
+        if callable(identifier_s):
+            identifier_s = identifier_s()
+        elif isinstance(identifier_s, str):
+            identifier_s = self.read_identifiers(identifier_s)
+
+        return list(collections.OrderedDict.fromkeys(identifier_s))
+
+    def warm_identifier(self, identifier):
+        """
+        :returns: True when any realm found account data for the identifier
+        """
+        found = False
+        for realm in self.realms:
+            found = realm.warm_cache(identifier) or found
+        return found
+
+    def report_progress(self, report):
+        msg = "Cache warm up: {0} of {1} identifiers".format(report.completed,
+                                                            report.total)
+        logger.debug(msg)
+        if self.progress:
+            self.progress(report.completed, report.total)
+
+    def warm(self, identifier_s):
+        """
+        :returns: a CacheWarmupReport
+        """
+        report = CacheWarmupReport()
+        identifiers = self.resolve_identifiers(identifier_s)
+        report.total = len(identifiers)
+
+        start = clock()
+        if self.realms and identifiers:
+            with concurrent.futures.ThreadPoolExecutor(self.max_workers) as pool:
+                futures = {pool.submit(self.warm_identifier, identifier):
+                           identifier for identifier in identifiers}
+
+                for future in concurrent.futures.as_completed(futures):
+                    identifier = futures[future]
+                    try:
+                        if future.result():
+                            report.warmed += 1
+                        else:
+                            report.missing.append(identifier)
+                    except Exception as exc:
+                        msg = ("Failed to warm cache for [{0}]: {1}".
+                               format(identifier, exc))
+                        logger.warning(msg)
+                        report.failed[identifier] = exc
+
+                    report.completed += 1
+                    if not report.completed % self.progress_interval:
+                        self.report_progress(report)
+
+        report.elapsed = clock() - start
+        if not report.completed or report.completed % self.progress_interval:
+            self.report_progress(report)
+
+        logger.info("Cache warm up complete: {0}".format(report))
+        return report
+
+
+class ConsistentHashRing:
+    """
+    A consistent hash ring, mapping keys to nodes.  Each node is placed on the
+    ring at many points (virtual nodes), in proportion to its weight, so that
+    keys are spread evenly and adding or removing a node moves only the keys
+    between its points and their predecessors:  about 1/N of all keys, for N
+    nodes.
+
+    Points are obtained from md5 digests, so every process maps a key to the
+    same node (unlike the salted, built-in hash).
+    """
+
+    def __init__(self, nodes=(), vnodes=160):
+        """
+        :param nodes: the names of the initial nodes
+        :param vnodes: the number of points per unit of weight
+        """
+        self.vnodes = vnodes
+        self.weights = {}  # node: weight
+        self._points = []  # sorted hashes
+        self._nodes = []  # the node of each point
+        for node in nodes:
+            self.add_node(node)
+
+    @staticmethod
+    def hash(key):
+        digest = hashlib.md5(str(key).encode('utf-8')).digest()
+        return int.from_bytes(digest[:8], 'big')
+
+    def add_node(self, node, weight=1):
+        if node in self.weights:
+            msg = 'The ring already contains node: {0}'.format(node)
+            raise InvalidArgumentException(msg)
+
+        self.weights[node] = weight
+        for i in range(self.vnodes * weight):
+            point = self.hash('{0}#{1}'.format(node, i))
+            index = bisect.bisect(self._points, point)
+            self._points.insert(index, point)
+            self._nodes.insert(index, node)
+
+    def remove_node(self, node):
+        del self.weights[node]
+        kept = [(point, each) for point, each in zip(self._points, self._nodes)
+                if each != node]
+        self._points = [point for point, _ in kept]
+        self._nodes = [each for _, each in kept]
+
+    def get_node(self, key):
+        """
+        :returns: the node of the first point clockwise from key's hash
+        """
+        if not self._points:
+            msg = 'The ring has no nodes'
+            raise InvalidArgumentException(msg)
+        index = bisect.bisect(self._points, self.hash(key))
+        return self._nodes[index % len(self._nodes)]
+
+    def __len__(self):
+        return len(self.weights)
+
+    def __repr__(self):
+        return "ConsistentHashRing(nodes={0}, vnodes={1})".format(
+            list(self.weights), self.vnodes)
+
+
+class ShardedCacheHandler(cache_abcs.CacheHandler):
+    """
+    A ShardedCacheHandler spreads cache entries across several CacheHandlers
+    (shards), such as one per Redis node, using a ConsistentHashRing.  Entries
+    are placed by identifier (a session id or a user's identifier), so all of
+    an identifier's domains are kept by the same shard.
+
+        cache_handler = ShardedCacheHandler({'redis1': DPCacheHandler(...),
+                                             'redis2': DPCacheHandler(...)})
+
+    Adding a shard moves only about 1/N of the entries to it.  Those entries
+    are then missing from cache until recreated, or until rebalance moves
+    them over, hash entries (see hset) included.
+    """
+
+    def __init__(self, shards, vnodes=160, weights=None):
+        """
+        :param shards: the CacheHandlers of the shards, keyed by name
+        :type shards: dict
+        :param weights: the weight of each shard, keyed by name (default 1)
+        """
+        if not shards:
+            msg = 'A ShardedCacheHandler requires at least one shard'
+            raise InvalidArgumentException(msg)
+
+        weights = weights or {}
+        self.shards = {}
+        self.ring = ConsistentHashRing(vnodes=vnodes)
+        for name, cache_handler in shards.items():
+            self.add_shard(name, cache_handler, weights.get(name, 1))
+
+    def add_shard(self, name, cache_handler, weight=1):
+        self.ring.add_node(name, weight)
+        self.shards[name] = cache_handler
+
+    def remove_shard(self, name):
+        """
+        :returns: the CacheHandler of the removed shard
+        """
+        self.ring.remove_node(name)
+        return self.shards.pop(name)
+
+    def get_shard(self, identifier):
+        """
+        :returns: the CacheHandler of the shard that keeps identifier's entries
+        """
+        return self.shards[self.ring.get_node(identifier)]
+
+    @property
+    def serialization_manager(self):
+        return next(iter(self.shards.values())).serialization_manager
+
+    @serialization_manager.setter
+    def serialization_manager(self, manager):
+        for cache_handler in self.shards.values():
+            cache_handler.serialization_manager = manager
+
+    def get_ttl(self, domain):
+        return next(iter(self.shards.values())).get_ttl(domain)
+
+    def generate_key(self, identifier, domain):
+        return self.get_shard(identifier).generate_key(identifier, domain)
+
+    def get(self, domain, identifier):
+        if identifier is None:
+            return None
+        return self.get_shard(identifier).get(domain=domain,
+                                              identifier=identifier)
+
+    def get_or_create(self, domain, identifier, creator_func, creator):
+        if identifier is None:
+            return None
+        return self.get_shard(identifier).get_or_create(
+            domain=domain, identifier=identifier, creator_func=creator_func,
+            creator=creator)
+
+    def set(self, domain, identifier, value):
+        if identifier is None:
+            return None
+        return self.get_shard(identifier).set(domain=domain,
+                                              identifier=identifier,
+                                              value=value)
+
+    def delete(self, domain, identifier):
+        if identifier is None:
+            return None
+        return self.get_shard(identifier).delete(domain=domain,
+                                                 identifier=identifier)
+
+    def delete_many(self, domain, identifiers):
+        # one request per shard:
+        by_shard = collections.defaultdict(list)
+        for identifier in identifiers:
+            if identifier is None:
+                continue
+            by_shard[self.ring.get_node(identifier)].append(identifier)
+        for name, shard_identifiers in by_shard.items():
+            self.shards[name].delete_many(domain=domain,
+                                          identifiers=shard_identifiers)
+
+    def get_raw(self, domain, identifier):
+        if identifier is None:
+            return None
+        return self.get_shard(identifier).get_raw(domain=domain,
+                                                  identifier=identifier)
+
+    def set_raw(self, domain, identifier, payload):
+        if identifier is None:
+            return None
+        return self.get_shard(identifier).set_raw(domain=domain,
+                                                  identifier=identifier,
+                                                  payload=payload)
+
+    def hget(self, domain, identifier, field):
+        if identifier is None:
+            return None
+        return self.get_shard(identifier).hget(domain=domain,
+                                               identifier=identifier,
+                                               field=field)
+
+    def hgetall(self, domain, identifier):
+        if identifier is None:
+            return {}
+        return self.get_shard(identifier).hgetall(domain=domain,
+                                                  identifier=identifier)
+
+    def hset(self, domain, identifier, mapping):
+        if identifier is None:
+            return None
+        return self.get_shard(identifier).hset(domain=domain,
+                                               identifier=identifier,
+                                               mapping=mapping)
+
+    def hdel(self, domain, identifier, fields):
+        if identifier is None:
+            return None
+        return self.get_shard(identifier).hdel(domain=domain,
+                                               identifier=identifier,
+                                               fields=fields)
+
+    def keys(self, pattern):
+        """
+        :returns: a list of the keys of every shard that match pattern
+        """
+        keys = []
+        for cache_handler in self.shards.values():
+            keys.extend(cache_handler.keys(pattern))
+        return keys
+
+    def rebalance(self, domains=('session', 'identifier_sessions',
+                                 'authz_info', 'credentials')):
+        """
+        Moves each entry kept by a shard other than the one that the ring now
+        assigns it to, such as after a shard is added.  Hash entries are moved
+        too, from shards that support them.  Requires shards that support key
+        iteration.
+
+        :returns: the number of entries moved
+        """
+        # imported here, as the bulk module imports from yosai.core:
+        from yosai.core.cache.bulk import generate_identifiers
+
+        moved = 0
+        for name, cache_handler in list(self.shards.items()):
+            for domain in domains:
+                misplaced = {identifier for identifier in
+                             generate_identifiers(cache_handler, domain)
+                             if self.ring.get_node(identifier) != name}
+                for identifier in misplaced:
+                    moved += self._move(cache_handler, domain, identifier)
+        return moved
+
+    def _move(self, cache_handler, domain, identifier):
+        """
+        Moves an entry, and a hash entry of the same key, from cache_handler to
+        the shard that the ring assigns it to.
+
+        :returns: the number of entries moved
+        """
+        target = self.get_shard(identifier)
+        moved = 0
+
+        payload = cache_handler.get_raw(domain=domain, identifier=identifier)
+        if payload is not None:
+            target.set_raw(domain=domain, identifier=identifier,
+                           payload=payload)
+            moved += 1
+
+        try:
+            mapping = cache_handler.hgetall(domain=domain,
+                                            identifier=identifier)
+        except CacheException:  # the shard doesn't support hash entries
+            mapping = None
+        if mapping:
+            target.hset(domain=domain, identifier=identifier, mapping=mapping)
+            moved += 1
+
+        cache_handler.delete(domain=domain, identifier=identifier)
+        return moved
+
+    def __repr__(self):
+        return "ShardedCacheHandler({0})".format(
+            ', '.join('{0}={1}'.format(name, cache_handler)
+                      for name, cache_handler in self.shards.items()))
@@ -362,6 +362,10 @@ class SessionDeleteException(SessionException):
     pass
 
 
+class SessionTokenException(SessionException):
+    pass
+
+
 class UncacheSessionException(SessionException):
     pass
 
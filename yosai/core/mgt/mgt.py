@@ -25,6 +25,7 @@ from abc import abstractmethod
 from yosai.core import(
     AuthenticationException,
     AuthzInfoResolver,
+    CacheWarmer,
     Credential,
     CredentialResolver,
     DefaultAuthenticator,
@@ -607,6 +608,28 @@ class NativeSecurityManager(mgt_abcs.SecurityManager,
 
         self.apply_target_s(validate_apply, target_s)
 
+    def warm_cache(self, identifier_s, max_workers=4, progress=None):
+        """
+        Pre-populates the realms' caches with the credentials and authz_info
+        of hot identifiers, such as after a deploy or a cache flush.  Warm up
+        completes before warm_cache returns.  Requests served meanwhile aren't
+        held back:  they read from the account store whatever isn't cached
+        yet.
+
+        :param identifier_s: an iterable of identifiers, the path of a
+                             recent-activity file (one identifier per line),
+                             or a callable that returns identifiers
+        :param max_workers: the maximum number of identifiers warmed
+                            concurrently
+        :param progress: an optional callback, called as
+                         progress(completed, total)
+
+        :returns: a CacheWarmupReport
+        """
+        warmer = CacheWarmer(self.realms, max_workers=max_workers,
+                             progress=progress)
+        return warmer.warm(identifier_s)
+
     """
     * ===================================================================== *
     * Authenticator Methods                                                 *
@@ -225,6 +225,27 @@ class AccountStoreRealm(realm_abcs.AuthenticatingRealm,
 
         self.cache_handler.delete('authz_info', identifier)
 
+    def warm_cache(self, identifier):
+        """
+        Pre-populates cache with an account's credentials and authz_info,
+        obtained through the same loaders used on a cache miss.  A cache warm
+        up, such as one performed by a CacheWarmer after a deploy or a cache
+        flush, spares the account store from a wave of concurrent misses.
+
+        :param identifier: the identifier of a specific source
+        :returns: True when the account store has data for the identifier
+        """
+        msg = "Warming cache for [{0}]".format(identifier)
+        logger.debug(msg)
+
+        credentials = self.get_credentials(identifier)
+
+        identifiers = SimpleIdentifierCollection(source_name=self.name,
+                                                 identifier=identifier)
+        authz_info = self.get_authorization_info(identifiers)
+
+        return credentials is not None or authz_info is not None
+
     # --------------------------------------------------------------------------
     # Authentication
     # --------------------------------------------------------------------------
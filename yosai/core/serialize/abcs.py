@@ -17,11 +17,34 @@ specific language governing permissions and limitations
 under the License.
 """
 
+import threading
+
 from abc import ABCMeta, abstractmethod
 from marshmallow import fields
 
+from yosai.core.serialize.registry import type_registry
+
+# the classes whose schemas are being built, per thread, and the classes whose
+# schemas nest each class's schema:
+_building = threading.local()
+_schema_dependents = {}
+
+
+class SerializableMeta(ABCMeta):
+    """
+    Registers each Serializable class with the type registry upon creation,
+    so that the SerializationManager can de-serialize its instances.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        if bases:
+            type_registry.register(cls)
+
 
-class Serializable(metaclass=ABCMeta):
+class Serializable(metaclass=SerializableMeta):
+
+    __slots__ = ()  # so that implementations may be slotted
 
     @classmethod
     @abstractmethod
@@ -34,20 +57,81 @@ class Serializable(metaclass=ABCMeta):
         """
         pass
 
+    @classmethod
+    def schema_class(cls):
+        """
+        serialization_schema defines new Schema classes each time that it is
+        called, so the SerializationSchema class is built once per class and
+        memoized.  A class's own __dict__ is consulted so that subclasses
+        memoize their own schema.
+
+        A schema that is built while another is (such as one that is nested
+        in it) records the other as its dependent, for invalidate_schema.
+
+        :returns: the memoized SerializationSchema class
+        """
+        try:
+            schema_class = cls.__dict__['_schema_class']
+        except KeyError:
+            building = _building.__dict__.setdefault('classes', [])
+            building.append(cls)
+            try:
+                schema_class = cls.serialization_schema()
+            finally:
+                building.pop()
+            # the thread-local is set first, as _schema_class signals readiness
+            cls._schema_local = threading.local()
+            cls._schema_class = schema_class
+
+        building = getattr(_building, 'classes', None)
+        if building:
+            _schema_dependents.setdefault(cls, set()).add(building[-1])
+        return schema_class
+
+    @classmethod
+    def schema(cls):
+        """
+        Schema instances keep state while (de)serializing, so an instance is
+        re-used only within the thread that created it.
+
+        :returns: a SerializationSchema instance for the current thread
+        """
+        try:
+            return cls.__dict__['_schema_local'].schema
+        except (KeyError, AttributeError):
+            schema = cls.schema_class()()
+            cls.__dict__['_schema_local'].schema = schema
+            return schema
+
+    @classmethod
+    def invalidate_schema(cls):
+        """
+        Discards the memoized schema so that it is rebuilt upon next use.  Call
+        this whenever a change affects what serialization_schema returns.  The
+        schemas of subclasses, and of the classes whose schemas were built
+        from this one, are discarded too.
+        """
+        for name in ('_schema_class', '_schema_local'):
+            if name in cls.__dict__:
+                delattr(cls, name)
+
+        for subclass in cls.__subclasses__():
+            subclass.invalidate_schema()
+        for dependent in _schema_dependents.pop(cls, ()):
+            dependent.invalidate_schema()
+
     def serialize(self):
         """
         :returns: a dict
         """
-        schema = self.serialization_schema()()
-        return schema.dump(self).data
+        return self.schema().dump(self).data
 
     @classmethod
     def deserialize(cls, data):
         """
         :returns: a deserialized object
         """
-        schema = cls.serialization_schema()()
-        return schema.load(data=data).data
+        return cls.schema().load(data=data).data
 
     def __eq__(self, other):
         if self is other:
@@ -0,0 +1,190 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+Times each registered serialization format on the objects that Yosai caches,
+so that operators can choose a format for their deployment:
+
+    python -m yosai.core.serialize.benchmark
+    python -m yosai.core.serialize.benchmark --format msgpack --format pickle
+
+Each object is serialized and de-serialized through a SerializationManager,
+just as a CacheHandler does.  De-serializing a session includes decoding its
+attributes, which a SimpleSession otherwise defers until they're used.
+
+The functions that make the objects are shared by the scripts in the
+benchmarks directory.
+"""
+
+import argparse
+import random
+import sys
+import timeit
+
+from marshmallow import Schema, fields
+
+from yosai.core import (
+    DefaultPermission,
+    IndexedAuthorizationInfo,
+    SerializationManager,
+    SimpleIdentifierCollection,
+    SimpleRole,
+    SimpleSession,
+)
+
+DOMAINS = ['leatherduffelbag', 'money', 'rug', 'bowling', 'ransom', 'car',
+           'briefcase', 'toe', 'ferret', 'pinball', 'marmot', 'limo',
+           'nihilist', 'whiterussian', 'tumbleweed', 'stranger', 'pornography',
+           'landlord', 'cashier', 'dancer']
+ACTIONS = ['read', 'write', 'create', 'delete', 'transport', 'sell', 'buy',
+           'bowl', 'drink', 'pee']
+
+
+def make_attributes_schema(count):
+    """
+    :returns: a session attributes schema of count string attributes, named
+              as make_session names them
+    """
+    declared = {'attribute{0}'.format(i): fields.Str() for i in range(count)}
+    return type('AttributesSchema', (Schema,), declared)
+
+
+def make_identifiers(realm_count=1, rand=None):
+    """
+    :param rand: a random.Random to draw user names from, or None for 'thedude'
+    """
+    identifiers = SimpleIdentifierCollection()
+    for realm in range(realm_count):
+        identifier = ('thedude' if rand is None else
+                      'user{0}'.format(rand.randint(1, 10**6)))
+        identifiers.add(source_name='realm{0}'.format(realm),
+                        identifier=identifier)
+    return identifiers
+
+
+def make_session(attribute_count=0, rand=None, session_cls=SimpleSession):
+    """
+    :param rand: a random.Random to draw the host, session id and attribute
+                 values from, or None for fixed ones
+    """
+    if rand is None:
+        session = session_cls(host='127.0.0.1')
+        session.session_id = 'sessionid123'
+    else:
+        session = session_cls(host='10.0.{0}.{1}'.format(
+            rand.randint(0, 255), rand.randint(0, 255)))
+        session.session_id = '{0:032x}'.format(rand.getrandbits(128))
+    session.set_internal_attribute('identifiers_session_key',
+                                   make_identifiers(rand=rand))
+    session.set_internal_attribute('authenticated_session_key', True)
+    for i in range(attribute_count):
+        value = i if rand is None else rand.randint(1, 10**6)
+        session.set_attribute('attribute{0}'.format(i),
+                              'value{0}'.format(value))
+    return session
+
+
+def make_authz_info(permission_count, role_count=5, rand=None):
+    """
+    :param rand: a random.Random to draw permissions from, or None for one
+                 seeded with 1
+    """
+    rand = random.Random(1) if rand is None else rand
+    permissions = set()
+    while len(permissions) < permission_count:
+        permissions.add(DefaultPermission(wildcard_string='{0}:{1}:{2}'.format(
+            rand.choice(DOMAINS),
+            ','.join(rand.sample(ACTIONS, rand.randint(1, 3))),
+            rand.randint(1, 100000))))
+    roles = {SimpleRole('role{0}'.format(i)) for i in range(role_count)}
+    return IndexedAuthorizationInfo(roles=roles, permissions=permissions)
+
+
+def deserialize_fully(manager, message):
+    """
+    De-serializes a message, decoding the attributes of a session too.
+    """
+    obj = manager.deserialize(message)
+    getattr(obj, 'attributes', None)
+    return obj
+
+
+def cached_objects():
+    """
+    :returns: a list of (name, object) tuples
+    """
+    return [('SimpleSession', make_session()),
+            ('SimpleIdentifierCollection', make_identifiers()),
+            ('IndexedAuthorizationInfo (10)', make_authz_info(10)),
+            ('IndexedAuthorizationInfo (1000)', make_authz_info(1000))]
+
+
+def mean_latency(func, number=None):
+    """
+    :param number: the number of calls to time, or None to time as many as
+                   take at least 0.2 seconds
+    :returns: the mean latency of func, in seconds
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        number, elapsed = timer.autorange()
+    else:
+        elapsed = timer.timeit(number)
+    return elapsed / number
+
+
+def measure(manager, obj, number=None):
+    """
+    :returns: a tuple of encoded size (bytes), mean serialize latency and mean
+              de-serialize latency (seconds)
+    """
+    message = manager.serialize(obj)
+    ser = mean_latency(lambda: manager.serialize(obj), number)
+    deser = mean_latency(lambda: deserialize_fully(manager, message), number)
+    return len(message), ser, deser
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m yosai.core.serialize.benchmark',
+        description='Times each serialization format on cached objects.')
+    parser.add_argument('--format', action='append', dest='formats',
+                        help='a format to time (default: all registered)')
+    parser.add_argument('--number', type=int,
+                        help='calls per measurement (default: as many as '
+                             'take 0.2 seconds)')
+    args = parser.parse_args(argv)
+
+    SerializationManager.load_serializers()
+    formats = args.formats or sorted(SerializationManager.serializers)
+
+    header = '{0:>32} {1:>8} {2:>8} {3:>10} {4:>12}'
+    print(header.format('object', 'format', 'bytes', 'ser (us)',
+                        'deser (us)'))
+
+    for name, obj in cached_objects():
+        for format in formats:
+            manager = SerializationManager(format=format)
+            size, ser, deser = measure(manager, obj, args.number)
+            print(header.format(name, format, size,
+                                '{0:.1f}'.format(ser * 1e6),
+                                '{0:.1f}'.format(deser * 1e6)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
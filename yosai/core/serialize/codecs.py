@@ -0,0 +1,381 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+Hand-written codecs for the Serializables that are cached most often.
+
+Each codec converts an object to and from the very same dict that its
+marshmallow SerializationSchema produces and consumes, skipping the schema
+machinery.  Consequently, entries cached by either path are readable by the
+other.  Codecs are registered with SerializationManager, by exact class, when
+this module is imported;  subclasses continue to use their schemas.
+
+Whenever a SerializationSchema changes, its codec must change with it.  The
+round-trip tests of test_codecs.py compare each codec against its schema.
+"""
+
+import collections
+import datetime
+
+import pytz
+from marshmallow import utils
+
+from yosai.core import (
+    CompactSession,
+    Credential,
+    DefaultPermission,
+    DefaultSessionKey,
+    IndexedAuthorizationInfo,
+    SerializationManager,
+    SimpleIdentifierCollection,
+    SimpleRole,
+    SimpleSession,
+)
+
+# -----------------------------------------------------------------------------
+# field helpers, equivalent to the marshmallow fields used by the schemas
+# -----------------------------------------------------------------------------
+
+
+def dump_str(value):
+    if value is None:
+        return None
+    return utils.ensure_text_type(value)
+
+
+def dump_bool(value):
+    if value is None:
+        return None
+    return bool(value)
+
+
+def load_datetime(value):
+    # parses the ISO strings of sessions serialized in format version 1
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    # version 1 always wrote utc;  other strings are parsed by marshmallow
+    if value.endswith('+00:00'):
+        try:
+            if len(value) == 32:
+                parsed = datetime.datetime.strptime(value[:26],
+                                                    '%Y-%m-%dT%H:%M:%S.%f')
+            else:
+                parsed = datetime.datetime.strptime(value[:19],
+                                                    '%Y-%m-%dT%H:%M:%S')
+            return parsed.replace(tzinfo=pytz.utc)
+        except ValueError:
+            pass
+    return utils.from_iso(value)
+
+
+def load_timedelta(value):
+    # converts the integer seconds of sessions serialized in format version 1
+    if value is None or isinstance(value, datetime.timedelta):
+        return value
+    return datetime.timedelta(seconds=int(value))
+
+
+def new_instance(cls, state):
+    instance = cls.__new__(cls)
+    instance.__dict__.update(state)
+    return instance
+
+
+# -----------------------------------------------------------------------------
+# codecs
+# -----------------------------------------------------------------------------
+
+
+def encode_simple_role(role):
+    state = role.__dict__
+    if 'identifier' not in state:
+        return {}
+    return {'identifier': dump_str(state['identifier'])}
+
+
+def decode_simple_role(data):
+    state = {}
+    if 'identifier' in data:
+        state['identifier'] = data['identifier']
+    return new_instance(SimpleRole, state)
+
+
+def encode_credential(credential):
+    state = credential.__dict__
+    if 'credential' not in state:
+        return {}
+    return {'credential': dump_str(state['credential'])}
+
+
+def decode_credential(data):
+    instance = Credential.__new__(Credential)
+    instance.credential = bytes(data['credential'], 'utf-8')
+    return instance
+
+
+def encode_default_session_key(session_key):
+    state = session_key.__dict__
+    if '_session_id' not in state:
+        return {}
+    return {'_session_id': dump_str(state['_session_id'])}
+
+
+def decode_default_session_key(data):
+    state = {}
+    if '_session_id' in data:
+        state['_session_id'] = data['_session_id']
+    return new_instance(DefaultSessionKey, state)
+
+
+permission_parts = ('domain', 'action', 'target')
+
+
+def encode_default_permission(permission):
+    parts = permission.__dict__.get('parts')
+    if parts is None:
+        return {'parts': None} if 'parts' in permission.__dict__ else {}
+
+    encoded = {}
+    for part in permission_parts:
+        if part in parts:
+            value = parts[part]
+            encoded[part] = (None if value is None else
+                             [dump_str(each) for each in value])
+    return {'parts': encoded}
+
+
+def decode_default_permission(data):
+    if 'parts' not in data:
+        return new_instance(DefaultPermission, {})
+    parts = data['parts']
+    if parts is not None:
+        parts = {part: None if value is None else frozenset(value)
+                 for part, value in parts.items() if part in permission_parts}
+    return new_instance(DefaultPermission, {'parts': parts})
+
+
+def encode_identifier_collection(identifiers):
+    state = identifiers.__dict__
+    encoded = {}
+    if 'source_identifiers' in state:
+        source_identifiers = state['source_identifiers']
+        encoded['source_identifiers'] = [
+            [dump_str(key), dump_str(value)]
+            for key, value in source_identifiers.items()]
+    if '_primary_identifier' in state:
+        encoded['_primary_identifier'] = dump_str(state['_primary_identifier'])
+    return encoded
+
+
+def decode_identifier_collection(data):
+    state = {'source_identifiers':
+             collections.OrderedDict(data['source_identifiers'])}
+    if '_primary_identifier' in data:
+        state['_primary_identifier'] = data['_primary_identifier']
+    return new_instance(SimpleIdentifierCollection, state)
+
+
+def encode_authz_info(authz_info):
+    state = authz_info.__dict__
+    encoded = {}
+    if '_roles' in state:
+        roles = state['_roles']
+        encoded['_roles'] = (None if roles is None else
+                             [encode_simple_role(role) for role in roles])
+    if '_permissions' in state:
+        permissions = state['_permissions']
+        encoded['_permissions'] = (None if permissions is None else {
+            key: [encode_default_permission(perm) for perm in collection]
+            for key, collection in permissions.items()})
+    return encoded
+
+
+def decode_authz_info(data):
+    state = {}
+    if '_roles' in data:
+        roles = data['_roles']
+        state['_roles'] = (None if roles is None else
+                           set(decode_simple_role(role) for role in roles))
+    if '_permissions' in data:
+        permissions = data['_permissions']
+        state['_permissions'] = (None if permissions is None else {
+            key: set(decode_default_permission(perm) for perm in collection)
+            for key, collection in permissions.items()})
+    return new_instance(IndexedAuthorizationInfo, state)
+
+
+def encode_internal_attributes(attributes):
+    encoded = {}
+    if 'identifiers_session_key' in attributes:
+        identifiers = attributes['identifiers_session_key']
+        encoded['identifiers_session_key'] = (
+            None if identifiers is None else
+            encode_identifier_collection(identifiers))
+    if 'authenticated_session_key' in attributes:
+        encoded['authenticated_session_key'] = dump_bool(
+            attributes['authenticated_session_key'])
+    if 'run_as_identifiers_session_key' in attributes:
+        run_as = attributes['run_as_identifiers_session_key']
+        encoded['run_as_identifiers_session_key'] = (
+            None if run_as is None else
+            [encode_identifier_collection(each) for each in run_as])
+    return encoded
+
+
+def decode_internal_attributes(data):
+    # None isn't allowed for any of these fields, so such values are dropped
+    decoded = {}
+    identifiers = data.get('identifiers_session_key')
+    if identifiers is not None:
+        decoded['identifiers_session_key'] = decode_identifier_collection(
+            identifiers)
+    authenticated = data.get('authenticated_session_key')
+    if authenticated is not None:
+        decoded['authenticated_session_key'] = bool(authenticated)
+    run_as = data.get('run_as_identifiers_session_key')
+    if run_as is not None:
+        run_as = [decode_identifier_collection(each) for each in run_as]
+        decoded['run_as_identifiers_session_key'] = (
+            collections.deque(run_as) if run_as else run_as)
+    return decoded
+
+
+# name, dump, load (of format version 1):  datetimes and timedeltas are
+# encoded natively by the serializer
+session_fields = (('_session_id', dump_str, None),
+                  ('_start_timestamp', None, load_datetime),
+                  ('_stop_timestamp', None, load_datetime),
+                  ('_last_access_time', None, load_datetime),
+                  ('_idle_timeout', None, load_timedelta),
+                  ('_absolute_timeout', None, load_timedelta),
+                  ('_is_expired', dump_bool, dump_bool),
+                  ('_host', dump_str, None))
+
+native_session_fields = frozenset(['_start_timestamp', '_stop_timestamp',
+                                   '_last_access_time', '_idle_timeout',
+                                   '_absolute_timeout'])
+
+
+def encode_simple_session(session):
+    state = session.__dict__
+    encoded = {}
+    for name, dump, _ in session_fields:
+        if name in state:
+            value = state[name]
+            encoded[name] = dump(value) if dump else value
+
+    if '_internal_attributes' in state:
+        internal_attributes = state['_internal_attributes']
+        encoded['_internal_attributes'] = (
+            None if internal_attributes is None else
+            encode_internal_attributes(internal_attributes))
+
+    if '_attributes' in state:
+        attributes = state['_attributes']
+        encoded['_attributes'] = (
+            None if attributes is None else
+            SimpleSession.attributes_schema().dump(attributes).data)
+    elif '_encoded_attributes' in state:
+        # attributes that were never decoded are written back as they are
+        encoded['_attributes'] = state['_encoded_attributes']
+
+    encoded[SimpleSession.format_version_key] = SimpleSession.format_version
+    return encoded
+
+
+def decode_simple_session(data):
+    native = data.get(SimpleSession.format_version_key, 1) >= 2
+    state = {}
+    for name, _, load in session_fields:
+        if name in data:
+            value = data[name]
+            if load is None or (native and name in native_session_fields):
+                state[name] = value
+            else:
+                state[name] = load(value)
+
+    if '_internal_attributes' in data:
+        internal_attributes = data['_internal_attributes']
+        state['_internal_attributes'] = (
+            None if internal_attributes is None else
+            decode_internal_attributes(internal_attributes))
+
+    # attributes are decoded upon first use (see SimpleSession.attributes), so
+    # a session may be validated without decoding them
+    if '_attributes' in data:
+        attributes = data['_attributes']
+        if attributes is None:
+            state['_attributes'] = None
+        else:
+            state['_encoded_attributes'] = attributes
+    return new_instance(SimpleSession, state)
+
+
+# name, dump:  timestamps are epoch floats and timeouts are integer seconds
+compact_session_fields = (('_session_id', dump_str),
+                          ('_start', None),
+                          ('_stop', None),
+                          ('_last_access', None),
+                          ('_idle_timeout', None),
+                          ('_absolute_timeout', None),
+                          ('_is_expired', dump_bool),
+                          ('_host', dump_str))
+
+
+def encode_compact_session(session):
+    encoded = {}
+    for name, dump in compact_session_fields:
+        value = getattr(session, name)
+        encoded[name] = dump(value) if dump else value
+
+    internal_attributes = session._internal_attributes
+    encoded['_internal_attributes'] = (
+        None if internal_attributes is None else
+        encode_internal_attributes(internal_attributes))
+
+    if session._attributes is not None:
+        encoded['_attributes'] = SimpleSession.attributes_schema().dump(
+            session._attributes).data
+    else:
+        # attributes that were never decoded are written back as they are
+        encoded['_attributes'] = session._encoded_attributes
+    return encoded
+
+
+def decode_compact_session(data):
+    state = {name: data.get(name) for name, _ in compact_session_fields}
+    internal_attributes = data.get('_internal_attributes')
+    if internal_attributes is not None:
+        state['_internal_attributes'] = decode_internal_attributes(
+            internal_attributes)
+    return CompactSession.new_instance(state, data.get('_attributes'))
+
+
+codecs = {SimpleRole: (encode_simple_role, decode_simple_role),
+          Credential: (encode_credential, decode_credential),
+          DefaultSessionKey: (encode_default_session_key,
+                              decode_default_session_key),
+          DefaultPermission: (encode_default_permission,
+                              decode_default_permission),
+          SimpleIdentifierCollection: (encode_identifier_collection,
+                                       decode_identifier_collection),
+          IndexedAuthorizationInfo: (encode_authz_info, decode_authz_info),
+          SimpleSession: (encode_simple_session, decode_simple_session),
+          CompactSession: (encode_compact_session, decode_compact_session)}
+
+for serializable_cls, (encode, decode) in codecs.items():
+    SerializationManager.register_codec(serializable_cls, encode, decode)
@@ -0,0 +1,140 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+"""
+
+import threading
+
+from yosai.core import (
+    InvalidArgumentException,
+    SerializationException,
+)
+
+# The type codes of the Serializables of yosai.core, keyed by the qualified
+# names of the classes themselves, so that no other class (such as a subclass
+# that shares a name) is given one.  Codes are part of the wire format:  never
+# change nor re-use a code, only append new ones.
+core_type_codes = {'yosai.core.session.session.SimpleSession': 1,
+                   'yosai.core.subject.identifier.SimpleIdentifierCollection': 2,
+                   'yosai.core.session.session.DefaultSessionKey': 3,
+                   'yosai.core.authz.authz.IndexedAuthorizationInfo': 4,
+                   'yosai.core.authz.authz.DefaultPermission': 5,
+                   'yosai.core.authz.authz.WildcardPermission': 6,
+                   'yosai.core.authz.authz.SimpleRole': 7,
+                   'yosai.core.authc.authc.Credential': 8,
+                   'yosai.core.context.context.MapContext': 9,
+                   'yosai.core.session.session.CompactSession': 10}
+
+
+def qualified_name(cls):
+    return '{0}.{1}'.format(cls.__module__, cls.__qualname__)
+
+
+class TypeRegistry:
+    """
+    A TypeRegistry maps the type tags of serialized objects to the classes
+    that de-serialize them.  A tag is either an integer type code or a string.
+
+    Every Serializable subclass is registered when it is created, under its
+    type code, if it is a class of yosai.core that has one, or else under its
+    qualified name (module and class name).  A class's tag thus never depends
+    upon which classes were created before it, so every process writes (and
+    reads) the same tag for it.  Its bare class name is registered as an
+    alias too, for reading the legacy envelopes of earlier releases, which
+    recorded only that:  when two classes share a name, the first one created
+    keeps the alias.  Use the serializable_type class decorator to register a
+    class under an explicit, shorter tag:
+
+        @serializable_type('myapp.ShoppingCart')
+        class ShoppingCart(serialize_abcs.Serializable):
+            ...
+    """
+
+    def __init__(self):
+        self.classes = {}  # tag: class
+        self.tags = {}  # class: the tag written when serializing
+        self._lock = threading.Lock()
+
+    def register(self, cls, tag=None, replace=False):
+        """
+        :param tag: the tag to register cls under, defaulting to its type code
+                    or else its qualified name
+        :param replace: whether to replace a class already registered under
+                        the tag
+        :returns: the tag that cls serializes with
+        """
+        name = cls.__name__
+
+        with self._lock:
+            if tag is None:
+                tag = core_type_codes.get(qualified_name(cls),
+                                          qualified_name(cls))
+
+            if not isinstance(tag, (int, str)) or isinstance(tag, bool):
+                msg = 'A type tag must be an int or a str, not {0}'.format(tag)
+                raise InvalidArgumentException(msg)
+
+            if replace or tag not in self.classes:
+                self.classes[tag] = cls
+            # the class name remains an alias, for legacy envelopes:
+            self.classes.setdefault(name, cls)
+
+            if replace or cls not in self.tags:
+                self.tags[cls] = tag
+
+        return self.tags[cls]
+
+    def tag_of(self, cls):
+        """
+        :returns: the tag to serialize instances of cls with
+        """
+        try:
+            return self.tags[cls]
+        except KeyError:
+            return self.register(cls)
+
+    def lookup(self, tag):
+        """
+        :returns: the class registered under tag
+        :raises SerializationException: when no class is registered under tag
+        """
+        try:
+            return self.classes[tag]
+        except (KeyError, TypeError):
+            msg = 'No Serializable class is registered for type tag {0}'.format(
+                tag)
+            raise SerializationException(msg)
+
+    def __contains__(self, tag):
+        return tag in self.classes
+
+    def __repr__(self):
+        return "TypeRegistry({0} types)".format(len(self.tags))
+
+
+type_registry = TypeRegistry()
+
+
+def serializable_type(tag):
+    """
+    A class decorator that registers a Serializable class under an explicit
+    type tag, replacing any class that was registered under it.
+    """
+    def decorator(cls):
+        type_registry.register(cls, tag, replace=True)
+        return cls
+    return decorator
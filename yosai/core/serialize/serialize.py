@@ -20,97 +20,242 @@ under the License.
 from yosai.core import (
     serialize_abcs,
     InvalidSerializationFormatException,
+    MisconfiguredException,
     SerializationException,
+    serialization_settings,
 )
+from yosai.core.serialize.registry import type_registry
 
-import msgpack
+import bz2
 import datetime
+import importlib
+import logging
+import lzma
+import marshal
+import msgpack
+import functools
+import pickle
+import pytz
 import rapidjson
-import pkg_resources
 import copy
+import struct
+import zlib
 from marshmallow import fields, missing
 
 
+# Envelope
+# --------
+# Serialized dicts carry two envelope entries, with keys that can't clash with
+# schema field names:  a version tag and a type tag, issued by the
+# type_registry.  Earlier releases used a verbose envelope
+# (serialized_dist_version, serialized_record_dt and serialized_cls), which
+# remains readable.
+version_key = '~v'
+type_key = '~t'
+legacy_type_key = 'serialized_cls'
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def dist_version():
+    """
+    :returns: the version of the installed yosai distribution, obtained once
+    """
+    # pkg_resources is slow to import, so it is imported only when needed:
+    import pkg_resources
+    try:
+        return pkg_resources.get_distribution('yosai').version
+    except pkg_resources.DistributionNotFound:
+        return 'N/A'
+
+
 class SerializationManager:
     """
     SerializationManager proxies serialization requests.  It is non-opinionated,
     designed so as to support multiple serialization methods.  MSGPack is
     the default encoding scheme.
 
-    TO-DO:  configure serialization scheme from yosai.core.settings json
+    Encoded payloads may optionally be compressed by a ``PayloadCompressor``.
+    Compressed payloads are tagged, so de-serialization always recognizes them,
+    whether or not compression is currently enabled.
+
+    Serializables with a registered codec (see serialize.codecs) are converted
+    to and from dicts by the codec, rather than by their marshmallow schema.
+
+    Serialization formats are provided by Serializers, registered by name.
+    Besides those registered with register_serializer, a SerializationManager
+    finds those named in the 'serializers' of SERIALIZATION_CONFIG settings
+    and those advertised by installed packages as entry points of the
+    'yosai.serializers' group.  The default format is that of the 'format'
+    setting (msgpack, unless configured otherwise).
     """
-    def __init__(self, format='msgpack'):
-        self.format = format
+    # serializable class: (encode, decode), populated by register_codec
+    codecs = {}
 
-        # add encoders here:
-        self.serializers = {'msgpack': MSGPackSerializer,
-                            'json': JSONSerializer}
+    # format name: Serializer, populated by register_serializer
+    serializers = {}
+
+    entry_point_group = 'yosai.serializers'
+    _plugins_loaded = False
+
+    def __init__(self, format=None, compressor=None, use_codecs=True):
+        """
+        :param format: the name of a registered serialization format, or None
+                       for the format of the settings
+        :param compressor: compresses large encoded payloads, if set
+        :type compressor: PayloadCompressor
+        :param use_codecs: when False, registered codecs are ignored
+        """
+        self.format = format or serialization_settings.format
+        self.compressor = compressor
+        self.use_codecs = use_codecs
+        self.serializer = self.get_serializer(self.format)
+
+    @classmethod
+    def register_serializer(cls, format, serializer):
+        """
+        :param format: the name of the serialization format
+        :type serializer: serialize_abcs.Serializer
+        """
+        cls.serializers[format] = serializer
+
+    @classmethod
+    def get_serializer(cls, format):
+        """
+        :returns: the Serializer registered for format
+        :raises InvalidSerializationFormatException: when there is none
+        """
+        if format not in cls.serializers and not cls._plugins_loaded:
+            cls.load_serializers()
 
         try:
-            self.serializer = self.serializers[self.format]
+            return cls.serializers[format]
         except KeyError:
-            msg = ('Could not locate serialization format: ', format)
+            msg = 'Could not locate serialization format: {0}'.format(format)
             raise InvalidSerializationFormatException(msg)
 
-    def serialize(self, obj):
+    @classmethod
+    def load_serializers(cls):
         """
-        :type obj: a Serializable object or a list of Serializable objects
-        :returns: an encoded, serialized object
+        Registers the serializers of entry points and then those of settings,
+        which take precedence over entry points but not over serializers that
+        are registered explicitly.  Serializers are loaded once, when a format
+        is first found missing.
+        """
+        cls._plugins_loaded = True
+        registered = set(cls.serializers)
+
+        # pkg_resources is slow to import, so it is imported only when needed:
+        import pkg_resources
+        for entry_point in pkg_resources.iter_entry_points(
+                cls.entry_point_group):
+            try:
+                serializer = entry_point.load()
+            except Exception:
+                msg = 'Failed to load serializer entry point: {0}'.format(
+                    entry_point)
+                logger.warning(msg, exc_info=True)
+                continue
+            cls.serializers.setdefault(entry_point.name, serializer)
+
+        for format, path in serialization_settings.serializers.items():
+            if format not in registered:
+                cls.serializers[format] = cls.import_serializer(path)
+
+    @staticmethod
+    def import_serializer(path):
+        """
+        :param path: the import path of a Serializer, as 'package.module:Class'
         """
         try:
-            dist_version = pkg_resources.get_distribution('yosai').version
+            module_name, _, attribute = path.partition(':')
+            return getattr(importlib.import_module(module_name), attribute)
+        except (AttributeError, ImportError, ValueError):
+            msg = 'Could not import the serializer configured as: {0}'.format(
+                path)
+            raise MisconfiguredException(msg)
+
+    @classmethod
+    def register_codec(cls, serializable_cls, encode, decode):
+        """
+        Registers a codec for instances of serializable_cls (but not of its
+        subclasses).  A codec must produce and consume the same dicts as
+        serializable_cls's SerializationSchema.
+
+        :param encode: a function that converts an instance to a dict
+        :param decode: a function that converts a dict to an instance
+        """
+        cls.codecs[serializable_cls] = (encode, decode)
 
-        except pkg_resources.DistributionNotFound:
-            dist_version = 'N/A'
+    def to_dict(self, obj):
+        codec = self.codecs.get(obj.__class__) if self.use_codecs else None
+        if codec is None:
+            return obj.serialize()
+        return codec[0](obj)
 
+    def from_dict(self, cls, data):
+        codec = self.codecs.get(cls) if self.use_codecs else None
+        if codec is None:
+            return cls.deserialize(data)
+        return codec[1](data)
+
+    def serialize(self, obj):
+        """
+        Each serialized dict is enveloped by two entries:  the version of the
+        yosai distribution that serialized it (version_key) and the tag that
+        its class is registered under with the type_registry (type_key).
+
+        :type obj: a Serializable object or a list of Serializable objects
+        :returns: an encoded, serialized object
+        """
+        version = dist_version()
         try:
-            newdict = {}
-            now = datetime.datetime.utcnow().isoformat()
-            serialization_attrs = {'serialized_dist_version': dist_version,
-                                   'serialized_record_dt': now}
-            newdict.update(serialization_attrs)
-            newdict.update(obj.serialize())
-            newdict['serialized_cls'] = obj.__class__.__name__
-            newobj = newdict
+            newobj = self.to_dict(obj)
+            newobj[version_key] = version
+            newobj[type_key] = type_registry.tag_of(obj.__class__)
 
         except AttributeError:
             try:
                 # assume that its an iterable of Serializables
                 newobj = []
                 for element in obj:
-                    mydict = copy.copy(newdict)
-                    mydict['serialized_cls'] = element.__class__.__name__
-                    mydict.update(element.serialize())
+                    mydict = self.to_dict(element)
+                    mydict[version_key] = version
+                    mydict[type_key] = type_registry.tag_of(element.__class__)
                     newobj.append(mydict)
 
                 # at this point, newobj is either a list of dicts or a dict
 
-            except AttributeError:
+            except (AttributeError, TypeError):
                 msg = 'Only serialize Serializable objects or list of Serializables'
                 raise SerializationException(msg)
 
-        return self.serializer.serialize(newobj)
+        message = self.serializer.serialize(newobj)
+        if self.compressor:
+            return self.compressor.compress(message)
+        return message
 
     def deserialize(self, message):
+        """
+        :param message: an encoded, serialized object, as bytes or any other
+                        object that supports the buffer protocol (such as a
+                        memoryview), which isn't copied
+        """
         # NOTE:  unpacked is expected to be a dict or list of dicts
 
         try:
+            message = PayloadCompressor.decompress(message)
             unpacked = self.serializer.deserialize(message)
 
             if not unpacked:
                 return None
 
-            yosai = __import__('yosai.core')
-            try:
-                cls = getattr(yosai.core, unpacked['serialized_cls'])
-                return cls.deserialize(unpacked)  # only serializables wont raise
-            except (AttributeError, TypeError):
-                # assume that its a list of Serializables
-                newlist = []
-                for element in unpacked:
-                    cls = getattr(yosai.core, element['serialized_cls'])
-                    newlist.append(cls.deserialize(element))
-                return newlist
+            if isinstance(unpacked, list):
+                return [self.from_dict(self.lookup(element), element)
+                        for element in unpacked]
+
+            return self.from_dict(self.lookup(unpacked), unpacked)
 
         except AttributeError:
             if message is None:  # a cache returns None when cache entry expires
@@ -119,35 +264,473 @@ class SerializationManager:
             msg = 'Only de-serialize Serializable objects or list of Serializables'
             raise SerializationException(msg)
 
+    def deserialize_stream(self, buffer):
+        """
+        De-serializes a buffer of consecutive, uncompressed messages, such as
+        those read from a socket, yielding an object per message.  Only formats
+        whose Serializer has a deserialize_stream method support streaming.
+
+        :param buffer: bytes or any other object supporting the buffer protocol
+        :returns: a generator of Serializables (or lists of Serializables)
+        """
+        try:
+            stream = self.serializer.deserialize_stream
+        except AttributeError:
+            msg = 'The {0} format does not support streaming'.format(
+                self.format)
+            raise InvalidSerializationFormatException(msg)
+
+        for unpacked in stream(buffer):
+            if isinstance(unpacked, list):
+                yield [self.from_dict(self.lookup(element), element)
+                       for element in unpacked]
+            else:
+                yield self.from_dict(self.lookup(unpacked), unpacked)
+
+    @staticmethod
+    def lookup(unpacked):
+        """
+        :param unpacked: a de-serialized, enveloped dict
+        :returns: the Serializable class that the dict represents
+        """
+        try:
+            tag = unpacked[type_key]
+        except KeyError:
+            try:
+                tag = unpacked[legacy_type_key]
+            except KeyError:
+                msg = 'Could not find the type tag of a serialized object'
+                raise SerializationException(msg)
+        return type_registry.lookup(tag)
+
+    def deserialize_lazily(self, message):
+        """
+        :returns: a LazyPayload that de-serializes message upon first use, or
+                  None when there is no message
+        """
+        if message is None:
+            return None
+        return LazyPayload(message, self)
+
+
+class LazyPayload:
+    """
+    A LazyPayload wraps a serialized payload, de-serializing it only upon first
+    access of an attribute of the object that it represents.  Until then, the
+    payload may be forwarded elsewhere as-is (such as when replicating a
+    session from one cache to another) without ever being de-serialized.
+
+        session = LazyPayload(payload, serialization_manager)
+        cache_handler.set_raw('session', session_id, session.payload)
+        session.session_id  # de-serializes
+    """
+
+    __slots__ = ('payload', 'serialization_manager', '_obj')
+
+    def __init__(self, payload, serialization_manager):
+        """
+        :param payload: the serialized bytes
+        :type serialization_manager: SerializationManager
+        """
+        self.payload = payload
+        self.serialization_manager = serialization_manager
+        self._obj = None
+
+    @property
+    def is_deserialized(self):
+        return self._obj is not None
+
+    def unwrap(self):
+        """
+        :returns: the de-serialized object
+        """
+        if self._obj is None:
+            self._obj = self.serialization_manager.deserialize(self.payload)
+        return self._obj
+
+    def __getattr__(self, name):
+        return getattr(self.unwrap(), name)
+
+    def __eq__(self, other):
+        if isinstance(other, LazyPayload):
+            other = other.unwrap()
+        return self.unwrap() == other
+
+    def __repr__(self):
+        if self._obj is None:
+            return "LazyPayload({0} bytes)".format(len(self.payload))
+        return "LazyPayload({0})".format(self._obj)
+
+
+class PayloadCompressor:
+    """
+    A PayloadCompressor compresses encoded payloads that are at least
+    ``threshold`` bytes long, using a codec from the standard library.  Small
+    payloads are left as they are, as are those that don't shrink.
+
+    A compressed payload is tagged with a two-byte header:  a marker byte
+    followed by a byte identifying the codec.  The marker, 0xc1, is never used
+    by msgpack and is never valid utf-8, so it can't begin an uncompressed
+    msgpack or json payload.  Consequently, decompress may be called on any
+    payload, returning untagged payloads unchanged.
+    """
+
+    marker = b'\xc1'
+
+    # codec name: (tag, compress, decompress, compression level keyword)
+    codecs = {'zlib': (b'z', zlib.compress, zlib.decompress, 'level'),
+              'bz2': (b'b', bz2.compress, bz2.decompress, 'compresslevel'),
+              'lzma': (b'x', lzma.compress, lzma.decompress, 'preset')}
+
+    decompressors = {tag: decompress
+                     for tag, _, decompress, _ in codecs.values()}
+
+    def __init__(self, threshold=1024, codec='zlib', level=None):
+        """
+        :param threshold: the minimum size, in bytes, of a payload to compress
+        :param codec: the name of the codec: zlib, bz2 or lzma
+        :param level: the codec's compression level, or None for its default
+        """
+        try:
+            self.tag, compress, _, level_keyword = self.codecs[codec]
+        except KeyError:
+            msg = 'Could not locate compression codec: {0}'.format(codec)
+            raise InvalidSerializationFormatException(msg)
+
+        if level is not None:
+            compress = functools.partial(compress, **{level_keyword: level})
+
+        self.codec = codec
+        self.threshold = threshold
+        self.level = level
+        self._compress = compress
+
+    def compress(self, payload):
+        """
+        :type payload: bytes
+        :returns: the tagged, compressed payload or the payload, unchanged
+        """
+        if len(payload) < self.threshold:
+            return payload
+
+        compressed = self._compress(payload)
+        if len(compressed) + 2 >= len(payload):
+            return payload
+
+        return self.marker + self.tag + compressed
+
+    @classmethod
+    def decompress(cls, message):
+        """
+        :returns: the decompressed payload, or the message if it isn't tagged
+        """
+        # message may be any buffer, so it is inspected without copying it:
+        if not message or message[0] != cls.marker[0]:
+            return message
+
+        try:
+            decompress = cls.decompressors[bytes(message[1:2])]
+            return decompress(memoryview(message)[2:])
+        except (KeyError, zlib.error, OSError, lzma.LZMAError):
+            msg = 'Failed to decompress a tagged payload'
+            raise SerializationException(msg)
+
+    def __repr__(self):
+        return ("PayloadCompressor(threshold={0}, codec={1}, level={2})".
+                format(self.threshold, self.codec, self.level))
+
+
+# Native Temporal Types
+# ---------------------
+# datetimes and timedeltas are encoded natively, as integer microseconds since
+# the unix epoch (datetimes) or in total (timedeltas), so that de-serializing
+# them never parses a string.  Naive datetimes are taken to be utc, as
+# marshmallow does, and are de-serialized as tz-aware utc datetimes.
+epoch = datetime.datetime(1970, 1, 1, tzinfo=pytz.utc)
+one_microsecond = datetime.timedelta(microseconds=1)
+
+
+def datetime_to_micros(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=pytz.utc)
+    return (value - epoch) // one_microsecond
+
+
+def micros_to_datetime(micros):
+    return epoch + datetime.timedelta(microseconds=micros)
+
+
+def timedelta_to_micros(value):
+    return value // one_microsecond
+
+
+def micros_to_timedelta(micros):
+    return datetime.timedelta(microseconds=micros)
+
 
 class JSONSerializer(serialize_abcs.Serializer):
+    """
+    json has no extension mechanism, so datetimes and timedeltas are encoded as
+    single-entry objects keyed by a type tag:  {"~dt": micros}, {"~td": micros}
+
+    So that no other object is mistaken for one, the key of every other
+    single-entry object whose key begins with '~' (such as a session
+    attribute's) is escaped with another '~', which is removed when decoding.
+    """
+
+    # type: (tag, encode), tag: decode
+    encoders = {datetime.datetime: ('~dt', datetime_to_micros),
+                datetime.timedelta: ('~td', timedelta_to_micros)}
+    decoders = {'~dt': micros_to_datetime,
+                '~td': micros_to_timedelta}
+
+    @classmethod
+    def default(cls, obj):
+        try:
+            tag, encode = cls.encoders[obj.__class__]
+        except KeyError:
+            raise TypeError('{0} is not JSON serializable'.format(repr(obj)))
+        return {tag: encode(obj)}
+
+    @classmethod
+    def escape(cls, obj):
+        """
+        :returns: obj, or a copy of it whose tag-like keys are escaped
+        """
+        if isinstance(obj, dict):
+            if len(obj) == 1:
+                for key, value in obj.items():
+                    if isinstance(key, str) and key.startswith('~'):
+                        return {'~' + key: cls.escape(value)}
+            return {key: cls.escape(value) for key, value in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [cls.escape(value) for value in obj]
+        return obj
+
+    @classmethod
+    def object_hook(cls, obj):
+        if len(obj) == 1:
+            for tag, value in obj.items():
+                decode = cls.decoders.get(tag)
+                if decode is not None:
+                    return decode(value)
+                if tag.startswith('~~'):
+                    return {tag[1:]: value}
+        return obj
 
     @classmethod
     def serialize(self, obj):
-        return bytes(rapidjson.dumps(obj), 'utf-8')
+        return bytes(rapidjson.dumps(self.escape(obj), default=self.default),
+                     'utf-8')
 
     @classmethod
     def deserialize(self, message):
+        # rapidjson only reads str, bytes and bytearray, so other buffers are
+        # copied
+        if not isinstance(message, (bytes, bytearray, str)):
+            message = bytes(message)
         try:
-            return rapidjson.loads(message, encoding='utf-8')
+            return rapidjson.loads(message, object_hook=self.object_hook)
         except:
             return None
 
 
 class MSGPackSerializer(serialize_abcs.Serializer):
+    """
+    datetimes and timedeltas are encoded as msgpack extension types, each
+    carrying a big-endian, signed 64-bit integer.  Further extension types may
+    be registered with register_ext_type.
+    """
+
+    # type: (code, encode), code: decode
+    encoders = {}
+    decoders = {}
+
+    @classmethod
+    def register_ext_type(cls, code, ext_cls, encode, decode):
+        """
+        :param code: the msgpack extension type code, from 0 to 127
+        :param ext_cls: the (exact) class of the objects to encode
+        :param encode: a function that converts an object to bytes
+        :param decode: a function that converts bytes to an object
+        """
+        cls.encoders[ext_cls] = (code, encode)
+        cls.decoders[code] = decode
+
+    @classmethod
+    def default(cls, obj):
+        try:
+            code, encode = cls.encoders[obj.__class__]
+        except KeyError:
+            raise TypeError('{0} is not msgpack serializable'.format(repr(obj)))
+        return msgpack.ExtType(code, encode(obj))
+
+    @classmethod
+    def ext_hook(cls, code, data):
+        decode = cls.decoders.get(code)
+        if decode is None:
+            return msgpack.ExtType(code, data)
+        return decode(data)
+
+    @classmethod
+    def serialize(self, obj):
+        return msgpack.packb(obj, default=self.default)
+
+    @classmethod
+    def deserialize(self, message):
+        try:
+            return msgpack.unpackb(message, encoding='utf-8',
+                                   ext_hook=self.ext_hook)
+        except:
+            return None
+
+    @classmethod
+    def deserialize_stream(self, buffer):
+        """
+        Unpacks consecutive messages from buffer, yielding each in turn.
+
+        :raises SerializationException: when the buffer ends mid-message
+        """
+        buffer = memoryview(buffer)
+        unpacker = msgpack.Unpacker(encoding='utf-8', ext_hook=self.ext_hook,
+                                    max_buffer_size=0)
+        unpacker.feed(buffer)
+        yield from unpacker
+
+        if unpacker.tell() != buffer.nbytes:
+            msg = 'A msgpack stream ended in the middle of a message'
+            raise SerializationException(msg)
+
+
+int64 = struct.Struct('>q')
+
+MSGPackSerializer.register_ext_type(
+    1, datetime.datetime,
+    lambda value: int64.pack(datetime_to_micros(value)),
+    lambda data: micros_to_datetime(int64.unpack(data)[0]))
+
+MSGPackSerializer.register_ext_type(
+    2, datetime.timedelta,
+    lambda value: int64.pack(timedelta_to_micros(value)),
+    lambda data: micros_to_timedelta(int64.unpack(data)[0]))
+
+
+class PickleSerializer(serialize_abcs.Serializer):
+    """
+    pickle encodes datetimes and timedeltas, along with everything else,
+    natively, using the highest protocol that the interpreter supports (5, as
+    of python 3.8).
+
+    CAUTION:  un-pickling runs code of the payload's choosing.  Use pickle only
+    for internal caches that no untrusted party can write to.
+    """
+
+    protocol = pickle.HIGHEST_PROTOCOL
 
     @classmethod
     def serialize(self, obj):
-        return msgpack.packb(obj)
+        return pickle.dumps(obj, protocol=self.protocol)
 
     @classmethod
     def deserialize(self, message):
         try:
-            return msgpack.unpackb(message, encoding='utf-8')
+            return pickle.loads(message)
         except:
             return None
 
 
+class MarshalSerializer(serialize_abcs.Serializer):
+    """
+    marshal is the most compact and, for python's core types, fastest encoding
+    in the standard library.  Its format may change between python versions,
+    so use it only for caches shared by processes of one interpreter version.
+
+    marshal doesn't encode datetimes and timedeltas, so they're converted to
+    tagged tuples:  ('~dt', micros) and ('~td', micros).  Serialized dicts never
+    contain tuples otherwise.
+    """
+
+    encoders = JSONSerializer.encoders
+    decoders = JSONSerializer.decoders
+
+    @classmethod
+    def to_marshallable(cls, obj):
+        obj_cls = obj.__class__
+        if obj_cls is dict:
+            return {key: cls.to_marshallable(value)
+                    for key, value in obj.items()}
+        if obj_cls is list:
+            return [cls.to_marshallable(value) for value in obj]
+        encoder = cls.encoders.get(obj_cls)
+        if encoder is None:
+            return obj
+        tag, encode = encoder
+        return (tag, encode(obj))
+
+    @classmethod
+    def from_marshallable(cls, obj):
+        obj_cls = obj.__class__
+        if obj_cls is dict:
+            return {key: cls.from_marshallable(value)
+                    for key, value in obj.items()}
+        if obj_cls is list:
+            return [cls.from_marshallable(value) for value in obj]
+        if obj_cls is tuple:
+            tag, value = obj
+            return cls.decoders[tag](value)
+        return obj
+
+    @classmethod
+    def serialize(self, obj):
+        return marshal.dumps(self.to_marshallable(obj))
+
+    @classmethod
+    def deserialize(self, message):
+        try:
+            return self.from_marshallable(marshal.loads(message))
+        except:
+            return None
+
+
+for format, serializer in [('msgpack', MSGPackSerializer),
+                           ('json', JSONSerializer),
+                           ('pickle', PickleSerializer),
+                           ('marshal', MarshalSerializer)]:
+    SerializationManager.register_serializer(format, serializer)
+
+
+class NativeDateTime(fields.DateTime):
+    """
+    A DateTime field that leaves datetimes as they are when serializing, for
+    the serializer to encode natively.  ISO strings, as written by earlier
+    releases, are still de-serialized.
+    """
+
+    def _serialize(self, value, attr, obj):
+        return value
+
+    def _deserialize(self, value, attr, data):
+        if isinstance(value, datetime.datetime):
+            return value
+        return super()._deserialize(value, attr, data)
+
+
+class NativeTimeDelta(fields.TimeDelta):
+    """
+    A TimeDelta field that leaves timedeltas as they are when serializing, for
+    the serializer to encode natively.  Integer seconds, as written by earlier
+    releases, are still de-serialized.
+    """
+
+    def _serialize(self, value, attr, obj):
+        return value
+
+    def _deserialize(self, value, attr, data):
+        if isinstance(value, datetime.timedelta):
+            return value
+        return super()._deserialize(value, attr, data)
+
+
 class CollectionDict(fields.Dict):
 
     def __init__(self, child, *args, **kwargs):
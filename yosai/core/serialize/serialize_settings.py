@@ -0,0 +1,25 @@
+from yosai.core import (
+    settings,
+)
+
+
+class SerializationSettings:
+    """
+    SerializationSettings is a settings proxy.  It obtains the serialization
+    configuration from Yosai's global settings and default values if there
+    aren't any.
+    """
+    def __init__(self):
+        serialization_config = settings.SERIALIZATION_CONFIG or {}
+
+        self.format = serialization_config.get('format', 'msgpack')
+
+        # format name: import path of a Serializer, as 'package.module:Class'
+        self.serializers = serialization_config.get('serializers') or {}
+
+    def __repr__(self):
+        return ("SerializationSettings(format={0}, serializers={1})".
+                format(self.format, self.serializers))
+
+# initalize module-level settings:
+serialization_settings = SerializationSettings()
@@ -33,6 +33,8 @@ class Session(metaclass=ABCMeta):
     frameworks.
     """
 
+    __slots__ = ()  # so that implementations may be slotted
+
     @property
     @abstractmethod
     def session_id(self):
@@ -258,6 +260,8 @@ class SessionStorageEvaluator(metaclass=ABCMeta):
 
 class ValidatingSession(Session):
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def is_valid(self):
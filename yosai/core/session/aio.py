@@ -0,0 +1,603 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+asyncio counterparts of the session store, session handler and session
+manager, for use under an event loop (such as by an ASGI application).  They
+require python 3.5 or later, so yosai.core doesn't import them:
+
+    from yosai.core.cache.aio import AsyncMemoryCacheHandler
+    from yosai.core.session.aio import AsyncNativeSessionManager
+
+    session_manager = AsyncNativeSessionManager()
+    session_manager.cache_handler = AsyncMemoryCacheHandler()
+    session_manager.event_bus = event_bus
+
+    session = await session_manager.start(DefaultSessionContext())
+    await session.set_attribute('cart', cart)
+
+Sessions are the same SimpleSessions, so validation and expiry (see
+SimpleSession.validate), touch throttling and change tracking behave as
+they do for the synchronous DefaultNativeSessionManager, as do session ids,
+events and the cached format of sessions.
+"""
+
+import logging
+from abc import ABCMeta, abstractmethod
+
+from yosai.core import (
+    CacheException,
+    CachingSessionStore,
+    DefaultNativeSessionHandler,
+    DefaultSessionKey,
+    ExpiredSessionException,
+    IllegalStateException,
+    InvalidSessionException,
+    RandomSessionIDGenerator,
+    SessionCacheException,
+    SessionCreationException,
+    SessionEventHandler,
+    SimpleSessionFactory,
+    UnknownSessionException,
+    event_abcs,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSessionStore(metaclass=ABCMeta):
+
+    @abstractmethod
+    async def create(self, session):
+        """
+        :returns: the session_id of the new session
+        """
+        pass
+
+    @abstractmethod
+    async def read(self, session_id):
+        pass
+
+    @abstractmethod
+    async def update(self, session):
+        pass
+
+    @abstractmethod
+    async def delete(self, session):
+        pass
+
+
+class AsyncCachingSessionStore(AsyncSessionStore):
+    """
+    The counterpart of a CachingSessionStore, which caches sessions using an
+    AsyncCacheHandler.  Sessions are cached as a CachingSessionStore caches
+    them, so both may share a cache, including each user's sessions, which
+    are kept as a list of session keys by an AsyncCacheHandler that doesn't
+    support hash entries.
+
+    Unlike a CachingSessionStore, it keeps no expiration index, as there is no
+    asyncio counterpart of the session validation scheduler to drain one.
+    How a user's sessions are kept is decided by the CachingSessionStore:
+    this store only awaits the cache.
+    """
+
+    identifier_sessions_domain = 'identifier_sessions'
+
+    def __init__(self):
+        self.session_id_generator = RandomSessionIDGenerator()
+        self.cache_handler = None
+
+    async def create(self, session):
+        session_id = self.session_id_generator.generate_id(session)
+        session.session_id = session_id
+        await self._cache(session, session_id)
+        await self._cache_identifiers_to_key_map(session, session_id)
+        return session_id
+
+    async def read(self, session_id):
+        """
+        :returns: the session, or None when it isn't cached
+        """
+        try:
+            return await self.cache_handler.get(domain='session',
+                                                identifier=session_id)
+        except AttributeError:
+            msg = "no cache parameter nor lazy-defined cache"
+            logger.warning(msg)
+            return None
+
+    async def update(self, session):
+        if not session.is_valid:
+            await self.delete(session)
+            return
+
+        await self._cache(session, session.session_id)
+        if CachingSessionStore.changes_user(session):
+            await self._cache_identifiers_to_key_map(session,
+                                                     session.session_id)
+
+    async def delete(self, session):
+        session_id = session.session_id
+        try:
+            await self.cache_handler.delete(domain='session',
+                                            identifier=session_id)
+        except AttributeError:
+            msg = "Cannot uncache without a cache_handler."
+            raise SessionCacheException(msg)
+
+        identifier = CachingSessionStore.user_of(session)
+        if identifier is not None:
+            await self._remove_session_ids(identifier, [session_id])
+
+    async def session_ids_of(self, identifier):
+        """
+        :returns: a list of the ids of the user's sessions
+        """
+        try:
+            fields = await self.cache_handler.hgetall(
+                domain=self.identifier_sessions_domain, identifier=identifier)
+        except CacheException:
+            return [session_key.session_id for session_key
+                    in await self._get_session_keys(identifier)]
+        return CachingSessionStore.session_ids_from_fields(fields)
+
+    async def delete_sessions(self, identifier, session_ids):
+        session_ids = list(session_ids)
+        if not session_ids:
+            return
+
+        await self.cache_handler.delete_many(domain='session',
+                                             identifiers=session_ids)
+        await self._remove_session_ids(identifier, session_ids)
+
+    async def _get_session_keys(self, identifier):
+        # see CachingSessionStore._get_session_keys
+        return await self.cache_handler.get(
+            domain=self.identifier_sessions_domain,
+            identifier=identifier) or []
+
+    async def _remove_session_ids(self, identifier, session_ids):
+        try:
+            await self.cache_handler.hdel(
+                domain=self.identifier_sessions_domain,
+                identifier=identifier, fields=session_ids)
+        except CacheException:
+            remaining = CachingSessionStore.session_keys_without(
+                await self._get_session_keys(identifier), session_ids)
+            if remaining is None:
+                return
+            if remaining:
+                await self.cache_handler.set(
+                    domain=self.identifier_sessions_domain,
+                    identifier=identifier, value=remaining)
+            else:
+                await self.cache_handler.delete(
+                    domain=self.identifier_sessions_domain,
+                    identifier=identifier)
+
+    async def _cache(self, session, session_id):
+        try:
+            await self.cache_handler.set(domain='session',
+                                         identifier=session_id, value=session)
+        except AttributeError:
+            msg = "Cannot cache without a cache_handler."
+            raise SessionCacheException(msg)
+
+    async def _cache_identifiers_to_key_map(self, session, session_id):
+        identifier = CachingSessionStore.user_of(session)
+        if identifier is None:
+            return
+        try:
+            await self.cache_handler.hset(
+                domain=self.identifier_sessions_domain,
+                identifier=identifier, mapping={session_id: b''})
+        except CacheException:
+            session_keys = CachingSessionStore.session_keys_with(
+                await self._get_session_keys(identifier), session_id)
+            if session_keys is not None:
+                await self.cache_handler.set(
+                    domain=self.identifier_sessions_domain,
+                    identifier=identifier, value=session_keys)
+
+    def __repr__(self):
+        return "AsyncCachingSessionStore(cache_handler={0})".format(
+            self.cache_handler)
+
+
+class AsyncNativeSessionHandler(event_abcs.EventBusAware):
+    """
+    The counterpart of a DefaultNativeSessionHandler, whose events are built
+    by DefaultNativeSessionHandler.session_event.
+    """
+
+    def __init__(self, session_event_handler, auto_touch=False,
+                 delete_invalid_sessions=True):
+        self.delete_invalid_sessions = delete_invalid_sessions
+        self.session_store = AsyncCachingSessionStore()
+        self.session_event_handler = session_event_handler
+        self.auto_touch = auto_touch
+
+    @property
+    def cache_handler(self):
+        return self.session_store.cache_handler
+
+    @cache_handler.setter
+    def cache_handler(self, cachehandler):
+        self.session_store.cache_handler = cachehandler
+
+    @property
+    def event_bus(self):
+        return self.session_event_handler.event_bus
+
+    @event_bus.setter
+    def event_bus(self, eventbus):
+        self.session_event_handler.event_bus = eventbus
+
+    async def create_session(self, session):
+        """
+        :returns: a session_id string
+        """
+        session_id = await self.session_store.create(session)
+        session.mark_clean()
+        return session_id
+
+    async def delete(self, session):
+        await self.session_store.delete(session)
+
+    async def do_get_session(self, session_key):
+        """
+        :returns: SimpleSession
+        :raises UnknownSessionException: when there is no such session
+        """
+        session_id = session_key.session_id
+        if session_id is None:
+            return None
+
+        session = await self.session_store.read(session_id)
+        if session is None:
+            msg = "Could not find session with ID [{0}]".format(session_id)
+            raise UnknownSessionException(msg)
+
+        await self.validate(session, session_key)
+        if self.auto_touch:
+            session.touch()
+            await self.on_change(session)
+        return session
+
+    async def validate(self, session, session_key):
+        # session exception hierarchy:  invalid -> stopped -> expired
+        try:
+            session.validate()  # can raise Stopped or Expired exceptions
+        except ExpiredSessionException as ese:
+            await self.on_expiration(session, ese, session_key)
+            raise ese
+        except InvalidSessionException as ise:
+            await self.on_invalidation(session, ise, session_key)
+            raise ise
+
+    async def on_stop(self, session):
+        session.last_access_time = session.stop_timestamp
+        await self.on_change(session)
+
+    async def after_stopped(self, session):
+        if self.delete_invalid_sessions:
+            await self.delete(session)
+
+    async def on_expiration(self, session, expired_session_exception,
+                            session_key):
+        try:
+            await self.on_change(session)
+            msg = "Session with id [{0}] has expired.".format(
+                session.session_id)
+            logger.debug(msg)
+
+            self.session_event_handler.notify_expiration(
+                DefaultNativeSessionHandler.session_event(session,
+                                                          session_key))
+        finally:
+            if self.delete_invalid_sessions:
+                await self.delete(session)
+
+    async def on_invalidation(self, session, ise, session_key):
+        if isinstance(ise, ExpiredSessionException):
+            await self.on_expiration(session, ise, session_key)
+            return
+
+        msg = "Session with id [{0}] is invalid.".format(session.session_id)
+        logger.debug(msg)
+
+        try:
+            await self.on_stop(session)
+            self.session_event_handler.notify_stop(
+                DefaultNativeSessionHandler.session_event(session,
+                                                          session_key))
+        finally:
+            await self.after_stopped(session)
+
+    async def on_change(self, session):
+        """
+        Writes the session, unless it has no changes
+        """
+        if self.auto_touch and not session.is_stopped:
+            session.touch()
+
+        if not session.is_dirty:
+            return
+
+        await self.session_store.update(session)
+        session.mark_clean()
+
+
+class AsyncDelegatingSession:
+    """
+    The counterpart of a DelegatingSession, whose methods are coroutines.
+    """
+
+    def __init__(self, session_manager, session_key):
+        self.session_key = session_key
+        self.session_manager = session_manager
+
+    @property
+    def session_id(self):
+        return self.session_key.session_id
+
+    async def touch(self):
+        await self.session_manager.touch(self.session_key)
+
+    async def stop(self, identifiers):
+        await self.session_manager.stop(self.session_key, identifiers)
+
+    async def get_internal_attribute(self, attribute_key):
+        return await self.session_manager.get_internal_attribute(
+            self.session_key, attribute_key)
+
+    async def set_internal_attribute(self, attribute_key, value=None):
+        await self.session_manager.set_internal_attribute(
+            self.session_key, attribute_key, value)
+
+    async def remove_internal_attribute(self, attribute_key):
+        return await self.session_manager.remove_internal_attribute(
+            self.session_key, attribute_key)
+
+    async def get_attribute_keys(self):
+        return await self.session_manager.get_attribute_keys(self.session_key)
+
+    async def get_attribute(self, attribute_key):
+        return await self.session_manager.get_attribute(self.session_key,
+                                                        attribute_key)
+
+    async def set_attribute(self, attribute_key, value=None):
+        await self.session_manager.set_attribute(self.session_key,
+                                                 attribute_key, value)
+
+    async def remove_attribute(self, attribute_key):
+        return await self.session_manager.remove_attribute(self.session_key,
+                                                           attribute_key)
+
+    def __repr__(self):
+        return "AsyncDelegatingSession(session_id: {0})".format(
+            self.session_id)
+
+
+class AsyncNativeSessionManager(event_abcs.EventBusAware):
+    """
+    The counterpart of a DefaultNativeSessionManager, whose methods are
+    coroutines that await the cache rather than block on it.
+    """
+
+    def __init__(self):
+        self.session_factory = SimpleSessionFactory()
+        self.session_event_handler = SessionEventHandler()
+        self.session_handler = AsyncNativeSessionHandler(
+            session_event_handler=self.session_event_handler, auto_touch=True)
+        self._event_bus = None
+
+    @property
+    def cache_handler(self):
+        return self.session_handler.cache_handler
+
+    @cache_handler.setter
+    def cache_handler(self, cachehandler):
+        self.session_handler.cache_handler = cachehandler
+
+    @property
+    def event_bus(self):
+        return self._event_bus
+
+    @event_bus.setter
+    def event_bus(self, eventbus):
+        self._event_bus = eventbus
+        self.session_event_handler.event_bus = eventbus
+
+    # -------------------------------------------------------------------------
+    # Session Lifecycle Methods
+    # -------------------------------------------------------------------------
+
+    async def start(self, session_context):
+        """
+        :returns: AsyncDelegatingSession
+        """
+        session = self.session_factory.create_session(session_context)
+        session_id = await self.session_handler.create_session(session)
+        if not session_id:
+            msg = 'Failed to obtain a sessionid while creating session.'
+            raise SessionCreationException(msg)
+
+        self.session_event_handler.notify_start(session)
+        return self.create_exposed_session(session)
+
+    async def stop(self, session_key, identifiers):
+        session = await self._lookup_required_session(session_key)
+        try:
+            msg = "Stopping session with id [{0}]".format(session.session_id)
+            logger.debug(msg)
+
+            session.stop()
+            await self.session_handler.on_stop(session)
+
+            self.session_event_handler.notify_stop(
+                DefaultNativeSessionHandler.session_event(
+                    session, session_key, identifiers))
+        finally:
+            await self.session_handler.after_stopped(session)
+
+    async def revoke_all_sessions(self, identifier):
+        """
+        Stops every session of a user, deleting them at once.
+
+        :returns: the number of sessions stopped
+        """
+        session_store = self.session_handler.session_store
+        if not hasattr(session_store, 'session_ids_of'):
+            msg = ("{0} can't find a user's sessions".
+                   format(session_store.__class__.__name__))
+            raise IllegalStateException(msg)
+
+        session_ids = await session_store.session_ids_of(identifier)
+        stopped = []
+        for session_id in session_ids:
+            session = await session_store.read(session_id)
+            if session is not None:
+                session.stop()
+                stopped.append(session)
+
+        await session_store.delete_sessions(identifier, session_ids)
+
+        for session in stopped:
+            self.session_event_handler.notify_stop(
+                DefaultNativeSessionHandler.session_event(
+                    session, DefaultSessionKey(session.session_id)))
+        return len(stopped)
+
+    def create_exposed_session(self, session, key=None):
+        return AsyncDelegatingSession(self,
+                                      DefaultSessionKey(session.session_id))
+
+    # -------------------------------------------------------------------------
+    # Session Lookup Methods
+    # -------------------------------------------------------------------------
+
+    async def get_session(self, key):
+        """
+        :returns: AsyncDelegatingSession, or None
+        """
+        session = await self.session_handler.do_get_session(key)
+        if session:
+            return self.create_exposed_session(session, key)
+        return None
+
+    async def _lookup_required_session(self, key):
+        session = await self.session_handler.do_get_session(key)
+        if not session:
+            msg = ("Unable to locate required Session instance based "
+                   "on session_key [" + str(key) + "].")
+            raise UnknownSessionException(msg)
+        return session
+
+    async def is_valid(self, session_key):
+        try:
+            await self.check_valid(session_key)
+            return True
+        except InvalidSessionException:
+            return False
+
+    async def check_valid(self, session_key):
+        await self._lookup_required_session(session_key)
+
+    # -------------------------------------------------------------------------
+    # Session Attribute Methods
+    # -------------------------------------------------------------------------
+
+    async def get_start_timestamp(self, session_key):
+        return (await self._lookup_required_session(session_key)).\
+            start_timestamp
+
+    async def get_last_access_time(self, session_key):
+        return (await self._lookup_required_session(session_key)).\
+            last_access_time
+
+    async def get_absolute_timeout(self, session_key):
+        return (await self._lookup_required_session(session_key)).\
+            absolute_timeout
+
+    async def get_idle_timeout(self, session_key):
+        return (await self._lookup_required_session(session_key)).idle_timeout
+
+    async def set_idle_timeout(self, session_key, idle_time):
+        session = await self._lookup_required_session(session_key)
+        session.idle_timeout = idle_time
+        await self.session_handler.on_change(session)
+
+    async def set_absolute_timeout(self, session_key, absolute_time):
+        session = await self._lookup_required_session(session_key)
+        session.absolute_timeout = absolute_time
+        await self.session_handler.on_change(session)
+
+    async def touch(self, session_key):
+        session = await self._lookup_required_session(session_key)
+        session.touch()
+        await self.session_handler.on_change(session)
+
+    async def get_host(self, session_key):
+        return (await self._lookup_required_session(session_key)).host
+
+    async def get_internal_attribute(self, session_key, attribute_key):
+        session = await self._lookup_required_session(session_key)
+        return session.get_internal_attribute(attribute_key)
+
+    async def set_internal_attribute(self, session_key, attribute_key,
+                                     value=None):
+        if value is None:
+            await self.remove_internal_attribute(session_key, attribute_key)
+        else:
+            session = await self._lookup_required_session(session_key)
+            session.set_internal_attribute(attribute_key, value)
+            await self.session_handler.on_change(session)
+
+    async def remove_internal_attribute(self, session_key, attribute_key):
+        session = await self._lookup_required_session(session_key)
+        removed = session.remove_internal_attribute(attribute_key)
+        if removed is not None:
+            await self.session_handler.on_change(session)
+        return removed
+
+    async def get_attribute_keys(self, session_key):
+        session = await self._lookup_required_session(session_key)
+        return tuple(session.attribute_keys or ())
+
+    async def get_attribute(self, session_key, attribute_key):
+        session = await self._lookup_required_session(session_key)
+        return session.get_attribute(attribute_key)
+
+    async def set_attribute(self, session_key, attribute_key, value=None):
+        if value is None:
+            await self.remove_attribute(session_key, attribute_key)
+        else:
+            session = await self._lookup_required_session(session_key)
+            session.set_attribute(attribute_key, value)
+            await self.session_handler.on_change(session)
+
+    async def remove_attribute(self, session_key, attribute_key):
+        session = await self._lookup_required_session(session_key)
+        removed = session.remove_attribute(attribute_key)
+        if removed is not None:
+            await self.session_handler.on_change(session)
+        return removed
+
+    def __repr__(self):
+        return "AsyncNativeSessionManager(cache_handler={0})".format(
+            self.cache_handler)
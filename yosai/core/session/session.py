@@ -17,15 +17,27 @@ specific language governing permissions and limitations
 under the License.
 """
 import collections
+import collections.abc
+import contextlib
+import heapq
 import logging
+import math
 import pytz
 import datetime
+import threading
+import time
 from abc import abstractmethod
 
-from marshmallow import Schema, fields, post_load
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+from marshmallow import Schema, fields, post_dump, post_load, pre_dump
 
 from yosai.core import (
+    BloomFilter,
+    CacheException,
+    LatencyHistogram,
     MapContext,
+    NativeDateTime,
+    NativeTimeDelta,
     ExpiredSessionException,
     InvalidArgumentException,
     IllegalStateException,
@@ -33,9 +45,12 @@ from yosai.core import (
     memoized_property,
     RandomSessionIDGenerator,
     SimpleIdentifierCollection,
+    StoppableScheduledExecutor,
     SessionCacheException,
     SessionCreationException,
     SessionEventException,
+    SessionTokenException,
+    SerializationManager,
     StoppedSessionException,
     UnknownSessionException,
     session_settings,
@@ -47,6 +62,12 @@ from yosai.core import (
 
 logger = logging.getLogger(__name__)
 
+session_tuple = collections.namedtuple('session_tuple',
+                                       ['identifiers', 'session_key'])
+
+# instances of SimpleSession.AttributesSchema, re-used per thread:
+_attributes_schemas = threading.local()
+
 
 class AbstractSessionStore(session_abcs.SessionStore):
     """
@@ -120,44 +141,201 @@ class AbstractSessionStore(session_abcs.SessionStore):
         pass
 
 
+class SessionExpirationIndex:
+    """
+    An index of session ids by expiration (the earlier of a session's idle
+    and absolute expirations), kept as a min-heap so that the sessions that
+    expire soonest are found, and removed, in O(log n) time each.
+
+    An entry of the heap is superseded, rather than removed, when its
+    session's expiration changes or its session is discarded, and is dropped
+    once it reaches the top of the heap.  The heap is compacted whenever
+    superseded entries outnumber current ones.
+
+    A SessionExpirationIndex is thread-safe.
+    """
+
+    def __init__(self):
+        self.expirations = {}  # session_id: expiration, in epoch seconds
+        self._heap = []  # (expiration, session_id)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def expiration_of(session):
+        """
+        :returns: the epoch time at which session expires, or None when it
+                  has no timeout
+        """
+        expirations = [getattr(session, name, None) for name in
+                       ('idle_expiration', 'absolute_expiration')]
+        expirations = [each for each in expirations
+                       if isinstance(each, datetime.datetime)]
+        if not expirations:
+            return None
+        return min(expirations).timestamp()
+
+    def add(self, session_id, expiration):
+        """
+        Indexes a session, superseding its former expiration.
+
+        :param expiration: the epoch time at which the session expires, or
+                           None for a session that doesn't
+        """
+        with self._lock:
+            if expiration is None:
+                self.expirations.pop(session_id, None)
+                return
+
+            if self.expirations.get(session_id) == expiration:
+                return
+            self.expirations[session_id] = expiration
+            heapq.heappush(self._heap, (expiration, session_id))
+
+            if len(self._heap) > 2 * len(self.expirations) + 64:
+                self._heap = [(expiry, sid) for sid, expiry
+                              in self.expirations.items()]
+                heapq.heapify(self._heap)
+
+    def add_session(self, session):
+        self.add(session.session_id, self.expiration_of(session))
+
+    def discard(self, session_id):
+        with self._lock:
+            self.expirations.pop(session_id, None)
+
+    def pop_soonest(self):
+        """
+        Removes the session that expires soonest from the index.
+
+        :returns: its (expiration, session_id), or None when the index is
+                  empty
+        """
+        with self._lock:
+            while self._heap:
+                expiration, session_id = heapq.heappop(self._heap)
+                if self.expirations.get(session_id) == expiration:
+                    del self.expirations[session_id]
+                    return expiration, session_id
+            return None
+
+    def pop_expired(self, now, limit=None):
+        """
+        Removes sessions that expired before now from the index, soonest
+        first.
+
+        :param now: an epoch time
+        :param limit: the maximum number of sessions to remove, or None
+        :returns: a list of the ids of the sessions removed
+        """
+        expired = []
+        with self._lock:
+            heap = self._heap
+            while heap and heap[0][0] < now:
+                if limit is not None and len(expired) >= limit:
+                    break
+                expiration, session_id = heapq.heappop(heap)
+                if self.expirations.get(session_id) == expiration:
+                    del self.expirations[session_id]
+                    expired.append(session_id)
+        return expired
+
+    def __len__(self):
+        return len(self.expirations)
+
+    def __repr__(self):
+        return "SessionExpirationIndex({0} sessions)".format(len(self))
+
+
 class MemorySessionStore(AbstractSessionStore):
     """
-    Simple memory-based implementation of the SessionStore that stores all of its
-    sessions in an in-memory dict.  This implementation does not page
-    to disk and is therefore unsuitable for applications that could experience
-    a large amount of sessions and would therefore result in MemoryError
-    exceptions as the interpreter runs out of memory.  This class is *not*
-    recommended for production use in most environments.
+    A SessionStore that keeps sessions within process memory, for
+    single-process deployments and for testing.  It requires no CacheHandler.
+
+    Sessions are indexed by expiration with a SessionExpirationIndex, so that
+    expired sessions are found without scanning every session.  When
+    expire_on_write is enabled, as it is by default unless the session
+    validation scheduler is, expired sessions are removed (by remove_expired)
+    whenever a session is created or updated.  Otherwise, they are left for an
+    ExecutorServiceSessionValidationScheduler, which uses expired_sessions.
+
+    Either way, the expiration of each session is published:  a session
+    handler that is given this store sets its expiration_listener, to which
+    remove_expired passes each expired session, for the handler to validate
+    (publishing its expiration, which clears its cached authorization info)
+    and delete.  Without a listener, expired sessions are simply removed.
 
     Memory Restrictions
     -------------------
-    If your application is expected to host many sessions beyond what can be
-    stored in the memory available to the Python interpreter, it is highly
-    recommended that you use a different SessionStore implementation using a
-    more expansive or permanent backing data store.
-
-    Instead, use a custom CachingSessionStore implementation that communicates
-    with a higher-capacity data store of your choice (Redis, Memcached,
-    file system, rdbms, etc).
+    Configure max_sessions to bound the number of sessions kept.  Once the
+    store is full, and no session has expired, a new session either evicts the
+    session that would expire soonest (the 'soonest_expiration' policy, which
+    favors recently accessed sessions) or is refused with a
+    SessionCreationException (the 'reject' policy).  Sessions without a
+    timeout are never evicted.
+
+    For many sessions, or sessions shared among processes, use a
+    CachingSessionStore with a higher-capacity data store of your choice
+    (Redis, Memcached, file system, rdbms, etc).
+
+    A MemorySessionStore is thread-safe.
     """
 
-    def __init__(self):
+    eviction_policies = ('soonest_expiration', 'reject')
+
+    def __init__(self, max_sessions=None, eviction_policy='soonest_expiration',
+                 expire_on_write=None):
+        """
+        :param max_sessions: the maximum number of sessions kept, or None for
+                             no limit
+        :param eviction_policy: either 'soonest_expiration' or 'reject'
+        :param expire_on_write: whether to remove expired sessions whenever
+                                a session is created or updated, by default
+                                unless the session validation scheduler is
+                                enabled
+        """
+        super().__init__()  # obtains a session id generator
+
+        if eviction_policy not in self.eviction_policies:
+            msg = 'Unrecognized eviction_policy: {0}'.format(eviction_policy)
+            raise InvalidArgumentException(msg)
+
+        if expire_on_write is None:
+            expire_on_write = not session_settings.validation_scheduler_enable
+
+        self.max_sessions = max_sessions
+        self.eviction_policy = eviction_policy
+        self.expire_on_write = expire_on_write
+        self.expiration_listener = None  # set by a session handler
+        self.clock = time.time
         self.sessions = {}
+        self.expiration_index = SessionExpirationIndex()
+        self._lock = threading.RLock()
 
     def update(self, session):
-        return self.store_session(session.session_id, session)
+        if not getattr(session, 'is_valid', True):
+            self.delete(session)
+            return None
+
+        with self._lock:
+            self.sessions.pop(session.session_id, None)
+            session = self.store_session(session.session_id, session)
+        if self.expire_on_write:
+            self.remove_expired()
+        return session
 
     def delete(self, session):
         try:
             sessionid = session.session_id
-            self.sessions.pop(sessionid)
         except AttributeError:
             msg = 'MemorySessionStore.delete None param passed'
             raise InvalidArgumentException(msg)
-        except KeyError:
-            msg = ('MemorySessionStore could not delete ', str(sessionid),
-                   'because it does not exist in memory!')
-            logger.warning(msg)
+
+        with self._lock:
+            if self.sessions.pop(sessionid, None) is None:
+                msg = ('MemorySessionStore could not delete ', str(sessionid),
+                       'because it does not exist in memory!')
+                logger.warning(msg)
+            self.expiration_index.discard(sessionid)
 
     def store_session(self, session_id, session):
         # stores only if session doesn't already exist, returning the existing
@@ -166,17 +344,104 @@ class MemorySessionStore(AbstractSessionStore):
             msg = 'MemorySessionStore.store_session invalid param passed'
             raise InvalidArgumentException(msg)
 
-        return self.sessions.setdefault(session_id, session)
+        with self._lock:
+            stored = self.sessions.setdefault(session_id, session)
+            self.expiration_index.add(
+                session_id, self.expiration_index.expiration_of(stored))
+            return stored
+
+    def expired_sessions(self, now=None, limit=None):
+        """
+        Obtains sessions that have expired, soonest expired first, removing
+        them from the expiration index (but not from the store).
+
+        :param now: the epoch time to compare expirations to, by default now
+        :param limit: the maximum number of sessions to obtain, or None
+        :returns: a list of sessions
+        """
+        now = self.clock() if now is None else now
+        index = self.expiration_index
+        expired = []
+        with self._lock:
+            for session_id in index.pop_expired(now, limit):
+                session = self.sessions.get(session_id)
+                if session is None:
+                    continue
+                # a session touched since it was stored is indexed anew:
+                expiration = index.expiration_of(session)
+                if expiration is not None and expiration >= now:
+                    index.add(session_id, expiration)
+                else:
+                    expired.append(session)
+        return expired
+
+    def remove_expired(self, now=None):
+        """
+        Removes the sessions that have expired.  Each is passed to the
+        expiration_listener, when there is one, which publishes its expiration
+        and deletes it, outside of the store's lock.
+
+        :param now: the epoch time to compare expirations to, by default now
+        :returns: the ids of the sessions removed
+        """
+        listener = self.expiration_listener
+        with self._lock:
+            expired = self.expired_sessions(now)
+            if listener is None:
+                for session in expired:
+                    self.sessions.pop(session.session_id, None)
+
+        if listener is not None:
+            for session in expired:
+                listener(session)
+
+        removed = [session.session_id for session in expired]
+        if removed:
+            logger.debug('Removed {0} expired sessions'.format(len(removed)))
+        return removed
+
+    def _make_room(self):
+        if self.max_sessions is None:
+            return
+
+        index = self.expiration_index
+        while len(self.sessions) >= self.max_sessions:
+            soonest = (index.pop_soonest()
+                       if self.eviction_policy == 'soonest_expiration'
+                       else None)
+            if soonest is None:
+                msg = ('MemorySessionStore is full, holding {0} sessions'.
+                       format(len(self.sessions)))
+                raise SessionCreationException(msg)
+
+            expiration, session_id = soonest
+            session = self.sessions.get(session_id)
+            current = index.expiration_of(session)
+            if current is not None and current != expiration:
+                index.add(session_id, current)  # touched since it was stored
+                continue
+
+            self.sessions.pop(session_id, None)
+            msg = 'Evicted session [{0}] to make room for another'.format(
+                session_id)
+            logger.info(msg)
 
     def _do_create(self, session):
         sessionid = self.generate_session_id(session)
         self.assign_session_id(session, sessionid)
-        self.store_session(sessionid, session)
+        if self.expire_on_write:
+            self.remove_expired()
+        with self._lock:
+            self._make_room()
+            self.store_session(sessionid, session)
         return sessionid
 
     def _do_read(self, sessionid):
         return self.sessions.get(sessionid)
 
+    def __len__(self):
+        return len(self.sessions)
+
 
 class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
     """
@@ -220,11 +485,43 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
 
     Ref: https://en.wikipedia.org/wiki/Cache_%28computing%29#Writing_policies
 
+    Sessions by Identifier
+    ----------------------
+    The ids of each user's sessions are kept as the fields of a hash entry
+    (domain 'identifier_sessions'), keyed by the user's primary identifier,
+    so that a user may have several sessions at once and all of them can be
+    found without a scan.  A CacheHandler that doesn't support hash entries
+    keeps them as a list of session keys instead, which is read, changed and
+    written back whole, so concurrent logins of one user may lose a session
+    from the list.
+
+    Expiration Index
+    ----------------
+    The sessions cached by this store are indexed by expiration, so that an
+    ExecutorServiceSessionValidationScheduler finds expired sessions through
+    expired_sessions.  Unless expire_on_write is False, expired entries are
+    dropped from the index whenever a session is written, so that the index
+    stays bounded when no scheduler drains it (the sessions themselves leave
+    the cache on their own).
     """
 
-    def __init__(self):
+    identifier_sessions_domain = 'identifier_sessions'
+
+    def __init__(self, expire_on_write=None):
+        """
+        :param expire_on_write: whether to drop expired entries from the
+                                expiration index whenever a session is
+                                written, by default unless the validation
+                                scheduler is enabled
+        """
         super().__init__()  # obtains a session id generator
         self._cache_handler = None
+        self.clock = time.time
+        # the sessions cached by this store, for scheduled validation:
+        self.expiration_index = SessionExpirationIndex()
+        if expire_on_write is None:
+            expire_on_write = not session_settings.validation_scheduler_enable
+        self.expire_on_write = expire_on_write
 
     # cache_handler property is required for CacheHandlerAware interface
     @property
@@ -244,6 +541,7 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
         sessionid = super().create(session)
         self._cache(session, sessionid)
         self._cache_identifiers_to_key_map(session, sessionid)
+        self._index_expiration(session, sessionid)
         return sessionid
 
     def read(self, sessionid):
@@ -262,7 +560,10 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
 
         if (session.is_valid):
             self._cache(session, session.session_id)
-            self._cache_identifiers_to_key_map(session, session.session_id)
+            if self.changes_user(session):
+                self._cache_identifiers_to_key_map(session,
+                                                   session.session_id)
+            self._index_expiration(session, session.session_id)
         else:
             self._uncache(session)
 
@@ -271,6 +572,73 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
         # for write-through caching:
         # self._do_delete(session)
 
+    def _index_expiration(self, session, session_id):
+        index = self.expiration_index
+        index.add(session_id, index.expiration_of(session))
+        if self.expire_on_write:
+            index.pop_expired(self.clock())
+
+    def expired_sessions(self, now=None, limit=None):
+        """
+        Obtains the sessions that have expired, among those that this store
+        has cached, soonest expired first, removing them from the expiration
+        index.  Each is read from cache:  a session that has since been
+        touched (perhaps by another process) is indexed anew rather than
+        obtained, and one that has left the cache is skipped.
+
+        :param now: the epoch time to compare expirations to, by default now
+        :param limit: the maximum number of sessions to examine, or None
+        :returns: a list of sessions
+        """
+        now = self.clock() if now is None else now
+        index = self.expiration_index
+        expired = []
+        for session_id in index.pop_expired(now, limit):
+            session = self._get_cached_session(session_id)
+            if session is None:
+                continue
+            expiration = index.expiration_of(session)
+            if expiration is not None and expiration >= now:
+                index.add(session_id, expiration)
+            else:
+                expired.append(session)
+        return expired
+
+    def read_raw(self, sessionid):
+        """
+        Obtains a cached session as serialized bytes, without de-serializing
+        it, for callers that only forward the session elsewhere (such as
+        when replicating it).  Wrap the payload with a LazyPayload to
+        de-serialize it upon first use.
+
+        :returns: bytes, or None when the session isn't cached
+        """
+        try:
+            return self.cache_handler.get_raw(domain='session',
+                                              identifier=sessionid)
+        except AttributeError:
+            msg = "no cache parameter nor lazy-defined cache"
+            logger.warning(msg)
+
+        return None
+
+    def write_raw(self, sessionid, payload):
+        """
+        Caches an already-serialized session, such as one obtained from
+        read_raw, without serializing it again.  Unlike update, write_raw
+        doesn't cache the mapping from the session's primary identifier to its
+        session key, because that would require de-serializing the session.
+
+        :type payload: bytes
+        """
+        try:
+            self.cache_handler.set_raw(domain='session',
+                                       identifier=sessionid,
+                                       payload=payload)
+        except AttributeError:
+            msg = "Cannot cache without a cache_handler."
+            raise SessionCacheException(msg)
+
     # java overloaded methods combined:
     def _get_cached_session(self, sessionid):
         try:
@@ -283,25 +651,153 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
 
         return None
 
-    def _cache_identifiers_to_key_map(self, session, session_id):
+    def session_ids_of(self, identifier):
         """
-        creates a cache entry within a user's cache space that is used to
-        identify the active session associated with the user
-
-        when a session is associated with a user, it will have an identifiers
-        attribute
+        :param identifier: a user's primary identifier
+        :returns: a list of the ids of the user's sessions, some of which may
+                  have since expired from cache
+        """
+        try:
+            fields = self.cache_handler.hgetall(
+                domain=self.identifier_sessions_domain, identifier=identifier)
+        except CacheException:
+            return [session_key.session_id for session_key
+                    in self._get_session_keys(identifier)]
+        return self.session_ids_from_fields(fields)
+
+    def delete_sessions(self, identifier, session_ids):
+        """
+        Deletes several of a user's sessions at once:  one request deletes the
+        sessions and another removes them from the user's sessions.
 
-        including a primary identifier is new to yosai
+        :param identifier: the user's primary identifier
+        :param session_ids: the ids of the sessions to delete
         """
-        isk = 'identifiers_session_key'
-        identifiers = session.get_internal_attribute(isk)
+        session_ids = list(session_ids)
+        if not session_ids:
+            return
+
+        for session_id in session_ids:
+            self.expiration_index.discard(session_id)
+
         try:
-            self.cache_handler.set(domain='session',
-                                   identifier=identifiers.primary_identifier,
-                                   value=DefaultSessionKey(session_id))
+            self.cache_handler.delete_many(domain='session',
+                                           identifiers=session_ids)
+            self._remove_session_ids(identifier, session_ids)
         except AttributeError:
+            msg = "Cannot uncache without a cache_handler."
+            raise SessionCacheException(msg)
+
+    def _get_session_keys(self, identifier):
+        """
+        :returns: the list of DefaultSessionKeys that indexes the sessions of a
+                  user when the cache handler doesn't support hash entries
+        """
+        return self.cache_handler.get(domain=self.identifier_sessions_domain,
+                                      identifier=identifier) or []
+
+    def _add_session_id(self, identifier, session_id):
+        try:
+            self.cache_handler.hset(domain=self.identifier_sessions_domain,
+                                    identifier=identifier,
+                                    mapping={session_id: b''})
+        except CacheException:
+            session_keys = self.session_keys_with(
+                self._get_session_keys(identifier), session_id)
+            if session_keys is not None:
+                self.cache_handler.set(domain=self.identifier_sessions_domain,
+                                       identifier=identifier,
+                                       value=session_keys)
+
+    def _remove_session_ids(self, identifier, session_ids):
+        try:
+            self.cache_handler.hdel(domain=self.identifier_sessions_domain,
+                                    identifier=identifier, fields=session_ids)
+        except CacheException:
+            remaining = self.session_keys_without(
+                self._get_session_keys(identifier), session_ids)
+            if remaining is None:
+                return
+            if remaining:
+                self.cache_handler.set(domain=self.identifier_sessions_domain,
+                                       identifier=identifier, value=remaining)
+            else:
+                self.cache_handler.delete(
+                    domain=self.identifier_sessions_domain,
+                    identifier=identifier)
+
+    # The following decide how a user's sessions are kept, for this store and
+    # its asyncio counterpart, which only differ in how they call the cache:
+
+    @staticmethod
+    def changes_user(session):
+        """
+        A session is added to its user's sessions once it has one, which
+        changes its internal attributes.
+
+        :returns: whether updating the session must add it to its user's
+                  sessions
+        """
+        dirty_fields = getattr(session, 'dirty_fields', None)
+        return dirty_fields is None or 'internal_attributes' in dirty_fields
+
+    @staticmethod
+    def user_of(session):
+        """
+        :returns: the primary identifier of the session's user, or None when
+                  the session has no user yet
+        """
+        identifiers = session.get_internal_attribute('identifiers_session_key')
+        return getattr(identifiers, 'primary_identifier', None)
+
+    @staticmethod
+    def session_ids_from_fields(fields):
+        """
+        :param fields: the fields of a user's sessions hash entry
+        :returns: a list of session ids
+        """
+        return [field.decode('utf-8') if isinstance(field, bytes) else field
+                for field in fields]
+
+    @staticmethod
+    def session_keys_with(session_keys, session_id):
+        """
+        :param session_keys: a user's sessions, when the cache handler doesn't
+                             support hash entries
+        :returns: the session keys including session_id, or None when they
+                  already include it
+        """
+        if any(key.session_id == session_id for key in session_keys):
+            return None
+        return session_keys + [DefaultSessionKey(session_id)]
+
+    @staticmethod
+    def session_keys_without(session_keys, session_ids):
+        """
+        :param session_keys: a user's sessions, when the cache handler doesn't
+                             support hash entries
+        :returns: the remaining session keys, which are empty when the user
+                  has no sessions left, or None when none was removed
+        """
+        remaining = [key for key in session_keys
+                     if key.session_id not in session_ids]
+        if len(remaining) == len(session_keys):
+            return None
+        return remaining
+
+    def _cache_identifiers_to_key_map(self, session, session_id):
+        """
+        adds the session to the sessions of its user, once the session is
+        associated with a user (has an identifiers attribute)
+
+        including a primary identifier is new to yosai
+        """
+        identifier = self.user_of(session)
+        if identifier is None:
             msg = "Could not cache identifiers_session_key."
             logger.warning(msg)
+            return
+        self._add_session_id(identifier, session_id)
 
     def _cache(self, session, session_id):
 
@@ -317,20 +813,19 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
 
         try:
             sessionid = session.session_id
+            self.expiration_index.discard(sessionid)
 
             # delete the serialized session object:
             self.cache_handler.delete(domain='session',
                                       identifier=sessionid)
 
-            try:
-                identifiers = session.get_internal_attribute('identifiers_session_key')
-                primary_id = identifiers.primary_identifier
-                # delete the mapping between a user and session id:
-                self.cache_handler.delete(domain='session',
-                                          identifier=primary_id)
-            except AttributeError:
+            # remove the session from its user's sessions:
+            primary_id = self.user_of(session)
+            if primary_id is None:
                 msg = '_uncache: Could not obtain identifiers from session'
                 logger.warning(msg)
+            else:
+                self._remove_session_ids(primary_id, [sessionid])
 
         except AttributeError:
             msg = "Cannot uncache without a cache_handler."
@@ -354,121 +849,789 @@ class CachingSessionStore(AbstractSessionStore, cache_abcs.CacheHandlerAware):
         pass
 
 
-# Yosai omits the SessionListenerAdapter class
-
-class ProxiedSession(session_abcs.Session):
+class CachedAttributes(collections.abc.MutableMapping):
     """
-    Simple Session implementation that immediately delegates all
-    corresponding calls to an underlying proxied session instance.
-
-    This class is mostly useful for framework subclassing to intercept certain
-    Session calls and perform additional logic.
+    The attributes of a session read from a HashCachingSessionStore.  Each
+    attribute is read from its field of the session's hash entry upon first
+    use, and the attributes set or removed are recorded so that only their
+    fields are written back.
 
+    A CachedAttributes is truthy until it is known to be empty, so that a
+    session's attribute methods don't read every attribute to find out.
     """
 
-    def __init__(self, target_session):
+    def __init__(self, session_store, session_id):
         """
-        unlike shiro, yosai differentiates session attributes for internal use
-        from session attributes for external use
+        :type session_store: HashCachingSessionStore
         """
-        # the proxied instance:
-        self._delegate = target_session
-        self._session_id = None
+        self.session_store = session_store
+        self.session_id = session_id
+        self.loaded = {}  # attribute key: value, for those read or set
+        self.absent = set()  # keys known to be without a field
+        self.changed = set()
+        self.removed = set()
+        self.complete = False  # whether every field has been read
+
+    def __getitem__(self, key):
+        try:
+            return self.loaded[key]
+        except KeyError:
+            if self.complete or key in self.absent:
+                raise
 
-    @property
-    def session_id(self):
-        return self._delegate.session_id
+        value = self.session_store.read_attribute(self.session_id, key)
+        if value is None:
+            self.absent.add(key)
+            raise KeyError(key)
+        self.loaded[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self.loaded[key] = value
+        self.absent.discard(key)
+        self.removed.discard(key)
+        self.changed.add(key)
+
+    def __delitem__(self, key):
+        self[key]  # raises KeyError for a missing attribute
+        del self.loaded[key]
+        self.absent.add(key)
+        self.changed.discard(key)
+        self.removed.add(key)
+
+    def load(self):
+        """
+        reads every attribute that hasn't been read, set or removed
+        """
+        if self.complete:
+            return
+        attributes = self.session_store.read_attributes(self.session_id)
+        for key, value in attributes.items():
+            if key not in self.loaded and key not in self.removed:
+                self.loaded[key] = value
+        self.absent.update(self.removed)
+        self.complete = True
+
+    def __iter__(self):
+        self.load()
+        return iter(list(self.loaded))
+
+    def __len__(self):
+        self.load()
+        return len(self.loaded)
+
+    def __bool__(self):
+        if self.complete:
+            return bool(self.loaded)
+        return True
+
+    def mark_written(self):
+        self.changed.clear()
+        self.removed.clear()
 
-    @property
-    def start_timestamp(self):
-        return self._delegate.start_timestamp
+    def __repr__(self):
+        return ("CachedAttributes(session_id={0}, loaded={1}, changed={2}, "
+                "removed={3})".format(self.session_id, list(self.loaded),
+                                      sorted(self.changed),
+                                      sorted(self.removed)))
 
-    @property
-    def last_access_time(self):
-        return self._delegate.last_access_time
 
-    @property
-    def idle_timeout(self):
-        return self._delegate.idle_timeout
+class HashCachingSessionStore(CachingSessionStore):
+    """
+    A CachingSessionStore that keeps each session as a hash entry (see
+    CacheHandler.hset), whose fields are the session's header (everything but
+    its attributes) and each of its attributes, serialized on its own.
+
+    A session read from the store decodes its header only.  Its attributes
+    are CachedAttributes, read one field at a time upon first use.  When the
+    session is updated, only the fields of the attributes set or removed are
+    written (and the header, only when another of its fields changed), so
+    changing one attribute doesn't rewrite the whole session.
+
+    This store requires a CacheHandler that supports hash entries, such as
+    the MemoryCacheHandler.  To use it:
+
+        session_manager.session_handler.session_store =\\
+            HashCachingSessionStore()
+
+    Attributes are serialized by the session's AttributesSchema, just as
+    they are when the session is serialized whole.  The sessions of this store
+    can't be moved with read_raw and write_raw.  Only SimpleSessions can be
+    kept, as the header is encoded from a session's __dict__, which a
+    CompactSession hasn't got.
+    """
 
-    @idle_timeout.setter
-    def idle_timeout(self, max_idle_time):
-        self._delegate.idle_timeout = max_idle_time
+    header_field = '~session'
+    attribute_prefix = 'attribute:'
 
     @property
-    def absolute_timeout(self):
-        return self._delegate.absolute_timeout
+    def serialization_manager(self):
+        return self.cache_handler.serialization_manager
 
-    @absolute_timeout.setter
-    def absolute_timeout(self, abs_time):
-        self._delegate.absolute_timeout = abs_time
+    def attribute_field(self, key):
+        return self.attribute_prefix + key
 
-    @property
-    def host(self):
-        return self._delegate.host
+    def check_session(self, session):
+        """
+        :raises SessionCacheException: when the session isn't a SimpleSession
+        """
+        if not isinstance(session, SimpleSession):
+            msg = ("{0} keeps SimpleSessions only, not {1}s".format(
+                self.__class__.__name__, session.__class__.__name__))
+            raise SessionCacheException(msg)
 
-    def touch(self):
-        self._delegate.touch()
+    # -------------------------------------------------------------------------
+    # Encoding Methods
+    # -------------------------------------------------------------------------
 
-    def stop(self, identifiers):
-        self._delegate.stop(identifiers)
+    def encode_header(self, session):
+        header = SimpleSession.__new__(SimpleSession)
+        header.__dict__.update(
+            (name, value) for name, value in session.__dict__.items()
+            if name not in ('_attributes', '_encoded_attributes', 'attributes'))
+        return self.serialization_manager.serialize(header)
 
-    @property
-    def attribute_keys(self):
-        return self._delegate.attribute_keys
+    def encode_attribute(self, key, value):
+        data = SimpleSession.attributes_schema().dump({key: value}).data
+        return self.serialization_manager.serializer.serialize(data)
 
-    @property
-    def internal_attribute_keys(self):
-        return self._delegate.internal_attribute_keys
+    def decode_attributes(self, payloads):
+        """
+        :param payloads: the payloads of attribute fields
+        :returns: a dict of the attributes that the payloads decode to
+        """
+        data = {}
+        serializer = self.serialization_manager.serializer
+        for payload in payloads:
+            data.update(serializer.deserialize(payload) or {})
+        return SimpleSession.attributes_schema().load(data, partial=True).data
 
-    def get_internal_attribute(self, key):
-        return self._delegate.get_internal_attribute(key)
+    # -------------------------------------------------------------------------
+    # Attribute Methods, used by CachedAttributes
+    # -------------------------------------------------------------------------
 
-    def set_internal_attribute(self, key, value):
-        self._delegate.set_internal_attribute(key, value)
+    def read_attribute(self, session_id, key):
+        """
+        :returns: the value of the attribute, or None when it isn't cached
+        """
+        payload = self.cache_handler.hget(domain='session',
+                                          identifier=session_id,
+                                          field=self.attribute_field(key))
+        if payload is None:
+            return None
+        return self.decode_attributes([payload]).get(key)
 
-    def remove_internal_attribute(self, key):
-        self._delegate.remove_internal_attribute(key)
+    def read_attributes(self, session_id):
+        """
+        :returns: a dict of every cached attribute of the session
+        """
+        fields = self.cache_handler.hgetall(domain='session',
+                                            identifier=session_id)
+        return self.decode_attributes(
+            payload for field, payload in fields.items()
+            if field.startswith(self.attribute_prefix))
 
-    def get_attribute(self, key):
-        return self._delegate.get_attribute(key)
+    # -------------------------------------------------------------------------
+    # SessionStore Methods
+    # -------------------------------------------------------------------------
 
-    def set_attribute(self, key, value):
-        self._delegate.set_attribute(key, value)
+    def update(self, session):
+        if not session.is_valid:
+            self._uncache(session)
+            return
 
-    def remove_attribute(self, key):
-        self._delegate.remove_attribute(key)
+        self.check_session(session)
+        session_id = session.session_id
+        attributes = session.__dict__.get('_attributes')
+        if (not isinstance(attributes, CachedAttributes) or
+                attributes.session_id != session_id):
+            # a session that wasn't read from this store is written whole
+            self._cache(session, session_id)
+            self._cache_identifiers_to_key_map(session, session_id)
+            return
 
-    def __repr__(self):
-        return "ProxiedSession(session_id={0}, attributes={1})".format(
-            self.session_id, self.attribute_keys)
+        dirty_fields = session.dirty_fields
+        mapping = {self.attribute_field(key):
+                   self.encode_attribute(key, attributes.loaded[key])
+                   for key in attributes.changed}
+        if dirty_fields - {'attributes'}:
+            mapping[self.header_field] = self.encode_header(session)
+
+        self.cache_handler.hset(domain='session', identifier=session_id,
+                                mapping=mapping)
+        if attributes.removed:
+            self.cache_handler.hdel(
+                domain='session', identifier=session_id,
+                fields=[self.attribute_field(key)
+                        for key in attributes.removed])
+        attributes.mark_written()
+
+        if 'internal_attributes' in dirty_fields:
+            self._cache_identifiers_to_key_map(session, session_id)
+        self._index_expiration(session, session_id)
+
+    def read_raw(self, sessionid):
+        msg = ("{0} keeps sessions as hash entries, which can't be read as "
+               "raw payloads".format(self.__class__.__name__))
+        raise SessionCacheException(msg)
+
+    def write_raw(self, sessionid, payload):
+        msg = ("{0} keeps sessions as hash entries, which can't be written "
+               "from raw payloads".format(self.__class__.__name__))
+        raise SessionCacheException(msg)
 
-# removed ImmutableProxiedSession because it can't be sent over the eventbus
+    def _get_cached_session(self, sessionid):
+        try:
+            payload = self.cache_handler.hget(domain='session',
+                                              identifier=sessionid,
+                                              field=self.header_field)
+        except AttributeError:
+            msg = "no cache parameter nor lazy-defined cache"
+            logger.warning(msg)
+            return None
 
-class SimpleSession(session_abcs.ValidatingSession,
-                    serialize_abcs.Serializable):
+        if payload is None:
+            return None
 
-    # Yosai omits:
-    #    - the manually-managed class version control process (too policy-reliant)
-    #    - the bit-flagging technique (will cross this bridge later, if needed)
+        session = self.serialization_manager.deserialize(payload)
+        session.__dict__.pop('_encoded_attributes', None)
+        session._attributes = CachedAttributes(self, sessionid)
+        return session
 
-    def __init__(self, host=None):
-        self._attributes = {}
-        self._internal_attributes = {}
-        self._is_expired = None
-        self._session_id = None
+    def _cache(self, session, session_id):
+        self.check_session(session)
+        try:
+            mapping = {self.attribute_field(key):
+                       self.encode_attribute(key, value)
+                       for key, value in (session.attributes or {}).items()}
+            mapping[self.header_field] = self.encode_header(session)
+
+            # fields of attributes that were since removed mustn't linger:
+            self.cache_handler.delete(domain='session', identifier=session_id)
+            self.cache_handler.hset(domain='session', identifier=session_id,
+                                    mapping=mapping)
+        except AttributeError:
+            msg = "Cannot cache without a cache_handler."
+            raise SessionCacheException(msg)
 
-        self._stop_timestamp = None
-        self._start_timestamp = datetime.datetime.now(pytz.utc)
 
-        self._last_access_time = self._start_timestamp
+# Yosai omits the SessionListenerAdapter class
 
-        # yosai.core.renames global_session_timeout to idle_timeout and added
-        # the absolute_timeout feature
-        self._absolute_timeout = session_settings.absolute_timeout  # timedelta
-        self._idle_timeout = session_settings.idle_timeout  # timedelta
+class SessionRevocation(serialize_abcs.Serializable):
+    """
+    The cached revocation of a session, in force until its expiration
+    """
 
-        self._host = host
+    def __init__(self, session_id, expiration=None):
+        """
+        :param expiration: epoch seconds, or None for a revocation that never
+                           lapses
+        """
+        self.session_id = session_id
+        self.expiration = expiration
+
+    def in_force(self, now):
+        return self.expiration is None or self.expiration > now
+
+    def __eq__(self, other):
+        try:
+            return (self.session_id == other.session_id and
+                    self.expiration == other.expiration)
+        except AttributeError:
+            return False
+
+    def __repr__(self):
+        return "SessionRevocation(session_id={0}, expiration={1})".format(
+            self.session_id, self.expiration)
+
+    @classmethod
+    def serialization_schema(cls):
+        class SerializationSchema(Schema):
+            session_id = fields.Str()
+            expiration = fields.Float(allow_none=True)
+
+            @post_load
+            def make_session_revocation(self, data):
+                mycls = SessionRevocation
+                instance = mycls.__new__(mycls)
+                instance.__dict__.update(data)
+                return instance
+
+        return SerializationSchema
+
+
+class SessionRevocationList(cache_abcs.CacheHandlerAware):
+    """
+    The ids of revoked sessions, such as those of stopped sessions whose
+    tokens (see ClientSideSessionStore) must no longer be accepted.  A
+    revocation is in force until the session would have expired anyway.
+
+    A BloomFilter answers most checks, those of sessions that weren't revoked,
+    without taking the lock or a round trip to cache.  Otherwise, revocations
+    are kept in memory, for a single process, and refresh forgets expired
+    ones.  It should be called periodically.
+
+    When a cache handler is set, revocations are also cached, each as a
+    SessionRevocation, so that a session revoked by one process is revoked
+    for all of them, and a check that the filter doesn't rule out reads the
+    cache.  The filter learns of other processes' revocations when it is
+    synced, by refresh, which is_revoked calls every refresh_interval:  until
+    then, a revocation made elsewhere may go unnoticed.  Cached revocations
+    expire in accordance with the time-to-live of their domain, so refresh
+    also writes back those still in force, renewing them.  refresh_interval
+    must therefore be shorter than that time-to-live.  A cache handler without
+    key iteration (keys) can't be synced, so every check then reads the cache.
+    """
+
+    domain = 'session_revocation'
+
+    def __init__(self, capacity=100000, error_rate=0.001,
+                 refresh_interval=60):
+        """
+        :param capacity: the number of revocations that the filter holds
+                         before its false positive rate exceeds error_rate
+        :param refresh_interval: the seconds between syncs with the cache
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.refresh_interval = refresh_interval
+        self.bloom_filter = BloomFilter(capacity, error_rate)
+        self.revocations = {}  # session_id: expiration
+        self.clock = time.time
+        self.next_refresh = None  # when the cache is next synced
+        self._cache_handler = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def cache_handler(self):
+        return self._cache_handler
+
+    @cache_handler.setter
+    def cache_handler(self, cachehandler):
+        self._cache_handler = cachehandler
+        # synced upon the next check:
+        self.next_refresh = None if cachehandler is None else 0
+
+    def revoke(self, session_id, expiration=None):
+        """
+        :param expiration: when the session would have expired anyway, as
+                           epoch seconds, after which its revocation is moot
+        :type expiration: float
+        """
+        if expiration is not None and expiration <= self.clock():
+            return
+
+        if self.cache_handler is not None:
+            self.cache_handler.set(
+                domain=self.domain, identifier=session_id,
+                value=SessionRevocation(session_id, expiration))
+
+        with self._lock:
+            if self.bloom_filter is not None:
+                self.bloom_filter.add(session_id)
+            self.revocations[session_id] = expiration
+
+    def is_revoked(self, session_id):
+        now = self.clock()
+        next_refresh = self.next_refresh
+        if next_refresh is not None and now >= next_refresh:
+            self._refresh_once()
+
+        bloom_filter = self.bloom_filter
+        if bloom_filter is not None and session_id not in bloom_filter:
+            return False
+
+        with self._lock:
+            if session_id in self.revocations:
+                expiration = self.revocations[session_id]
+                if expiration is None or expiration > now:
+                    return True
+
+        if self.cache_handler is None:
+            return False
+        revocation = self.cache_handler.get(domain=self.domain,
+                                            identifier=session_id)
+        return revocation is not None and revocation.in_force(now)
+
+    def _refresh_once(self):
+        # a sync that is underway isn't waited for, nor repeated:
+        if self._refresh_lock.acquire(blocking=False):
+            try:
+                self.refresh()
+            finally:
+                self._refresh_lock.release()
+
+    def refresh(self):
+        """
+        Rebuilds the filter from the revocations that remain in force,
+        forgetting the expired ones.  When a cache handler is set, the
+        revocations of every process are read from cache and those in force
+        are written back, renewing them.
+
+        :returns: the number of revocations in force
+        """
+        now = self.clock()
+        with self._lock:
+            snapshot = dict(self.revocations)
+        revocations = dict(snapshot)
+
+        if self.cache_handler is not None:
+            self.next_refresh = now + self.refresh_interval
+            cached = self._cached_revocations()
+            if cached is None:  # can't be synced
+                with self._lock:
+                    self.bloom_filter = None
+                return None
+            for revocation in cached:
+                revocations.setdefault(revocation.session_id,
+                                       revocation.expiration)
+
+        revocations = {session_id: expiration for session_id, expiration
+                       in revocations.items()
+                       if expiration is None or expiration > now}
+
+        if self.cache_handler is not None:
+            for session_id, expiration in revocations.items():
+                self.cache_handler.set(
+                    domain=self.domain, identifier=session_id,
+                    value=SessionRevocation(session_id, expiration))
+
+        bloom_filter = BloomFilter(self.capacity, self.error_rate)
+        for session_id in revocations:
+            bloom_filter.add(session_id)
+
+        with self._lock:
+            # revocations made meanwhile are kept:
+            for session_id, expiration in self.revocations.items():
+                if session_id not in snapshot:
+                    revocations[session_id] = expiration
+                    bloom_filter.add(session_id)
+            self.revocations = revocations
+            self.bloom_filter = bloom_filter
+            return len(revocations)
+
+    def _cached_revocations(self):
+        """
+        :returns: a list of the cached SessionRevocations, or None when the
+                  cache handler doesn't support key iteration
+        """
+        # imported here, as the bulk module imports from yosai.core:
+        from yosai.core.cache.bulk import generate_identifiers
+
+        try:
+            identifiers = list(generate_identifiers(self.cache_handler,
+                                                    self.domain))
+        except (AttributeError, NotImplementedError, CacheException):
+            return None
+
+        revocations = []
+        for identifier in identifiers:
+            revocation = self.cache_handler.get(domain=self.domain,
+                                                identifier=identifier)
+            if revocation is not None:
+                revocations.append(revocation)
+        return revocations
+
+    def __len__(self):
+        with self._lock:
+            return len(self.revocations)
+
+    def __repr__(self):
+        return ("SessionRevocationList(cache_handler={0}, bloom_filter={1})".
+                format(self.cache_handler, self.bloom_filter))
+
+
+class LoadedSessions(threading.local):
+    def __init__(self):
+        self.sessions = {}  # session_id: session
+        self.tokens = {}  # session_id: the token of the session's latest state
+
+
+class ClientSideSessionStore(AbstractSessionStore,
+                             cache_abcs.CacheHandlerAware):
+    """
+    A ClientSideSessionStore keeps no sessions on the server.  Instead, each
+    session is serialized, encrypted and authenticated (using Fernet) into a
+    token that the client presents with each request, such as in a cookie.
+    A request loads its token first and issues the session's latest token
+    last:
+
+        session_id = session_store.load_token(request.cookies['session'])
+        session = session_manager.get_session(DefaultSessionKey(session_id))
+        ...
+        response.set_cookie('session', session_store.issue_token(session_id))
+        session_store.release(session_id)
+
+    Until it is released, the session manager reads a loaded session from
+    memory, without a round trip to a store.  Loaded sessions are kept per
+    thread, so a store may be shared by threads that each handle a request.
+
+    Keys are rotated by adding a new key to the front of keys:  tokens are
+    encrypted with the first key and decrypted with any of them, so tokens
+    issued before the rotation remain readable until the old key is dropped.
+
+    A token remains decryptable after its session is stopped, so deleted
+    sessions are revoked and load_token rejects the tokens of revoked
+    sessions.  Likewise, an earlier token of a session remains valid until
+    its session would have expired.  As no store can list client-side
+    sessions, scheduled session validation doesn't apply.
+    """
+
+    def __init__(self, keys, revocation_list=None, max_token_size=4096,
+                 serialization_manager=None):
+        """
+        :param keys: Fernet keys, newest first, or a single key
+        :param revocation_list: defaults to an in-memory SessionRevocationList
+        :type revocation_list: SessionRevocationList
+        :param max_token_size: the size limit of a token, in bytes, such as
+                               that of a cookie
+        """
+        super().__init__()
+        if isinstance(keys, (str, bytes)):
+            keys = [keys]
+        if not keys:
+            msg = 'A ClientSideSessionStore requires at least one key'
+            raise InvalidArgumentException(msg)
+
+        self.fernet = MultiFernet([Fernet(key) for key in keys])
+        self.revocation_list = revocation_list or SessionRevocationList()
+        self.max_token_size = max_token_size
+        self.serialization_manager = (serialization_manager or
+                                      SerializationManager())
+        self._loaded = LoadedSessions()
+
+    @property
+    def cache_handler(self):
+        return self.revocation_list.cache_handler
+
+    @cache_handler.setter
+    def cache_handler(self, cachehandler):
+        # revocations are shared by way of the cache:
+        self.revocation_list.cache_handler = cachehandler
+
+    def encode(self, session):
+        """
+        :returns: the token of session, as bytes
+        :raises SessionTokenException: when the token exceeds max_token_size
+        """
+        token = self.fernet.encrypt(
+            self.serialization_manager.serialize(session))
+        if len(token) > self.max_token_size:
+            msg = ('The token of session [{0}] is {1} bytes, exceeding the '
+                   'limit of {2}'.format(session.session_id, len(token),
+                                         self.max_token_size))
+            raise SessionTokenException(msg)
+        return token
+
+    def decode(self, token):
+        """
+        :returns: the session of token
+        :raises UnknownSessionException: when token wasn't issued with any of
+                                         the keys, or has been tampered with
+        """
+        if isinstance(token, str):
+            token = token.encode('ascii')
+        if len(token) > self.max_token_size:
+            msg = 'The session token exceeds the size limit'
+            raise UnknownSessionException(msg)
+        try:
+            return self.serialization_manager.deserialize(
+                self.fernet.decrypt(token))
+        except InvalidToken:
+            msg = 'The session token is invalid'
+            raise UnknownSessionException(msg)
+
+    def load_token(self, token):
+        """
+        Makes the session of token available to the current thread.
+
+        :returns: the session_id of the token's session
+        :raises UnknownSessionException: when the token is invalid or its
+                                         session has been revoked
+        """
+        session = self.decode(token)
+        session_id = session.session_id
+        if self.revocation_list.is_revoked(session_id):
+            msg = 'Session [{0}] has been revoked'.format(session_id)
+            raise UnknownSessionException(msg)
+
+        self._loaded.sessions[session_id] = session
+        self._loaded.tokens[session_id] = token
+        return session_id
+
+    def issue_token(self, session_id):
+        """
+        :returns: the token of the session's latest state, or None when the
+                  session isn't loaded (such as once it is stopped)
+        """
+        token = self._loaded.tokens.get(session_id)
+        if token is None:
+            session = self._loaded.sessions.get(session_id)
+            if session is None:
+                return None
+            token = self._loaded.tokens[session_id] = self.encode(session)
+        return token
+
+    def release(self, session_id):
+        self._loaded.sessions.pop(session_id, None)
+        self._loaded.tokens.pop(session_id, None)
+
+    def update(self, session):
+        if not session.is_valid:
+            self.delete(session)
+            return
+        # encoding now raises when a change outgrows the size limit:
+        token = self.encode(session)
+        self._loaded.sessions[session.session_id] = session
+        self._loaded.tokens[session.session_id] = token
+
+    def delete(self, session):
+        session_id = session.session_id
+        self.release(session_id)
+        self.revocation_list.revoke(
+            session_id, SessionExpirationIndex.expiration_of(session))
+
+    def _do_create(self, session):
+        session_id = self.generate_session_id(session)
+        self.assign_session_id(session, session_id)
+        self._loaded.sessions[session_id] = session
+        self._loaded.tokens.pop(session_id, None)
+        return session_id
+
+    def _do_read(self, session_id):
+        return self._loaded.sessions.get(session_id)
+
+    def __repr__(self):
+        return ("ClientSideSessionStore(max_token_size={0}, "
+                "revocation_list={1})".format(self.max_token_size,
+                                              self.revocation_list))
+
+
+class ProxiedSession(session_abcs.Session):
+    """
+    Simple Session implementation that immediately delegates all
+    corresponding calls to an underlying proxied session instance.
+
+    This class is mostly useful for framework subclassing to intercept certain
+    Session calls and perform additional logic.
+
+    """
+
+    def __init__(self, target_session):
+        """
+        unlike shiro, yosai differentiates session attributes for internal use
+        from session attributes for external use
+        """
+        # the proxied instance:
+        self._delegate = target_session
+        self._session_id = None
+
+    @property
+    def session_id(self):
+        return self._delegate.session_id
+
+    @property
+    def start_timestamp(self):
+        return self._delegate.start_timestamp
+
+    @property
+    def last_access_time(self):
+        return self._delegate.last_access_time
+
+    @property
+    def idle_timeout(self):
+        return self._delegate.idle_timeout
+
+    @idle_timeout.setter
+    def idle_timeout(self, max_idle_time):
+        self._delegate.idle_timeout = max_idle_time
+
+    @property
+    def absolute_timeout(self):
+        return self._delegate.absolute_timeout
+
+    @absolute_timeout.setter
+    def absolute_timeout(self, abs_time):
+        self._delegate.absolute_timeout = abs_time
+
+    @property
+    def host(self):
+        return self._delegate.host
+
+    def touch(self):
+        self._delegate.touch()
+
+    def stop(self, identifiers):
+        self._delegate.stop(identifiers)
+
+    @property
+    def attribute_keys(self):
+        return self._delegate.attribute_keys
+
+    @property
+    def internal_attribute_keys(self):
+        return self._delegate.internal_attribute_keys
+
+    def get_internal_attribute(self, key):
+        return self._delegate.get_internal_attribute(key)
+
+    def set_internal_attribute(self, key, value):
+        self._delegate.set_internal_attribute(key, value)
+
+    def remove_internal_attribute(self, key):
+        self._delegate.remove_internal_attribute(key)
+
+    def get_attribute(self, key):
+        return self._delegate.get_attribute(key)
+
+    def set_attribute(self, key, value):
+        self._delegate.set_attribute(key, value)
+
+    def remove_attribute(self, key):
+        self._delegate.remove_attribute(key)
+
+    def __repr__(self):
+        return "ProxiedSession(session_id={0}, attributes={1})".format(
+            self.session_id, self.attribute_keys)
+
+# removed ImmutableProxiedSession because it can't be sent over the eventbus
+
+class SimpleSession(session_abcs.ValidatingSession,
+                    serialize_abcs.Serializable):
+
+    # Yosai omits:
+    #    - the manually-managed class version control process (too policy-reliant)
+    #    - the bit-flagging technique (will cross this bridge later, if needed)
+
+    # the version of the serialized form, written as its format_version_key:
+    #   1 (or absent):  timestamps as ISO strings, timeouts as integer seconds
+    #   2:  timestamps and timeouts encoded natively by the serializer
+    format_version = 2
+    format_version_key = '_format_version'
+
+    # touching a session changes its last_access_time in memory, yet marks it
+    # dirty (to be written) only once it has moved by this fraction of the
+    # idle_timeout since the session was last written:
+    touch_write_threshold = session_settings.touch_write_threshold
+
+    def __init__(self, host=None):
+        self._attributes = {}
+        self._internal_attributes = {}
+        self._is_expired = None
+        self._session_id = None
+
+        self._stop_timestamp = None
+        self._start_timestamp = datetime.datetime.now(pytz.utc)
+
+        self._last_access_time = self._start_timestamp
+
+        # yosai.core.renames global_session_timeout to idle_timeout and added
+        # the absolute_timeout feature
+        self._absolute_timeout = session_settings.absolute_timeout  # timedelta
+        self._idle_timeout = session_settings.idle_timeout  # timedelta
+
+        self._host = host
 
     # the properties are required to enforce the Session abc-interface..
     @property
@@ -481,11 +1644,15 @@ class SimpleSession(session_abcs.ValidatingSession,
         :type abs_timeout: timedelta
         """
         self._absolute_timeout = abs_timeout
+        self.mark_dirty('absolute_timeout')
 
     @memoized_property
     def attributes(self):
         if not hasattr(self, '_attributes'):
-            self._attributes = {}
+            # a de-serialized session decodes its attributes upon first use:
+            encoded = self.__dict__.pop('_encoded_attributes', None)
+            self._attributes = ({} if encoded is None else
+                                self.attributes_schema().load(encoded).data)
         return self._attributes
 
     @property
@@ -516,6 +1683,7 @@ class SimpleSession(session_abcs.ValidatingSession,
         :type host:  string
         """
         self._host = host
+        self.mark_dirty('host')
 
     @property
     def idle_timeout(self):
@@ -527,6 +1695,7 @@ class SimpleSession(session_abcs.ValidatingSession,
         :type idle_timeout: timedelta
         """
         self._idle_timeout = idle_timeout
+        self.mark_dirty('idle_timeout')
 
     @property
     def is_expired(self):
@@ -535,6 +1704,7 @@ class SimpleSession(session_abcs.ValidatingSession,
     @is_expired.setter
     def is_expired(self, expired):
         self._is_expired = expired
+        self.mark_dirty('is_expired')
 
     @property
     def is_stopped(self):
@@ -551,6 +1721,7 @@ class SimpleSession(session_abcs.ValidatingSession,
         :type last_access_time: datetime
         """
         self._last_access_time = last_access_time
+        self.mark_dirty('last_access_time')
 
     # DG:  renamed id to session_id because of reserved word conflict
     @property
@@ -560,6 +1731,7 @@ class SimpleSession(session_abcs.ValidatingSession,
     @session_id.setter
     def session_id(self, identity):
         self._session_id = identity
+        self.mark_dirty('session_id')
 
     @property
     def start_timestamp(self):
@@ -572,6 +1744,7 @@ class SimpleSession(session_abcs.ValidatingSession,
         :type start_ts: datetime
         """
         self._start_timestamp = start_ts
+        self.mark_dirty('start_timestamp')
 
     @property
     def stop_timestamp(self):
@@ -586,6 +1759,7 @@ class SimpleSession(session_abcs.ValidatingSession,
         :type stop_ts: datetime
         """
         self._stop_timestamp = stop_ts
+        self.mark_dirty('stop_timestamp')
 
     @property
     def absolute_expiration(self):
@@ -599,8 +1773,38 @@ class SimpleSession(session_abcs.ValidatingSession,
             return self.last_access_time + self.idle_timeout
         return None
 
+    @property
+    def dirty_fields(self):
+        """
+        :returns: the names of the fields changed since the session was last
+                  written (or de-serialized)
+        """
+        return frozenset(self.__dict__.get('_dirty_fields', ()))
+
+    @property
+    def is_dirty(self):
+        return bool(self.__dict__.get('_dirty_fields'))
+
+    def mark_dirty(self, field):
+        self.__dict__.setdefault('_dirty_fields', set()).add(field)
+
+    def mark_clean(self):
+        """
+        called once the session is written
+        """
+        self.__dict__.pop('_dirty_fields', None)
+        self._written_access_time = self._last_access_time
+
     def touch(self):
-        self.last_access_time = datetime.datetime.now(pytz.utc)
+        now = datetime.datetime.now(pytz.utc)
+        written = self.__dict__.setdefault('_written_access_time',
+                                           self._last_access_time)
+        self._last_access_time = now
+
+        idle_timeout = self._idle_timeout
+        if (not written or not idle_timeout or
+                now - written >= idle_timeout * self.touch_write_threshold):
+            self.mark_dirty('last_access_time')
 
     def stop(self):
         if (not self.stop_timestamp):
@@ -678,161 +1882,598 @@ class SimpleSession(session_abcs.ValidatingSession,
             # throw an exception explaining details of why it expired:
             lastaccesstime = self.last_access_time.isoformat()
 
-            idle_timeout = self.idle_timeout.seconds
-            idle_timeout_min = str(idle_timeout // 60)
+            idle_timeout = self.idle_timeout.seconds
+            idle_timeout_min = str(idle_timeout // 60)
+
+            absolute_timeout = self.absolute_timeout.seconds
+            absolute_timeout_min = str(absolute_timeout // 60)
+
+            currenttime = datetime.datetime.now(pytz.utc).isoformat()
+            session_id = str(self.session_id)
+
+            msg2 = ("Session with id [" + session_id + "] has expired. "
+                    "Last access time: " + lastaccesstime +
+                    ".  Current time: " + currenttime +
+                    ".  Session idle timeout is set to " + str(idle_timeout) +
+                    " seconds (" + idle_timeout_min + " minutes) and "
+                    " absolute timeout is set to " + str(absolute_timeout) +
+                    " seconds (" + absolute_timeout_min + "minutes)")
+
+            if logger.getEffectiveLevel() == logging.DEBUG:
+                logger.debug(msg2)
+
+            raise ExpiredSessionException(msg2)
+
+    def get_internal_attribute(self, key):
+        if (not self.internal_attributes):
+            return None
+
+        return self.internal_attributes.get(key)
+
+    def set_internal_attribute(self, key, value=None):
+        if (not value):
+            self.remove_internal_attribute(key)
+        else:
+            self.internal_attributes[key] = value
+            self.mark_dirty('internal_attributes')
+
+    def remove_internal_attribute(self, key):
+        if (not self.internal_attributes):
+            return None
+        else:
+            removed = self.internal_attributes.pop(key, None)
+            if removed is not None:
+                self.mark_dirty('internal_attributes')
+            return removed
+
+    def get_attribute(self, key):
+        if (not self.attributes):
+            return None
+
+        return self.attributes.get(key)
+
+    def set_attribute(self, key, value=None):
+        if (not value):
+            self.remove_attribute(key)
+        else:
+            self.attributes[key] = value
+            self.mark_dirty('attributes')
+
+    def remove_attribute(self, key):
+        if (not self.attributes):
+            return None
+        else:
+            removed = self.attributes.pop(key, None)
+            if removed is not None:
+                self.mark_dirty('attributes')
+            return removed
+
+
+    # deleted on_equals as it is unecessary in python
+    # deleted hashcode method as python's __hash__ may be fine -- TBD!
+
+    # omitting the bit-flagging methods:
+    #       writeobject, readObject, getalteredfieldsbitmask, isFieldPresent
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, session_abcs.ValidatingSession):
+            # other may be a CompactSession, so only its properties are read:
+            return (self._session_id == other.session_id and
+                    self._idle_timeout == other.idle_timeout and
+                    self._absolute_timeout == other.absolute_timeout and
+                    self._start_timestamp == other.start_timestamp)
+                    # self._is_expired == other._is_expired and
+                    #self._last_access_time == other._last_access_time)
+
+        return False
+
+    def __repr__(self):
+        return ("SimpleSession(session_id: {0}, start_timestamp: {1}, "
+                "stop_timestamp: {2}, last_access_time: {3},"
+                "idle_timeout: {4}, absolute_timeout: {5}, is_expired: {6},"
+                "host: {7})".format(self.session_id, self.start_timestamp,
+                                    self.stop_timestamp, self.last_access_time,
+                                    self.idle_timeout, self.absolute_timeout,
+                                    self.is_expired, self.host))
+
+    class AttributesSchema(Schema):
+        pass
+
+    @classmethod
+    def set_attributes_schema(cls, schema):
+        cls.AttributesSchema = schema
+        cls.invalidate_schema()
+
+    @classmethod
+    def attributes_schema(cls):
+        """
+        :returns: an instance of AttributesSchema, re-used per thread
+        """
+        local = _attributes_schemas
+        schema = getattr(local, 'schema', None)
+        if schema is None or schema.__class__ is not cls.AttributesSchema:
+            schema = local.schema = cls.AttributesSchema()
+        return schema
+
+    @classmethod
+    def serialization_schema(cls):
+
+        class InternalSessionAttributesSchema(Schema):
+            identifiers_session_key = fields.Nested(
+                SimpleIdentifierCollection.schema_class(),
+                attribute='identifiers_session_key',
+                allow_none=False)
+
+            authenticated_session_key = fields.Boolean(
+                attribute='authenticated_session_key',
+                allow_none=False)
+
+            run_as_identifiers_session_key = fields.Nested(
+                SimpleIdentifierCollection.schema_class(),
+                attribute='run_as_identifiers_session_key',
+                many=True,
+                allow_none=False)
+
+            @post_load
+            def make_internal_attributes(self, data):
+                try:
+                    raisk = 'run_as_identifiers_session_key'
+                    runas = data.get(raisk)
+                    if runas:
+                        que = collections.deque(runas)
+                        data[raisk] = que
+                except TypeError:
+                    msg = ("Session de-serialization note: "
+                           "run_as_identifiers_session_key attribute N/A.")
+                    logger.warning(msg)
+
+                return data
+
+
+        class SerializationSchema(Schema):
+            _session_id = fields.Str(allow_none=True)
+            _start_timestamp = NativeDateTime(allow_none=True)
+            _stop_timestamp = NativeDateTime(allow_none=True)
+            _last_access_time = NativeDateTime(allow_none=True)
+            _idle_timeout = NativeTimeDelta(allow_none=True)
+            _absolute_timeout = NativeTimeDelta(allow_none=True)
+            _is_expired = fields.Boolean(allow_none=True)
+            _host = fields.Str(allow_none=True)
+
+            # NOTE:  After you've defined your SimpleSessionAttributesSchema,
+            #        the Raw() fields assignment below should be replaced by
+            #        the Schema line that follows it
+            _internal_attributes = fields.Nested(InternalSessionAttributesSchema,
+                                                 allow_none=True)
+
+            _attributes = fields.Nested(cls.AttributesSchema,
+                                        allow_none=True)
+
+            @pre_dump
+            def decode_attributes(self, obj):
+                obj.attributes  # a lazily de-serialized session decodes them
+                return obj
+
+            @post_dump
+            def add_format_version(self, data):
+                data[cls.format_version_key] = cls.format_version
+                return data
+
+            @post_load
+            def make_simple_session(self, data):
+                mycls = SimpleSession
+                instance = mycls.__new__(mycls)
+                instance.__dict__.update(data)
+
+                return instance
+
+        return SerializationSchema
+
+
+def _epoch_to_datetime(epoch):
+    if epoch is None:
+        return None
+    return datetime.datetime.fromtimestamp(epoch, pytz.utc)
+
+
+def _datetime_to_epoch(value):
+    if value is None:
+        return None
+    return value.timestamp()
+
+
+def _timedelta_to_seconds(value):
+    # rounded up, as a timeout of 0 means none at all:
+    if value is None:
+        return None
+    if isinstance(value, datetime.timedelta):
+        value = value.total_seconds()
+    return int(math.ceil(value))
+
+
+class CompactSession(session_abcs.ValidatingSession,
+                     serialize_abcs.Serializable):
+    """
+    A CompactSession behaves as a SimpleSession does, yet takes less memory
+    and validates more quickly:  its fields are slots, its timestamps are
+    epoch seconds (floats) and its timeouts are whole seconds (ints, rounded
+    up), so validate reads the clock once and does no datetime arithmetic.  Its
+    properties return (and accept) datetimes and timedeltas, as those of a
+    SimpleSession do.  To use CompactSessions:
+
+        session_manager.session_factory = CompactSessionFactory()
+
+    Attributes are declared by SimpleSession.set_attributes_schema.  As its
+    fields aren't kept in a __dict__, a CompactSession can't be kept by a
+    HashCachingSessionStore.
+    """
+
+    __slots__ = ('_session_id', '_start', '_stop', '_last_access',
+                 '_written_access', '_idle_timeout', '_absolute_timeout',
+                 '_is_expired', '_host', '_attributes', '_encoded_attributes',
+                 '_internal_attributes', '_dirty_fields')
+
+    touch_write_threshold = session_settings.touch_write_threshold
+
+    def __init__(self, host=None):
+        now = time.time()
+        self._session_id = None
+        self._start = now
+        self._stop = None
+        self._last_access = now
+        self._written_access = None
+        self._idle_timeout = _timedelta_to_seconds(session_settings.idle_timeout)
+        self._absolute_timeout = _timedelta_to_seconds(
+            session_settings.absolute_timeout)
+        self._is_expired = None
+        self._host = host
+        self._attributes = {}
+        self._encoded_attributes = None
+        self._internal_attributes = {}
+        self._dirty_fields = None
+
+    @property
+    def session_id(self):
+        return self._session_id
+
+    @session_id.setter
+    def session_id(self, identity):
+        self._session_id = identity
+        self.mark_dirty('session_id')
+
+    @property
+    def start_timestamp(self):
+        return _epoch_to_datetime(self._start)
+
+    @start_timestamp.setter
+    def start_timestamp(self, start_ts):
+        """
+        :type start_ts: datetime
+        """
+        self._start = _datetime_to_epoch(start_ts)
+        self.mark_dirty('start_timestamp')
+
+    @property
+    def stop_timestamp(self):
+        return _epoch_to_datetime(self._stop)
+
+    @stop_timestamp.setter
+    def stop_timestamp(self, stop_ts):
+        """
+        :type stop_ts: datetime
+        """
+        self._stop = _datetime_to_epoch(stop_ts)
+        self.mark_dirty('stop_timestamp')
+
+    @property
+    def last_access_time(self):
+        return _epoch_to_datetime(self._last_access)
+
+    @last_access_time.setter
+    def last_access_time(self, last_access_time):
+        """
+        :type last_access_time: datetime
+        """
+        self._last_access = _datetime_to_epoch(last_access_time)
+        self.mark_dirty('last_access_time')
+
+    @property
+    def idle_timeout(self):
+        if self._idle_timeout is None:
+            return None
+        return datetime.timedelta(seconds=self._idle_timeout)
+
+    @idle_timeout.setter
+    def idle_timeout(self, idle_timeout):
+        """
+        :type idle_timeout: timedelta
+        """
+        self._idle_timeout = _timedelta_to_seconds(idle_timeout)
+        self.mark_dirty('idle_timeout')
+
+    @property
+    def absolute_timeout(self):
+        if self._absolute_timeout is None:
+            return None
+        return datetime.timedelta(seconds=self._absolute_timeout)
+
+    @absolute_timeout.setter
+    def absolute_timeout(self, abs_timeout):
+        """
+        :type abs_timeout: timedelta
+        """
+        self._absolute_timeout = _timedelta_to_seconds(abs_timeout)
+        self.mark_dirty('absolute_timeout')
+
+    @property
+    def absolute_expiration(self):
+        if self._absolute_timeout:
+            return _epoch_to_datetime(self._start + self._absolute_timeout)
+        return None
+
+    @property
+    def idle_expiration(self):
+        if self._idle_timeout:
+            return _epoch_to_datetime(self._last_access + self._idle_timeout)
+        return None
+
+    @property
+    def host(self):
+        return self._host
+
+    @host.setter
+    def host(self, host):
+        self._host = host
+        self.mark_dirty('host')
+
+    @property
+    def is_expired(self):
+        return self._is_expired
+
+    @is_expired.setter
+    def is_expired(self, expired):
+        self._is_expired = expired
+        self.mark_dirty('is_expired')
+
+    @property
+    def is_stopped(self):
+        return bool(self._stop)
+
+    @property
+    def is_valid(self):
+        return not self._stop and not self._is_expired
+
+    @property
+    def dirty_fields(self):
+        return frozenset(self._dirty_fields or ())
+
+    @property
+    def is_dirty(self):
+        return bool(self._dirty_fields)
+
+    def mark_dirty(self, field):
+        if self._dirty_fields is None:
+            self._dirty_fields = set()
+        self._dirty_fields.add(field)
+
+    def mark_clean(self):
+        self._dirty_fields = None
+        self._written_access = self._last_access
+
+    def touch(self):
+        now = time.time()
+        written = self._written_access
+        if written is None:
+            written = self._written_access = self._last_access
+        self._last_access = now
+
+        idle_timeout = self._idle_timeout
+        if (not written or not idle_timeout or
+                now - written >= idle_timeout * self.touch_write_threshold):
+            self.mark_dirty('last_access_time')
+
+    def stop(self, now=None):
+        if not self._stop:
+            self._stop = time.time() if now is None else now
+            self.mark_dirty('stop_timestamp')
+
+    def expire(self, now=None):
+        self.stop(now)
+        self.is_expired = True
+
+    def is_timed_out(self, now=None):
+        """
+        :param now: the current epoch time, read from the clock when None
+        """
+        if self._is_expired:
+            return True
+
+        absolute_timeout = self._absolute_timeout
+        idle_timeout = self._idle_timeout
+        if not (absolute_timeout or idle_timeout):
+            return False
+
+        if not self._last_access:
+            msg = ("session.last_access_time for session with id [{0}] is "
+                   "null.".format(self._session_id))
+            raise IllegalStateException(msg)
 
-            absolute_timeout = self.absolute_timeout.seconds
-            absolute_timeout_min = str(absolute_timeout // 60)
+        if now is None:
+            now = time.time()
+        return bool((absolute_timeout and
+                     now > self._start + absolute_timeout) or
+                    (idle_timeout and now > self._last_access + idle_timeout))
 
-            currenttime = datetime.datetime.now(pytz.utc).isoformat()
-            session_id = str(self.session_id)
+    def validate(self):
+        if self._stop:
+            msg = ("Session with id [{0}] has been explicitly stopped.  No "
+                   "further interaction under this session is allowed.".
+                   format(self._session_id))
+            raise StoppedSessionException(msg)
+
+        now = time.time()
+        if self.is_timed_out(now):
+            self.expire(now)
+            msg = ("Session with id [{0}] has expired. Last access time: {1}.  "
+                   "Current time: {2}.  Session idle timeout is set to {3} "
+                   "seconds and absolute timeout is set to {4} seconds".format(
+                       self._session_id,
+                       _epoch_to_datetime(self._last_access).isoformat(),
+                       _epoch_to_datetime(now).isoformat(),
+                       self._idle_timeout, self._absolute_timeout))
+            raise ExpiredSessionException(msg)
 
-            msg2 = ("Session with id [" + session_id + "] has expired. "
-                    "Last access time: " + lastaccesstime +
-                    ".  Current time: " + currenttime +
-                    ".  Session idle timeout is set to " + str(idle_timeout) +
-                    " seconds (" + idle_timeout_min + " minutes) and "
-                    " absolute timeout is set to " + str(absolute_timeout) +
-                    " seconds (" + absolute_timeout_min + "minutes)")
+    @property
+    def attributes(self):
+        if self._attributes is None and self._encoded_attributes is not None:
+            # a de-serialized session decodes its attributes upon first use:
+            encoded, self._encoded_attributes = self._encoded_attributes, None
+            self._attributes = SimpleSession.attributes_schema().load(
+                encoded).data
+        return self._attributes
 
-            if logger.getEffectiveLevel() == logging.DEBUG:
-                logger.debug(msg2)
+    @property
+    def attribute_keys(self):
+        if self.attributes is None:
+            return None
+        return set(self.attributes)
 
-            raise ExpiredSessionException(msg2)
+    @property
+    def internal_attributes(self):
+        return self._internal_attributes
 
-    def get_internal_attribute(self, key):
-        if (not self.internal_attributes):
+    @property
+    def internal_attribute_keys(self):
+        if self._internal_attributes is None:
             return None
+        return set(self._internal_attributes)
 
-        return self.internal_attributes.get(key)
+    def get_internal_attribute(self, key):
+        if not self._internal_attributes:
+            return None
+        return self._internal_attributes.get(key)
 
     def set_internal_attribute(self, key, value=None):
-        if (not value):
+        if not value:
             self.remove_internal_attribute(key)
         else:
-            self.internal_attributes[key] = value
+            if self._internal_attributes is None:
+                self._internal_attributes = {}
+            self._internal_attributes[key] = value
+            self.mark_dirty('internal_attributes')
 
     def remove_internal_attribute(self, key):
-        if (not self.internal_attributes):
+        if not self._internal_attributes:
             return None
-        else:
-            return self.internal_attributes.pop(key, None)
+        removed = self._internal_attributes.pop(key, None)
+        if removed is not None:
+            self.mark_dirty('internal_attributes')
+        return removed
 
     def get_attribute(self, key):
-        if (not self.attributes):
+        attributes = self.attributes
+        if not attributes:
             return None
-
-        return self.attributes.get(key)
+        return attributes.get(key)
 
     def set_attribute(self, key, value=None):
-        if (not value):
+        if not value:
             self.remove_attribute(key)
         else:
-            self.attributes[key] = value
+            if self.attributes is None:
+                self._attributes = {}
+            self._attributes[key] = value
+            self.mark_dirty('attributes')
 
     def remove_attribute(self, key):
-        if (not self.attributes):
+        attributes = self.attributes
+        if not attributes:
             return None
-        else:
-            return self.attributes.pop(key, None)
-
-
-    # deleted on_equals as it is unecessary in python
-    # deleted hashcode method as python's __hash__ may be fine -- TBD!
-
-    # omitting the bit-flagging methods:
-    #       writeobject, readObject, getalteredfieldsbitmask, isFieldPresent
+        removed = attributes.pop(key, None)
+        if removed is not None:
+            self.mark_dirty('attributes')
+        return removed
 
     def __eq__(self, other):
         if self is other:
             return True
-        if isinstance(other, session_abcs.ValidatingSession):
+        if isinstance(other, CompactSession):
             return (self._session_id == other._session_id and
                     self._idle_timeout == other._idle_timeout and
                     self._absolute_timeout == other._absolute_timeout and
-                    self._start_timestamp == other._start_timestamp)
-                    # self._is_expired == other._is_expired and
-                    #self._last_access_time == other._last_access_time)
-
+                    self._start == other._start)
+        if isinstance(other, session_abcs.ValidatingSession):
+            # as SimpleSession.__eq__ does, so that equality is symmetric:
+            return (self._session_id == other.session_id and
+                    self.idle_timeout == other.idle_timeout and
+                    self.absolute_timeout == other.absolute_timeout and
+                    self.start_timestamp == other.start_timestamp)
         return False
 
     def __repr__(self):
-        return ("SimpleSession(session_id: {0}, start_timestamp: {1}, "
-                "stop_timestamp: {2}, last_access_time: {3},"
-                "idle_timeout: {4}, absolute_timeout: {5}, is_expired: {6},"
+        return ("CompactSession(session_id: {0}, start_timestamp: {1}, "
+                "stop_timestamp: {2}, last_access_time: {3}, "
+                "idle_timeout: {4}, absolute_timeout: {5}, is_expired: {6}, "
                 "host: {7})".format(self.session_id, self.start_timestamp,
                                     self.stop_timestamp, self.last_access_time,
                                     self.idle_timeout, self.absolute_timeout,
                                     self.is_expired, self.host))
 
-    class AttributesSchema(Schema):
-        pass
+    # the slots of the serialized form, other than the attributes:
+    serialized_slots = ('_session_id', '_start', '_stop', '_last_access',
+                        '_idle_timeout', '_absolute_timeout', '_is_expired',
+                        '_host', '_internal_attributes')
 
     @classmethod
-    def set_attributes_schema(cls, schema):
-        cls.AttributesSchema = schema
+    def new_instance(cls, state, encoded_attributes=None):
+        """
+        :returns: a CompactSession of the de-serialized state, whose
+                  attributes are decoded upon first use
+        """
+        instance = cls.__new__(cls)
+        for name in cls.serialized_slots:
+            setattr(instance, name, state.get(name))
+        if instance._internal_attributes is None:
+            instance._internal_attributes = {}
+        instance._written_access = None
+        instance._dirty_fields = None
+        instance._attributes = None
+        instance._encoded_attributes = encoded_attributes
+        if encoded_attributes is None:
+            instance._attributes = {}
+        return instance
 
     @classmethod
     def serialization_schema(cls):
-
-        class InternalSessionAttributesSchema(Schema):
-            identifiers_session_key = fields.Nested(
-                SimpleIdentifierCollection.serialization_schema(),
-                attribute='identifiers_session_key',
-                allow_none=False)
-
-            authenticated_session_key = fields.Boolean(
-                attribute='authenticated_session_key',
-                allow_none=False)
-
-            run_as_identifiers_session_key = fields.Nested(
-                SimpleIdentifierCollection.serialization_schema(),
-                attribute='run_as_identifiers_session_key',
-                many=True,
-                allow_none=False)
-
-            @post_load
-            def make_internal_attributes(self, data):
-                try:
-                    raisk = 'run_as_identifiers_session_key'
-                    runas = data.get(raisk)
-                    if runas:
-                        que = collections.deque(runas)
-                        data[raisk] = que
-                except TypeError:
-                    msg = ("Session de-serialization note: "
-                           "run_as_identifiers_session_key attribute N/A.")
-                    logger.warning(msg)
-
-                return data
-
+        # internal attributes are serialized as a SimpleSession's are:
+        internal_attributes = SimpleSession.schema_class()._declared_fields[
+            '_internal_attributes']
 
         class SerializationSchema(Schema):
             _session_id = fields.Str(allow_none=True)
-            _start_timestamp = fields.DateTime(allow_none=True)  # iso is default
-            _stop_timestamp = fields.DateTime(allow_none=True)  # iso is default
-            _last_access_time = fields.DateTime(allow_none=True)  # iso is default
-            _idle_timeout = fields.TimeDelta(allow_none=True)
-            _absolute_timeout = fields.TimeDelta(allow_none=True)
+            _start = fields.Float(allow_none=True)
+            _stop = fields.Float(allow_none=True)
+            _last_access = fields.Float(allow_none=True)
+            _idle_timeout = fields.Integer(allow_none=True)
+            _absolute_timeout = fields.Integer(allow_none=True)
             _is_expired = fields.Boolean(allow_none=True)
             _host = fields.Str(allow_none=True)
+            _internal_attributes = internal_attributes
+            _attributes = fields.Method('dump_attributes', 'load_attributes',
+                                        allow_none=True)
 
-            # NOTE:  After you've defined your SimpleSessionAttributesSchema,
-            #        the Raw() fields assignment below should be replaced by
-            #        the Schema line that follows it
-            _internal_attributes = fields.Nested(InternalSessionAttributesSchema,
-                                                 allow_none=True)
+            def dump_attributes(self, obj):
+                return SimpleSession.attributes_schema().dump(
+                    obj.attributes).data
 
-            _attributes = fields.Nested(cls.AttributesSchema,
-                                        allow_none=True)
+            def load_attributes(self, value):
+                return value  # decoded upon first use
 
             @post_load
-            def make_simple_session(self, data):
-                mycls = SimpleSession
-                instance = mycls.__new__(mycls)
-                instance.__dict__.update(data)
-
-                return instance
+            def make_compact_session(self, data):
+                return cls.new_instance(data, data.get('_attributes'))
 
         return SerializationSchema
 
@@ -844,6 +2485,13 @@ class SimpleSessionFactory(session_abcs.SessionFactory):
         return SimpleSession(host=getattr(session_context, 'host', None))
 
 
+class CompactSessionFactory(session_abcs.SessionFactory):
+
+    @classmethod
+    def create_session(cls, session_context=None):
+        return CompactSession(host=getattr(session_context, 'host', None))
+
+
 class DelegatingSession(session_abcs.Session):
     """
     A DelegatingSession is a client-tier representation of a server side
@@ -1059,9 +2707,19 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
     @session_store.setter
     def session_store(self, sessionstore):
         self._session_store = sessionstore
+        self.apply_expiration_listener_to_session_store()
         if self.cache_handler:
             self.apply_cache_handler_to_session_store()
 
+    def apply_expiration_listener_to_session_store(self):
+        """
+        A store that removes expired sessions on its own (such as the
+        MemorySessionStore) passes them to validate_expired, so that their
+        expiration is published.
+        """
+        if hasattr(self.session_store, 'expiration_listener'):
+            self.session_store.expiration_listener = self.validate_expired
+
     @property
     def cache_handler(self):
         return self._cache_handler
@@ -1099,7 +2757,11 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
         """
         :returns: a session_id string
         """
-        return self.session_store.create(session)
+        session_id = self.session_store.create(session)
+        mark_clean = getattr(session, 'mark_clean', None)
+        if mark_clean:
+            mark_clean()
+        return session_id
 
     # -------------------------------------------------------------------------
     # Session Teardown Methods
@@ -1139,9 +2801,11 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
 
         return session
 
-    def do_get_session(self, session_key):
+    def do_get_session(self, session_key, defer_change=False):
         """
         :type session_key: DefaultSessionKey
+        :param defer_change: when True, an auto-touched session isn't written
+                             back, leaving that to the caller
         :returns: SimpleSession
         """
         session_id = session_key.session_id
@@ -1158,7 +2822,8 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
             # won't be called unless the session is valid (due exceptions):
             if self.auto_touch:  # new to yosai
                 session.touch()
-                self.on_change(session)
+                if not defer_change:
+                    self.on_change(session)
 
         return session
 
@@ -1190,6 +2855,25 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
             self.on_invalidation(session, ise, session_key)
             raise ise
 
+    def validate_expired(self, session):
+        """
+        Validates a session that its store found expired, publishing its
+        expiration and deleting it.
+
+        :returns: True when the session was invalidated
+        """
+        session_key = DefaultSessionKey(session.session_id)
+        try:
+            self.validate(session, session_key)
+        except InvalidSessionException:
+            return True
+        except Exception:
+            # the session is deleted even when publishing its expiration fails:
+            msg = 'Could not validate session [{0}]'.format(session.session_id)
+            logger.warning(msg, exc_info=True)
+            return True
+        return False
+
     # -------------------------------------------------------------------------
     # Event-driven Methods
     # -------------------------------------------------------------------------
@@ -1230,12 +2914,8 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
                     format(session.session_id)
                 logger.debug(msg)
 
-                identifiers = session.get_internal_attribute('identifiers_session_key')
-
-                session_tuple = collections.namedtuple(
-                    'session_tuple', ['identifiers', 'session_key'])
-                mysession = session_tuple(identifiers, session_key)
-                self.session_event_handler.notify_expiration(mysession)
+                self.session_event_handler.notify_expiration(
+                    self.session_event(session, session_key))
             except:
                 raise
             finally:
@@ -1263,13 +2943,8 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
 
         try:
             self.on_stop(session)
-            identifiers = session.get_internal_attribute('identifiers_session_key')
-
-            session_tuple = collections.namedtuple(
-                'session_tuple', ['identifiers', 'session_key'])
-            mysession = session_tuple(identifiers, session_key)
-
-            self.session_event_handler.notify_stop(mysession)
+            self.session_event_handler.notify_stop(
+                self.session_event(session, session_key))
         except:
             raise
         # DG:  this results in a redundant delete operation (from shiro):
@@ -1277,9 +2952,164 @@ class DefaultNativeSessionHandler(session_abcs.SessionHandler,
             self.after_stopped(session)
 
     def on_change(self, session):
+        """
+        Writes the session, unless it tracks changes and has none
+        """
         if self.auto_touch and not session.is_stopped:  # new to yosai
             session.touch()
+
+        if not getattr(session, 'is_dirty', True):
+            return
+
         self.session_store.update(session)
+        mark_clean = getattr(session, 'mark_clean', None)
+        if mark_clean:
+            mark_clean()
+
+    @staticmethod
+    def session_event(session, session_key, identifiers=None):
+        """
+        Builds what a SESSION.STOP or SESSION.EXPIRE event publishes, for this
+        handler, its asyncio counterpart and the session managers.
+
+        :param identifiers: the identifiers to publish when the session has
+                            none (such as those of a user logging out)
+        :returns: a session_tuple of the session's identifiers and key
+        """
+        idents = session.get_internal_attribute('identifiers_session_key')
+        return session_tuple(idents or identifiers, session_key)
+
+
+class ExecutorServiceSessionValidationScheduler(
+        session_abcs.SessionValidationScheduler):
+    """
+    Validates expired sessions in the background, at a fixed interval, so that
+    abandoned sessions are removed from their store and their expiration is
+    published (as a SESSION.EXPIRE event, which clears their cached
+    authorization info) rather than going unnoticed until they're accessed.
+
+    Each sweep walks the expiration index of the session store (see
+    MemorySessionStore.expired_sessions and
+    CachingSessionStore.expired_sessions), batch_size sessions at a time,
+    until no expired session remains.  Sessions that haven't expired are never
+    examined.  Every expired session is validated by the session handler,
+    which publishes its expiration and deletes it.
+
+    The duration of each sweep is recorded in a LatencyHistogram, and
+    snapshot exports it along with counts of the sessions validated.
+    """
+
+    def __init__(self, session_handler, interval=3600, batch_size=500):
+        """
+        :type session_handler: DefaultNativeSessionHandler
+        :param interval: the time between sweeps, in seconds
+        :param batch_size: the maximum number of sessions obtained from the
+                           session store at a time
+        """
+        self.session_handler = session_handler
+        self.interval = interval
+        self.batch_size = batch_size
+        self.service = None
+        self.sweep_latency = LatencyHistogram()
+        self.last_sweep_seconds = None
+        self.sessions_validated = 0
+        self.sessions_invalidated = 0
+
+    @property
+    def is_enabled(self):
+        return self.service is not None
+
+    def enable_session_validation(self):
+        if self.service is None and self.interval:
+            self.service = StoppableScheduledExecutor(self.run,
+                                                      interval=self.interval)
+            self.service.daemon = True  # mustn't keep the interpreter alive
+            self.service.start()
+
+    def disable_session_validation(self):
+        service, self.service = self.service, None
+        if service is not None:
+            service.stop()
+
+    def run(self):
+        try:
+            self.validate_sessions()
+        except Exception:
+            # the scheduled thread mustn't die, so the next sweep may succeed
+            logger.exception('Session validation failed')
+
+    def validate_sessions(self, now=None):
+        """
+        Validates every expired session, a batch at a time.
+
+        :param now: the epoch time to compare expirations to, by default now
+        :returns: the number of sessions invalidated
+        """
+        store = self.session_handler.session_store
+        try:
+            expired_sessions = store.expired_sessions
+        except AttributeError:
+            msg = ('{0} has no expiration index, so it can\'t be validated by '
+                   'a scheduler'.format(store.__class__.__name__))
+            raise IllegalStateException(msg)
+
+        start = time.perf_counter()
+        invalidated = 0
+        try:
+            while True:
+                batch = expired_sessions(now=now, limit=self.batch_size)
+                for session in batch:
+                    if self.validate(session):
+                        invalidated += 1
+                self.sessions_validated += len(batch)
+                if len(batch) < self.batch_size:
+                    break
+        finally:
+            self.sessions_invalidated += invalidated
+            self.last_sweep_seconds = time.perf_counter() - start
+            self.sweep_latency.record(self.last_sweep_seconds)
+
+        msg = ("Session validation invalidated {0} sessions in {1:.3f} "
+               "seconds".format(invalidated, self.last_sweep_seconds))
+        logger.debug(msg)
+        return invalidated
+
+    def validate(self, session):
+        """
+        :returns: True when the session was invalidated
+        """
+        return self.session_handler.validate_expired(session)
+
+    def snapshot(self):
+        """
+        :returns: a dict of the scheduler's metrics, suitable for exporting
+        """
+        return {'enabled': self.is_enabled,
+                'sessions_validated': self.sessions_validated,
+                'sessions_invalidated': self.sessions_invalidated,
+                'last_sweep_seconds': self.last_sweep_seconds,
+                'sweep_latency': self.sweep_latency.snapshot()}
+
+    def __repr__(self):
+        return ("ExecutorServiceSessionValidationScheduler(interval={0}, "
+                "batch_size={1}, enabled={2})".format(
+                    self.interval, self.batch_size, self.is_enabled))
+
+
+class SessionUnitOfWork:
+    """
+    The sessions that a DefaultNativeSessionManager has loaded, and those it
+    has changed, during one unit of work (typically, one request) of a thread.
+    """
+
+    def __init__(self):
+        self.sessions = {}  # session_id: SimpleSession
+        self.changed = collections.OrderedDict()  # session_id: SimpleSession
+        self.depth = 0  # of nested units of work
+
+    def __repr__(self):
+        return ("SessionUnitOfWork(sessions={0}, changed={1})".
+                format(list(self.sessions), list(self.changed)))
 
 
 class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
@@ -1309,6 +3139,21 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
      yet clear why Shiro doesn't.  Until the reason why is revealed, Yosai
      includes a new auto_touch feature to enable/disable auto-touching.
 
+    Units of Work
+    -------------
+    Outside of a unit of work, every attribute access reads (and validates)
+    the session from its store and every change writes it back.  Within a
+    unit of work, a session is read once, all accesses and changes apply to
+    that in-memory copy and the changed sessions are written once, by flush:
+
+        with session_manager.unit_of_work():
+            session.set_attribute('one', 1)
+            session.set_attribute('two', 2)
+        # the session is written once, upon leaving the block
+
+    Units of work are thread-local, so a session manager may be shared by
+    threads that each handle a request.  Nested units of work join the
+    outermost one, which alone flushes (or discards) their changes.
     """
 
     def __init__(self):
@@ -1318,6 +3163,13 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
             DefaultNativeSessionHandler(session_event_handler=self.session_event_handler,
                                         auto_touch=True)
         self._event_bus = None
+        self._unit_of_work = threading.local()
+
+        self.session_validation_scheduler = None
+        self.session_validation_scheduler_enabled =\
+            session_settings.validation_scheduler_enable
+        self.session_validation_interval =\
+            session_settings.validation_time_interval
 
     @property
     def session_event_handler(self):
@@ -1347,6 +3199,147 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
         self.session_event_handler.event_bus = eventbus
         self.session_handler.event_bus = eventbus  # it passes through
 
+    # -------------------------------------------------------------------------
+    # Unit of Work Methods
+    # -------------------------------------------------------------------------
+
+    @property
+    def current_unit_of_work(self):
+        """
+        :returns: the SessionUnitOfWork of the current thread, or None
+        """
+        return getattr(self._unit_of_work, 'work', None)
+
+    def begin(self):
+        """
+        Begins a unit of work in the current thread.  Nested calls join the
+        unit of work that is already underway.
+
+        :returns: SessionUnitOfWork
+        """
+        work = self.current_unit_of_work
+        if work is None:
+            work = self._unit_of_work.work = SessionUnitOfWork()
+        work.depth += 1
+        return work
+
+    def flush(self):
+        """
+        Writes each session changed during the current unit of work, once.
+        """
+        work = self.current_unit_of_work
+        if work is None:
+            return
+
+        while work.changed:
+            _, session = work.changed.popitem(last=False)
+            self.session_handler.on_change(session)
+
+    def end(self, flush=True):
+        """
+        Ends the current thread's unit of work, unless ending a nested one.
+
+        :param flush: when False, changes that aren't yet flushed are
+                      discarded; ignored when ending a nested unit of work,
+                      whose changes belong to the outermost one
+        """
+        work = self.current_unit_of_work
+        if work is None:
+            return
+
+        work.depth -= 1
+        if work.depth > 0:
+            return
+
+        try:
+            if flush:
+                self.flush()
+        finally:
+            self._unit_of_work.work = None
+
+    @contextlib.contextmanager
+    def unit_of_work(self):
+        """
+        A unit of work that is flushed upon leaving the block, unless an
+        exception is raised, in which case its changes are discarded.
+
+        A nested block joins the outermost unit of work, so its changes are
+        flushed or discarded along with those of the outermost block:  an
+        exception raised by a nested block and caught by an enclosing one
+        doesn't discard them.
+        """
+        work = self.begin()
+        try:
+            yield work
+        except:
+            self.end(flush=False)
+            raise
+        self.end()
+
+    def _on_change(self, session):
+        work = self.current_unit_of_work
+        if work is None:
+            self.session_handler.on_change(session)
+        else:
+            work.changed[session.session_id] = session
+
+    def _forget(self, session):
+        work = self.current_unit_of_work
+        if work is not None:
+            work.sessions.pop(session.session_id, None)
+            work.changed.pop(session.session_id, None)
+
+    # -------------------------------------------------------------------------
+    # Session Validation Methods
+    # -------------------------------------------------------------------------
+
+    def enable_session_validation(self):
+        """
+        Starts validating expired sessions in the background, every
+        session_validation_interval.
+
+        :returns: ExecutorServiceSessionValidationScheduler
+        """
+        scheduler = self.session_validation_scheduler
+        if scheduler is None:
+            scheduler = ExecutorServiceSessionValidationScheduler(
+                self.session_handler,
+                interval=self.session_validation_interval.total_seconds())
+            self.session_validation_scheduler = scheduler
+
+        msg = "Enabling session validation scheduler..."
+        logger.debug(msg)
+        scheduler.enable_session_validation()
+        return scheduler
+
+    def enable_session_validation_if_necessary(self):
+        # as with shiro, called when a session starts:
+        scheduler = self.session_validation_scheduler
+        if (self.session_validation_scheduler_enabled and
+                (scheduler is None or not scheduler.is_enabled)):
+            self.enable_session_validation()
+
+    def disable_session_validation(self):
+        scheduler = self.session_validation_scheduler
+        if scheduler is not None:
+            scheduler.disable_session_validation()
+            msg = "Disabled session validation scheduler."
+            logger.debug(msg)
+
+    def validate_sessions(self):
+        """
+        Validates every expired session now, rather than waiting for the
+        scheduler's next sweep.  A CachingSessionStore whose expire_on_write
+        is enabled (as it is unless the scheduler is) forgets sessions that had
+        already expired when a session was last written.
+
+        :returns: the number of sessions invalidated
+        """
+        scheduler = (self.session_validation_scheduler or
+                     ExecutorServiceSessionValidationScheduler(
+                         self.session_handler))
+        return scheduler.validate_sessions()
+
     # -------------------------------------------------------------------------
     # Session Lifecycle Methods
     # -------------------------------------------------------------------------
@@ -1357,6 +3350,8 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
         start method of the SessionManager but rather defers timeout settings
         responsibilities to the SimpleSession, which uses session_settings
         """
+        self.enable_session_validation_if_necessary()
+
         # is a SimpleSesson:
         session = self._create_session(session_context)
 
@@ -1377,24 +3372,54 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
             session.stop()
             self.session_handler.on_stop(session)
 
-            idents = session.get_internal_attribute('identifiers_session_key')
-
-            if not idents:
-                idents = identifiers
-
-            session_tuple = collections.namedtuple(
-                'session_tuple', ['identifiers', 'session_key'])
-            mysession = session_tuple(idents, session_key)
-
-            self.session_event_handler.notify_stop(mysession)
+            self.session_event_handler.notify_stop(
+                DefaultNativeSessionHandler.session_event(
+                    session, session_key, identifiers))
 
         except InvalidSessionException:
             raise
 
         finally:
             # DG: this results in a redundant delete operation (from shiro).
+            self._forget(session)
             self.session_handler.after_stopped(session)
 
+    def revoke_all_sessions(self, identifier):
+        """
+        Stops every session of a user, such as to log the user out everywhere.
+        The sessions are deleted at once and then a stop event is published
+        for each of them.
+
+        :param identifier: the user's primary identifier
+        :returns: the number of sessions stopped
+        """
+        session_store = self.session_handler.session_store
+        if not hasattr(session_store, 'session_ids_of'):
+            msg = ("{0} can't find a user's sessions".
+                   format(session_store.__class__.__name__))
+            raise IllegalStateException(msg)
+
+        session_ids = session_store.session_ids_of(identifier)
+        stopped = []
+        for session_id in session_ids:
+            # sessions that have expired from cache are merely forgotten:
+            session = session_store.read(session_id)
+            if session is not None:
+                session.stop()
+                stopped.append(session)
+
+        session_store.delete_sessions(identifier, session_ids)
+
+        for session in stopped:
+            self._forget(session)
+            self.session_event_handler.notify_stop(
+                DefaultNativeSessionHandler.session_event(
+                    session, DefaultSessionKey(session.session_id)))
+
+        msg = "Revoked {0} sessions of [{1}]".format(len(stopped), identifier)
+        logger.debug(msg)
+        return len(stopped)
+
     # -------------------------------------------------------------------------
     # Session Creation Methods
     # -------------------------------------------------------------------------
@@ -1444,9 +3469,24 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
     # called internally:
     def _lookup_required_session(self, key):
         """
+        Within a unit of work, a session is read and validated only once.
+
         :returns: SimpleSession
         """
-        session = self.session_handler.do_get_session(key)
+        work = self.current_unit_of_work
+        if work is None:
+            session = self.session_handler.do_get_session(key)
+        else:
+            session_id = key.session_id
+            session = work.sessions.get(session_id)
+            if session is None:
+                session = self.session_handler.do_get_session(
+                    key, defer_change=True)
+                if session:
+                    work.sessions[session_id] = session
+                    if self.session_handler.auto_touch:
+                        work.changed[session_id] = session  # was touched
+
         if (not session):
             msg = ("Unable to locate required Session instance based "
                    "on session_key [" + str(key) + "].")
@@ -1486,17 +3526,17 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
     def set_idle_timeout(self, session_key, idle_time):
         session = self._lookup_required_session(session_key)
         session.idle_timeout = idle_time
-        self.session_handler.on_change(session)
+        self._on_change(session)
 
     def set_absolute_timeout(self, session_key, absolute_time):
         session = self._lookup_required_session(session_key)
         session.absolute_timeout = absolute_time
-        self.session_handler.on_change(session)
+        self._on_change(session)
 
     def touch(self, session_key):
         session = self._lookup_required_session(session_key)
         session.touch()
-        self.session_handler.on_change(session)
+        self._on_change(session)
 
     def get_host(self, session_key):
         return self._lookup_required_session(session_key).host
@@ -1519,13 +3559,13 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
         else:
             session = self._lookup_required_session(session_key)
             session.set_internal_attribute(attribute_key, value)
-            self.session_handler.on_change(session)
+            self._on_change(session)
 
     def remove_internal_attribute(self, session_key, attribute_key):
         session = self._lookup_required_session(session_key)
         removed = session.remove_internal_attribute(attribute_key)
         if (removed is not None):
-            self.session_handler.on_change(session)
+            self._on_change(session)
         return removed
 
     def get_attribute_keys(self, session_key):
@@ -1545,13 +3585,13 @@ class DefaultNativeSessionManager(cache_abcs.CacheHandlerAware,
         else:
             session = self._lookup_required_session(session_key)
             session.set_attribute(attribute_key, value)
-            self.session_handler.on_change(session)
+            self._on_change(session)
 
     def remove_attribute(self, session_key, attribute_key):
         session = self._lookup_required_session(session_key)
         removed = session.remove_attribute(attribute_key)
         if (removed is not None):
-            self.session_handler.on_change(session)
+            self._on_change(session)
         return removed
 
 
@@ -25,6 +25,10 @@ class DefaultSessionSettings:
         idletimeout = timeout_config.get('idle_timeout', 450)  # def:15min
         self.idle_timeout = datetime.timedelta(seconds=idletimeout)
 
+        # a fraction of idle_timeout:
+        self.touch_write_threshold =\
+            timeout_config.get('touch_write_threshold', 0.1)
+
         self.validation_scheduler_enable =\
             validation_config.get('scheduler_enabled', True)
 
@@ -33,11 +37,12 @@ class DefaultSessionSettings:
 
     def __repr__(self):
         return ("SessionSettings(absolute_timeout={0}, idle_timeout={1}, "
-                "validation_scheduler_enable={2}, "
-                "validation_time_interval={3})".
+                "touch_write_threshold={2}, validation_scheduler_enable={3}, "
+                "validation_time_interval={4})".
                 format(
                     self.absolute_timeout,
                     self.idle_timeout,
+                    self.touch_write_threshold,
                     self.validation_scheduler_enable,
                     self.validation_time_interval))
 
@@ -19,6 +19,8 @@ under the License.
 
 import collections
 import datetime
+import hashlib
+import math
 import time
 import threading
 
@@ -116,3 +118,45 @@ class OrderedSet(collections.MutableSet):
         if isinstance(other, OrderedSet):
             return len(self) == len(other) and list(self) == list(other)
         return set(self) == set(other)
+
+
+class BloomFilter:
+    """
+    A compact, probabilistic set.  Membership tests may return false positives
+    (at about error_rate, until capacity items are added) but never false
+    negatives.  Items can't be removed, so a filter is rebuilt to forget them.
+    """
+
+    def __init__(self, capacity=100000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.bit_count = max(8, math.ceil(-capacity * math.log(error_rate) /
+                                          math.log(2) ** 2))
+        self.hash_count = max(1, round(self.bit_count / capacity *
+                                       math.log(2)))
+        self.bits = bytearray((self.bit_count + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # double hashing derives every position from a single digest:
+        digest = hashlib.md5(str(item).encode('utf-8')).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.bit_count
+                for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+    def __repr__(self):
+        return ("BloomFilter(capacity={0}, error_rate={1}, count={2})".
+                format(self.capacity, self.error_rate, self.count))